@@ -0,0 +1,376 @@
+"""
+Offline replay benchmark for the dictionary lookup pipeline.
+
+Usage (from backend/):
+    python -m benchmarks.dict_lookup [--words 1000] [--corpus DIR] [--allocations] [--json OUT]
+    python -m benchmarks.dict_lookup --record DIR --word-list words.txt   # needs network
+
+Every HTTP request goes through an ``httpx.MockTransport`` that answers from
+a response corpus, so the run needs no network and is stable enough for CI.
+A request to any other host fails the run. The corpus is either:
+
+- a recorded directory: ``DIR/<source>/<word>.html`` (``.json`` for
+  freedict), captured with ``--record``; words with no file get a 404, as
+  the live sites do for unknown words;
+- synthetic (the default): generated pages for ``--words`` pseudo-words.
+  Entry sizes vary from word to word, about 5% of words are "not found",
+  and each page has ~20 KB of scripts and navigation in front of the entry.
+
+Each word goes through the real code paths, in this order:
+
+- ``youdao`` / ``cambridge`` / ``bing`` / ``freedict``: cold lookup of each
+  source (cache miss → replayed response → parse → cache write);
+- ``get_all_examples``: merging the examples of the four results;
+- ``aggregate (warm)`` and ``search_word (warm)``: the same lookups again,
+  now served from the dictionary cache.
+
+Then every cache tier is emptied and ``aggregate (cold)`` runs for all words.
+
+The async entry points are called with the replaying client. The sync
+wrappers (``search_cambridge`` etc.) only add a short-lived loop and client
+around them. The AI fallback is disabled for the run so it can never reach
+the network.
+
+Reported per stage: latency p50/p95/p99/max. With ``--allocations``, also
+the average number of bytes allocated per call (peak traced memory, via
+tracemalloc; this slows the run, so latency figures from such a run are not
+comparable).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx  # noqa: E402
+
+from models.database import DatabaseManager  # noqa: E402
+from services import multi_dict_service  # noqa: E402
+from services.dict_service import DictService  # noqa: E402
+from services.multi_dict_service import MultiDictService  # noqa: E402
+from services.request_metrics import RequestMetricsRecorder  # noqa: E402
+
+SOURCES = ("youdao", "cambridge", "bing", "freedict")
+
+# Same URLs as the fetchers (DictService._search_youdao_base_async, MultiDictService.search_*_async).
+SOURCE_URLS = {
+    "youdao": "https://dict.youdao.com/w/eng/{word}",
+    "cambridge": "https://dictionary.cambridge.org/dictionary/english-chinese-simplified/{word}",
+    "bing": "https://cn.bing.com/dict/search?q={word}&mkt=zh-cn&setlang=zh-hans",
+    "freedict": "https://api.dictionaryapi.dev/api/v2/entries/en/{word}",
+}
+_HOSTS = {
+    "dict.youdao.com": "youdao",
+    "dictionary.cambridge.org": "cambridge",
+    "cn.bing.com": "bing",
+    "api.dictionaryapi.dev": "freedict",
+}
+
+
+# ----------------------------------------------------------------------
+# Response corpus
+# ----------------------------------------------------------------------
+
+class ResponseCorpus:
+    """(source, word) -> (status, body)."""
+
+    def __init__(self, words: List[str], responses: Dict[Tuple[str, str], Tuple[int, str]]) -> None:
+        self.words = words
+        self.responses = responses
+
+    def get(self, source: str, word: str) -> Tuple[int, str]:
+        return self.responses.get((source, word.lower()), (404, ""))
+
+    @classmethod
+    def load(cls, directory: str, limit: Optional[int] = None) -> "ResponseCorpus":
+        responses = {}
+        words = set()
+        for source in SOURCES:
+            source_dir = os.path.join(directory, source)
+            if not os.path.isdir(source_dir):
+                continue
+            for name in os.listdir(source_dir):
+                word, _ = os.path.splitext(name)
+                with open(os.path.join(source_dir, name), encoding="utf-8") as f:
+                    responses[(source, word.lower())] = (200, f.read())
+                words.add(word.lower())
+        ordered = sorted(words)
+        return cls(ordered[:limit] if limit else ordered, responses)
+
+    @classmethod
+    def synthetic(cls, count: int, seed: int = 7) -> "ResponseCorpus":
+        rng = random.Random(seed)
+        words = synthetic_words(count, rng)
+        responses = {}
+        for word in words:
+            if rng.random() < 0.05:
+                continue  # unknown everywhere: every source answers 404
+            responses[("youdao", word)] = (200, _chrome(rng) + _youdao_body(word, rng))
+            responses[("cambridge", word)] = (200, _chrome(rng) + _cambridge_body(word, rng))
+            responses[("bing", word)] = (200, _chrome(rng) + _bing_body(word, rng))
+            responses[("freedict", word)] = (200, _free_dict_body(word, rng))
+        return cls(words, responses)
+
+
+def synthetic_words(count: int, rng: random.Random) -> List[str]:
+    syllables = ["ab", "con", "tra", "ver", "sion", "ment", "pre", "lo", "gic", "al", "im", "port", "ex", "tend", "ly"]
+    words = []
+    seen = set()
+    while len(words) < count:
+        word = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+    return words
+
+
+def _chrome(rng: random.Random) -> str:
+    return (
+        "<html><head>"
+        + "<script>window.cfg = {key: 'value', list: [1, 2, 3]};</script>" * rng.randint(100, 200)
+        + "</head><body>"
+        + "<div class='nav'><ul><li><a href='/a'>link</a></li></ul></div>" * rng.randint(100, 200)
+    )
+
+
+def _youdao_body(word: str, rng: random.Random) -> str:
+    meanings = "".join(f"<li>n. 含义{i}；释义 {word}</li>" for i in range(rng.randint(1, 5)))
+    examples = "".join(
+        f"<li><p>The {word} example {i}.</p><p>例句 {i}。</p></li>" for i in range(rng.randint(1, 6))
+    )
+    return (
+        '<div id="results-contents"><div class="baav">'
+        f'<span class="pronounce">英<span class="phonetic">[{word}]</span></span>'
+        f'<span class="pronounce">美<span class="phonetic">[{word}]</span></span></div>'
+        f'<div class="trans-container"><ul>{meanings}<li class="additional">[ 复数 {word}s ]</li></ul></div>'
+        f'<div id="bilingual"><ul>{examples}</ul></div>'
+        f'<div id="relWordTab"><p>词根： {word[:4]}</p></div>'
+        '<div id="synonyms"><ul><li>n.</li><li>alpha, beta</li></ul></div></div>'
+        "</body></html>"
+    )
+
+
+def _cambridge_body(word: str, rng: random.Random) -> str:
+    blocks = "".join(
+        '<div class="def-block"><div class="ddef_h">'
+        f'<div class="def">meaning {i} of {word}</div></div><span class="trans">释义 {i}</span>'
+        f'<div class="examp"><span class="eg">A {word} sentence.</span><span class="trans">例句。</span></div></div>'
+        for i in range(rng.randint(1, 8))
+    )
+    return (
+        f'<div class="di-title">{word}</div>'
+        f'<span class="us dpron-i"><span class="pron">/{word}/</span></span>{blocks}</body></html>'
+    )
+
+
+def _bing_body(word: str, rng: random.Random) -> str:
+    sentences = "".join(
+        f'<div class="se_li"><div class="sen_en">Bing {word} {i}.</div><div class="sen_cn">必应 {i}。</div></div>'
+        for i in range(rng.randint(1, 10))
+    )
+    return (
+        f'<div class="qdef"><div class="hd_prUS">美 [{word}]</div><ul><li>n. 障碍</li><li>v. 钩住</li></ul></div>'
+        f'<div id="sentenceSeg">{sentences}</div></body></html>'
+    )
+
+
+def _free_dict_body(word: str, rng: random.Random) -> str:
+    return json.dumps([{
+        "word": word,
+        "phonetic": f"/{word}/",
+        "phonetics": [{"audio": f"https://api.dictionaryapi.dev/media/pronunciations/en/{word}-us.mp3"}],
+        "meanings": [
+            {"partOfSpeech": pos, "definitions": [
+                {"definition": f"{pos} sense {i} of {word}.", "example": f"Use {word} here."}
+                for i in range(rng.randint(1, 3))
+            ]}
+            for pos in ("noun", "verb")
+        ],
+    }])
+
+
+def replay_transport(corpus: ResponseCorpus) -> httpx.MockTransport:
+    """MockTransport answering dictionary requests from ``corpus``; other hosts are an error."""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        source = _HOSTS.get(request.url.host)
+        if source is None:
+            raise RuntimeError(f"benchmark tried to reach {request.url} (not in the replay corpus)")
+        if source == "bing":
+            word = request.url.params.get("q", "")
+        else:
+            word = request.url.path.rstrip("/").rsplit("/", 1)[-1]
+        status, body = corpus.get(source, word)
+        return httpx.Response(status, text=body)
+
+    return httpx.MockTransport(handler)
+
+
+# ----------------------------------------------------------------------
+# Harness
+# ----------------------------------------------------------------------
+
+class _StageRecorder:
+    def __init__(self, words: int, allocations: bool) -> None:
+        self.timings = RequestMetricsRecorder(max_samples_per_series=max(words, 1))
+        self.allocations = allocations
+        self.allocated: Dict[str, List[int]] = {}
+
+    async def measure(self, stage: str, awaitable):
+        if self.allocations:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            self.timings.record(bucket="bench", route=stage, method="STAGE", duration_ms=elapsed_ms, status_code=200)
+            if self.allocations:
+                self.allocated.setdefault(stage, []).append(tracemalloc.get_traced_memory()[1] - before)
+
+    def report(self) -> Dict[str, dict]:
+        routes = self.timings.snapshot()["routes"]
+        report = {}
+        for key, summary in routes.items():
+            stage = key.split(" ", 1)[1]
+            row = {k: summary[k] for k in ("count", "p50_ms", "p95_ms", "p99_ms", "max_ms")}
+            if stage in self.allocated:
+                samples = self.allocated[stage]
+                row["alloc_kb_per_call"] = round(sum(samples) / len(samples) / 1024, 1)
+            report[stage] = row
+        return report
+
+
+@contextmanager
+def _isolated_cache(db: DatabaseManager):
+    """Point the dictionary cache at ``db`` and keep the AI fallback off the network."""
+    saved_db = multi_dict_service._db_manager
+    saved_ai = DictService.__dict__["_search_word_ai_fallback_async"]
+
+    async def _no_ai(_word):
+        return None
+
+    multi_dict_service._db_manager = db
+    DictService._search_word_ai_fallback_async = staticmethod(_no_ai)
+    MultiDictService.cache.clear_memory()
+    try:
+        yield
+    finally:
+        MultiDictService.cache.clear_memory()
+        multi_dict_service._db_manager = saved_db
+        DictService._search_word_ai_fallback_async = saved_ai
+
+
+async def _run_stages(corpus: ResponseCorpus, recorder: _StageRecorder, db: DatabaseManager) -> None:
+    async with httpx.AsyncClient(transport=replay_transport(corpus)) as client:
+        for word in corpus.words:
+            youdao = await recorder.measure("youdao", DictService._search_youdao_base_async(word, client))
+            sources = {}
+            for source, fetch in (
+                ("cambridge", MultiDictService.search_cambridge_async),
+                ("bing", MultiDictService.search_bing_async),
+                ("freedict", MultiDictService.search_free_dict_async),
+            ):
+                result = await recorder.measure(source, fetch(word, client))
+                if result:
+                    sources[source] = result
+            if youdao:
+                sources["youdao"] = youdao
+
+            async def _examples(found=sources):
+                return MultiDictService.get_all_examples(found)
+
+            await recorder.measure("get_all_examples", _examples())
+            await recorder.measure(
+                "aggregate (warm)", MultiDictService.aggregate_search_async(word, youdao_result=youdao, client=client)
+            )
+            await recorder.measure("search_word (warm)", DictService.search_word_async(word, client=client))
+
+        MultiDictService.cache.clear_memory()
+        db.clear_all_dict_cache()
+        for word in corpus.words:
+            await recorder.measure("aggregate (cold)", MultiDictService.aggregate_search_async(word, client=client))
+
+
+def run(corpus: ResponseCorpus, allocations: bool = False) -> Dict[str, dict]:
+    """Replay ``corpus`` through the lookup pipeline; returns per-stage summaries."""
+    recorder = _StageRecorder(len(corpus.words), allocations)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bench.db"), json_path=os.path.join(tmp, "missing.json"))
+        try:
+            with _isolated_cache(db):
+                if allocations:
+                    tracemalloc.start()
+                try:
+                    asyncio.run(_run_stages(corpus, recorder, db))
+                finally:
+                    if allocations:
+                        tracemalloc.stop()
+        finally:
+            db.close_all_connections()
+    return recorder.report()
+
+
+async def _record(directory: str, words: List[str]) -> None:
+    headers = dict(multi_dict_service._DEFAULT_HEADERS)
+    async with httpx.AsyncClient(headers=headers, timeout=15, follow_redirects=True) as client:
+        for word in words:
+            for source, template in SOURCE_URLS.items():
+                resp = await client.get(template.format(word=word))
+                if resp.status_code != 200:
+                    continue
+                ext = "json" if source == "freedict" else "html"
+                os.makedirs(os.path.join(directory, source), exist_ok=True)
+                with open(os.path.join(directory, source, f"{word.lower()}.{ext}"), "w", encoding="utf-8") as f:
+                    f.write(resp.text)
+            print(f"recorded {word}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=1000, help="corpus size (synthetic, or a cap for --corpus)")
+    parser.add_argument("--corpus", help="directory of recorded responses (see --record)")
+    parser.add_argument("--allocations", action="store_true", help="also report bytes allocated per call")
+    parser.add_argument("--json", help="write the report as JSON to this path")
+    parser.add_argument("--record", help="fetch live responses for --word-list into this directory and exit")
+    parser.add_argument("--word-list", help="file with one word per line (for --record)")
+    args = parser.parse_args()
+
+    if args.record:
+        if not args.word_list:
+            parser.error("--record needs --word-list")
+        with open(args.word_list, encoding="utf-8") as f:
+            words = [line.strip() for line in f if line.strip()]
+        asyncio.run(_record(args.record, words))
+        return
+
+    corpus = ResponseCorpus.load(args.corpus, args.words) if args.corpus else ResponseCorpus.synthetic(args.words)
+    report = run(corpus, allocations=args.allocations)
+
+    print(f"{len(corpus.words)} words ({'recorded: ' + args.corpus if args.corpus else 'synthetic'})")
+    header = f"{'stage':<20} {'count':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"
+    print(header + (f" {'alloc KB':>9}" if args.allocations else ""))
+    for stage, row in report.items():
+        line = (
+            f"{stage:<20} {row['count']:>6} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} "
+            f"{row['p99_ms']:>8.2f} {row['max_ms']:>8.2f}"
+        )
+        if "alloc_kb_per_call" in row:
+            line += f" {row['alloc_kb_per_call']:>9.1f}"
+        print(line)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
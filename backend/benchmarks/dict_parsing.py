@@ -0,0 +1,138 @@
+"""
+Per-source parse time of the dictionary scrapers.
+
+Usage (from backend/):
+    python -m benchmarks.dict_parsing [--fixtures DIR] [--repeat 20]
+
+``--fixtures`` points at saved result pages named ``youdao*.html``,
+``cambridge*.html`` and ``bing*.html`` (save them from a browser or with
+curl). Without it, synthetic pages are used: a small entry behind ~100 KB
+of scripts, styles and navigation, which is roughly how the real pages are
+laid out.
+
+For each page the benchmark reports:
+
+- "legacy": ``BeautifulSoup(page, 'html.parser')`` over the whole page,
+  which is what each lookup paid before services.html_parsing, not yet
+  counting the field extraction;
+- "current": the scraper's full parse function (slice + selected builder +
+  extraction), once per available tree builder.
+"""
+import argparse
+import glob
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bs4 import BeautifulSoup  # noqa: E402
+
+from services import html_parsing  # noqa: E402
+from services.dict_service import DictService  # noqa: E402
+from services.multi_dict_service import MultiDictService  # noqa: E402
+
+PARSERS = {
+    "youdao": DictService._parse_youdao,
+    "cambridge": MultiDictService._parse_cambridge,
+    "bing": MultiDictService._parse_bing,
+}
+
+_SYNTHETIC_BODIES = {
+    "youdao": (
+        '<div id="results-contents"><div class="baav">'
+        '<span class="pronounce">英<span class="phonetic">[snæɡ]</span></span>'
+        '<span class="pronounce">美<span class="phonetic">[snæɡ]</span></span></div>'
+        '<div class="trans-container"><ul><li>n. 障碍；意外困难；（水中的）暗桩</li>'
+        '<li>vt. 钩住；阻碍</li><li class="additional">[ 复数 snags ]</li></ul></div>'
+        + '<div id="bilingual"><ul>' + '<li><p>We hit a snag.</p><p>我们遇到了麻烦。</p></li>' * 10 + '</ul></div>'
+        '<div id="relWordTab"><p>词根： snag</p></div>'
+        '<div id="synonyms"><ul><li>n.</li><li>obstacle, hitch</li></ul></div></div>'
+    ),
+    "cambridge": (
+        '<div class="di-title">snag</div><span class="us dpron-i"><span class="pron">/snæɡ/</span></span>'
+        + (
+            '<div class="def-block"><div class="ddef_h"><div class="def">a problem or difficulty</div></div>'
+            '<span class="trans">问题；障碍</span>'
+            '<div class="examp"><span class="eg">The only snag is the cost.</span><span class="trans">唯一的问题是费用。</span></div>'
+            '</div>'
+        ) * 8
+    ),
+    "bing": (
+        '<div class="qdef"><div class="hd_prUS">美 [snæɡ]</div><ul><li>n. 障碍</li><li>v. 钩住</li></ul></div>'
+        + '<div id="sentenceSeg">' + (
+            '<div class="se_li"><div class="sen_en">We hit a snag.</div><div class="sen_cn">我们遇到了麻烦。</div></div>'
+        ) * 10 + '</div>'
+    ),
+}
+
+
+def _synthetic_page(body: str) -> str:
+    chrome = (
+        "<html><head>"
+        + "<script>window.cfg = {key: 'value', list: [1, 2, 3]};</script>" * 600
+        + "<style>.nav a{color:#333;margin:0 4px}</style>" * 300
+        + "</head><body>"
+        + "<div class='nav'><ul><li><a href='/a'>link</a></li><li><a href='/b'>link</a></li></ul></div>" * 600
+    )
+    return chrome + body + "<div class='footer'>" + "<p>footer text</p>" * 200 + "</div></body></html>"
+
+
+def _load_pages(fixtures):
+    pages = {}
+    for source in PARSERS:
+        if fixtures:
+            for path in sorted(glob.glob(os.path.join(fixtures, f"{source}*.html"))):
+                with open(path, encoding="utf-8") as f:
+                    pages.setdefault(source, []).append((os.path.basename(path), f.read()))
+        else:
+            pages[source] = [("synthetic", _synthetic_page(_SYNTHETIC_BODIES[source]))]
+    return pages
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def _available_builders():
+    builders = ["html.parser"]
+    for name in ("lxml",):
+        try:
+            BeautifulSoup("<p></p>", name)
+            builders.append(name)
+        except Exception:
+            pass
+    return builders
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", help="directory of saved youdao*/cambridge*/bing*.html pages")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    builders = _available_builders()
+    print(f"tree builders: {', '.join(builders)} (default: {html_parsing.HTML_FEATURES})")
+    print(f"{'source':<10} {'page':<24} {'KB':>6} {'legacy ms':>10}  " + "  ".join(f"{b + ' ms':>16}" for b in builders))
+    for source, pages in _load_pages(args.fixtures).items():
+        parse = PARSERS[source]
+        for name, page in pages:
+            legacy = _time(lambda: BeautifulSoup(page, "html.parser"), args.repeat)
+            current = []
+            for builder in builders:
+                html_parsing.HTML_FEATURES = builder
+                current.append(_time(lambda: parse("snag", page), args.repeat))
+            print(
+                f"{source:<10} {name[:24]:<24} {len(page.encode('utf-8')) / 1024:>6.0f} {legacy:>10.2f}  "
+                + "  ".join(f"{ms:>16.2f}" for ms in current)
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Time GET /api/review/forecast on a synthetic 100k-word database.
+
+Usage (from backend/):
+    python -m benchmarks.review_forecast [--words 100000] [--days 90]
+
+Builds a throwaway database with schedules spread over the next year (plus a
+share of new and overdue words) and warms the in-memory schedule once. It
+then reports the median and worst forecast time over repeated calls in three
+cases:
+- a full rebuild of the due cards' states (the first forecast of the process
+  or of a new day, or one after the schedule index was invalidated);
+- right after a schedule write (only the changed words are re-read);
+- with the schedule unchanged.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import DatabaseManager  # noqa: E402
+
+
+def _populate(db: DatabaseManager, count: int) -> None:
+    rng = random.Random(7)
+    now = time.time()
+    rows = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.03:
+            next_time = 0  # new
+        elif roll < 0.05:
+            next_time = now - rng.uniform(0, 5 * 86400)  # overdue
+        else:
+            next_time = now + rng.uniform(0, 365 * 86400)
+        rows.append((f"word{i}", "m", next_time, rng.randint(1, 60), rng.randint(0, 8), 2.5))
+    db.write(lambda conn: conn.executemany(
+        "INSERT INTO words (word, meaning, next_review_time, interval, repetitions, easiness) VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    ))
+    db.reviews.due_queue.invalidate()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=100_000)
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bench.db"), json_path=os.path.join(tmp, "missing.json"))
+        try:
+            _populate(db, args.words)
+            started = time.perf_counter()
+            db.get_due_review_count()
+            print(f"{args.words} words; schedule index loaded in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+            for label in ("full rebuild", "after a schedule write", "unchanged schedule"):
+                timings = []
+                for i in range(args.repeat):
+                    if label == "full rebuild":
+                        db.reviews._forecast_cache = None
+                    elif label == "after a schedule write":
+                        # Like a review landing between two forecasts.
+                        db.reviews.due_queue.set(f"word{i}", time.time() + 86400)
+                    started = time.perf_counter()
+                    db.get_review_forecast(args.days)
+                    timings.append((time.perf_counter() - started) * 1000)
+                print(
+                    f"forecast ({args.days} days, {label}): "
+                    f"median {statistics.median(timings):.2f} ms, max {max(timings):.2f} ms"
+                )
+        finally:
+            db.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
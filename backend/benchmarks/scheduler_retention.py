@@ -0,0 +1,65 @@
+"""
+Compare FSRS and SM-2 predicted retention on historical review logs.
+
+Usage (from backend/):
+    python -m benchmarks.scheduler_retention --db path/to/vocab.db [--fit]
+
+Every review after a word's first is scored: each model predicts the recall
+probability at that moment from the preceding history, and the prediction is
+compared with whether the user actually recalled the word (rating >= 3).
+With --fit, FSRS weights are fitted on 80% of the words and all models are
+scored on the held-out 20%; otherwise the cached (or default) weights are
+scored on the whole history.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import fsrs  # noqa: E402
+from services.fsrs_fit import ReviewLogs, evaluate, fit_weights, load_review_rows  # noqa: E402
+
+
+def _print_report(title: str, report: dict) -> None:
+    print(f"\n{title}: {report['reviews']} reviews, {report['scored_reviews']} scored")
+    print(f"{'model':<8}{'log_loss':>10}{'rmse':>10}{'predicted':>12}{'actual':>10}")
+    for model in ("fsrs", "sm2"):
+        m = report[model]
+        print(
+            f"{model:<8}{m['log_loss']:>10.4f}{m['rmse']:>10.4f}"
+            f"{m['predicted_retention']:>12.3f}{m['actual_retention']:>10.3f}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", default=os.environ.get("VOCABBOOK_DB_PATH", "vocab.db"))
+    parser.add_argument("--fit", action="store_true", help="fit on 80%% of words, score on the rest")
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    rows = load_review_rows(args.db)
+    if not rows:
+        print("review_history is empty; nothing to benchmark.")
+        return
+
+    if not args.fit:
+        cached = fsrs.load_weights_file(fsrs.weights_path_for(args.db))
+        weights = cached["weights"] if cached else None
+        label = "cached fitted weights" if cached else "default weights"
+        _print_report(f"All history ({label})", evaluate(ReviewLogs.from_rows(rows), weights))
+        return
+
+    train = ReviewLogs.from_rows([r for r in rows if r[0] % 5 != 0])
+    test = ReviewLogs.from_rows([r for r in rows if r[0] % 5 == 0])
+    started = time.perf_counter()
+    weights = fit_weights(train, iterations=args.iterations)
+    print(f"Fitted on {train.review_count} reviews in {time.perf_counter() - started:.1f}s")
+    _print_report("Held-out words (default weights)", evaluate(test))
+    _print_report("Held-out words (fitted weights)", evaluate(test, weights))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare word-row mapping for GET /api/words/all on a synthetic database.
+
+Usage (from backend/):
+    python -m benchmarks.word_rows [--words 50000] [--repeat 10]
+
+"legacy" is the per-row mapping the repositories used before WordRowMapper:
+``sqlite3.Row`` -> dict, then a Python loop replacing NULL text columns with
+"" and copying ``date_added`` to ``date``. "mapper" is WordsRepository.get_all,
+which uses COALESCE in SQL and maps plain tuples with a precomputed column
+tuple. Both read the same rows through the same connection.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models.database import DatabaseManager  # noqa: E402
+
+_LEGACY_TEXT_KEYS = ['phonetic', 'meaning', 'example', 'context_en', 'context_cn', 'roots', 'synonyms', 'tags', 'note', 'audio']
+
+
+def _legacy_get_all(db: DatabaseManager) -> list[dict]:
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.row_factory = sqlite3.Row
+    cursor.execute('SELECT * FROM words ORDER BY next_review_time ASC')
+    result = []
+    for row in cursor.fetchall():
+        d = dict(row)
+        d['mastered'] = bool(d['mastered'])
+        d['date'] = d['date_added']
+        for key in _LEGACY_TEXT_KEYS:
+            if d.get(key) is None:
+                d[key] = ""
+        result.append(d)
+    return result
+
+
+def _populate(db: DatabaseManager, count: int) -> None:
+    rng = random.Random(11)
+    now = time.time()
+    rows = []
+    for i in range(count):
+        # Imported books leave most optional columns NULL.
+        example = f"example sentence {i}" if rng.random() < 0.4 else None
+        rows.append((f"word{i}", f"/w{i}/", f"meaning {i}", example, "2024-01-01", now + rng.uniform(0, 3e7)))
+    db.write(lambda conn: conn.executemany(
+        "INSERT INTO words (word, phonetic, meaning, example, date_added, next_review_time) VALUES (?, ?, ?, ?, ?, ?)",
+        rows,
+    ))
+
+
+def _time(fn, repeat: int) -> list[float]:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--words", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = DatabaseManager(db_path=os.path.join(tmp, "bench.db"), json_path=os.path.join(tmp, "missing.json"))
+        try:
+            _populate(db, args.words)
+            assert _legacy_get_all(db) == db.get_all_words()
+            results = {
+                "legacy": _time(lambda: _legacy_get_all(db), args.repeat),
+                "mapper": _time(db.get_all_words, args.repeat),
+            }
+            for label, samples in results.items():
+                print(f"{label:>7}: median {statistics.median(samples):7.1f} ms   worst {max(samples):7.1f} ms")
+            speedup = statistics.median(results["legacy"]) / statistics.median(results["mapper"])
+            print(f"{args.words} words; mapper is {speedup:.2f}x faster")
+        finally:
+            db.close_all_connections()
+
+
+if __name__ == "__main__":
+    main()
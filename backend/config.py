@@ -7,6 +7,11 @@ DB_PATH = os.path.join(DATA_DIR, "vocab.db")
 RESOURCE_DIR = os.path.join(DATA_DIR, "resources")
 SOUNDS_DIR = os.path.join(RESOURCE_DIR, "sounds")
 
+# 离线词典词库（ECDICT 格式，见 services.offline_dict）；文件不存在时该来源自动停用
+OFFLINE_DICT_PATH = os.environ.get("VOCABBOOK_OFFLINE_DICT", os.path.join(RESOURCE_DIR, "offline_dict.db"))
+# 随安装包附带的词库（数据目录里没有时使用）
+BUNDLED_OFFLINE_DICT_PATH = os.path.join(BASE_DIR, "resources", "offline_dict.db")
+
 # Ensure directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
 os.makedirs(RESOURCE_DIR, exist_ok=True)
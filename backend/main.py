@@ -27,7 +27,6 @@ from services.request_metrics import (
 )
 from services.blocking_io import shutdown_blocking_executors
 from services.http_client import close_http_client
-from services.multi_dict_service import shutdown_dict_executor
 
 # Global database instance
 db: DatabaseManager = None
@@ -48,7 +47,6 @@ async def lifespan(app: FastAPI):
     yield
     # Shutdown: stop DB work first, then close every connection (including
     # ones owned by executor threads).
-    shutdown_dict_executor()
     shutdown_blocking_executors()
     if db:
         db.close_all_connections()
@@ -155,5 +153,8 @@ def get_db() -> DatabaseManager:
 
 
 if __name__ == "__main__":
+    import multiprocessing
     import uvicorn
+    # Frozen (PyInstaller) builds: let spawned worker processes (FSRS fitting) bootstrap.
+    multiprocessing.freeze_support()
     uvicorn.run("main:app", host="127.0.0.1", port=8000)
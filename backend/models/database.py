@@ -3,6 +3,7 @@ import json
 import os
 import time
 import threading
+from contextlib import contextmanager
 from datetime import datetime
 from typing import Any, Optional
 import logging
@@ -14,6 +15,10 @@ from repositories.cache_repo import CacheRepository
 from repositories.translations_repo import TranslationsRepository
 from repositories.families_repo import FamiliesRepository
 from repositories.limits_repo import LimitsRepository
+from models.db_pool import ReadConnectionPool
+from models.db_writer import DatabaseWriter
+from utils.cache_codec import CURRENT_FORMAT, decode_payload, encode_payload
+from utils.text_utils import NORMALIZED_VERSION, clean_chinese_text, normalize_dict_entry
 
 logger = logging.getLogger(__name__)
 
@@ -31,21 +36,30 @@ class DatabaseManager:
     SQLite 数据库管理器，使用线程本地存储的长连接。
 
     优化策略：
-    - 每个线程维护一个独立的数据库连接（线程本地存储）
+    - 只读连接来自有上限的连接池：每个线程首次查询时租用一个（线程本地存储），
+      线程退出后自动回收，空闲过久的连接会被关闭
+    - 所有写操作交给单一写线程（DatabaseWriter），排队的写入合并为一个事务提交
     - 避免频繁创建/关闭连接的开销
     - 线程安全，支持多线程环境（如词典查询线程）
     """
 
-    def __init__(self, db_path="vocab.db", json_path="vocab.json"):
+    def __init__(self, db_path="vocab.db", json_path="vocab.json", read_pool_size=16):
         self.db_path = db_path
         self.json_path = json_path
         self._local = _DatabaseLocal()
         self._lock = threading.Lock()
-        # Registry of every connection handed out, so shutdown/test teardown
-        # can close connections owned by executor threads (thread-local state
-        # cannot be enumerated from other threads).
-        self._all_connections: list[sqlite3.Connection] = []
-        self._conn_registry_lock = threading.Lock()
+        # Bounded pool of read-only connections. Each thread leases one on
+        # first use (get_connection); leases of exited threads are reclaimed.
+        self._read_pool = ReadConnectionPool(
+            lambda: self._open_connection(read_only=True),
+            max_size=read_pool_size,
+        )
+        # The one connection allowed to write (see write()).
+        self._writer = DatabaseWriter(lambda: self._open_connection(read_only=False))
+        # Set by init_db: whether the words_fts index is usable on this SQLite
+        # build, and whether it was just created and still needs its backfill.
+        self.fts_enabled = False
+        self._fts_needs_backfill = False
 
         self.words = WordsRepository(self)
         self.reviews = ReviewsRepository(self)
@@ -55,70 +69,159 @@ class DatabaseManager:
         self.families = FamiliesRepository(self)
         self.limits = LimitsRepository(self)
 
-        self.init_db()
-        self.check_schema_updates()
-        self.backfill_word_tags()
-        self.migrate_from_json()
+        try:
+            self.init_db()
+            self.check_schema_updates()
+            self.backfill_word_tags()
+            self.backfill_review_rollup()
+            self.migrate_from_json()
+            self.normalize_stored_text()
+            self.compress_dict_cache()
+        except Exception:
+            self._writer.close()
+            self._read_pool.close()
+            raise
 
     # ------------------------------------------------------------------
     # Connection management
     # ------------------------------------------------------------------
 
+    def _open_connection(self, read_only: bool) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        # Wait up to 5s for a busy lock instead of failing fast, and
+        # use a larger page cache for the read-heavy review/dict queries.
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.execute("PRAGMA cache_size=-16000")
+        if read_only:
+            # Writes go through the writer thread; fail loudly if one slips past it.
+            conn.execute("PRAGMA query_only=ON")
+            # Serve reads straight from the OS page cache and keep sort/temp
+            # b-trees (GROUP BY, ORDER BY on the stats queries) off disk.
+            conn.execute("PRAGMA mmap_size=268435456")
+            conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
     def get_connection(self):
         """
         获取当前线程的数据库连接。
-        每个线程使用独立的连接，避免线程安全问题。
+        每个线程使用独立的只读连接，避免线程安全问题；在写线程内（写闭包中）
+        返回写连接，因此闭包里调用的查询能看到本事务尚未提交的修改。
         """
+        if self._writer.owns_current_thread():
+            return self._writer.connection
+
         conn = self._local.connection
 
         if conn is None:
-            conn = sqlite3.connect(self.db_path, check_same_thread=False)
-            conn.execute("PRAGMA journal_mode=WAL")
-            conn.execute("PRAGMA synchronous=NORMAL")
-            # Wait up to 5s for a busy lock instead of failing fast, and
-            # use a larger page cache for the read-heavy review/dict queries.
-            conn.execute("PRAGMA busy_timeout=5000")
-            conn.execute("PRAGMA cache_size=-16000")
+            conn = self._read_pool.acquire(owner=threading.current_thread())
             self._local.connection = conn
-            with self._conn_registry_lock:
-                self._all_connections.append(conn)
 
         return conn
 
+    @contextmanager
+    def read_connection(self, dedicated=False):
+        """Check out a read connection for the block and return it to the pool afterwards.
+
+        For threads that only touch the database briefly; reuses this thread's
+        leased connection (or the writer connection inside a write closure)
+        when there is one. ``dedicated=True`` always checks out a pooled
+        connection, for cursors that are consumed across several threads
+        (e.g. a streamed export resumed on whichever DB executor thread is free).
+        """
+        if dedicated:
+            with self._read_pool.connection() as conn:
+                yield conn
+        elif self._writer.owns_current_thread():
+            yield self._writer.connection
+        elif self._local.connection is not None:
+            yield self._local.connection
+        else:
+            with self._read_pool.connection() as conn:
+                yield conn
+
+    def release_connection(self):
+        """把当前线程租用的只读连接归还连接池（不关闭）。"""
+        conn = self._local.connection
+        if conn is not None:
+            self._local.connection = None
+            self._read_pool.release(conn)
+
+    def pool_stats(self) -> dict:
+        """Occupancy and wait metrics of the read pool plus writer counters."""
+        stats = self._read_pool.stats()
+        stats["writer_transactions"] = self._writer.transactions
+        stats["writer_writes"] = self._writer.writes
+        return stats
+
+    def write(self, fn):
+        """Run ``fn(conn)`` on the writer connection and return its result once committed.
+
+        ``fn`` must not commit or roll back; raising rolls back only its own
+        changes. Blocks the calling thread (use from run_db_blocking or other
+        worker threads; async code can await ``submit_write``).
+        """
+        return self._writer.run(fn)
+
+    def submit_write(self, fn):
+        """Queue ``fn(conn)`` for the writer; returns a concurrent.futures.Future."""
+        return self._writer.submit(fn)
+
+    def on_commit(self, callback):
+        """Inside a write closure: run ``callback`` once the transaction has committed."""
+        self._writer.on_commit(callback)
+
+    def vacuum(self):
+        """VACUUM the database on the writer connection (between group commits) to return free pages."""
+        def _vacuum(conn):
+            conn.execute("VACUUM")
+
+        self._writer.run_standalone(_vacuum)
+
     def close_connection(self):
-        """关闭当前线程的数据库连接。"""
+        """关闭当前线程的数据库连接（从连接池中移除，下次使用时重新打开）。"""
         conn = self._local.connection
         if conn is not None:
-            try:
-                conn.close()
-            except Exception as e:
-                logger.debug(f"Error closing DB connection: {e}")
             self._local.connection = None
+            self._read_pool.discard(conn)
 
     def close_all_connections(self):
-        """关闭所有已创建的连接（含其他线程的）。
+        """关闭所有已创建的连接（含其他线程的）及写线程。
 
         仅应在进程关闭或测试清理时调用：关闭后其他线程的线程本地引用会失效，
         下次 get_connection() 前必须确保没有并发数据库操作。
         """
-        with self._conn_registry_lock:
-            connections = list(self._all_connections)
-            self._all_connections.clear()
-        for conn in connections:
-            try:
-                conn.close()
-            except Exception as e:
-                logger.debug(f"Error closing DB connection: {e}")
+        self._writer.close()
+        self._read_pool.close()
         self._local.connection = None
 
+    def _invalidate_on_change(self, conn, changes_before):
+        """Raw SQL writes bypass the repositories, so drop derived in-memory indexes."""
+        if conn.total_changes != changes_before:
+            self.on_commit(self.reviews.due_queue.invalidate)
+            self.on_commit(self.words.suggest_index.invalidate)
+
     def execute(self, query, params=(), fetch=False, commit=True):
-        """Helper to execute a single query with automatic connection handling."""
+        """Helper to execute a single query with automatic connection handling.
+
+        ``commit=True`` runs it as a write on the writer thread; ``commit=False``
+        is a read on this thread's read-only connection.
+        """
+        if commit:
+            def _write(conn):
+                changes_before = conn.total_changes
+                cursor = conn.cursor()
+                cursor.execute(query, params)
+                self._invalidate_on_change(conn, changes_before)
+                return cursor.fetchall() if fetch else None
+
+            return self.write(_write)
+
         conn = self.get_connection()
         try:
             cursor = conn.cursor()
             cursor.execute(query, params)
-            if commit:
-                conn.commit()
             if fetch:
                 return cursor.fetchall()
             return None
@@ -128,8 +231,6 @@ class DatabaseManager:
                 conn = self.get_connection()
                 cursor = conn.cursor()
                 cursor.execute(query, params)
-                if commit:
-                    conn.commit()
                 if fetch:
                     return cursor.fetchall()
                 return None
@@ -137,15 +238,14 @@ class DatabaseManager:
 
     def execute_many(self, queries):
         """Execute multiple queries in a single transaction."""
-        conn = self.get_connection()
-        try:
+        def _write(conn):
+            changes_before = conn.total_changes
             cursor = conn.cursor()
             for query, params in queries:
                 cursor.execute(query, params)
-            conn.commit()
-        except sqlite3.Error as e:
-            conn.rollback()
-            raise
+            self._invalidate_on_change(conn, changes_before)
+
+        self.write(_write)
 
     # ------------------------------------------------------------------
     # Schema DDL & migrations
@@ -153,7 +253,9 @@ class DatabaseManager:
 
     def init_db(self):
         """Initialize the database tables."""
-        conn = self.get_connection()
+        self.write(self._init_db)
+
+    def _init_db(self, conn):
         cursor = conn.cursor()
 
         cursor.execute('''
@@ -180,6 +282,8 @@ class DatabaseManager:
             )
         ''')
 
+        self.fts_enabled = self._init_words_fts(cursor)
+
         # Structured tag index: one row per (word, tag).
         # `words.tags` (comma-separated) remains the display source; this table
         # provides exact tag filtering and an efficient tag list. Both are kept
@@ -205,6 +309,22 @@ class DatabaseManager:
             )
         ''')
 
+        # Per-day review rollup maintained incrementally by ReviewsRepository
+        # alongside every review_history insert, so the heatmap and streak are
+        # O(days) instead of a GROUP BY over the whole (ever-growing) history.
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS review_daily_rollup (
+                review_date TEXT PRIMARY KEY,
+                review_count INTEGER NOT NULL DEFAULT 0,
+                distinct_words INTEGER NOT NULL DEFAULT 0,
+                rating_1 INTEGER NOT NULL DEFAULT 0,
+                rating_2 INTEGER NOT NULL DEFAULT 0,
+                rating_3 INTEGER NOT NULL DEFAULT 0,
+                rating_4 INTEGER NOT NULL DEFAULT 0,
+                rating_5 INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+
         cursor.execute('''
             CREATE TABLE IF NOT EXISTS word_families (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -291,7 +411,52 @@ class DatabaseManager:
             )
         ''')
 
-        conn.commit()
+    def _init_words_fts(self, cursor: sqlite3.Cursor) -> bool:
+        """Create the words_fts full-text index and its sync triggers.
+
+        External-content FTS5 table over words(word, meaning) with the trigram
+        tokenizer, so substring search works for English words and for Chinese
+        meanings alike. Triggers keep it in sync with every write to `words`
+        (repository or raw SQL). Returns False when this SQLite build has no
+        FTS5/trigram support; keyword search then falls back to LIKE.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'words_fts'")
+        existed = cursor.fetchone() is not None
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS words_fts USING fts5(
+                    word, meaning,
+                    content='words', content_rowid='id',
+                    tokenize='trigram'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            logger.warning(f"FTS5 trigram index unavailable, keyword search will use LIKE: {e}")
+            # Triggers left behind by an FTS5-capable build would make every
+            # words write fail with "no such module", so drop them.
+            for trigger in ('words_fts_ai', 'words_fts_ad', 'words_fts_au'):
+                cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+            return False
+
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS words_fts_ai AFTER INSERT ON words BEGIN
+                INSERT INTO words_fts (rowid, word, meaning) VALUES (new.id, new.word, new.meaning);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS words_fts_ad AFTER DELETE ON words BEGIN
+                INSERT INTO words_fts (words_fts, rowid, word, meaning) VALUES ('delete', old.id, old.word, old.meaning);
+            END
+        ''')
+        cursor.execute('''
+            CREATE TRIGGER IF NOT EXISTS words_fts_au AFTER UPDATE OF word, meaning ON words BEGIN
+                INSERT INTO words_fts (words_fts, rowid, word, meaning) VALUES ('delete', old.id, old.word, old.meaning);
+                INSERT INTO words_fts (rowid, word, meaning) VALUES (new.id, new.word, new.meaning);
+            END
+        ''')
+        if not existed:
+            self._fts_needs_backfill = True
+        return True
 
     def backfill_word_tags(self):
         """One-time backfill: split legacy comma-separated tags into word_tags.
@@ -300,7 +465,9 @@ class DatabaseManager:
         exist. Only acts when the tag table is empty but tagged words exist, so
         it is a no-op after the first migration (and on fresh installs).
         """
-        conn = self.get_connection()
+        self.write(self._backfill_word_tags)
+
+    def _backfill_word_tags(self, conn):
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM word_tags')
         if cursor.fetchone()[0] > 0:
@@ -318,11 +485,29 @@ class DatabaseManager:
                         'INSERT OR IGNORE INTO word_tags (word_id, tag) VALUES (?, ?)',
                         (word_id, tag),
                     )
-        conn.commit()
+
+    def backfill_review_rollup(self):
+        """One-time backfill: aggregate existing review_history into review_daily_rollup.
+
+        Only acts when the rollup is empty but history exists, so it is a
+        no-op once the rollup is being maintained incrementally.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        cursor.execute('SELECT COUNT(*) FROM review_daily_rollup')
+        if cursor.fetchone()[0] > 0:
+            return
+        cursor.execute('SELECT EXISTS (SELECT 1 FROM review_history)')
+        if not cursor.fetchone()[0]:
+            return
+        logger.info("[Migration] Building review_daily_rollup from review_history...")
+        self.reviews.rebuild_daily_rollup()
 
     def check_schema_updates(self):
         """Check and update database schema for new columns."""
-        conn = self.get_connection()
+        self.write(self._check_schema_updates)
+
+    def _check_schema_updates(self, conn):
         cursor = conn.cursor()
 
         try:
@@ -353,6 +538,38 @@ class DatabaseManager:
                 logger.info("Adding 'audio' column to words table...")
                 cursor.execute("ALTER TABLE words ADD COLUMN audio TEXT")
 
+            # FSRS scheduler state (services.fsrs); NULL until first scheduled by FSRS.
+            if 'fsrs_stability' not in columns:
+                logger.info("Adding 'fsrs_stability' column to words table...")
+                cursor.execute("ALTER TABLE words ADD COLUMN fsrs_stability REAL")
+
+            if 'fsrs_difficulty' not in columns:
+                logger.info("Adding 'fsrs_difficulty' column to words table...")
+                cursor.execute("ALTER TABLE words ADD COLUMN fsrs_difficulty REAL")
+
+            add_last_review_time = 'last_review_time' not in columns
+            if add_last_review_time:
+                logger.info("Adding 'last_review_time' column to words table...")
+                cursor.execute("ALTER TABLE words ADD COLUMN last_review_time REAL")
+
+            # utils.text_utils normalization applied to the row (0 = never).
+            if 'normalized_version' not in columns:
+                logger.info("Adding 'normalized_version' column to words table...")
+                cursor.execute("ALTER TABLE words ADD COLUMN normalized_version INTEGER DEFAULT 0")
+
+            cursor.execute("PRAGMA table_info(dict_cache)")
+            dict_cache_columns = [info[1] for info in cursor.fetchall()]
+            if 'normalized_version' not in dict_cache_columns:
+                logger.info("Adding 'normalized_version' column to dict_cache table...")
+                cursor.execute("ALTER TABLE dict_cache ADD COLUMN normalized_version INTEGER DEFAULT 0")
+            # utils.cache_codec payload encoding (0 = plain JSON text) and uncompressed size.
+            if 'payload_format' not in dict_cache_columns:
+                logger.info("Adding 'payload_format' column to dict_cache table...")
+                cursor.execute("ALTER TABLE dict_cache ADD COLUMN payload_format INTEGER DEFAULT 0")
+            if 'raw_size' not in dict_cache_columns:
+                logger.info("Adding 'raw_size' column to dict_cache table...")
+                cursor.execute("ALTER TABLE dict_cache ADD COLUMN raw_size INTEGER")
+
             cursor.execute("PRAGMA table_info(review_history)")
             review_history_columns = [info[1] for info in cursor.fetchall()]
             if 'reviewed_at' not in review_history_columns:
@@ -368,6 +585,14 @@ class DatabaseManager:
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_review_history_word_id ON review_history(word_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_review_history_review_date ON review_history(review_date)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_review_history_reviewed_at ON review_history(reviewed_at)')
+            if add_last_review_time:
+                cursor.execute(
+                    """
+                    UPDATE words SET last_review_time = (
+                        SELECT MAX(reviewed_at) FROM review_history WHERE review_history.word_id = words.id
+                    )
+                    """
+                )
 
             cursor.execute("PRAGMA table_info(chat_sessions)")
             chat_columns = [info[1] for info in cursor.fetchall()]
@@ -383,6 +608,12 @@ class DatabaseManager:
             self.chat.ensure_schema(cursor)
             self.chat.migrate_legacy(cursor)
 
+            if self.fts_enabled and self._fts_needs_backfill:
+                # One-time backfill: index words that predate the FTS table.
+                logger.info("[Migration] Building words_fts full-text index...")
+                cursor.execute("INSERT INTO words_fts (words_fts) VALUES ('rebuild')")
+                self._fts_needs_backfill = False
+
             cursor.execute("SELECT COUNT(*) FROM words WHERE next_review_time = 0 OR next_review_time IS NULL")
             orphan_count = cursor.fetchone()[0]
             if orphan_count > 0:
@@ -391,25 +622,21 @@ class DatabaseManager:
                     "UPDATE words SET next_review_time = ? WHERE next_review_time = 0 OR next_review_time IS NULL",
                     (time.time(),)
                 )
-
-            conn.commit()
         except Exception:
             # Fail fast: a half-migrated schema means later queries crash with
-            # confusing errors far from the root cause. Roll back the partial
-            # migration and abort startup instead of booting into a broken DB.
+            # confusing errors far from the root cause. The writer rolls back
+            # the partial migration; abort startup instead of booting into a
+            # broken DB.
             logger.exception("Schema migration failed — refusing to start against an incompatible database")
-            try:
-                conn.rollback()
-            except Exception:
-                logger.debug("Rollback after failed schema migration also failed", exc_info=True)
             raise
 
     def migrate_from_json(self):
         """Migrate data from vocab.json if DB is empty."""
         if not os.path.exists(self.json_path):
             return
+        self.write(self._migrate_from_json)
 
-        conn = self.get_connection()
+    def _migrate_from_json(self, conn):
         cursor = conn.cursor()
 
         cursor.execute('SELECT count(*) FROM words')
@@ -445,12 +672,116 @@ class DatabaseManager:
                 except Exception as e:
                     logger.error(f"Skipping error word {item.get('word')}: {e}")
 
-            conn.commit()
             logger.info(f"Migration complete. {len(data)} words imported.")
 
         except Exception as e:
             logger.error(f"Migration failed: {e}")
 
+    def normalize_stored_text(self):
+        """Rewrite rows stored before the current text normalization (utils.text_utils).
+
+        Readers return stored text as is, so rows written by an older version
+        (or by raw SQL/JSON migration) are normalized once here.
+        """
+        self.write(self._normalize_stored_text)
+
+    def _normalize_stored_text(self, conn):
+        cursor = conn.cursor()
+        version = NORMALIZED_VERSION
+
+        cursor.execute(
+            'SELECT id, meaning, example, context_cn FROM words WHERE normalized_version < ?',
+            (version,),
+        )
+        pending = cursor.fetchall()
+        if pending:
+            changed = []
+            for word_id, *texts in pending:
+                cleaned = [clean_chinese_text(t) for t in texts]
+                if cleaned != texts:
+                    changed.append((*cleaned, word_id))
+            # Only rewrite text that actually changed (meaning updates re-index FTS).
+            cursor.executemany(
+                'UPDATE words SET meaning = ?, example = ?, context_cn = ? WHERE id = ?',
+                changed,
+            )
+            cursor.execute(
+                'UPDATE words SET normalized_version = ? WHERE normalized_version < ?',
+                (version, version),
+            )
+            logger.info(f"[Migration] Normalized text of {len(pending)} words ({len(changed)} rewritten)")
+
+        cursor.execute('SELECT id, data, payload_format FROM dict_cache WHERE normalized_version < ?', (version,))
+        pending = cursor.fetchall()
+        if pending:
+            changed = []
+            for entry_id, payload, payload_format in pending:
+                try:
+                    entry = decode_payload(payload, payload_format)
+                except (ValueError, TypeError):
+                    continue
+                if isinstance(entry, dict):
+                    original = dict(entry)
+                    if normalize_dict_entry(entry) != original:
+                        changed.append((*encode_payload(entry), entry_id))
+            cursor.executemany(
+                'UPDATE dict_cache SET data = ?, payload_format = ?, raw_size = ? WHERE id = ?',
+                changed,
+            )
+            cursor.execute(
+                'UPDATE dict_cache SET normalized_version = ? WHERE normalized_version < ?',
+                (version, version),
+            )
+            logger.info(f"[Migration] Normalized {len(pending)} dictionary cache entries ({len(changed)} rewritten)")
+
+    def compress_dict_cache(self, batch_size=500):
+        """Re-encode dict_cache rows stored in an older payload format (utils.cache_codec).
+
+        Rows are converted in batches, one write each, so the writer is never
+        held for long. If anything was converted, the database is VACUUMed
+        afterwards to give the freed pages back to the filesystem. Returns
+        the number of rows converted.
+        """
+        converted = 0
+        last_id = 0
+        while True:
+            done, last_id = self.write(
+                lambda conn, after=last_id: self._compress_dict_cache_batch(conn, after, batch_size)
+            )
+            converted += done
+            if last_id is None:
+                break
+        if converted:
+            logger.info(f"[Migration] Compressed {converted} dictionary cache entries")
+            try:
+                self.vacuum()
+            except sqlite3.Error as e:
+                logger.warning(f"[Migration] VACUUM after dict_cache compression failed: {e}")
+        return converted
+
+    def _compress_dict_cache_batch(self, conn, after_id, batch_size):
+        """Convert one batch; returns (rows converted, last id seen or None when finished)."""
+        rows = conn.execute(
+            # raw_size IS NULL: written before the codec existed. Entries too small to
+            # compress are stored as JSON (format 0) but with raw_size, so they count as done.
+            'SELECT id, data, payload_format FROM dict_cache '
+            'WHERE (raw_size IS NULL OR (payload_format > 0 AND payload_format < ?)) AND id > ? '
+            'ORDER BY id LIMIT ?',
+            (CURRENT_FORMAT, after_id, batch_size),
+        ).fetchall()
+        updates = []
+        for entry_id, payload, payload_format in rows:
+            try:
+                entry = decode_payload(payload, payload_format)
+            except (ValueError, TypeError):
+                continue  # unreadable rows are left alone; reads treat them as misses
+            updates.append((*encode_payload(entry), entry_id))
+        conn.executemany(
+            'UPDATE dict_cache SET data = ?, payload_format = ?, raw_size = ? WHERE id = ?',
+            updates,
+        )
+        return len(updates), (rows[-1][0] if len(rows) == batch_size else None)
+
     # ------------------------------------------------------------------
     # Backward-compatible delegation methods
     # ------------------------------------------------------------------
@@ -458,7 +789,9 @@ class DatabaseManager:
     # --- Words ---
     def add_word(self, data): return self.words.add(data)
     def get_word(self, word): return self.words.get(word)
+    def get_words_by_names(self, words): return self.words.get_many(words)
     def get_all_words(self): return self.words.get_all()
+    def iter_all_words(self, chunk_size=500): return self.words.iter_all(chunk_size)
     def get_words_for_list(self, keyword=None, tag=None, page=1, page_size=20): return self.words.get_for_list(keyword, tag, page, page_size)
     def get_all_tags(self): return self.words.get_all_tags()
     def get_existing_words(self, words): return self.words.get_existing_words(words)
@@ -469,12 +802,17 @@ class DatabaseManager:
     def mark_word_mastered(self, word): return self.words.mark_mastered(word)
     def search_words(self, **kwargs): return self.words.search(**kwargs)
     def get_words_count(self): return self.words.get_count()
+    def suggest_words(self, prefix, limit=10): return self.words.suggest(prefix, limit)
 
     # --- Reviews ---
     def update_review_status(self, word, stage, next_time, mastered, review_count_inc=True): return self.reviews.update_review_status(word, stage, next_time, mastered, review_count_inc)
-    def update_sm2_status(self, word, easiness, interval, repetitions, next_time, rating): return self.reviews.update_sm2_status(word, easiness, interval, repetitions, next_time, rating)  # returns remaining due count
+    def update_sm2_status(self, word, easiness, interval, repetitions, next_time, rating, stability=None, difficulty=None): return self.reviews.update_sm2_status(word, easiness, interval, repetitions, next_time, rating, stability, difficulty)  # returns remaining due count
+    def update_sm2_batch(self, updates): return self.reviews.update_sm2_batch(updates)  # returns (updated words, remaining due count)
+    def reschedule_words(self, compute, tag_filter="", mastered_filter=None, status_filter=None, words=None): return self.reviews.reschedule(compute, tag_filter, mastered_filter, status_filter, words)
     def get_review_heatmap_data(self): return self.reviews.get_heatmap_data()
     def get_due_review_count(self): return self.reviews.get_due_count()
+    def get_review_forecast(self, days=90): return self.reviews.get_review_forecast(days)
+    def get_schedule_histogram(self, edges): return self.reviews.due_queue.histogram(edges)
     def get_difficult_words(self, limit): return self.reviews.get_difficult_words(limit)
     def get_word_review_history(self, word_id): return self.reviews.get_word_history(word_id)
     def get_statistics(self): return self.reviews.get_statistics()
@@ -502,6 +840,7 @@ class DatabaseManager:
 
     # --- Dict cache ---
     def get_dict_cache(self, word, source, ttl=86400): return self.cache.get(word, source, ttl)
+    def get_dict_cache_entry(self, word, source, max_age=86400): return self.cache.get_entry(word, source, max_age)
     def set_dict_cache(self, word, source, data): return self.cache.set(word, source, data)
     def clear_expired_dict_cache(self, ttl=86400): return self.cache.clear_expired(ttl)
     def get_dict_cache_stats(self): return self.cache.get_stats()
@@ -0,0 +1,240 @@
+"""
+Bounded pool of read-only SQLite connections.
+
+Before the pool, every thread that touched the database opened its own
+connection and kept it until shutdown, including the short-lived
+ThreadPoolExecutor threads spawned by the dictionary AI fallback. Those
+connections were never released, so the process accumulated connections
+(and their page caches) over time.
+
+ReadConnectionPool caps the number of open read connections. Connections can
+be used in two ways:
+
+- checked out for a block (``with pool.connection() as conn``) and returned
+  at the end; or
+- leased to a thread (``acquire(owner=thread)``). This is what
+  ``DatabaseManager.get_connection`` does. The lease is reclaimed once the
+  owning thread has exited, so dead executor threads no longer leak.
+
+Idle connections beyond ``min_idle`` are closed after ``idle_timeout``
+seconds. Checkout wait time is recorded in ``query_metrics`` as
+``db.pool.wait``, and ``stats()`` reports pool occupancy.
+"""
+import logging
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from services.request_metrics import query_metrics
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """No read connection became available within the checkout timeout."""
+
+
+class ReadConnectionPool:
+    """Checkout/return pool for read-only connections, with dead-thread and idle reaping."""
+
+    # How often a blocked checkout wakes up to look for leases held by threads
+    # that have since exited (nothing notifies the pool when a thread dies).
+    _REAP_POLL = 0.05
+    # Minimum spacing of opportunistic idle/dead-thread sweeps.
+    _REAP_INTERVAL = 1.0
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        max_size: int = 16,
+        min_idle: int = 1,
+        idle_timeout: float = 60.0,
+        acquire_timeout: float = 5.0,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self._connect = connect
+        self.max_size = max_size
+        self.min_idle = min_idle
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self._cond = threading.Condition()
+        # (connection, returned_at) — used LIFO so recently used connections,
+        # whose page caches are warm, are handed out first.
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        # Checked-out connection -> owning thread (None for block checkouts).
+        self._leased: Dict[sqlite3.Connection, Optional[threading.Thread]] = {}
+        self._opening = 0
+        self._last_reap = time.monotonic()
+        self._stats = {
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "opened": 0,
+            "reaped_dead_threads": 0,
+            "reaped_idle": 0,
+            "wait_ms_total": 0.0,
+            "max_wait_ms": 0.0,
+            "peak_in_use": 0,
+        }
+
+    @property
+    def size(self) -> int:
+        return len(self._idle) + len(self._leased) + self._opening
+
+    # ------------------------------------------------------------------
+    # Checkout / return
+    # ------------------------------------------------------------------
+
+    def acquire(self, owner: Optional[threading.Thread] = None, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Check out a connection, waiting up to ``timeout`` seconds when the pool is full.
+
+        With ``owner`` set the connection is leased to that thread and is
+        returned automatically once the thread has exited.
+        """
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+        waited = False
+        conn = None
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self._reap_locked(now, force=waited)
+                if self._idle:
+                    conn, _ = self._idle.pop()
+                    break
+                if self.size < self.max_size:
+                    self._opening += 1
+                    break
+                if now >= deadline:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"no read connection available within {timeout:.1f}s ({self.max_size} in use)"
+                    )
+                waited = True
+                self._cond.wait(min(self._REAP_POLL, deadline - now))
+
+        if conn is None:
+            # Open outside the lock; the slot is reserved through _opening.
+            try:
+                conn = self._connect()
+            except BaseException:
+                with self._cond:
+                    self._opening -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._opening -= 1
+                self._stats["opened"] += 1
+
+        wait_ms = (time.monotonic() - started) * 1000.0
+        with self._cond:
+            self._leased[conn] = owner
+            self._stats["checkouts"] += 1
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], len(self._leased))
+            if waited:
+                self._stats["waits"] += 1
+                self._stats["wait_ms_total"] += wait_ms
+                self._stats["max_wait_ms"] = max(self._stats["max_wait_ms"], wait_ms)
+        if waited:
+            query_metrics.record(bucket="db", route="db.pool.wait", method="POOL", duration_ms=wait_ms, status_code=200)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> None:
+        """Return a checked-out connection to the pool."""
+        with self._cond:
+            if self._leased.pop(conn, _MISSING) is _MISSING:
+                return  # already reclaimed, discarded or the pool was closed
+            if conn.in_transaction:
+                # A read left open would pin an old WAL snapshot for the next user.
+                conn.rollback()
+            self._idle.append((conn, time.monotonic()))
+            self._reap_locked(time.monotonic())
+            self._cond.notify()
+
+    def discard(self, conn: sqlite3.Connection) -> None:
+        """Close a checked-out connection instead of returning it (e.g. after an I/O error)."""
+        with self._cond:
+            self._leased.pop(conn, None)
+            self._cond.notify()
+        _close_quietly(conn)
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[sqlite3.Connection]:
+        """``with pool.connection() as conn``: check out for the block and return afterwards."""
+        conn = self.acquire(timeout=timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    # ------------------------------------------------------------------
+    # Reaping
+    # ------------------------------------------------------------------
+
+    def _reap_locked(self, now: float, force: bool = False) -> None:
+        if not force and now - self._last_reap < self._REAP_INTERVAL:
+            return
+        self._last_reap = now
+
+        dead = [conn for conn, owner in self._leased.items() if owner is not None and not owner.is_alive()]
+        for conn in dead:
+            del self._leased[conn]
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append((conn, now))
+        self._stats["reaped_dead_threads"] += len(dead)
+
+        # The oldest idle connections sit at the front of the list.
+        stale = 0
+        while len(self._idle) > self.min_idle and now - self._idle[0][1] >= self.idle_timeout:
+            _close_quietly(self._idle.pop(0)[0])
+            stale += 1
+        self._stats["reaped_idle"] += stale
+        if dead:
+            self._cond.notify(len(dead))
+
+    def reap(self) -> None:
+        """Reclaim leases of exited threads and close connections idle past ``idle_timeout``."""
+        with self._cond:
+            self._reap_locked(time.monotonic(), force=True)
+
+    # ------------------------------------------------------------------
+    # Shutdown & metrics
+    # ------------------------------------------------------------------
+
+    def close(self) -> None:
+        """Close every connection, including ones still checked out."""
+        with self._cond:
+            connections = [conn for conn, _ in self._idle] + list(self._leased)
+            self._idle.clear()
+            self._leased.clear()
+            self._cond.notify_all()
+        for conn in connections:
+            _close_quietly(conn)
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update(
+                max_size=self.max_size,
+                open=self.size,
+                in_use=len(self._leased),
+                idle=len(self._idle),
+            )
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 3)
+        stats["max_wait_ms"] = round(stats["max_wait_ms"], 3)
+        return stats
+
+
+_MISSING = object()
+
+
+def _close_quietly(conn: sqlite3.Connection) -> None:
+    try:
+        conn.close()
+    except Exception as e:
+        logger.debug(f"Error closing pooled DB connection: {e}")
@@ -0,0 +1,252 @@
+"""
+Single-writer thread with group commit.
+
+SQLite admits one writer at a time. With a connection per executor thread,
+review submits, dictionary-cache writes and chat saves each took the WAL
+write lock (waiting out ``busy_timeout`` under contention) and paid their own
+commit. DatabaseWriter owns the only connection that writes: callers hand it
+a closure ``fn(conn)`` and wait on a future, and the writer thread runs every
+closure queued at that moment in one transaction and commits once.
+
+Each closure runs inside its own SAVEPOINT, so a failing write is rolled back
+alone and only its caller sees the exception. Closures must not commit or
+roll back themselves. Work that has to follow the commit (in-memory indexes
+such as the due queue) is registered with ``on_commit`` and runs on the
+writer thread in commit order, before the callers' futures resolve.
+
+Statements that cannot run inside a transaction (VACUUM) go through
+``run_standalone``: the closure runs alone on the writer connection, between
+group commits, with no BEGIN around it.
+"""
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, List, Optional, TypeVar
+
+from services.request_metrics import timed_query
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+_STOP = object()
+
+
+class _Write:
+    __slots__ = ("fn", "future", "callbacks", "standalone")
+
+    def __init__(self, fn: Callable[[sqlite3.Connection], object], standalone: bool = False) -> None:
+        self.fn = fn
+        self.standalone = standalone
+        self.future: Future = Future()
+        self.callbacks: List[Callable[[], None]] = []
+
+
+class DatabaseWriter:
+    """Runs write closures on one dedicated connection/thread, group-committing them.
+
+    ``commit_window`` is how long (seconds) the writer lingers for more work
+    once it sees concurrent writers; a lone caller is committed immediately.
+    """
+
+    def __init__(
+        self,
+        connect: Callable[[], sqlite3.Connection],
+        commit_window: float = 0.002,
+        max_batch: int = 256,
+    ) -> None:
+        self._connect = connect
+        self.commit_window = commit_window
+        self.max_batch = max_batch
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._start_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._current: Optional[_Write] = None
+        self.connection: Optional[sqlite3.Connection] = None
+        # Totals since start, for diagnostics and tests.
+        self.transactions = 0
+        self.writes = 0
+
+    # ------------------------------------------------------------------
+    # Caller side
+    # ------------------------------------------------------------------
+
+    def owns_current_thread(self) -> bool:
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is not None:
+                return
+            # Connect on the caller so an unusable database fails the write
+            # that triggered the start instead of killing the thread.
+            self.connection = self._connect()
+            self._thread = threading.Thread(target=self._run, name="vocabbook-db-writer", daemon=True)
+            self._thread.start()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], T]) -> "Future[T]":
+        """Queue a write closure; the future resolves with its result after the commit."""
+        write = _Write(fn)
+        self._ensure_started()
+        self._queue.put(write)
+        return write.future
+
+    def run(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run a write closure and wait for its commit.
+
+        Called from inside another closure (on the writer thread) it joins the
+        open transaction instead of queueing, which would deadlock.
+        """
+        if self.owns_current_thread():
+            return fn(self.connection)
+        return self.submit(fn).result()
+
+    def run_standalone(self, fn: Callable[[sqlite3.Connection], T]) -> T:
+        """Run ``fn`` on the writer connection outside any transaction (e.g. VACUUM)."""
+        if self.owns_current_thread():
+            raise RuntimeError("run_standalone() cannot be called from inside a write closure")
+        write = _Write(fn, standalone=True)
+        self._ensure_started()
+        self._queue.put(write)
+        return write.future.result()
+
+    def on_commit(self, callback: Callable[[], None]) -> None:
+        """From inside a closure: run ``callback`` after its transaction commits."""
+        if self._current is None or not self.owns_current_thread():
+            raise RuntimeError("on_commit() is only valid inside a write closure")
+        self._current.callbacks.append(callback)
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Finish queued writes, stop the thread and close the connection (restarts on next submit)."""
+        with self._start_lock:
+            thread = self._thread
+            if thread is None:
+                return
+            self._queue.put(_STOP)
+            thread.join(timeout)
+            self._thread = None
+            if self.connection is not None:
+                try:
+                    self.connection.close()
+                except Exception as e:
+                    logger.debug(f"Error closing DB writer connection: {e}")
+                self.connection = None
+
+    # ------------------------------------------------------------------
+    # Writer thread
+    # ------------------------------------------------------------------
+
+    def _collect(self, first: _Write) -> tuple:
+        """Gather the batch that ``first`` opens; returns (batch, stop requested, held-over item).
+
+        A standalone write ends the batch and is handed back to run after it.
+        """
+        batch = [first]
+        deadline = None
+        while len(batch) < self.max_batch:
+            try:
+                if deadline is None:
+                    item = self._queue.get_nowait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                if deadline is not None or len(batch) == 1 or self.commit_window <= 0:
+                    break
+                # Others were already queued, so more are likely on the way.
+                deadline = time.monotonic() + self.commit_window
+                continue
+            if item is _STOP:
+                return batch, True, None
+            if item.standalone:
+                return batch, False, item
+            batch.append(item)
+        return batch, False, None
+
+    def _run(self) -> None:
+        held = None
+        while True:
+            if held is not None:
+                item, held = held, None
+            else:
+                item = self._queue.get()
+            if item is _STOP:
+                return
+            if item.standalone:
+                self._run_standalone(item)
+                continue
+            batch, stop, held = self._collect(item)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _run_standalone(self, write: _Write) -> None:
+        if not write.future.set_running_or_notify_cancel():
+            return
+        conn = self.connection
+        try:
+            conn.row_factory = None
+            result = write.fn(conn)
+            if conn.in_transaction:
+                conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            write.future.set_exception(e)
+        else:
+            write.future.set_result(result)
+
+    def _commit(self, batch: List[_Write]) -> None:
+        conn = self.connection
+        live = [w for w in batch if w.future.set_running_or_notify_cancel()]
+        if not live:
+            return
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for write in live:
+                conn.row_factory = None
+                self._current = write
+                conn.execute("SAVEPOINT writer_item")
+                try:
+                    result = write.fn(conn)
+                except Exception as e:
+                    conn.execute("ROLLBACK TO writer_item")
+                    conn.execute("RELEASE writer_item")
+                    write.callbacks.clear()
+                    outcomes.append((write, None, e))
+                else:
+                    conn.execute("RELEASE writer_item")
+                    outcomes.append((write, result, None))
+                finally:
+                    self._current = None
+            with timed_query("db.writer.commit"):
+                conn.commit()
+        except Exception as e:
+            logger.error(f"[DBWriter] Group commit of {len(live)} writes failed: {e}")
+            try:
+                conn.rollback()
+            except Exception:
+                logger.debug("Rollback after failed group commit also failed", exc_info=True)
+            for write in live:
+                write.future.set_exception(e)
+            return
+
+        self.transactions += 1
+        self.writes += len(live)
+        for write, result, error in outcomes:
+            for callback in write.callbacks:
+                try:
+                    callback()
+                except Exception:
+                    logger.exception("[DBWriter] on_commit callback failed")
+            if error is not None:
+                write.future.set_exception(error)
+            else:
+                write.future.set_result(result)
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
-import json
 import time
 import logging
 from typing import TYPE_CHECKING
 
+from utils.cache_codec import decode_payload, encode_payload
+from utils.text_utils import NORMALIZED_VERSION, normalize_dict_entry
+
 if TYPE_CHECKING:
     from models.database import DatabaseManager
 
@@ -17,69 +19,90 @@ class CacheRepository:
         self.db = db
 
     def get(self, word: str, source: str, ttl: int = 86400) -> dict | None:
+        entry = self.get_entry(word, source, max_age=ttl)
+        return entry[0] if entry else None
+
+    def get_entry(self, word: str, source: str, max_age: float = 86400) -> tuple[dict, float] | None:
+        """Cached data and its ``created_at``, if younger than ``max_age``.
+
+        Rows older than ``max_age`` are deleted. Callers that serve stale data
+        pass their freshness window plus the allowed staleness, and compare
+        ``created_at`` against the freshness window themselves.
+        """
         conn = self.db.get_connection()
         cursor = conn.cursor()
 
         now = time.time()
         cursor.execute('''
-            SELECT data, created_at FROM dict_cache
+            SELECT data, created_at, payload_format FROM dict_cache
             WHERE word = ? AND source = ?
         ''', (word.lower(), source))
 
         row = cursor.fetchone()
         if row:
-            data_json, created_at = row
-            if now - created_at < ttl:
+            payload, created_at, payload_format = row
+            if now - created_at < max_age:
                 try:
-                    return json.loads(data_json)
-                except (json.JSONDecodeError, TypeError):
+                    return decode_payload(payload, payload_format), created_at
+                except (ValueError, TypeError):
                     return None
             else:
-                cursor.execute('DELETE FROM dict_cache WHERE word = ? AND source = ?',
-                              (word.lower(), source))
-                conn.commit()
+                self.db.write(lambda write_conn: write_conn.execute(
+                    'DELETE FROM dict_cache WHERE word = ? AND source = ?', (word.lower(), source),
+                ))
         return None
 
     def set(self, word: str, source: str, data: dict) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
         try:
-            data_json = json.dumps(data, ensure_ascii=False)
-            cursor.execute('''
-                INSERT OR REPLACE INTO dict_cache (word, source, data, created_at)
-                VALUES (?, ?, ?, ?)
-            ''', (word.lower(), source, data_json, time.time()))
-            conn.commit()
+            payload, payload_format, raw_size = encode_payload(normalize_dict_entry(data))
+
+            def _write(conn):
+                conn.execute('''
+                    INSERT OR REPLACE INTO dict_cache
+                        (word, source, data, created_at, normalized_version, payload_format, raw_size)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', (word.lower(), source, payload, time.time(), NORMALIZED_VERSION, payload_format, raw_size))
+                self.db.on_commit(lambda: self.db.words.suggest_index.add(word, cached=True))
+
+            self.db.write(_write)
         except Exception as e:
             logger.error(f"Set dict cache error: {e}")
 
     def clear_expired(self, ttl: int = 86400) -> int:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
         expired_time = time.time() - ttl
-        cursor.execute('DELETE FROM dict_cache WHERE created_at < ?', (expired_time,))
-        deleted = cursor.rowcount
-        conn.commit()
-        return deleted
+        return self.db.write(
+            lambda conn: conn.execute('DELETE FROM dict_cache WHERE created_at < ?', (expired_time,)).rowcount
+        )
 
     def get_stats(self) -> dict:
         conn = self.db.get_connection()
         cursor = conn.cursor()
 
-        cursor.execute('SELECT COUNT(*) FROM dict_cache')
-        total = cursor.fetchone()[0]
+        # LENGTH() counts characters for TEXT; CAST to BLOB to count stored bytes.
+        cursor.execute('''
+            SELECT COUNT(*),
+                   COALESCE(SUM(payload_format > 0), 0),
+                   COALESCE(SUM(LENGTH(CAST(data AS BLOB))), 0),
+                   COALESCE(SUM(COALESCE(raw_size, LENGTH(CAST(data AS BLOB)))), 0)
+            FROM dict_cache
+        ''')
+        total, compressed, stored_bytes, raw_bytes = cursor.fetchone()
 
         cursor.execute('SELECT source, COUNT(*) FROM dict_cache GROUP BY source')
         by_source = {row[0]: row[1] for row in cursor.fetchall()}
 
-        return {'total': total, 'by_source': by_source}
+        return {
+            'total': total,
+            'by_source': by_source,
+            'compressed': compressed,
+            'stored_bytes': stored_bytes,
+            'raw_bytes': raw_bytes,
+            'bytes_saved': raw_bytes - stored_bytes,
+        }
 
     def clear_all(self) -> int:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM dict_cache')
-        deleted = cursor.rowcount
-        conn.commit()
-        return deleted
+        def _write(conn):
+            self.db.on_commit(self.db.words.suggest_index.invalidate)
+            return conn.execute('DELETE FROM dict_cache').rowcount
+
+        return self.db.write(_write)
@@ -96,14 +96,14 @@ class ChatRepository:
             )
 
     def save_session(self, session_data: dict, owner_key: str = 'guest') -> bool:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
         resolved_owner_key = session_data.get('owner_key') or owner_key or 'guest'
-        try:
+
+        def _write(conn: sqlite3.Connection) -> None:
             serialized_messages = [
                 self._serialize_chat_message(message)
                 for message in session_data.get('messages', [])
             ]
+            cursor = conn.cursor()
             cursor.execute(
                 "SELECT message_json FROM chat_messages WHERE session_id = ? ORDER BY sequence ASC",
                 (session_data['id'],),
@@ -166,13 +166,13 @@ class ChatRepository:
                     session_data['createdAt'],
                 ),
             )
-            conn.commit()
+
+        try:
+            # A failure rolls back the whole save (never messages deleted but
+            # not re-inserted).
+            self.db.write(_write)
             return True
         except Exception as e:
-            # Roll back so the thread-local connection doesn't carry this
-            # half-finished transaction (messages deleted but not re-inserted)
-            # into the next caller's commit.
-            conn.rollback()
             logger.error(f"Save chat session error: {e}")
             return False
 
@@ -233,9 +233,8 @@ class ChatRepository:
             conn.row_factory = original_row_factory
 
     def delete_session(self, session_id: str, owner_key: str | None = None) -> bool:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
+        def _write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
             if owner_key is None:
                 cursor.execute('DELETE FROM chat_messages WHERE session_id = ?', (session_id,))
                 cursor.execute('DELETE FROM chat_sessions WHERE id = ?', (session_id,))
@@ -251,18 +250,13 @@ class ChatRepository:
                     (session_id, session_id, owner_key),
                 )
                 cursor.execute('DELETE FROM chat_sessions WHERE id = ? AND owner_key = ?', (session_id, owner_key))
-            conn.commit()
-            return cursor.rowcount > 0
-        except Exception:
-            # Roll back the partial delete before propagating so the thread
-            # -local connection isn't left with an open transaction.
-            conn.rollback()
-            raise
+            return cursor.rowcount
+
+        return self.db.write(_write) > 0
 
     def clear_all_sessions(self, owner_key: str | None = None) -> bool:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
+        def _write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
             if owner_key is None:
                 cursor.execute('DELETE FROM chat_messages')
                 cursor.execute('DELETE FROM chat_sessions')
@@ -272,8 +266,6 @@ class ChatRepository:
                     (owner_key,),
                 )
                 cursor.execute('DELETE FROM chat_sessions WHERE owner_key = ?', (owner_key,))
-            conn.commit()
-            return cursor.rowcount > 0
-        except Exception:
-            conn.rollback()
-            raise
+            return cursor.rowcount
+
+        return self.db.write(_write) > 0
@@ -15,29 +15,22 @@ class FamiliesRepository:
         self.db = db
 
     def add(self, root: str, root_meaning: str, word: str) -> bool:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
         try:
-            cursor.execute('''
+            self.db.write(lambda conn: conn.execute('''
                 INSERT OR IGNORE INTO word_families (root, root_meaning, word)
                 VALUES (?, ?, ?)
-            ''', (root.lower(), root_meaning, word.lower()))
-            conn.commit()
+            ''', (root.lower(), root_meaning, word.lower())))
             return True
         except Exception as e:
             logger.error(f"Add word family error: {e}")
             return False
 
     def add_batch(self, root: str, root_meaning: str, words: list[str]) -> bool:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
         try:
-            for word in words:
-                cursor.execute('''
-                    INSERT OR IGNORE INTO word_families (root, root_meaning, word)
-                    VALUES (?, ?, ?)
-                ''', (root.lower(), root_meaning, word.lower()))
-            conn.commit()
+            self.db.write(lambda conn: conn.executemany('''
+                INSERT OR IGNORE INTO word_families (root, root_meaning, word)
+                VALUES (?, ?, ?)
+            ''', [(root.lower(), root_meaning, word.lower()) for word in words]))
             return True
         except Exception as e:
             logger.error(f"Add word families batch error: {e}")
@@ -14,9 +14,11 @@ class LimitsRepository:
 
     def reset_if_needed(self, feature: str) -> int:
         today = datetime.now().strftime('%Y-%m-%d')
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        # Read-check-write in one writer transaction so concurrent calls cannot both insert.
+        return self.db.write(lambda conn: self._reset_if_needed(conn.cursor(), feature, today))
 
+    @staticmethod
+    def _reset_if_needed(cursor, feature: str, today: str) -> int:
         cursor.execute('SELECT used_count, last_reset_date FROM user_limits WHERE feature = ?', (feature,))
         row = cursor.fetchone()
 
@@ -25,7 +27,6 @@ class LimitsRepository:
                 INSERT INTO user_limits (feature, used_count, last_reset_date)
                 VALUES (?, 0, ?)
             ''', (feature, today))
-            conn.commit()
             return 0
 
         used_count, last_reset_date = row
@@ -35,17 +36,13 @@ class LimitsRepository:
                 SET used_count = 0, last_reset_date = ?
                 WHERE feature = ?
             ''', (today, feature))
-            conn.commit()
             return 0
 
         return used_count
 
     def increment(self, feature: str) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
+        self.db.write(lambda conn: conn.execute('''
             UPDATE user_limits
             SET used_count = used_count + 1
             WHERE feature = ?
-        ''', (feature,))
-        conn.commit()
+        ''', (feature,)))
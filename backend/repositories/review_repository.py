@@ -66,9 +66,36 @@ class ReviewRepository:
 
         return due_words, total_count
 
+    # Queue name -> (status filter, sort column, sort order) for keyset paging.
+    QUEUE_ORDER = {
+        "due": ("due", "next_review_time", "ASC"),
+        "new": ("new", "date_added", "DESC"),
+    }
+
+    def get_queue_page(self, queue: str, limit: int, after=None):
+        """Fetch ``limit + 1`` rows of a review queue starting after a keyset position.
+
+        Unlike get_due_words this never replenishes, so consecutive pages walk
+        the queue exactly once; the extra row lets the caller detect a next page.
+        """
+        status_filter, sort_by, sort_order = self.QUEUE_ORDER[queue]
+        words, _total = self.db.search_words(
+            status_filter=status_filter,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            limit=limit + 1,
+            offset=0,
+            count_total=False,
+            after=after,
+        )
+        return words
+
     def get_due_count(self) -> int:
         return self.db.get_due_review_count()
 
+    def get_forecast(self, days: int) -> dict:
+        return self.db.get_review_forecast(days)
+
     def get_new_words(self, limit: int):
         return self.db.search_words(
             status_filter="new",
@@ -93,8 +120,10 @@ class ReviewRepository:
         repetitions: int,
         next_time: float,
         rating: int,
+        stability: float | None = None,
+        difficulty: float | None = None,
     ) -> int:
-        """Apply the SM-2 update and return the remaining due count."""
+        """Apply the scheduler update and return the remaining due count."""
         return self.db.update_sm2_status(
             word=word,
             easiness=easiness,
@@ -102,6 +131,44 @@ class ReviewRepository:
             repetitions=repetitions,
             next_time=next_time,
             rating=rating,
+            stability=stability,
+            difficulty=difficulty,
+        )
+
+    def get_scheduler(self):
+        """Scheduler selected for this install, with FSRS weights cached beside the DB."""
+        from services.fsrs import weights_path_for
+        from services.review_service import get_scheduler
+
+        return get_scheduler(weights_path_for(getattr(self.db, "db_path", "vocab.db")))
+
+    def get_load_balancer(self):
+        """LoadBalancer over the live schedule when VOCABBOOK_LOAD_BALANCE is on, else None.
+
+        Loads the schedule index up front, so call it off the event loop.
+        """
+        from services.load_balance import LoadBalancer, load_balancing_enabled
+
+        if not load_balancing_enabled():
+            return None
+        self.db.get_schedule_histogram(())
+        return LoadBalancer(self.db.get_schedule_histogram)
+
+    def get_words(self, words: list[str]) -> dict[str, dict]:
+        return self.db.get_words_by_names(words)
+
+    def update_sm2_batch(self, updates: list[dict]) -> tuple[set[str], int]:
+        """Apply scheduler updates in one transaction; returns (updated words, remaining due count)."""
+        return self.db.update_sm2_batch(updates)
+
+    def reschedule(self, compute, *, tag: str = "", mastered=None, status=None, words=None) -> int:
+        """Rewrite the schedules of a filtered word set in one transaction; returns the count."""
+        return self.db.reschedule_words(
+            compute,
+            tag_filter=tag,
+            mastered_filter=mastered,
+            status_filter=status,
+            words=words,
         )
 
     def log_study_session(self, duration: int, review_count: int) -> None:
@@ -1,31 +1,132 @@
 from __future__ import annotations
 
 import sqlite3
+import threading
 import time
 import logging
+from collections import Counter
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, TYPE_CHECKING
+from typing import Any, Callable, Dict, List, TYPE_CHECKING
+
+from repositories.word_rows import WORD_ROWS
+from services.due_queue import DueQueue
+from services.request_metrics import timed_query
+# Imported up front: numpy's first import (~150 ms) would otherwise land on the first forecast.
+from services.sm2_batch import forecast_reviews
 
 if TYPE_CHECKING:
     from models.database import DatabaseManager
 
 logger = logging.getLogger(__name__)
 
+# Ratings with their own histogram column in review_daily_rollup.
+_ROLLUP_RATINGS = (1, 2, 3, 4, 5)
+# 超过这么多个变更词时，整体重查比逐词更新更快
+_FORECAST_INCREMENTAL_LIMIT = 2000
+
+
+def _insert_review_history(cursor: sqlite3.Cursor, word: str, review_date: str, reviewed_at: float, rating: int) -> None:
+    """Append one review_history row for ``word``; see _insert_review_history_many."""
+    _insert_review_history_many(cursor, [(word, review_date, reviewed_at, rating)])
+
+
+def _insert_review_history_many(cursor: sqlite3.Cursor, reviews: list[tuple[str, str, float, int]]) -> int:
+    """Append review_history rows and fold them into review_daily_rollup.
+
+    ``reviews`` holds (word, review_date, reviewed_at, rating) tuples; unknown
+    words are skipped. Must run in the same transaction as the words-table
+    update so the rollup never disagrees with the history it summarizes.
+    Returns the number of history rows written.
+    """
+    words = sorted({r[0] for r in reviews})
+    if not words:
+        return 0
+    cursor.execute(f"SELECT word, id FROM words WHERE word IN ({','.join('?' * len(words))})", words)
+    ids = dict(cursor.fetchall())
+    history_rows = [(ids[w], day, at, rating) for w, day, at, rating in reviews if w in ids]
+    if not history_rows:
+        return 0
+
+    # Whether a review is the word's first of its day decides distinct_words;
+    # check against the history as it was before this batch.
+    word_ids = sorted({r[0] for r in history_rows})
+    days = sorted({r[1] for r in history_rows})
+    cursor.execute(
+        f'''
+        SELECT DISTINCT word_id, review_date FROM review_history
+        WHERE word_id IN ({",".join("?" * len(word_ids))}) AND review_date IN ({",".join("?" * len(days))})
+        ''',
+        (*word_ids, *days),
+    )
+    seen = set(cursor.fetchall())
+
+    cursor.executemany(
+        'INSERT INTO review_history (word_id, review_date, reviewed_at, rating) VALUES (?, ?, ?, ?)',
+        history_rows,
+    )
+
+    # Per-day deltas: [review_count, distinct_words, rating_1 .. rating_5]
+    deltas: dict[str, list[int]] = {}
+    for word_id, day, _reviewed_at, rating in history_rows:
+        delta = deltas.setdefault(day, [0] * (2 + len(_ROLLUP_RATINGS)))
+        delta[0] += 1
+        if (word_id, day) not in seen:
+            seen.add((word_id, day))
+            delta[1] += 1
+        if rating in _ROLLUP_RATINGS:
+            delta[2 + _ROLLUP_RATINGS.index(rating)] += 1
+
+    rating_columns = [f"rating_{r}" for r in _ROLLUP_RATINGS]
+    cursor.executemany(
+        f'''
+        INSERT INTO review_daily_rollup (review_date, review_count, distinct_words, {", ".join(rating_columns)})
+        VALUES (?, ?, ?, {", ".join("?" * len(rating_columns))})
+        ON CONFLICT(review_date) DO UPDATE SET
+            review_count = review_count + excluded.review_count,
+            distinct_words = distinct_words + excluded.distinct_words,
+            {", ".join(f"{c} = {c} + excluded.{c}" for c in rating_columns)}
+        ''',
+        [(day, *delta) for day, delta in deltas.items()],
+    )
+    return len(history_rows)
+
 
 class ReviewsRepository:
 
     def __init__(self, db: DatabaseManager) -> None:
         self.db = db
+        # In-memory schedule index behind get_due_count and due-page fetches.
+        self.due_queue = DueQueue(self._load_due_entries)
+        # (queue version, end of today, word -> SM-2 state of each card due
+        # by then, state -> card count, rating counts) of the last forecast.
+        self._forecast_cache: tuple | None = None
+        # Forecasts run on several DB executor threads; one updates the cache at a time.
+        self._forecast_lock = threading.Lock()
+
+    def _load_due_entries(self) -> list:
+        cursor = self.db.get_connection().cursor()
+        with timed_query("reviews.due_queue.load"):
+            cursor.execute('SELECT next_review_time, id, word FROM words')
+            return cursor.fetchall()
+
+    def check_due_queue(self) -> list:
+        """Compare the in-memory due queue with the words table.
+
+        Returns the entries present on only one side (empty when consistent).
+        """
+        cached = set(self.due_queue.snapshot())
+        actual = {(float(t or 0), int(i), w) for t, i, w in self._load_due_entries()}
+        return sorted(cached ^ actual)
 
     def update_review_status(self, word: str, stage: int, next_time: float, mastered: bool, review_count_inc: bool = True) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        today = datetime.now().strftime('%Y-%m-%d')
+        reviewed_at = time.time()
 
         sql = '''
             UPDATE words
-            SET stage = ?, next_review_time = ?, mastered = ?
+            SET stage = ?, next_review_time = ?, mastered = ?, last_review_time = ?
         '''
-        params: list = [stage, next_time, 1 if mastered else 0]
+        params: list = [stage, next_time, 1 if mastered else 0, reviewed_at]
 
         if review_count_inc:
             sql += ', review_count = review_count + 1'
@@ -33,122 +134,315 @@ class ReviewsRepository:
         sql += ' WHERE word = ?'
         params.append(word)
 
-        cursor.execute(sql, tuple(params))
-
-        today = datetime.now().strftime('%Y-%m-%d')
-        reviewed_at = time.time()
-        # Single statement: derive word_id from the words row instead of a separate SELECT
-        cursor.execute(
-            '''
-            INSERT INTO review_history (word_id, review_date, reviewed_at, rating)
-            SELECT id, ?, ?, ? FROM words WHERE word = ?
-            ''',
-            (today, reviewed_at, 1, word),
-        )
-
-        conn.commit()
-
-    def update_sm2_status(self, word: str, easiness: float, interval: int, repetitions: int, next_time: float, rating: int) -> int:
-        """Apply the SM-2 update and return the remaining due count on the same connection."""
-        mastered = 1 if interval > 180 else 0
-        error_delta = 1 if rating <= 2 else (-1 if rating >= 4 else 0)
-        reviewed_at = time.time()
-        today = datetime.fromtimestamp(reviewed_at).strftime('%Y-%m-%d')
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute(
+        def _write(conn: sqlite3.Connection) -> None:
+            cursor = conn.cursor()
+            cursor.execute(sql, tuple(params))
+            if cursor.rowcount > 0:
+                self.db.on_commit(lambda: self.due_queue.set(word, next_time))
+            _insert_review_history(cursor, word, today, reviewed_at, 1)
+
+        self.db.write(_write)
+
+    def update_sm2_status(
+        self,
+        word: str,
+        easiness: float,
+        interval: int,
+        repetitions: int,
+        next_time: float,
+        rating: int,
+        stability: float | None = None,
+        difficulty: float | None = None,
+    ) -> int:
+        """Apply the scheduler update and return the remaining due count (from the due queue)."""
+        _updated, due_count = self.update_sm2_batch([{
+            "word": word,
+            "easiness": easiness,
+            "interval": interval,
+            "repetitions": repetitions,
+            "next_time": next_time,
+            "rating": rating,
+            "stability": stability,
+            "difficulty": difficulty,
+        }])
+        return due_count
+
+    def update_sm2_batch(self, updates: list[dict]) -> tuple[set[str], int]:
+        """Apply several scheduler (SM-2/FSRS) updates with their history rows in one transaction.
+
+        Each update carries word, easiness, interval, repetitions, next_time,
+        rating, optional FSRS stability/difficulty (kept when None) and an
+        optional reviewed_at timestamp (defaults to now). Updates
+        are applied in order, so a word reviewed twice ends on its last result.
+        Returns (words that exist and were updated, remaining due count).
+        """
+        now_ts = time.time()
+        if not updates:
+            return set(), self.due_queue.count_due(now_ts)
+
+        word_rows = []
+        history_rows = []
+        for u in updates:
+            rating = u["rating"]
+            reviewed_at = u.get("reviewed_at") or now_ts
+            word_rows.append((
+                u["easiness"],
+                u["interval"],
+                u["repetitions"],
+                u["next_time"],
+                1 if u["interval"] > 180 else 0,
+                1 if rating <= 2 else (-1 if rating >= 4 else 0),
+                u.get("stability"),
+                u.get("difficulty"),
+                reviewed_at,
+                u["word"],
+            ))
+            history_rows.append((
+                u["word"],
+                datetime.fromtimestamp(reviewed_at).strftime('%Y-%m-%d'),
+                reviewed_at,
+                rating,
+            ))
+
+        def _write(conn: sqlite3.Connection) -> set[str]:
+            cursor = conn.cursor()
+            cursor.executemany(
                 '''
                 UPDATE words
                 SET easiness = ?, interval = ?, repetitions = ?, next_review_time = ?,
                     mastered = ?, review_count = review_count + 1,
-                    error_count = MAX(0, error_count + ?)
+                    error_count = MAX(0, error_count + ?),
+                    fsrs_stability = COALESCE(?, fsrs_stability),
+                    fsrs_difficulty = COALESCE(?, fsrs_difficulty),
+                    last_review_time = ?
                 WHERE word = ?
                 ''',
-                (easiness, interval, repetitions, next_time, mastered, error_delta, word),
+                word_rows,
             )
-
-            # Single statement: derive word_id from the words row instead of a separate SELECT
+            _insert_review_history_many(cursor, history_rows)
+            # Last write wins for repeated words; only existing words come back.
+            final_times = {row[-1]: row[3] for row in word_rows}
+            words = sorted(final_times)
+            cursor.execute(f"SELECT word FROM words WHERE word IN ({','.join('?' * len(words))})", words)
+            updated = {row[0] for row in cursor.fetchall()}
+            self.db.on_commit(lambda: self.due_queue.set_many((word, final_times[word], None) for word in updated))
+            return updated
+
+        updated = self.db.write(_write)
+        return updated, self.due_queue.count_due(now_ts)
+
+    def reschedule(
+        self,
+        compute: Callable[[list[tuple]], list[tuple]],
+        tag_filter: str = "",
+        mastered_filter: bool | None = None,
+        status_filter: str | None = None,
+        words: list[str] | None = None,
+    ) -> int:
+        """Rewrite the schedule of every matching word in one write transaction.
+
+        ``compute`` gets the matched (id, word, easiness, interval, repetitions,
+        stage, next_review_time, mastered) rows and returns aligned
+        (easiness, interval, repetitions, next_review_time, mastered) tuples.
+        This is not a review: review_count and review_history are untouched.
+        Returns the number of words rescheduled.
+        """
+        conditions, params = self.db.words.filter_conditions(tag_filter, mastered_filter, status_filter)
+        if words is not None:
+            if not words:
+                return 0
+            conditions.append(f"word IN ({','.join('?' * len(words))})")
+            params.extend(words)
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+        def _write(conn: sqlite3.Connection) -> int:
+            # Runs on the writer connection, so no review can land between
+            # the read and the rewrite.
+            cursor = conn.cursor()
             cursor.execute(
-                '''
-                INSERT INTO review_history (word_id, review_date, reviewed_at, rating)
-                SELECT id, ?, ?, ? FROM words WHERE word = ?
+                f'''
+                SELECT id, word, easiness, interval, repetitions, stage, next_review_time, mastered
+                FROM words WHERE {where_clause}
                 ''',
-                (today, reviewed_at, rating, word),
+                params,
             )
-
-            cursor.execute(
-                'SELECT COUNT(*) FROM words WHERE next_review_time = 0 OR (next_review_time > 0 AND next_review_time <= ?)',
-                (reviewed_at,),
+            rows = cursor.fetchall()
+            schedules = compute(rows) if rows else []
+            cursor.executemany(
+                '''
+                UPDATE words
+                SET easiness = ?, interval = ?, repetitions = ?, next_review_time = ?, mastered = ?
+                WHERE id = ?
+                ''',
+                [(*schedule, row[0]) for schedule, row in zip(schedules, rows)],
             )
-            due_count = int(cursor.fetchone()[0] or 0)
+            self.db.on_commit(lambda: self.due_queue.set_many(
+                (row[1], schedule[3], row[0]) for schedule, row in zip(schedules, rows)
+            ))
+            return len(rows)
 
-            conn.commit()
-            return due_count
-        except Exception:
-            conn.rollback()
-            raise
+        return self.db.write(_write)
 
     def get_heatmap_data(self) -> dict:
         conn = self.db.get_connection()
         cursor = conn.cursor()
         one_year_ago = (datetime.now() - timedelta(days=366)).strftime('%Y-%m-%d')
-        cursor.execute('''
-            SELECT review_date, COUNT(*)
-            FROM review_history
-            WHERE review_date >= ?
-            GROUP BY review_date
-        ''', (one_year_ago,))
-        rows = cursor.fetchall()
+        with timed_query("reviews.heatmap"):
+            cursor.execute('''
+                SELECT review_date, review_count
+                FROM review_daily_rollup
+                WHERE review_date >= ? AND review_count > 0
+            ''', (one_year_ago,))
+            rows = cursor.fetchall()
         return {row[0]: row[1] for row in rows}
 
+    def rebuild_daily_rollup(self) -> int:
+        """Recompute review_daily_rollup from review_history; returns the day count.
+
+        Used by the one-time backfill migration, and after history rows are
+        written outside this repository (imports, repairs).
+        """
+        rating_columns = ", ".join(f"rating_{r}" for r in _ROLLUP_RATINGS)
+        rating_sums = ", ".join(f"SUM(CASE WHEN rating = {r} THEN 1 ELSE 0 END)" for r in _ROLLUP_RATINGS)
+
+        def _write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
+            cursor.execute('DELETE FROM review_daily_rollup')
+            cursor.execute(f'''
+                INSERT INTO review_daily_rollup (review_date, review_count, distinct_words, {rating_columns})
+                SELECT review_date, COUNT(*), COUNT(DISTINCT word_id), {rating_sums}
+                FROM review_history
+                WHERE review_date IS NOT NULL AND review_date != ''
+                GROUP BY review_date
+            ''')
+            return cursor.rowcount
+
+        return self.db.write(_write)
+
     def get_due_count(self) -> int:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        now_ts = time.time()
-        cursor.execute(
-            'SELECT COUNT(*) FROM words WHERE next_review_time = 0 OR (next_review_time > 0 AND next_review_time <= ?)',
-            (now_ts,),
-        )
-        row = cursor.fetchone()
-        return int(row[0] or 0) if row else 0
+        return self.due_queue.count_due(time.time())
+
+    def _forecast_inputs(self, today_end: float, today: datetime) -> tuple[list, list[int]]:
+        """SM-2 state groups of the cards due by ``today_end`` and the 30-day rating counts.
+
+        The due cards' states are kept between forecasts. After a schedule
+        write only the words the due queue logged as changed are re-read, so
+        a forecast right after a review does not rescan every due card. A
+        new day, an invalidated queue or a very large batch reads them all.
+        """
+        with self._forecast_lock:
+            return self._update_forecast_inputs(today_end, today)
+
+    def _update_forecast_inputs(self, today_end: float, today: datetime) -> tuple[list, list[int]]:
+        # Caller holds self._forecast_lock.
+        cursor = self.db.get_connection().cursor()
+        cached = self._forecast_cache
+        changed = None
+        if cached is not None and cached[1] == today_end:
+            version, changed = self.due_queue.changes_since(cached[0])
+            if changed is not None and len(changed) > _FORECAST_INCREMENTAL_LIMIT:
+                changed = None
+        else:
+            version = self.due_queue.version
+
+        with timed_query("reviews.forecast"):
+            if changed is None:
+                cursor.execute(
+                    '''
+                    SELECT word, easiness, interval, repetitions, stage FROM words
+                    WHERE next_review_time >= 0 AND next_review_time < ?
+                    ''',
+                    (today_end,),
+                )
+                states = {row[0]: row[1:] for row in cursor.fetchall()}
+                groups = Counter(states.values())
+            else:
+                # Update copies: a failed read below must leave the cache as it was.
+                states, groups = dict(cached[2]), Counter(cached[3])
+                for word in changed:
+                    state = states.pop(word, None)
+                    if state is not None:
+                        groups[state] -= 1
+                        if not groups[state]:
+                            del groups[state]
+                for start in range(0, len(changed), 500):
+                    chunk = changed[start:start + 500]
+                    cursor.execute(
+                        f'''
+                        SELECT word, easiness, interval, repetitions, stage FROM words
+                        WHERE word IN ({", ".join("?" * len(chunk))})
+                          AND next_review_time >= 0 AND next_review_time < ?
+                        ''',
+                        (*chunk, today_end),
+                    )
+                    for row in cursor.fetchall():
+                        states[row[0]] = state = row[1:]
+                        groups[state] += 1
+            rating_columns = ", ".join(f"SUM(rating_{r})" for r in _ROLLUP_RATINGS)
+            cursor.execute(
+                f'SELECT {rating_columns} FROM review_daily_rollup WHERE review_date >= ?',
+                ((today - timedelta(days=30)).strftime('%Y-%m-%d'),),
+            )
+            rating_counts = [count or 0 for count in cursor.fetchone()]
+        self._forecast_cache = (version, today_end, states, groups, rating_counts)
+        return [(*state, count) for state, count in groups.items()], rating_counts
+
+    def get_review_forecast(self, days: int = 90, now: float | None = None) -> dict:
+        """Per-day review load for the next ``days`` local days.
+
+        ``scheduled`` comes straight from the in-memory schedule (one
+        bisection per day boundary; day 0 also holds everything overdue and
+        new). ``simulated`` is the expected number of follow-up reviews that
+        clearing today's due cards would add, using SM-2 with the rating mix
+        of the last 30 days.
+
+        On 100k words (benchmarks/review_forecast.py) a forecast takes ~3 ms,
+        whether or not a review was just written. The first forecast of the
+        process or of a new day rebuilds the due cards' states, which takes
+        ~20 ms, so the 20 ms budget holds for the median of that case only.
+        """
+        now_ts = time.time() if now is None else now
+        today = datetime.fromtimestamp(now_ts).replace(hour=0, minute=0, second=0, microsecond=0)
+        dates = [today + timedelta(days=i) for i in range(days)]
+        # Day 0 starts at 0 so overdue and new (next_review_time = 0) cards count as today.
+        edges = [0.0] + [(day + timedelta(days=1)).timestamp() for day in dates]
+        scheduled = self.due_queue.histogram(edges)
+
+        due_groups, rating_counts = self._forecast_inputs(edges[1], today)
+
+        total_ratings = sum(rating_counts)
+        if total_ratings:
+            rating_weights = {r: count / total_ratings for r, count in zip(_ROLLUP_RATINGS, rating_counts)}
+        else:
+            rating_weights = {4: 1.0}  # no recent history: assume "good"
+        simulated = forecast_reviews(due_groups, rating_weights, edges, now=now_ts)
+
+        return {
+            "days": [
+                {
+                    "date": day.strftime('%Y-%m-%d'),
+                    "scheduled": count,
+                    "simulated": round(float(extra), 2),
+                    "total": round(count + float(extra), 2),
+                }
+                for day, count, extra in zip(dates, scheduled, simulated)
+            ],
+            "due_now": self.due_queue.count_due(now_ts),
+            "rating_mix": {str(r): round(w, 4) for r, w in rating_weights.items()},
+        }
 
     def get_difficult_words(self, limit: int) -> list[dict]:
         """Words with error_count >= 1, hardest first."""
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute(
+        return WORD_ROWS.fetch_all(
+            self.db.get_connection(),
             """
-            SELECT * FROM words
+            SELECT {columns} FROM words
             WHERE error_count >= 1
             ORDER BY error_count DESC, next_review_time ASC
             LIMIT ?
             """,
             (limit,),
         )
-        rows = cursor.fetchall()
-
-        words: list[dict] = []
-        for row in rows:
-            word = dict(row)
-            word["mastered"] = bool(word["mastered"])
-            word["date"] = word["date_added"]
-            for key in [
-                "phonetic",
-                "meaning",
-                "example",
-                "context_en",
-                "context_cn",
-                "roots",
-                "synonyms",
-                "tags",
-            ]:
-                if word.get(key) is None:
-                    word[key] = ""
-            words.append(word)
-        return words
 
     def get_word_history(self, word_id: int) -> list:
         conn = self.db.get_connection()
@@ -167,51 +461,33 @@ class ReviewsRepository:
     def get_statistics(self) -> dict:
         conn = self.db.get_connection()
         cursor = conn.cursor()
-
-        cursor.execute('SELECT COUNT(*) FROM words')
-        total = cursor.fetchone()[0]
-
-        cursor.execute('SELECT COUNT(*) FROM words WHERE mastered = 1')
-        mastered = cursor.fetchone()[0]
-
         now_ts = time.time()
-        cursor.execute(
-            'SELECT COUNT(*) FROM words WHERE next_review_time = 0 OR (next_review_time > 0 AND next_review_time <= ?)',
-            (now_ts,)
-        )
-        due_today = cursor.fetchone()[0]
 
-        cursor.execute('SELECT COUNT(*) FROM words WHERE review_count = 0 AND mastered = 0')
-        new_words = cursor.fetchone()[0]
+        # One pass over words for every per-word counter.
+        with timed_query("reviews.statistics.words"):
+            cursor.execute(
+                '''
+                SELECT
+                    COUNT(*),
+                    SUM(CASE WHEN mastered = 1 THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN next_review_time = 0 OR (next_review_time > 0 AND next_review_time <= ?) THEN 1 ELSE 0 END),
+                    SUM(CASE WHEN review_count = 0 AND mastered = 0 THEN 1 ELSE 0 END)
+                FROM words
+                ''',
+                (now_ts,),
+            )
+            total, mastered, due_today, new_words = (int(v or 0) for v in cursor.fetchone())
 
         learning = total - mastered - new_words
 
         today_str = datetime.now().strftime('%Y-%m-%d')
+        with timed_query("reviews.statistics.reviewed_today"):
+            cursor.execute('SELECT distinct_words FROM review_daily_rollup WHERE review_date = ?', (today_str,))
+            row = cursor.fetchone()
+            reviewed_today = int(row[0]) if row else 0
 
-        cursor.execute('SELECT COUNT(DISTINCT word_id) FROM review_history WHERE review_date = ?', (today_str,))
-        reviewed_today = cursor.fetchone()[0]
-
-        cursor.execute('SELECT DISTINCT review_date FROM review_history ORDER BY review_date DESC')
-        dates = [row[0] for row in cursor.fetchall()]
-
-        streak_days = 0
-        if dates:
-            latest_date = datetime.strptime(dates[0], '%Y-%m-%d').date()
-            today_date = datetime.now().date()
-
-            if latest_date == today_date or latest_date == (today_date - timedelta(days=1)):
-                streak_days = 1
-                current_check = latest_date
-
-                for i in range(1, len(dates)):
-                    prev_date = datetime.strptime(dates[i], '%Y-%m-%d').date()
-                    if (current_check - prev_date).days == 1:
-                        streak_days += 1
-                        current_check = prev_date
-                    else:
-                        break
-            else:
-                streak_days = 0
+        with timed_query("reviews.statistics.streak"):
+            streak_days = self._streak_days(cursor)
 
         return {
             'total': total,
@@ -223,6 +499,42 @@ class ReviewsRepository:
             'streak_days': streak_days
         }
 
+    @staticmethod
+    def _streak_days(cursor: sqlite3.Cursor) -> int:
+        """Length of the run of consecutive review days ending today or yesterday.
+
+        Gaps-and-islands in SQL over the per-day rollup (O(days), independent
+        of history size): consecutive dates share the same
+        ``julianday(date) - row_number``, so the most recent island is the
+        current streak. Only that island's end date and size come back to Python.
+        """
+        cursor.execute(
+            '''
+            WITH days AS (
+                SELECT review_date AS day
+                FROM review_daily_rollup
+                WHERE review_count > 0
+            ),
+            islands AS (
+                SELECT day, julianday(day) - ROW_NUMBER() OVER (ORDER BY day) AS island
+                FROM days
+            )
+            SELECT MAX(day), COUNT(*)
+            FROM islands
+            GROUP BY island
+            ORDER BY MAX(day) DESC
+            LIMIT 1
+            '''
+        )
+        row = cursor.fetchone()
+        if not row or not row[0]:
+            return 0
+        latest_date = datetime.strptime(row[0], '%Y-%m-%d').date()
+        today_date = datetime.now().date()
+        if latest_date == today_date or latest_date == (today_date - timedelta(days=1)):
+            return int(row[1])
+        return 0
+
     def get_learning_focus_summary(self, limit: int = 5) -> Dict[str, Any]:
         conn = self.db.get_connection()
         cursor = conn.cursor()
@@ -294,10 +606,9 @@ class ReviewsRepository:
             return
 
         today = datetime.now().strftime('%Y-%m-%d')
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
 
-        try:
+        def _write(conn: sqlite3.Connection) -> None:
+            cursor = conn.cursor()
             cursor.execute('''
                 UPDATE study_stats
                 SET total_duration = total_duration + ?, review_count = review_count + ?
@@ -310,7 +621,8 @@ class ReviewsRepository:
                     VALUES (?, ?, ?)
                 ''', (today, duration_seconds, review_count))
 
-            conn.commit()
+        try:
+            self.db.write(_write)
         except Exception as e:
             logger.error(f"Log study session error: {e}")
 
@@ -17,15 +17,12 @@ class TranslationsRepository:
         self.db = db
 
     def add(self, source_text: str, target_text: str, source_lang: str, target_lang: str) -> int | None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
+        created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         try:
-            cursor.execute('''
+            return self.db.write(lambda conn: conn.execute('''
                 INSERT INTO translations (source_text, target_text, source_lang, target_lang, created_at)
                 VALUES (?, ?, ?, ?, ?)
-            ''', (source_text, target_text, source_lang, target_lang, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
-            conn.commit()
-            return cursor.lastrowid
+            ''', (source_text, target_text, source_lang, target_lang, created_at)).lastrowid)
         except Exception as e:
             logger.error(f"Add translation error: {e}")
             return None
@@ -56,8 +53,7 @@ class TranslationsRepository:
         return [dict(row) for row in rows]
 
     def delete(self, translation_id: int) -> bool:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('DELETE FROM translations WHERE id = ?', (translation_id,))
-        conn.commit()
-        return cursor.rowcount > 0
+        deleted = self.db.write(
+            lambda conn: conn.execute('DELETE FROM translations WHERE id = ?', (translation_id,)).rowcount
+        )
+        return deleted > 0
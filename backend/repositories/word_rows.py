@@ -0,0 +1,96 @@
+"""
+Shared row mapping for ``words`` reads.
+
+Word reads used to set ``conn.row_factory = sqlite3.Row``, copy every row
+into a dict and then loop over ~10 text keys in Python to turn NULL into "".
+On ``/api/words/all`` for large books, that per-row work cost more than the
+query itself.
+
+WordRowMapper fixes a column tuple once. It selects the text columns through
+``COALESCE(col, '')`` so SQLite does the NULL handling, fetches plain tuples,
+and builds each dict with a single ``dict(zip(columns, row))`` plus the two
+derived keys (``mastered`` as bool, ``date`` copied from ``date_added``).
+The words and reviews repositories share one mapper, so every word dict has
+the same shape.
+"""
+from __future__ import annotations
+
+import sqlite3
+from typing import Iterable, Sequence
+
+# Text columns the API exposes as "" rather than null.
+_TEXT_COLUMNS = frozenset({
+    "phonetic", "meaning", "example", "context_en", "context_cn",
+    "roots", "synonyms", "tags", "note", "audio",
+})
+
+# Every API-visible column of ``words``, in table order. Keep in sync with
+# init_db and the ALTER TABLE migrations in check_schema_updates (bookkeeping
+# columns such as ``normalized_version`` are left out).
+WORD_COLUMNS = (
+    "id", "word", "phonetic", "meaning", "example", "roots", "synonyms",
+    "context_en", "context_cn", "date_added", "next_review_time", "review_count",
+    "mastered", "error_count", "stage", "easiness", "interval", "repetitions",
+    "tags", "note", "audio", "fsrs_stability", "fsrs_difficulty", "last_review_time",
+)
+
+
+class WordRowMapper:
+    """Maps ``SELECT {mapper.select_sql} FROM words ...`` tuples to API word dicts."""
+
+    __slots__ = ("columns", "select_sql", "_mastered", "_date_added")
+
+    def __init__(self, columns: Sequence[str]) -> None:
+        self.columns = tuple(columns)
+        self.select_sql = ", ".join(
+            f"COALESCE(words.{col}, '') AS {col}" if col in _TEXT_COLUMNS else f"words.{col}"
+            for col in self.columns
+        )
+        self._mastered = self.columns.index("mastered")
+        self._date_added = self.columns.index("date_added")
+
+    def to_dict(self, row: Sequence) -> dict:
+        d = dict(zip(self.columns, row))
+        d["mastered"] = bool(row[self._mastered])
+        d["date"] = row[self._date_added]
+        return d
+
+    def to_dicts(self, rows: Iterable[Sequence]) -> list[dict]:
+        columns, mastered, date_added = self.columns, self._mastered, self._date_added
+        result = []
+        append = result.append
+        for row in rows:
+            d = dict(zip(columns, row))
+            d["mastered"] = bool(row[mastered])
+            d["date"] = row[date_added]
+            append(d)
+        return result
+
+    @staticmethod
+    def cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+        """A cursor that yields plain tuples, whatever ``conn.row_factory`` is set to."""
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        return cursor
+
+    def fetch_all(self, conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> list[dict]:
+        """Run ``sql`` (containing ``{columns}`` where the select list goes) and map every row."""
+        cursor = self.cursor(conn)
+        cursor.execute(sql.format(columns=self.select_sql), params)
+        return self.to_dicts(cursor.fetchall())
+
+    def fetch_one(self, conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> dict | None:
+        cursor = self.cursor(conn)
+        cursor.execute(sql.format(columns=self.select_sql), params)
+        row = cursor.fetchone()
+        return self.to_dict(row) if row is not None else None
+
+
+# Full word rows (get/get_all/search/difficult words).
+WORD_ROWS = WordRowMapper(WORD_COLUMNS)
+
+# Compact rows for the paginated list (get_for_list).
+WORD_LIST_ROWS = WordRowMapper((
+    "id", "word", "phonetic", "meaning", "mastered", "next_review_time",
+    "tags", "date_added", "review_count",
+))
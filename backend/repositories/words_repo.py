@@ -3,11 +3,20 @@ from __future__ import annotations
 import sqlite3
 import time
 from datetime import datetime
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
+
+from repositories.word_rows import WORD_LIST_ROWS, WORD_ROWS
+from services.offline_dict import get_offline_dict
+from services.request_metrics import timed_query
+from services.suggest_index import TOP_K, SuggestIndex
+from utils.text_utils import NORMALIZED_VERSION, WORD_TEXT_FIELDS, clean_chinese_text
 
 if TYPE_CHECKING:
     from models.database import DatabaseManager
 
+# Scheduler state columns; a change to any of them is a due-queue change.
+_SCHEDULE_COLUMNS = frozenset({'stage', 'mastered', 'easiness', 'interval', 'repetitions'})
+
 
 def _split_tags(tags_str: str) -> list[str]:
     """Parse a comma-separated tag string into stripped, non-empty tags."""
@@ -30,91 +39,160 @@ def _sync_word_tags(cursor: sqlite3.Cursor, word_id: int, tags_str: str) -> None
         )
 
 
+# The trigram tokenizer only indexes 3-character sequences; shorter keywords
+# (e.g. a two-character Chinese meaning like "苹果") cannot use the index.
+_FTS_MIN_KEYWORD_CHARS = 3
+
+# Columns search() can order by (and therefore build keyset cursors on).
+WORD_SORT_FIELDS = frozenset({
+    "word", "next_review_time", "date_added", "review_count", "mastered", "easiness", "interval",
+})
+
+
+def _fts_phrase(keyword: str) -> str:
+    """Quote a raw keyword as a single FTS5 phrase (no query-syntax injection)."""
+    return '"' + keyword.replace('"', '""') + '"'
+
+
 class WordsRepository:
 
     def __init__(self, db: DatabaseManager) -> None:
         self.db = db
+        # In-memory prefix index behind the search box suggestions.
+        self.suggest_index = SuggestIndex(self._load_suggest_sources)
 
-    def add(self, data: dict) -> bool:
+    def _load_suggest_sources(self) -> Iterator[tuple]:
         conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
+        with timed_query("words.suggest_index.load"):
+            saved = conn.execute('SELECT word FROM words').fetchall()
+            looked_up = conn.execute('SELECT DISTINCT word FROM dict_cache').fetchall()
+        for (word,) in saved:
+            yield word, True, False, 0
+        for (word,) in looked_up:
+            yield word, False, True, 0
+        store = get_offline_dict()
+        if store is not None:
+            for word, frequency in store.ranked_words():
+                yield word, False, False, frequency
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        """Ranked words starting with ``prefix`` (SuggestIndex).
+
+        When the index has fewer than ``limit``, the rest come from the
+        offline dictionary's headwords without a known frequency.
+        """
+        limit = min(limit, TOP_K)
+        suggestions = self.suggest_index.suggest(prefix, limit)
+        store = get_offline_dict()
+        if len(suggestions) < limit and store is not None:
+            seen = {s['word'].lower() for s in suggestions}
+            for entry in store.prefix(prefix, limit):
+                if len(suggestions) >= limit:
+                    break
+                if entry['word'].lower() not in seen:
+                    seen.add(entry['word'].lower())
+                    suggestions.append({'word': entry['word'], 'saved': False})
+        return suggestions
+
+    def add(self, data: dict) -> bool:
+        next_review_time = time.time()
+
+        def _write(conn: sqlite3.Connection) -> None:
+            cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO words (word, phonetic, meaning, example, context_en, context_cn, roots, synonyms, tags, audio, date_added, next_review_time)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                INSERT INTO words (word, phonetic, meaning, example, context_en, context_cn, roots, synonyms, tags, audio, date_added, next_review_time, normalized_version)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             ''', (
                 data['word'],
                 data.get('phonetic', ''),
-                data.get('meaning', ''),
-                data.get('example', ''),
+                clean_chinese_text(data.get('meaning', '')),
+                clean_chinese_text(data.get('example', '')),
                 data.get('context_en', ''),
-                data.get('context_cn', ''),
+                clean_chinese_text(data.get('context_cn', '')),
                 data.get('roots', ''),
                 data.get('synonyms', ''),
                 data.get('tags', ''),
                 data.get('audio', ''),
                 data.get('date', datetime.now().strftime('%Y-%m-%d')),
-                time.time()
+                next_review_time,
+                NORMALIZED_VERSION,
             ))
-            _sync_word_tags(cursor, cursor.lastrowid, data.get('tags', ''))
-            conn.commit()
+            word_id = cursor.lastrowid
+            _sync_word_tags(cursor, word_id, data.get('tags', ''))
+            self.db.on_commit(lambda: self.db.reviews.due_queue.set(data['word'], next_review_time, word_id))
+            self.db.on_commit(lambda: self.suggest_index.add(data['word'], saved=True))
+
+        try:
+            self.db.write(_write)
             return True
         except sqlite3.IntegrityError:
-            # Roll back so the thread-local connection doesn't carry a half
-            # -finished transaction into the next caller's commit.
-            conn.rollback()
             return False
 
     def get(self, word: str) -> dict | None:
-        conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM words WHERE word = ?', (word,))
-        row = cursor.fetchone()
-        if row:
-            d = dict(row)
-            d['mastered'] = bool(d['mastered'])
-            d['date'] = d['date_added']
-            for key in ['phonetic', 'meaning', 'example', 'context_en', 'context_cn', 'roots', 'synonyms', 'tags', 'note', 'audio']:
-                if d.get(key) is None:
-                    d[key] = ""
-            return d
-        return None
+        return WORD_ROWS.fetch_one(self.db.get_connection(), 'SELECT {columns} FROM words WHERE word = ?', (word,))
 
-    def get_all(self) -> list[dict]:
+    def get_many(self, words: list[str]) -> dict[str, dict]:
+        """Map each existing word to its row dict (chunked IN queries)."""
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        cursor.execute('SELECT * FROM words ORDER BY next_review_time ASC')
-        rows = cursor.fetchall()
-
-        result = []
-        for row in rows:
-            d = dict(row)
-            d['mastered'] = bool(d['mastered'])
-            d['date'] = d['date_added']
-            for key in ['phonetic', 'meaning', 'example', 'context_en', 'context_cn', 'roots', 'synonyms', 'tags', 'note', 'audio']:
-                if d.get(key) is None:
-                    d[key] = ""
-            result.append(d)
+        unique = list(dict.fromkeys(words))
+        result: dict[str, dict] = {}
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            sql = f"SELECT {{columns}} FROM words WHERE word IN ({','.join('?' * len(chunk))})"
+            for d in WORD_ROWS.fetch_all(conn, sql, chunk):
+                result[d["word"]] = d
         return result
 
+    def get_all(self) -> list[dict]:
+        return WORD_ROWS.fetch_all(self.db.get_connection(), 'SELECT {columns} FROM words ORDER BY next_review_time ASC')
+
+    def iter_all(self, chunk_size: int = 500) -> Iterator[list[dict]]:
+        """Yield get_all() rows in chunks of ``chunk_size`` (same order and shape).
+
+        Holds one pooled read connection, and therefore one consistent
+        snapshot, until the generator is exhausted or closed. Only one chunk
+        is materialised at a time.
+        """
+        with self.db.read_connection(dedicated=True) as conn:
+            cursor = WORD_ROWS.cursor(conn)
+            try:
+                cursor.execute(f'SELECT {WORD_ROWS.select_sql} FROM words ORDER BY next_review_time ASC')
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        return
+                    yield WORD_ROWS.to_dicts(rows)
+            finally:
+                cursor.close()
+
+    def _uses_fts(self, keyword: str) -> bool:
+        return bool(keyword) and self.db.fts_enabled and len(keyword) >= _FTS_MIN_KEYWORD_CHARS
+
+    def _keyword_condition(self, keyword: str) -> tuple[str, list]:
+        """Build the WHERE fragment for a word/meaning substring search.
+
+        Uses the words_fts trigram index when possible; otherwise falls back to
+        the LIKE scan (FTS5 unavailable, or keyword too short for trigrams).
+        """
+        if self._uses_fts(keyword):
+            return (
+                "words.id IN (SELECT rowid FROM words_fts WHERE words_fts MATCH ?)",
+                [_fts_phrase(keyword)],
+            )
+        like_pattern = f"%{keyword}%"
+        return "(word LIKE ? OR meaning LIKE ?)", [like_pattern, like_pattern]
+
     def get_for_list(self, keyword=None, tag=None, page=1, page_size=20) -> dict:
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        select_fields = '''
-            id, word, phonetic, meaning, mastered, next_review_time,
-            tags, date_added, review_count
-        '''
+        cursor = WORD_LIST_ROWS.cursor(conn)
 
         where_clauses = []
         params = []
 
         if keyword:
-            where_clauses.append("(word LIKE ? OR meaning LIKE ?)")
-            params.extend([f"%{keyword}%", f"%{keyword}%"])
+            condition, keyword_params = self._keyword_condition(keyword)
+            where_clauses.append(condition)
+            params.extend(keyword_params)
 
         if tag:
             where_clauses.append("EXISTS (SELECT 1 FROM word_tags wt WHERE wt.word_id = words.id AND wt.tag = ?)")
@@ -128,26 +206,14 @@ class WordsRepository:
 
         offset = (page - 1) * page_size
         data_sql = f'''
-            SELECT {select_fields}
+            SELECT {WORD_LIST_ROWS.select_sql}
             FROM words
             WHERE {where_sql}
             ORDER BY next_review_time ASC
             LIMIT ? OFFSET ?
         '''
         cursor.execute(data_sql, tuple(params) + (page_size, offset))
-        rows = cursor.fetchall()
-
-        result = []
-        for row in rows:
-            d = dict(row)
-            d['mastered'] = bool(d.get('mastered', 0))
-            d['date'] = d.get('date_added', '')
-            for key in ['phonetic', 'meaning', 'tags']:
-                if d.get(key) is None:
-                    d[key] = ""
-            result.append(d)
-
-        return {'words': result, 'total': total}
+        return {'words': WORD_LIST_ROWS.to_dicts(cursor.fetchall()), 'total': total}
 
     def get_existing_words(self, words: list[str]) -> list[str]:
         """Return which of the given words already exist (case-sensitive, like get()).
@@ -174,41 +240,48 @@ class WordsRepository:
         """
         if not words_data:
             return 0
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
         now = datetime.now().strftime('%Y-%m-%d')
         params = [
             (
                 d['word'],
                 d.get('phonetic', ''),
-                d.get('meaning', ''),
-                d.get('example', ''),
+                clean_chinese_text(d.get('meaning', '')),
+                clean_chinese_text(d.get('example', '')),
                 d.get('context_en', ''),
-                d.get('context_cn', ''),
+                clean_chinese_text(d.get('context_cn', '')),
                 d.get('roots', ''),
                 d.get('synonyms', ''),
                 d.get('tags', ''),
                 d.get('audio', ''),
                 d.get('date', now),
                 time.time(),
+                NORMALIZED_VERSION,
             )
             for d in words_data
         ]
-        try:
+        # First occurrence wins, as with INSERT OR IGNORE.
+        scheduled: dict[str, float] = {}
+        for row in params:
+            scheduled.setdefault(row[0], row[11])
+
+        def _write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
             # Existing words are skipped by INSERT OR IGNORE; only sync tags for new ones.
             existing_words = set(self.get_existing_words([d['word'] for d in words_data]))
-            words_before = conn.total_changes
             cursor.executemany(
                 '''
                 INSERT OR IGNORE INTO words (
                     word, phonetic, meaning, example, context_en, context_cn,
-                    roots, synonyms, tags, audio, date_added, next_review_time
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    roots, synonyms, tags, audio, date_added, next_review_time, normalized_version
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 ''',
                 params,
             )
-            inserted = conn.total_changes - words_before
+            # rowcount (sqlite3_changes) excludes rows written by the
+            # words_fts triggers, unlike conn.total_changes.
+            inserted = cursor.rowcount
             new_words = [d for d in words_data if d['word'] not in existing_words]
+            id_map: dict[str, int] = {}
             if new_words:
                 id_map = self._word_ids_by_word(cursor, [d['word'] for d in new_words])
                 tag_rows = [
@@ -222,11 +295,13 @@ class WordsRepository:
                         'INSERT OR IGNORE INTO word_tags (word_id, tag) VALUES (?, ?)',
                         tag_rows,
                     )
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
-        return inserted
+            self.db.on_commit(lambda: self.db.reviews.due_queue.set_many(
+                (word, scheduled[word], word_id) for word, word_id in id_map.items()
+            ))
+            self.db.on_commit(lambda: [self.suggest_index.add(word, saved=True) for word in id_map])
+            return inserted
+
+        return self.db.write(_write)
 
     @staticmethod
     def _word_ids_by_word(cursor: sqlite3.Cursor, words: list[str]) -> dict[str, int]:
@@ -260,22 +335,14 @@ class WordsRepository:
         return tags
 
     def update_context(self, word: str, en: str, cn: str) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('UPDATE words SET context_en = ?, context_cn = ? WHERE word = ?', (en, cn, word))
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+        self.db.write(lambda conn: conn.execute(
+            'UPDATE words SET context_en = ?, context_cn = ? WHERE word = ?', (en, clean_chinese_text(cn), word),
+        ))
 
     def update(self, word: str, update_data: dict) -> bool:
         if not update_data:
             return False
 
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-
         valid_columns = {
             'phonetic', 'meaning', 'example', 'context_en', 'context_cn', 'note',
             'roots', 'synonyms', 'tags', 'audio', 'mastered', 'stage'
@@ -285,6 +352,8 @@ class WordsRepository:
         params = []
         for col, val in update_data.items():
             if col in valid_columns:
+                if col in WORD_TEXT_FIELDS and isinstance(val, str):
+                    val = clean_chinese_text(val)
                 set_clauses.append(f"{col} = ?")
                 params.append(val)
 
@@ -294,47 +363,41 @@ class WordsRepository:
         sql = f"UPDATE words SET {', '.join(set_clauses)} WHERE word = ?"
         params.append(word)
 
-        try:
+        # The review forecast reads these columns; log the word as changed.
+        schedule_changed = not _SCHEDULE_COLUMNS.isdisjoint(update_data)
+
+        def _write(conn: sqlite3.Connection) -> int:
+            cursor = conn.cursor()
             cursor.execute(sql, tuple(params))
             affected = cursor.rowcount
-            if 'tags' in update_data:
-                cursor.execute('SELECT id FROM words WHERE word = ?', (word,))
+            if 'tags' in update_data or schedule_changed:
+                cursor.execute('SELECT id, next_review_time FROM words WHERE word = ?', (word,))
                 row = cursor.fetchone()
                 if row:
-                    _sync_word_tags(cursor, row[0], update_data['tags'] or '')
-            conn.commit()
-            return affected > 0
+                    word_id, next_review_time = row
+                    if 'tags' in update_data:
+                        _sync_word_tags(cursor, word_id, update_data['tags'] or '')
+                    if schedule_changed:
+                        self.db.on_commit(lambda: self.db.reviews.due_queue.set(word, next_review_time, word_id))
+            return affected
+
+        try:
+            return self.db.write(_write) > 0
         except sqlite3.Error:
-            # Roll back so the thread-local connection doesn't carry a half
-            # -finished transaction into the next caller's commit.
-            conn.rollback()
             return False
 
     def delete(self, word: str) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-    def delete(self, word: str) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
+        def _write(conn: sqlite3.Connection) -> None:
+            cursor = conn.cursor()
             cursor.execute('DELETE FROM word_tags WHERE word_id = (SELECT id FROM words WHERE word = ?)', (word,))
             cursor.execute('DELETE FROM words WHERE word = ?', (word,))
-            conn.commit()
-        except Exception:
-            # Roll back the partial delete (word_tags gone but words row kept)
-            # so the thread-local connection isn't left dirty.
-            conn.rollback()
-            raise
+            self.db.on_commit(lambda: self.db.reviews.due_queue.remove(word))
+            self.db.on_commit(lambda: self.suggest_index.remove_saved(word))
+
+        self.db.write(_write)
 
     def mark_mastered(self, word: str) -> None:
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        try:
-            cursor.execute('UPDATE words SET mastered = 1 WHERE word = ?', (word,))
-            conn.commit()
-        except Exception:
-            conn.rollback()
-            raise
+        self.db.write(lambda conn: conn.execute('UPDATE words SET mastered = 1 WHERE word = ?', (word,)))
 
     def search(
         self,
@@ -347,18 +410,117 @@ class WordsRepository:
         limit=50,
         offset=0,
         count_total=True,
+        after=None,
     ) -> tuple[list[dict], int | None]:
+        """Filtered, sorted page of words plus the optional filtered total.
+
+        ``after`` is a keyset position ``(sort value, id)`` taken from the last
+        row of the previous page (see utils.pagination); when given, the page
+        starts right after it instead of at ``offset``. Keyset paging is not
+        available for relevance ranking.
+
+        The unfiltered due list in review order is served from the in-memory
+        due queue (ReviewsRepository.due_queue) instead of scanning ``words``.
+        """
         conn = self.db.get_connection()
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        cursor = WORD_ROWS.cursor(conn)
+
+        if (
+            status_filter == "due"
+            and not keyword
+            and not tag_filter
+            and mastered_filter is None
+            and sort_by == "next_review_time"
+            and str(sort_order).upper() == "ASC"
+        ):
+            entries, due_total = self.db.reviews.due_queue.due_page(time.time(), offset, limit, after)
+            rows = self._rows_by_id(cursor, [entry[1] for entry in entries])
+            return WORD_ROWS.to_dicts(rows), (due_total if count_total else None)
 
         conditions = []
         params = []
+        from_sql = "words"
+        from_params: list = []
+        ranked = sort_by == "relevance" and bool(keyword)
 
         if keyword:
-            conditions.append("(word LIKE ? OR meaning LIKE ?)")
-            like_pattern = f"%{keyword}%"
-            params.extend([like_pattern, like_pattern])
+            if ranked and self._uses_fts(keyword):
+                # Join the match set so bm25 rank is available for ORDER BY;
+                # the join itself is the keyword filter.
+                from_sql = (
+                    "words JOIN (SELECT rowid AS fts_id, rank AS fts_rank FROM words_fts "
+                    "WHERE words_fts MATCH ?) AS fts ON fts.fts_id = words.id"
+                )
+                from_params.append(_fts_phrase(keyword))
+            else:
+                condition, keyword_params = self._keyword_condition(keyword)
+                conditions.append(condition)
+                params.extend(keyword_params)
+
+        filter_conditions, filter_params = self.filter_conditions(tag_filter, mastered_filter, status_filter)
+        conditions.extend(filter_conditions)
+        params.extend(filter_params)
+
+        where_clause = " AND ".join(conditions) if conditions else "1=1"
+
+        keyset_sql, keyset_params = "", []
+        if ranked:
+            # Exact and prefix headword matches lead; then bm25 rank (FTS) or
+            # the list's usual next_review_time order (LIKE fallback).
+            order_sql = "CASE WHEN word = ? COLLATE NOCASE THEN 0 WHEN word LIKE ? THEN 1 ELSE 2 END, "
+            order_sql += "fts.fts_rank, words.id" if from_params else "next_review_time ASC, words.id"
+            order_params = [keyword, f"{keyword}%"]
+        else:
+            if sort_by not in WORD_SORT_FIELDS:
+                sort_by = "next_review_time"
+            sort_order = sort_order.upper()
+            if sort_order not in ("ASC", "DESC"):
+                sort_order = "ASC"
+            # id breaks ties so keyset cursors address a unique position.
+            order_sql, order_params = f"{sort_by} {sort_order}, words.id {sort_order}", []
+            if after is not None:
+                keyset_sql, keyset_params = self._keyset_condition(sort_by, sort_order, after)
+
+        total_count = None
+        if count_total:
+            count_sql = f"SELECT COUNT(*) FROM {from_sql} WHERE {where_clause}"
+            cursor.execute(count_sql, from_params + params)
+            total_count = cursor.fetchone()[0]
+
+        query_sql = f"""
+            SELECT {WORD_ROWS.select_sql} FROM {from_sql}
+            WHERE {where_clause}{keyset_sql}
+            ORDER BY {order_sql}
+            LIMIT ? OFFSET ?
+        """
+        cursor.execute(
+            query_sql,
+            from_params + params + keyset_params + order_params + [limit, 0 if after is not None else offset],
+        )
+        return WORD_ROWS.to_dicts(cursor.fetchall()), total_count
+
+    @staticmethod
+    def _keyset_condition(sort_by: str, sort_order: str, after) -> tuple[str, list]:
+        """SQL condition for rows past the keyset position ``after`` = (sort value, id).
+
+        SQLite sorts NULL before every value, so NULLs lead an ASC page and
+        trail a DESC one. A plain row-value comparison is never true for NULL
+        (date_added can be NULL), so the NULL block is handled explicitly.
+        """
+        value, last_id = after
+        if sort_order == "ASC":
+            if value is None:
+                return f" AND (({sort_by} IS NULL AND words.id > ?) OR {sort_by} IS NOT NULL)", [last_id]
+            return f" AND ({sort_by}, words.id) > (?, ?)", [value, last_id]
+        if value is None:
+            return f" AND {sort_by} IS NULL AND words.id < ?", [last_id]
+        return f" AND (({sort_by}, words.id) < (?, ?) OR {sort_by} IS NULL)", [value, last_id]
+
+    @staticmethod
+    def filter_conditions(tag_filter="", mastered_filter=None, status_filter=None) -> tuple[list[str], list]:
+        """SQL conditions (on ``words``) and params for the tag/mastered/status list filters."""
+        conditions: list[str] = []
+        params: list = []
 
         if tag_filter:
             conditions.append("EXISTS (SELECT 1 FROM word_tags wt WHERE wt.word_id = words.id AND wt.tag = ?)")
@@ -379,40 +541,17 @@ class WordsRepository:
                 conditions.append("mastered = 0 AND next_review_time > ?")
                 params.append(now_ts)
 
-        where_clause = " AND ".join(conditions) if conditions else "1=1"
-
-        valid_sort_fields = {"word", "next_review_time", "date_added", "review_count", "mastered", "easiness", "interval"}
-        if sort_by not in valid_sort_fields:
-            sort_by = "next_review_time"
-        if sort_order.upper() not in ("ASC", "DESC"):
-            sort_order = "ASC"
-
-        total_count = None
-        if count_total:
-            count_sql = f"SELECT COUNT(*) FROM words WHERE {where_clause}"
-            cursor.execute(count_sql, params)
-            total_count = cursor.fetchone()[0]
+        return conditions, params
 
-        query_sql = f"""
-            SELECT * FROM words
-            WHERE {where_clause}
-            ORDER BY {sort_by} {sort_order}
-            LIMIT ? OFFSET ?
-        """
-        cursor.execute(query_sql, params + [limit, offset])
-        rows = cursor.fetchall()
-
-        result = []
-        for row in rows:
-            d = dict(row)
-            d['mastered'] = bool(d['mastered'])
-            d['date'] = d['date_added']
-            for key in ['phonetic', 'meaning', 'example', 'context_en', 'context_cn', 'roots', 'synonyms', 'tags', 'note', 'audio']:
-                if d.get(key) is None:
-                    d[key] = ""
-            result.append(d)
-
-        return result, total_count
+    @staticmethod
+    def _rows_by_id(cursor: sqlite3.Cursor, ids: list[int]) -> list[tuple]:
+        """Fetch WORD_ROWS tuples for ``ids``, returned in the order of ``ids``."""
+        if not ids:
+            return []
+        placeholders = ",".join("?" * len(ids))
+        cursor.execute(f"SELECT {WORD_ROWS.select_sql} FROM words WHERE id IN ({placeholders})", ids)
+        by_id = {row[0]: row for row in cursor.fetchall()}
+        return [by_id[word_id] for word_id in ids if word_id in by_id]
 
     def get_count(self) -> int:
         conn = self.db.get_connection()
@@ -29,6 +29,19 @@ def _get_db():
     return main_get_db()
 
 
+@router.get("/suggest")
+async def suggest_words(
+    prefix: str = Query(..., min_length=1, max_length=64),
+    limit: int = Query(10, ge=1, le=20),
+):
+    """
+    搜索框前缀联想（不访问网络）
+    候选来自生词本、查过的词（dict_cache）和离线词库；生词本里的词优先，其余按词频排序。
+    """
+    suggestions = await run_db_blocking(_get_db().suggest_words, prefix, limit)
+    return {"prefix": prefix, "suggestions": suggestions}
+
+
 @router.get("/search/{word}")
 async def search_word(word: str, sources: Optional[str] = None):
     """
@@ -42,8 +55,8 @@ async def search_word(word: str, sources: Optional[str] = None):
     trimmed = word.strip()
     source_list = sources.split(",") if sources else None
 
-    # 并行执行：词典查询 + 音频预取 + 是否已保存查询
-    dict_task = run_io_blocking(DictService.search_word, trimmed, source_list)
+    # 并行执行：词典查询（事件循环上异步抓取）+ 音频预取 + 是否已保存查询
+    dict_task = DictService.search_word_async(trimmed, source_list)
     audio_task = run_io_blocking(AudioService.ensure_audio, trimmed)
     saved_task = run_db_blocking(_get_db().get_word, trimmed)
 
@@ -3,16 +3,16 @@ Review API Router
 复习相关操作
 """
 import hashlib
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from fastapi import APIRouter, HTTPException, Query, Header
 from pydantic import BaseModel, Field
 from datetime import datetime, date, timedelta
 import time
 
 from repositories.review_repository import ReviewRepository
-from services.blocking_io import run_db_blocking
-from services.multi_dict_service import clean_chinese_text
+from services.blocking_io import run_db_blocking, run_io_blocking
 from utils.db import get_db
+from utils.pagination import decode_cursor, split_page
 from utils.evermem_helpers import (
     extract_bearer_token,
     can_use_evermem,
@@ -34,6 +34,26 @@ class ReviewSubmit(BaseModel):
     time_spent: float = 0  # 花费时间（秒）
 
 
+class ReviewBatchItem(ReviewSubmit):
+    """批量提交中的单条复习结果"""
+    reviewed_at: Optional[float] = None  # 复习时间戳（离线/重放会话）；默认为提交时间
+
+
+class ReviewBatchSubmit(BaseModel):
+    """批量提交复习结果（按复习顺序）"""
+    reviews: List[ReviewBatchItem] = Field(..., min_length=1, max_length=500)
+
+
+class RescheduleRequest(BaseModel):
+    """批量重排复习计划：按筛选条件选词，统一评分重算（quality）或整体平移（shift_days）"""
+    tag: str = ""
+    mastered: Optional[bool] = None
+    status: Optional[str] = Field(None, pattern="^(due|new|learning)$")
+    words: Optional[List[str]] = None
+    quality: Optional[int] = Field(None, ge=1, le=5)  # 对所有选中单词应用同一 SM-2 评分
+    shift_days: Optional[float] = None  # 将已排期的复习整体推后/提前（天）
+
+
 class ReviewSession(BaseModel):
     """复习会话"""
     duration: int  # 总时长（秒）
@@ -97,18 +117,6 @@ def _review_group_ids_recent(user_id: Optional[str], weeks: int = 4) -> Optional
     return group_ids if group_ids else None
 
 
-def _clean_review_words(words: List[dict]) -> List[dict]:
-    """Clean Chinese text in review word list."""
-    for w in words:
-        if 'meaning' in w and w['meaning']:
-            w['meaning'] = clean_chinese_text(w['meaning'])
-        if 'example' in w and w['example']:
-            w['example'] = clean_chinese_text(w['example'])
-        if 'context_cn' in w and w['context_cn']:
-            w['context_cn'] = clean_chinese_text(w['context_cn'])
-    return words
-
-
 def _format_learning_focus_summary(summary: dict, limit: int = 5) -> str:
     weak_words = summary.get("weak_words", [])
     if not weak_words:
@@ -137,6 +145,92 @@ def _format_learning_focus_summary(summary: dict, limit: int = 5) -> str:
     )
 
 
+_QUALITY_LABELS = {
+    0: "完全不认识", 1: "勉强见过", 2: "有印象但想不起来",
+    3: "有些犹豫但答对了", 4: "比较熟悉", 5: "完全掌握"
+}
+
+
+def _build_review_record(
+    word: str,
+    word_data: dict,
+    quality: int,
+    easiness: float,
+    interval: int,
+    repetitions: int,
+    next_review_in_hours: float,
+) -> str:
+    """Build the structured EverMem learning record for one review."""
+    meaning = word_data.get('meaning', '')
+    label = _QUALITY_LABELS.get(quality, f"评分{quality}")
+    interval_text = f"{next_review_in_hours}小时后" if quality <= 2 else f"{interval}天后"
+    # error_count after the update (same delta logic as reviews_repo.update_sm2_batch)
+    old_error_count = int(word_data.get("error_count") or 0)
+    error_delta = 1 if quality <= 2 else (-1 if quality >= 4 else 0)
+    error_count = max(0, old_error_count + error_delta)
+    weakness_signal = (
+        "This word is still weak for the user."
+        if quality <= 2 or error_count >= 2
+        else "This word seems reasonably stable for the user."
+    )
+    return (
+        f"[REVIEW_RECORD] 复习单词 '{word}' ({meaning}). "
+        f"评分: {quality}/5 ({label}). "
+        f"下次复习: {interval_text}. "
+        f"当前难度信号: error_count={error_count}, easiness={round(easiness, 2)}, repetitions={repetitions}. "
+        f"{weakness_signal}"
+    )
+
+
+def _store_review_records(
+    records: List[Tuple[str, int, str]],
+    evermem_user_id: Optional[str],
+    *,
+    authorization: Optional[str],
+    x_evermem_enabled: Optional[str],
+    x_evermem_url: Optional[str],
+    x_evermem_key: Optional[str],
+) -> None:
+    """Store (word, quality, record) learning records to EverMemOS (fire-and-forget)."""
+    if not records:
+        return
+    try:
+        evermem, _, evermem_enabled, _ = prime_evermem_runtime(
+            authorization=authorization,
+            x_evermem_enabled=x_evermem_enabled,
+            x_evermem_url=x_evermem_url,
+            x_evermem_key=x_evermem_key,
+        )
+        if evermem and evermem_user_id:
+            import asyncio
+            review_group_id = _review_group_id_for_user(evermem_user_id)
+
+            async def _store_review_record_batch():
+                for word, quality, record in records:
+                    result = await evermem.add_memory(
+                        content=record,
+                        user_id=evermem_user_id,
+                        sender="tutor_vocab",
+                        sender_name="VocabBook Tutor",
+                        flush=True,
+                        group_id=review_group_id,
+                        group_name=review_group_id,
+                        async_mode=False,  # Synchronous: guarantee write before returning
+                    )
+                    if result is not None:
+                        status = result.get("status", "unknown")
+                        logger.debug(f"[EverMem Review] Stored review record user={evermem_user_id} group_id={review_group_id} word={word} quality={quality} status={status}")
+
+            asyncio.create_task(_store_review_record_batch())
+        elif evermem_enabled:
+            logger.warning(
+                "[EverMem Review] Skipped review record "
+                f"user_id={evermem_user_id} service_available={bool(evermem)}"
+            )
+    except Exception as e:
+        logger.error(f"[EverMem] Failed to store review record: {e}")
+
+
 @router.get("/due")
 async def get_due_words(
     limit: int = Query(20, ge=1, le=100),
@@ -150,7 +244,7 @@ async def get_due_words(
     )
 
     response = {
-        "words": _clean_review_words(words),
+        "words": words,
         "count": len(words),
     }
     if include_total:
@@ -158,19 +252,49 @@ async def get_due_words(
     return response
 
 
+@router.get("/queue")
+async def get_review_queue(
+    queue: str = Query("due", pattern="^(due|new)$"),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+):
+    """按游标分页遍历复习队列（due: 按到期时间；new: 按添加日期倒序）"""
+    _status, sort_by, sort_order = ReviewRepository.QUEUE_ORDER[queue]
+    after = None
+    if cursor:
+        try:
+            after = decode_cursor(cursor, sort_by, sort_order)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    rows = await run_db_blocking(get_review_repository().get_queue_page, queue, limit, after)
+    words, next_cursor = split_page(rows, limit, sort_by, sort_order)
+    return {
+        "words": words,
+        "count": len(words),
+        "next_cursor": next_cursor,
+    }
+
+
 @router.get("/due-count")
 async def get_due_count():
     """获取当前待复习数量（轻量接口）"""
     return {"due_count": await run_db_blocking(get_review_repository().get_due_count)}
 
 
+@router.get("/forecast")
+async def get_review_forecast(days: int = Query(90, ge=1, le=365)):
+    """未来每日复习量预测：已排期数量 + 今日待复习完成后产生的预计复习量"""
+    return await run_db_blocking(get_review_repository().get_forecast, days)
+
+
 @router.get("/new")
 async def get_new_words(limit: int = Query(10, ge=1, le=50)):
     """获取新单词（未开始复习的）"""
     words, total = await run_db_blocking(get_review_repository().get_new_words, limit)
     
     return {
-        "words": _clean_review_words(words),
+        "words": words,
         "count": len(words),
         "total_new": total
     }
@@ -182,11 +306,24 @@ async def get_difficult_words(limit: int = Query(20, ge=1, le=100)):
     words = await run_db_blocking(get_review_repository().get_difficult_words, limit)
 
     return {
-        "words": _clean_review_words(words),
+        "words": words,
         "count": len(words)
     }
 
 
+def _schedule_review(repo: ReviewRepository, quality: int, word_data: dict) -> dict:
+    """Next schedule for one review, spread by the load balancer when it is on.
+
+    Loading the scheduler may read its weights file and balancing may reload
+    the schedule index from SQLite, so run this on the DB executor.
+    """
+    schedule = repo.get_scheduler().review(quality, word_data)
+    balancer = repo.get_load_balancer()
+    if balancer is not None:
+        schedule = balancer.balance(schedule, quality)
+    return schedule
+
+
 @router.post("/submit")
 async def submit_review(
     review: ReviewSubmit,
@@ -196,7 +333,7 @@ async def submit_review(
     x_evermem_url: Optional[str] = Header(None, alias="X-EverMem-Url"),
     x_evermem_key: Optional[str] = Header(None, alias="X-EverMem-Key"),
 ):
-    """提交单词复习结果（SM-2 算法）"""
+    """提交单词复习结果（SM-2 / FSRS，见 VOCABBOOK_SCHEDULER）"""
     repo = get_review_repository()
     evermem_user_id = _resolve_evermem_user_id(authorization, x_client_id) if can_use_evermem(authorization) else None
 
@@ -204,12 +341,10 @@ async def submit_review(
     if not word_data:
         raise HTTPException(status_code=404, detail=f"Word '{review.word}' not found")
     
-    # Import review service
-    from services.review_service import ReviewService
-    
-    # Calculate SM-2
-    easiness, interval, repetitions = ReviewService.calculate_sm2(review.quality, word_data)
-    next_time = ReviewService.calculate_next_review_time(interval, review.quality)
+    # Calculate the new schedule with the configured scheduler
+    schedule = await run_db_blocking(_schedule_review, repo, review.quality, word_data)
+    easiness, interval, repetitions = schedule["easiness"], schedule["interval"], schedule["repetitions"]
+    next_time = schedule["next_time"]
     next_review_in_hours = round(max(0, next_time - time.time()) / 3600, 1)
     
     # Update database (returns remaining due count on the same connection,
@@ -222,67 +357,22 @@ async def submit_review(
         repetitions=repetitions,
         next_time=next_time,
         rating=review.quality,
+        stability=schedule["stability"],
+        difficulty=schedule["difficulty"],
     )
 
     # Store learning record to EverMemOS (fire-and-forget)
-    try:
-        evermem, _, evermem_enabled, _ = prime_evermem_runtime(
-            authorization=authorization,
-            x_evermem_enabled=x_evermem_enabled,
-            x_evermem_url=x_evermem_url,
-            x_evermem_key=x_evermem_key,
-        )
-        if evermem and evermem_user_id:
-            import asyncio
-            meaning = word_data.get('meaning', '')
-            review_group_id = _review_group_id_for_user(evermem_user_id)
-            # Build structured learning record
-            quality_labels = {
-                0: "完全不认识", 1: "勉强见过", 2: "有印象但想不起来",
-                3: "有些犹豫但答对了", 4: "比较熟悉", 5: "完全掌握"
-            }
-            label = quality_labels.get(review.quality, f"评分{review.quality}")
-            interval_text = f"{next_review_in_hours}小时后" if review.quality <= 2 else f"{interval}天后"
-            # error_count after the update (same delta logic as reviews_repo.update_sm2_status)
-            old_error_count = int(word_data.get("error_count") or 0)
-            error_delta = 1 if review.quality <= 2 else (-1 if review.quality >= 4 else 0)
-            error_count = max(0, old_error_count + error_delta)
-            weakness_signal = (
-                "This word is still weak for the user."
-                if review.quality <= 2 or error_count >= 2
-                else "This word seems reasonably stable for the user."
-            )
-            record = (
-                f"[REVIEW_RECORD] 复习单词 '{review.word}' ({meaning}). "
-                f"评分: {review.quality}/5 ({label}). "
-                f"下次复习: {interval_text}. "
-                f"当前难度信号: error_count={error_count}, easiness={round(easiness, 2)}, repetitions={repetitions}. "
-                f"{weakness_signal}"
-            )
-            async def _store_review_record():
-                result = await evermem.add_memory(
-                    content=record,
-                    user_id=evermem_user_id,
-                    sender="tutor_vocab",
-                    sender_name="VocabBook Tutor",
-                    flush=True,
-                    group_id=review_group_id,
-                    group_name=review_group_id,
-                    async_mode=False,  # Synchronous: guarantee write before returning
-                )
-                if result is not None:
-                    status = result.get("status", "unknown")
-                    logger.debug(f"[EverMem Review] Stored review record user={evermem_user_id} group_id={review_group_id} word={review.word} quality={review.quality} status={status}")
+    _store_review_records(
+        [(review.word, review.quality, _build_review_record(
+            review.word, word_data, review.quality, easiness, interval, repetitions, next_review_in_hours,
+        ))],
+        evermem_user_id,
+        authorization=authorization,
+        x_evermem_enabled=x_evermem_enabled,
+        x_evermem_url=x_evermem_url,
+        x_evermem_key=x_evermem_key,
+    )
 
-            asyncio.create_task(_store_review_record())
-        elif evermem_enabled:
-            logger.warning(
-                "[EverMem Review] Skipped review record "
-                f"user_id={evermem_user_id} service_available={bool(evermem)}"
-            )
-    except Exception as e:
-        logger.error(f"[EverMem] Failed to store review record: {e}")
-    
     return {
         "message": "Review submitted",
         "word": review.word,
@@ -296,6 +386,168 @@ async def submit_review(
     }
 
 
+@router.post("/submit-batch")
+async def submit_review_batch(
+    batch: ReviewBatchSubmit,
+    authorization: Optional[str] = Header(None),
+    x_client_id: Optional[str] = Header(None, alias="X-Client-Id"),
+    x_evermem_enabled: Optional[str] = Header("false", alias="X-EverMem-Enabled"),
+    x_evermem_url: Optional[str] = Header(None, alias="X-EverMem-Url"),
+    x_evermem_key: Optional[str] = Header(None, alias="X-EverMem-Key"),
+):
+    """批量提交复习结果（SM-2 / FSRS），所有更新在一个事务中完成"""
+    repo = get_review_repository()
+    evermem_user_id = _resolve_evermem_user_id(authorization, x_client_id) if can_use_evermem(authorization) else None
+
+    updates = []
+    results = []
+    records = []
+
+    def schedule_batch():
+        # Scheduling reads the weights file and the balancer may reload the
+        # schedule index, so the whole loop runs on the DB executor.
+        scheduler = repo.get_scheduler()
+        balancer = repo.get_load_balancer()
+        word_rows = repo.get_words([item.word for item in batch.reviews])
+        # Running per-word state, so a word reviewed twice in one session is
+        # scheduled from its first result, exactly as two /submit calls would.
+        states = {word: dict(data) for word, data in word_rows.items()}
+        now_ts = time.time()
+
+        for item in batch.reviews:
+            word_data = states.get(item.word)
+            if word_data is None:
+                results.append({"word": item.word, "quality": item.quality, "status": "not_found"})
+                continue
+
+            reviewed_at = min(item.reviewed_at, now_ts) if item.reviewed_at else now_ts
+            schedule = scheduler.review(item.quality, word_data, now=reviewed_at)
+            if balancer is not None:
+                schedule = balancer.balance(schedule, item.quality, now=reviewed_at)
+            easiness, interval, repetitions = schedule["easiness"], schedule["interval"], schedule["repetitions"]
+            next_time = schedule["next_time"]
+            next_review_in_hours = round(max(0, next_time - now_ts) / 3600, 1)
+
+            updates.append({
+                "word": item.word,
+                "easiness": easiness,
+                "interval": interval,
+                "repetitions": repetitions,
+                "next_time": next_time,
+                "rating": item.quality,
+                "stability": schedule["stability"],
+                "difficulty": schedule["difficulty"],
+                "reviewed_at": reviewed_at,
+            })
+            records.append((item.word, item.quality, _build_review_record(
+                item.word, word_data, item.quality, easiness, interval, repetitions, next_review_in_hours,
+            )))
+            results.append({
+                "word": item.word,
+                "quality": item.quality,
+                "status": "ok",
+                "next_review": datetime.fromtimestamp(next_time).strftime('%Y-%m-%d %H:%M'),
+                "interval_days": interval,
+                "next_review_in_hours": next_review_in_hours,
+                "easiness": round(easiness, 2),
+                "error_count_incremented": item.quality <= 2,
+            })
+
+            error_delta = 1 if item.quality <= 2 else (-1 if item.quality >= 4 else 0)
+            word_data.update(
+                easiness=easiness,
+                interval=interval,
+                repetitions=repetitions,
+                error_count=max(0, int(word_data.get("error_count") or 0) + error_delta),
+                last_review_time=reviewed_at,
+            )
+            if schedule["stability"] is not None:
+                word_data.update(fsrs_stability=schedule["stability"], fsrs_difficulty=schedule["difficulty"])
+
+    await run_db_blocking(schedule_batch)
+
+    _updated, remaining_due_count = await run_db_blocking(repo.update_sm2_batch, updates)
+
+    _store_review_records(
+        records,
+        evermem_user_id,
+        authorization=authorization,
+        x_evermem_enabled=x_evermem_enabled,
+        x_evermem_url=x_evermem_url,
+        x_evermem_key=x_evermem_key,
+    )
+
+    return {
+        "message": "Reviews submitted",
+        "submitted": len(updates),
+        "results": results,
+        "remaining_due_count": remaining_due_count,
+    }
+
+
+@router.post("/reschedule")
+async def reschedule_words(request: RescheduleRequest):
+    """批量重排复习计划（向量化 SM-2，单事务写入），不计入复习记录"""
+    if (request.quality is None) == (request.shift_days is None):
+        raise HTTPException(status_code=400, detail="Provide exactly one of quality or shift_days")
+
+    from services.sm2_batch import regrade_schedules, shift_schedules
+
+    if request.quality is not None:
+        quality = request.quality
+        now_ts = time.time()
+        compute = lambda rows: regrade_schedules(rows, quality, now=now_ts)
+    else:
+        shift_days = request.shift_days
+        compute = lambda rows: shift_schedules(rows, shift_days)
+
+    repo = get_review_repository()
+    rescheduled = await run_db_blocking(
+        repo.reschedule,
+        compute,
+        tag=request.tag,
+        mastered=request.mastered,
+        status=request.status,
+        words=request.words,
+    )
+    return {
+        "message": "Words rescheduled",
+        "rescheduled": rescheduled,
+        "remaining_due_count": await run_db_blocking(repo.get_due_count),
+    }
+
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """当前复习调度器（VOCABBOOK_SCHEDULER）及 FSRS 拟合参数状态"""
+    from services import fsrs
+    from services.fsrs_fit import is_fit_running
+
+    db = get_db()
+    weights_path = fsrs.weights_path_for(db.db_path)
+    cached = await run_io_blocking(fsrs.load_weights_file, weights_path)
+    scheduler = await run_io_blocking(get_review_repository().get_scheduler)
+    return {
+        "scheduler": scheduler.name,
+        "weights": "fitted" if cached else "default",
+        "fitted_at": cached.get("fitted_at") if cached else None,
+        "review_count": cached.get("review_count") if cached else None,
+        "metrics": cached.get("metrics") if cached else None,
+        "fitting": is_fit_running(),
+    }
+
+
+@router.post("/scheduler/fit", status_code=202)
+async def fit_scheduler():
+    """在后台进程中根据 review_history 拟合 FSRS 参数（结果缓存为 JSON）"""
+    from services import fsrs
+    from services.fsrs_fit import start_background_fit
+
+    db = get_db()
+    started = start_background_fit(db.db_path, fsrs.weights_path_for(db.db_path))
+    return {"started": started, "message": "Fitting started" if started else "A fit is already running"}
+
+
 @router.post("/session")
 async def log_session(
     session: ReviewSession,
@@ -4,7 +4,9 @@ Statistics API Router
 """
 from fastapi import APIRouter
 from services.blocking_io import run_db_blocking
-from services.request_metrics import request_metrics
+from services.multi_dict_service import MultiDictService
+from services.request_metrics import query_metrics, request_metrics
+from services.single_flight import dict_flights
 
 router = APIRouter()
 
@@ -85,4 +87,9 @@ async def get_words_count():
 @router.get("/request-timings")
 async def get_request_timings():
     """Return in-memory request timing stats for p95 analysis."""
-    return request_metrics.snapshot()
+    snapshot = request_metrics.snapshot()
+    snapshot["queries"] = query_metrics.snapshot()["routes"]
+    snapshot["db_pool"] = get_db().pool_stats()
+    snapshot["dict_cache"] = MultiDictService.cache.stats()
+    snapshot["dict_single_flight"] = dict_flights.stats()
+    return snapshot
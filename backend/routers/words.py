@@ -4,12 +4,15 @@ Words API Router
 """
 from typing import Optional, List
 from fastapi import APIRouter, HTTPException, Query, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, field_validator
 from datetime import datetime
 
 from services.blocking_io import run_db_blocking, run_io_blocking
-from services.multi_dict_service import clean_chinese_text
 from services.audio_service import AudioService
+from services.word_export import get_encoder, stream_words
+from repositories.words_repo import WORD_SORT_FIELDS
+from utils.pagination import decode_cursor, split_page
 import logging
 
 logger = logging.getLogger(__name__)
@@ -77,9 +80,10 @@ class WordResponse(BaseModel):
 class WordListResponse(BaseModel):
     """单词列表响应"""
     words: List[WordResponse]
-    total: int
+    total: Optional[int] = None  # 游标翻页的后续页默认不统计总数
     page: int
     page_size: int
+    next_cursor: Optional[str] = None
 
 
 def get_db():
@@ -95,40 +99,44 @@ async def _ensure_word_audio_field(word: str, existing_audio: str = "") -> str:
     return audio_path or ""
 
 
-def _clean_word_data(word_data: dict) -> dict:
-    """Clean Chinese text in word data."""
-    if not word_data:
-        return word_data
-    
-    # Clean meaning
-    if 'meaning' in word_data and word_data['meaning']:
-        word_data['meaning'] = clean_chinese_text(word_data['meaning'])
-        
-    # Clean example
-    if 'example' in word_data and word_data['example']:
-        word_data['example'] = clean_chinese_text(word_data['example'])
-
-    # Clean context_cn if exists
-    if 'context_cn' in word_data and word_data['context_cn']:
-        word_data['context_cn'] = clean_chinese_text(word_data['context_cn'])
-        
-    return word_data
-
-
 @router.get("", response_model=WordListResponse)
 async def get_words(
     keyword: str = Query("", description="搜索关键词"),
     tag: str = Query("", description="标签筛选"),
     mastered: Optional[bool] = Query(None, description="是否已掌握"),
     status: Optional[str] = Query(None, description="状态筛选: new/learning/review"),
-    sort_by: str = Query("next_review_time", description="排序字段"),
+    sort_by: Optional[str] = Query(None, description="排序字段（关键词搜索默认按相关度 relevance）"),
     sort_order: str = Query("ASC", description="排序方向"),
     page: int = Query(1, ge=1, description="页码"),
-    page_size: int = Query(50, ge=1, le=200, description="每页数量")
+    page_size: int = Query(50, ge=1, le=200, description="每页数量"),
+    cursor: Optional[str] = Query(None, description="翻页游标（上一页返回的 next_cursor），优先于 page"),
+    include_total: Optional[bool] = Query(None, description="是否统计总数；默认仅在首页/页码模式统计"),
 ):
-    """获取单词列表，支持分页和筛选"""
+    """获取单词列表，支持分页和筛选。
+
+    传入 cursor 时使用 keyset 翻页：每页代价恒定，与翻到第几页无关；
+    后续页默认跳过 COUNT(*)（客户端沿用首页的 total）。
+    """
     db = get_db()
     offset = (page - 1) * page_size
+    if not sort_by:
+        sort_by = "relevance" if keyword else "next_review_time"
+    elif sort_by != "relevance" and sort_by not in WORD_SORT_FIELDS:
+        sort_by = "next_review_time"
+    sort_order = sort_order.upper() if sort_order.upper() in ("ASC", "DESC") else "ASC"
+    # Relevance ranking has no stable keyset; it pages by offset only.
+    keyset_sort = None if sort_by == "relevance" and keyword else sort_by
+
+    after = None
+    if cursor:
+        if keyset_sort is None:
+            raise HTTPException(status_code=400, detail="Cursor paging is not supported for relevance sort")
+        try:
+            after = decode_cursor(cursor, keyset_sort, sort_order)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    if include_total is None:
+        include_total = after is None
 
     words, total = await run_db_blocking(
         db.search_words,
@@ -138,15 +146,19 @@ async def get_words(
         status_filter=status,
         sort_by=sort_by,
         sort_order=sort_order,
-        limit=page_size,
+        limit=page_size + 1,  # one extra row tells us whether a next page exists
         offset=offset,
+        count_total=include_total,
+        after=after,
     )
-    
+    words, next_cursor = split_page(words, page_size, keyset_sort, sort_order)
+
     return WordListResponse(
-        words=[WordResponse(**_clean_word_data(w)) for w in words],
+        words=[WordResponse(**w) for w in words],
         total=total,
         page=page,
-        page_size=page_size
+        page_size=page_size,
+        next_cursor=next_cursor,
     )
 
 
@@ -155,7 +167,26 @@ async def get_all_words():
     """获取所有单词（不分页）"""
     db = get_db()
     words = await run_db_blocking(db.get_all_words)
-    return {"words": [_clean_word_data(w) for w in words], "total": len(words)}
+    return {"words": words, "total": len(words)}
+
+
+@router.get("/all/stream")
+async def stream_all_words(fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|json)$")):
+    """流式获取所有单词：按块读取游标并逐块编码，内存占用与词库大小无关"""
+    encoder = get_encoder(fmt)
+    return StreamingResponse(stream_words(get_db(), fmt), media_type=encoder.media_type)
+
+
+@router.get("/export")
+async def export_words(fmt: str = Query("csv", alias="format", pattern="^(csv|anki|ndjson|json)$")):
+    """导出整个词库（CSV / Anki 文本 / NDJSON / JSON），以流式下载返回"""
+    encoder = get_encoder(fmt)
+    filename = f"vocabbook-{datetime.now().strftime('%Y%m%d')}.{encoder.extension}"
+    return StreamingResponse(
+        stream_words(get_db(), fmt),
+        media_type=encoder.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get("/tags")
@@ -179,7 +210,7 @@ async def get_word(word: str):
         await run_db_blocking(db.update_word, word, {"audio": audio_path})
         word_data["audio"] = audio_path
 
-    return _clean_word_data(word_data)
+    return word_data
 
 
 @router.post("", status_code=201)
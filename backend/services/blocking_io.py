@@ -6,6 +6,9 @@ from typing import Any, Callable, TypeVar
 T = TypeVar("T")
 _DB_EXECUTOR = ThreadPoolExecutor(max_workers=3, thread_name_prefix="vocabbook-db")
 _IO_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix="vocabbook-io")
+# CPU-bound work (HTML parsing) awaited from async code; never blocks on the
+# other executors, so awaiting it from an I/O thread cannot deadlock.
+_CPU_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="vocabbook-parse")
 
 
 async def _run_on_executor(
@@ -28,6 +31,11 @@ async def run_io_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) ->
     return await _run_on_executor(_IO_EXECUTOR, func, *args, **kwargs)
 
 
+async def run_cpu_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run CPU-bound parsing off the event loop on the small parse executor."""
+    return await _run_on_executor(_CPU_EXECUTOR, func, *args, **kwargs)
+
+
 async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
     """Backward-compatible alias for generic blocking I/O execution."""
     return await run_io_blocking(func, *args, **kwargs)
@@ -35,4 +43,5 @@ async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
 
 def shutdown_blocking_executors() -> None:
     _IO_EXECUTOR.shutdown(wait=True, cancel_futures=False)
+    _CPU_EXECUTOR.shutdown(wait=True, cancel_futures=False)
     _DB_EXECUTOR.shutdown(wait=True, cancel_futures=False)
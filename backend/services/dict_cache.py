@@ -0,0 +1,285 @@
+"""
+Dictionary lookup cache: one memory tier in front of SQLite ``dict_cache``.
+
+Entries are per (word, source). DictService used to keep its own cache of
+aggregated results, keyed by ``word:sources``. It now assembles the
+aggregated result from these entries on each lookup, so the same data is
+no longer held twice.
+
+Memory tier
+    An LRU bounded by bytes, not entry count: a Youdao page with word
+    families is far larger than a Free Dictionary phonetic. An entry's size
+    is estimated once, when it is stored, from its JSON encoding. Access is
+    guarded by a lock (lookups run on the DB and parse executors).
+
+SQLite tier
+    Read-through on a memory miss. A row found in SQLite is copied into
+    memory with its original ``created_at``, so both tiers agree on
+    freshness.
+
+Freshness
+    Each source has a ``(fresh_ttl, max_stale)`` policy. ``lookup`` reports
+    whether a hit is stale, so callers can serve it and refresh in the
+    background (stale-while-revalidate). Entries older than
+    ``fresh_ttl + max_stale`` are dropped as misses.
+
+Lemma aliases
+    With a ``lemma_of`` callable (word -> lemma, or None), a lookup that
+    misses for an inflected form ("ran", "mice") is answered from the
+    lemma's entry. The callable must only return certain lemmas (see
+    services.lemmatizer); a guess would serve another word's entry ("caring"
+    from "car") and the form itself would never be fetched. Aliases are not
+    stored as rows. The word -> lemma pairs are memoized in a small
+    in-memory map.
+
+``stats()`` reports hits, stale hits, misses and evictions for each tier,
+alias hits, and the overall hit rate with and without aliases.
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from utils.text_utils import normalize_dict_entry
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry overhead (key tuple, entry tuple, OrderedDict node), in bytes.
+_ENTRY_OVERHEAD = 200
+
+DEFAULT_POLICY = (86400, 7 * 86400)
+# 缓存的 lemma_of 结果个数上限
+_MAX_ALIASES = 10000
+
+
+def aliased(result: dict, word: str, lemma: str) -> dict:
+    """A copy of the lemma's ``result`` answering a lookup of ``word``."""
+    copy = dict(result)
+    if "word" in copy:
+        copy["word"] = word
+    copy["lemma"] = lemma
+    return copy
+
+
+def estimate_size(result) -> int:
+    """Approximate memory cost of a cached result."""
+    try:
+        return len(json.dumps(result, ensure_ascii=False).encode("utf-8")) + _ENTRY_OVERHEAD
+    except (TypeError, ValueError):
+        return 4096 + _ENTRY_OVERHEAD
+
+
+class DictCache:
+    """Thread-safe per-(word, source) cache: byte-bounded LRU memory tier + SQLite read-through."""
+
+    def __init__(
+        self,
+        policy: Dict[str, Tuple[float, float]],
+        db_getter: Callable[[], object],
+        max_bytes: int = 16 * 1024 * 1024,
+        lemma_of: Optional[Callable[[str], Optional[str]]] = None,
+    ) -> None:
+        self.policy = policy
+        self.max_bytes = max_bytes
+        self._db_getter = db_getter
+        self._lemma_of = lemma_of
+        self._lock = threading.Lock()
+        # (word_lower, source) -> (result, stored_at, size)
+        self._entries: "OrderedDict[Tuple[str, str], tuple]" = OrderedDict()
+        self._bytes = 0
+        # word_lower -> lemma_lower（不是变形时为 None），lemma_of 的结果缓存
+        self._aliases: "OrderedDict[str, Optional[str]]" = OrderedDict()
+        self._counters = {
+            "lookups": 0,
+            "memory": {"hits": 0, "stale_hits": 0, "misses": 0, "evictions": 0, "expired": 0},
+            "db": {"hits": 0, "stale_hits": 0, "misses": 0, "errors": 0},
+            "aliases": {"hits": 0, "stale_hits": 0},
+            "writes": 0,
+        }
+
+    def windows(self, source: str) -> Tuple[float, float]:
+        """(fresh_ttl, max_stale) for ``source``."""
+        return self.policy.get(source, DEFAULT_POLICY)
+
+    # ------------------------------------------------------------------
+    # 读
+    # ------------------------------------------------------------------
+
+    def lookup(self, word: str, source: str) -> Tuple[Optional[dict], bool]:
+        """(result, is_stale) from memory, then SQLite; (None, False) on a miss."""
+        result, stale, _ = self.resolve(word, source)
+        return result, stale
+
+    def resolve(self, word: str, source: str) -> Tuple[Optional[dict], bool, str]:
+        """Like ``lookup``, falling back to a cached lemma of ``word``.
+
+        Returns (result, is_stale, cache_word): ``cache_word`` is the word the
+        entry is stored under, i.e. the lemma for an alias hit, whose result
+        is an ``aliased`` copy.
+        """
+        with self._lock:
+            self._counters["lookups"] += 1
+        result, stale = self._find(word, source, counted=True)
+        if result is not None:
+            return result, stale, word
+
+        lemma = self.alias_of(word)
+        if lemma is None:
+            return None, False, word
+        result, stale = self._find(lemma, source, counted=False)
+        if result is None:
+            return None, False, word
+        with self._lock:
+            self._counters["aliases"]["stale_hits" if stale else "hits"] += 1
+        return aliased(result, word, lemma), stale, lemma
+
+    def alias_of(self, word: str) -> Optional[str]:
+        """The lemma lookups of ``word`` fall back to, else None."""
+        if self._lemma_of is None:
+            return None
+        key = word.lower()
+        with self._lock:
+            if key in self._aliases:
+                return self._aliases[key]
+        lemma = self._lemma_of(word)
+        lemma = lemma.lower() if lemma and lemma.lower() != key else None
+        with self._lock:
+            self._aliases[key] = lemma
+            while len(self._aliases) > _MAX_ALIASES:
+                self._aliases.popitem(last=False)
+        return lemma
+
+    def _find(self, word: str, source: str, counted: bool) -> Tuple[Optional[dict], bool]:
+        # counted=False：候选原形的探测，不计入各层统计
+        key = (word.lower(), source)
+        fresh_ttl, max_stale = self.windows(source)
+        now = time.time()
+
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                result, stored_at, size = item
+                age = now - stored_at
+                if age < fresh_ttl + max_stale:
+                    self._entries.move_to_end(key)
+                    stale = age >= fresh_ttl
+                    if counted:
+                        self._counters["memory"]["stale_hits" if stale else "hits"] += 1
+                    return result, stale
+                del self._entries[key]
+                self._bytes -= size
+                self._counters["memory"]["expired"] += 1
+            if counted:
+                self._counters["memory"]["misses"] += 1
+
+        db = self._db_getter()
+        if not db:
+            return None, False
+        try:
+            found = db.get_dict_cache_entry(word, source, max_age=fresh_ttl + max_stale)
+        except Exception as e:
+            logger.error(f"DB cache read error: {e}")
+            with self._lock:
+                self._counters["db"]["errors"] += 1
+            return None, False
+
+        if found is None:
+            if counted:
+                with self._lock:
+                    self._counters["db"]["misses"] += 1
+            return None, False
+        result, created_at = found
+        stale = now - created_at >= fresh_ttl
+        self.put_memory(word, source, result, stored_at=created_at)
+        if counted:
+            with self._lock:
+                self._counters["db"]["stale_hits" if stale else "hits"] += 1
+        return result, stale
+
+    def get(self, word: str, source: str) -> Optional[dict]:
+        return self.lookup(word, source)[0]
+
+    # ------------------------------------------------------------------
+    # 写
+    # ------------------------------------------------------------------
+
+    def set(self, word: str, source: str, result: dict) -> dict:
+        """Normalize ``result`` and store it in both tiers; returns the stored dict."""
+        # 写入前统一规范化文本，读取时无需再清洗
+        result = normalize_dict_entry(result)
+        self.put_memory(word, source, result)
+        with self._lock:
+            self._counters["writes"] += 1
+
+        db = self._db_getter()
+        if db:
+            try:
+                db.set_dict_cache(word, source, result)
+            except Exception as e:
+                logger.error(f"DB cache write error: {e}")
+        return result
+
+    def put_memory(self, word: str, source: str, result: dict, stored_at: Optional[float] = None) -> None:
+        """Store in the memory tier only, evicting least-recently-used entries past ``max_bytes``."""
+        key = (word.lower(), source)
+        size = estimate_size(result)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return  # would evict everything else and still not fit
+            self._entries[key] = (result, time.time() if stored_at is None else stored_at, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._counters["memory"]["evictions"] += 1
+
+    def clear_memory(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+            self._bytes = 0
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Tuple[str, str]) -> bool:
+        word, source = key
+        with self._lock:
+            return (word.lower(), source) in self._entries
+
+    def stats(self) -> dict:
+        with self._lock:
+            memory = dict(self._counters["memory"])
+            memory.update(entries=len(self._entries), bytes=self._bytes, max_bytes=self.max_bytes)
+            db, aliases = self._counters["db"], self._counters["aliases"]
+            lookups = self._counters["lookups"]
+            exact = memory["hits"] + memory["stale_hits"] + db["hits"] + db["stale_hits"]
+            alias_hits = aliases["hits"] + aliases["stale_hits"]
+            return {
+                "lookups": lookups,
+                "memory": memory,
+                "db": dict(db),
+                "aliases": {**aliases, "memoized": len(self._aliases)},
+                # 命中率：含 / 不含原形别名（别名带来的提升 = 两者之差）
+                "hit_rate": round((exact + alias_hits) / lookups, 4) if lookups else None,
+                "hit_rate_without_aliases": round(exact / lookups, 4) if lookups else None,
+                "writes": self._counters["writes"],
+            }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            for tier in ("memory", "db", "aliases"):
+                for name in self._counters[tier]:
+                    self._counters[tier][name] = 0
+            self._counters["lookups"] = 0
+            self._counters["writes"] = 0
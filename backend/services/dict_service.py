@@ -1,45 +1,27 @@
+import asyncio
 import re
-from bs4 import BeautifulSoup
-from collections import OrderedDict
 from datetime import datetime
 from typing import Optional
-import time
 
 from .tag_service import TagService
 from .word_family_service import WordFamilyService
-from .multi_dict_service import get_session, MultiDictService, clean_chinese_text, _clean_dict_entry
+from .multi_dict_service import MultiDictService, get_session, run_dict_sync, spawn_refresh
+from .blocking_io import run_db_blocking
+from .html_parsing import css, parse_page
+from .single_flight import dict_flights
+from utils.text_utils import clean_chinese_text
 import logging
 
 logger = logging.getLogger(__name__)
 
 
-# 内存缓存用于词典查询 (最多 500 个词，5分钟过期，LRU 淘汰)
-_dict_cache: OrderedDict = OrderedDict()
-_cache_ttl = 1800  # 30 minutes — aligned with MultiDictService memory cache
-
-
-def _get_cached(word: str):
-    """获取缓存的词典结果"""
-    if word in _dict_cache:
-        result, timestamp = _dict_cache[word]
-        if time.time() - timestamp < _cache_ttl:
-            # Move to end (most recently used)
-            _dict_cache.move_to_end(word)
-            return _clean_dict_entry(result)
-        else:
-            del _dict_cache[word]
-    return None
-
-
-def _set_cached(word: str, result: dict):
-    """设置词典缓存"""
-    # Clean before caching
-    result = _clean_dict_entry(result)
-
-    # 限制缓存大小 — LRU 淘汰最老的条目
-    if len(_dict_cache) >= 2000:
-        _dict_cache.popitem(last=False)
-    _dict_cache[word] = (result, time.time())
+# 有道页面解析前的裁剪标记（见 services.html_parsing）与文本节点匹配
+_YOUDAO_MARKERS = (
+    "error-wrapper", "phonetic", "trans-container", "bilingual",
+    "词根", "relWordTab", "synonyms", "同近义词",
+)
+_ROOTS_TEXT = re.compile("词根")
+_SYNONYMS_TEXT = re.compile("同近义词")
 
 
 class DictService:
@@ -51,7 +33,7 @@ class DictService:
             data = {"inputtext": text, "type": "AUTO"}
             session = get_session()
             r = session.post(url, data=data, timeout=5)
-            soup = BeautifulSoup(r.text, 'html.parser')
+            soup = parse_page(r.text, ("translateResult", "generate"))
 
             res_ul = soup.find('ul', id='translateResult')
             if res_ul:
@@ -68,41 +50,52 @@ class DictService:
 
     @staticmethod
     def search_word(word, sources=None):
+        """同步包装（导入等线程内调用方），实际查询见 search_word_async。"""
+        return run_dict_sync(lambda client: DictService.search_word_async(word, sources, client))
+
+    @staticmethod
+    async def search_word_async(word, sources=None, client=None):
         """
         Search word on Youdao and optionally other dictionaries.
         Returns a dictionary structure compatible with old format but enriched.
-        Uses LRU cache to improve performance.
+
+        Youdao and the other sources are fetched concurrently on the event
+        loop (shared AsyncClient unless ``client`` is given). The result is
+        assembled from the per-source cache entries (MultiDictService.cache)
+        on every call rather than cached as a whole; concurrent lookups of
+        the same (word, sources) share one assembly.
+
+        When the offline dictionary (services.offline_dict) has the word, it
+        answers at once: the network sources are read from the cache only,
+        and any that are missing or stale are fetched in the background, so
+        later lookups are enriched.
         """
-        # 检查缓存
-        cache_key = f"{word}:{sources or 'default'}"
-        cached = _get_cached(cache_key)
-        if cached:
-            return cached
-        
-        # 1. First, search Youdao as base (because it's the primary source for most parsing logic)
-        youdao_result = DictService._search_youdao_base(word)
-        
-        # 2. If multi-source search is requested (or default behavior)
-        if sources is None:
-            # Default sources logic could be here, but for now we trust the caller 
-            # or default to just Youdao if sources is empty/None to save time?
-            # Actually, let's default to ALL if not specified, to match user request "richer"
-            # But normally we might want to make it configurable. 
-            # For backward compatibility with existing frontend call (search_word(word)),
-            # let's just return Youdao unless specifically asked for more?
-            # No, user wants optimization. Let's do aggregate search.
-            pass
-
-        # Perform aggregate search
-        # If youdao search failed, we still might want to try others?
-        # But our aggregate_search logic takes youdao_result as input.
-        
-        aggregated = MultiDictService.aggregate_search(word, enabled_dicts=sources, youdao_result=youdao_result)
-        
-        primary = aggregated.get('primary')
+        flight_key = ("word", word.lower(), tuple(sources) if sources is not None else None)
+        return await dict_flights.do(flight_key, lambda: DictService._assemble_word(word, sources, client))
+
+    @staticmethod
+    async def _assemble_word(word, sources, client):
+        offline_result = await MultiDictService.search_offline_async(word)
+        if offline_result:
+            # 离线词库先作答；网络来源只读缓存，缺失或陈旧的在后台补全
+            youdao_result, other_sources, complete = await DictService._cached_sources(word, sources)
+            if not complete:
+                DictService._enrich_in_background(word, sources, client)
+            other_sources = {MultiDictService.DICT_OFFLINE: offline_result, **other_sources}
+        else:
+            # Youdao stays the primary source (richest parsing: roots, tags,
+            # families); the others only enrich it, so all run side by side.
+            youdao_result, other_sources = await asyncio.gather(
+                DictService._search_youdao_base_async(word, client),
+                MultiDictService.gather_sources_async(word, sources, client),
+            )
+        aggregated = MultiDictService.assemble_results(other_sources, youdao_result)
+
+        # primary 会被就地补全；复制一份，避免改动共享的来源结果（缓存 / 合并请求）
+        primary = dict(aggregated['primary']) if aggregated.get('primary') else None
         if not primary or primary.get('meaning') == '暂无释义' or not primary.get('meaning', '').strip():
             # Trigger AI fallback if available
-            ai_result = DictService.search_word_ai_fallback(word)
+            ai_result = await DictService._cached_ai_fallback(word)
             if ai_result:
                 if primary:
                     if not primary.get('phonetic'):
@@ -112,12 +105,12 @@ class DictService:
                     if not primary.get('example'):
                         primary['example'] = ai_result.get('example')
                 else:
-                    primary = ai_result
+                    primary = dict(ai_result)
                     aggregated['primary'] = primary
 
         if not primary:
             return None
-            
+
         # Merge best info into primary result
         # Enrich phonetic if missing or better available
         best_phonetic = MultiDictService.get_best_phonetic(aggregated['sources'])
@@ -128,116 +121,180 @@ class DictService:
         all_examples = MultiDictService.get_all_examples(aggregated['sources'])
         if all_examples:
             primary['example'] = all_examples
-            
+
         # Add the full sources data to the result so frontend can display tabs
         primary['sources_data'] = aggregated['sources']
-        
-        # 存入缓存
-        _set_cached(cache_key, primary)
-        
+
         return primary
 
+    @staticmethod
+    async def _cached_sources(word, sources):
+        """只读缓存、不发请求：返回 (有道结果, 其他来源结果, 是否全部命中且新鲜)。"""
+        selected = [MultiDictService.DICT_YOUDAO] + MultiDictService.network_sources(sources)
+
+        def lookup_all():
+            return {source: MultiDictService.lookup_cache(word, source) for source in selected}
+
+        hits = await run_db_blocking(lookup_all)
+        complete = all(result and not stale for result, stale in hits.values())
+        found = {source: result for source, (result, _) in hits.items() if result}
+        youdao_result = found.pop(MultiDictService.DICT_YOUDAO, None)
+        if youdao_result:
+            youdao_result = {**youdao_result, "date": datetime.now().strftime('%Y-%m-%d')}
+        return youdao_result, found, complete
+
+    @staticmethod
+    def _enrich_in_background(word, sources, client):
+        """后台抓取网络来源并写入缓存；同一 (word, sources) 同时只有一个补全任务。"""
+        async def enrich():
+            await asyncio.gather(
+                DictService._search_youdao_base_async(word, client),
+                MultiDictService.gather_sources_async(word, sources, client),
+            )
+
+        flight_key = ("enrich", word.lower(), tuple(sources) if sources is not None else None)
+        spawn_refresh(dict_flights.do(flight_key, enrich))
+
+    @staticmethod
+    async def _cached_ai_fallback(word):
+        """AI 兜底释义，结果作为 "ai" 来源缓存；过期后重新生成，失败时沿用旧结果。"""
+        cached, stale = await run_db_blocking(MultiDictService.lookup_cache, word, MultiDictService.DICT_AI)
+        if cached and not stale:
+            return cached
+        try:
+            ai_result = await DictService._search_word_ai_fallback_async(word)
+        except Exception as e:
+            logger.error(f"AI fallback failed for {word}: {e}")
+            ai_result = None
+        if not ai_result:
+            return cached
+        return await run_db_blocking(MultiDictService.set_cache, word, MultiDictService.DICT_AI, ai_result)
+
     @staticmethod
     def _search_youdao_base(word):
+        """有道查询（同步包装）"""
+        return run_dict_sync(lambda client: DictService._search_youdao_base_async(word, client))
+
+    @staticmethod
+    async def _search_youdao_base_async(word, client=None):
         """
         Original Youdao search logic to parse specific fields like roots, tags, etc.
+
+        Goes through the same cache tiers (stale-while-revalidate) and
+        single-flight layer as the other sources.
         """
+        url = "https://dict.youdao.com/w/eng/{word}"
+        deadline = MultiDictService._source_deadlines[MultiDictService.DICT_YOUDAO]
         try:
-            url = f"https://dict.youdao.com/w/eng/{word}"
-            session = get_session()
-            resp = session.get(url, timeout=10)
-
-            if resp.status_code == 200:
-                soup = BeautifulSoup(resp.text, 'html.parser')
-                if soup.find('div', class_='error-wrapper'):
-                    return None
+            result = await asyncio.wait_for(
+                MultiDictService._fetch_source(
+                    MultiDictService.DICT_YOUDAO, word, url, DictService._parse_youdao, 10, client,
+                ),
+                deadline,
+            )
+        except Exception as e:
+            logger.error(f"Search error: {e}")
+            return None
+        if not result:
+            return None
+        # 缓存里的 date 是抓取当天；按查询当天返回
+        return {**result, "date": datetime.now().strftime('%Y-%m-%d')}
 
-                phonetic = ""
-                phs = soup.find_all('span', class_='phonetic')
-                if phs and len(phs) > 0:
+    @staticmethod
+    def _parse_youdao(word, html):
+        """Parse a Youdao result page; None when the word is not found."""
+        try:
+            soup = parse_page(html, _YOUDAO_MARKERS)
+            if css('div.error-wrapper').select_one(soup):
+                return None
+
+            phonetic = ""
+            phs = css('span.phonetic').select(soup)
+            if phs and len(phs) > 0:
+                try:
+                    phonetic = phs[1].get_text() if len(phs) > 1 else phs[0].get_text()
+                except (IndexError, AttributeError):
+                    phonetic = ""
+
+            meaning = ""
+            trans = css('div.trans-container').select_one(soup)
+            if trans:
+                ul = css('ul').select_one(trans)
+                if ul:
                     try:
-                        phonetic = phs[1].get_text() if len(phs) > 1 else phs[0].get_text()
-                    except (IndexError, AttributeError):
-                        phonetic = ""
-
-                meaning = ""
-                trans = soup.find('div', class_='trans-container')
-                if trans:
-                    ul = trans.find('ul')
-                    if ul:
+                        meaning = "\n".join([li.get_text() for li in ul.find_all('li') if not li.get('class')])
+                        meaning = clean_chinese_text(meaning)
+                    except (AttributeError, TypeError):
+                        meaning = ""
+            if not meaning:
+                meaning = "暂无释义"
+
+            example = ""
+            bi = css('div#bilingual').select_one(soup)
+            if bi:
+                li_elem = css('li').select_one(bi)
+                if li_elem:
+                    p = li_elem.find_all('p')
+                    if p and len(p) >= 2:
                         try:
-                            meaning = "\n".join([li.get_text() for li in ul.find_all('li') if not li.get('class')])
-                            meaning = clean_chinese_text(meaning)
-                        except (AttributeError, TypeError):
-                            meaning = ""
-                if not meaning:
-                    meaning = "暂无释义"
-
-                example = ""
-                bi = soup.find('div', id='bilingual')
-                if bi:
-                    li_elem = bi.find('li')
-                    if li_elem:
-                        p = li_elem.find_all('p')
-                        if p and len(p) >= 2:
-                            try:
-                                example_en = p[0].get_text(separator=' ', strip=True)
-                                example_cn = p[1].get_text(separator='', strip=True) 
-                                # Remove spaces between Chinese characters
-                                example_cn = clean_chinese_text(example_cn)
-                                example = f"{example_en}\n{example_cn}"
-                            except (IndexError, AttributeError):
-                                example = ""
-
-                # Parse Roots
-                roots = ""
-                root_marker = soup.find(string=lambda t: "词根" in t if t else False)
-                if root_marker:
-                    root_container = root_marker.find_parent('div')
-                    if root_container:
-                        raw_root = root_container.get_text(separator=' ', strip=True)
-                        roots = raw_root.replace("词根", "[词根]").replace("  ", " ").strip()
-
-                if not roots:
-                    rel = soup.find('div', id='relWordTab')
-                    if rel:
-                        roots = rel.get_text(separator=' ', strip=True)
-
-                # Parse Synonyms
-                synonyms = ""
-                syn_div = soup.find('div', id='synonyms')
-                if syn_div:
-                    synonyms = syn_div.get_text(separator=' ', strip=True)
-                if not synonyms:
-                    syn_marker = soup.find(string=lambda t: "同近义词" in t if t else False)
-                    if syn_marker:
-                        syn_container = syn_marker.find_parent('div')
-                        if syn_container:
-                            synonyms = syn_container.get_text(separator=' ', strip=True)
-
-                # Parse Tags (CET4, GRE, etc.)
-                tags = TagService.get_tags_for_word(word, resp.text)
-
-                # Extract word family information
-                word_families = WordFamilyService.extract_root_from_word(word)
-                if roots:
-                    parsed_roots = WordFamilyService.parse_roots_text(roots)
-                    existing_roots = {f['root'] for f in word_families}
-                    for pr in parsed_roots:
-                        if pr['root'] not in existing_roots:
-                            word_families.append(pr)
-
-                return {
-                    "word": word,
-                    "phonetic": phonetic,
-                    "meaning": meaning,
-                    "example": example,
-                    "roots": roots,
-                    "synonyms": synonyms,
-                    "tags": TagService.format_tags(tags),
-                    "word_families": word_families,
-                    "date": datetime.now().strftime('%Y-%m-%d'),
-                }
+                            example_en = p[0].get_text(separator=' ', strip=True)
+                            example_cn = p[1].get_text(separator='', strip=True) 
+                            # Remove spaces between Chinese characters
+                            example_cn = clean_chinese_text(example_cn)
+                            example = f"{example_en}\n{example_cn}"
+                        except (IndexError, AttributeError):
+                            example = ""
+
+            # Parse Roots
+            roots = ""
+            # 全文扫描文本节点代价高：页面里没有该字样时直接跳过
+            root_marker = soup.find(string=_ROOTS_TEXT) if "词根" in html else None
+            if root_marker:
+                root_container = root_marker.find_parent('div')
+                if root_container:
+                    raw_root = root_container.get_text(separator=' ', strip=True)
+                    roots = raw_root.replace("词根", "[词根]").replace("  ", " ").strip()
+
+            if not roots:
+                rel = css('div#relWordTab').select_one(soup)
+                if rel:
+                    roots = rel.get_text(separator=' ', strip=True)
+
+            # Parse Synonyms
+            synonyms = ""
+            syn_div = css('div#synonyms').select_one(soup)
+            if syn_div:
+                synonyms = syn_div.get_text(separator=' ', strip=True)
+            if not synonyms and "同近义词" in html:
+                syn_marker = soup.find(string=_SYNONYMS_TEXT)
+                if syn_marker:
+                    syn_container = syn_marker.find_parent('div')
+                    if syn_container:
+                        synonyms = syn_container.get_text(separator=' ', strip=True)
+
+            # Parse Tags (CET4, GRE, etc.)
+            tags = TagService.get_tags_for_word(word, html)
+
+            # Extract word family information
+            word_families = WordFamilyService.extract_root_from_word(word)
+            if roots:
+                parsed_roots = WordFamilyService.parse_roots_text(roots)
+                existing_roots = {f['root'] for f in word_families}
+                for pr in parsed_roots:
+                    if pr['root'] not in existing_roots:
+                        word_families.append(pr)
+
+            return {
+                "word": word,
+                "phonetic": phonetic,
+                "meaning": meaning,
+                "example": example,
+                "roots": roots,
+                "synonyms": synonyms,
+                "tags": TagService.format_tags(tags),
+                "word_families": word_families,
+                "date": datetime.now().strftime('%Y-%m-%d'),
+            }
         except Exception as e:
             logger.error(f"Search error: {e}")
         return None
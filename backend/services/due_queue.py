@@ -0,0 +1,184 @@
+"""
+In-process index of the review schedule.
+
+Keeps every word's ``next_review_time`` in a sorted array so the due count and
+the first due page are bisections instead of a ``COUNT(*)`` over ``words``
+(whose ``next_review_time = 0 OR ...`` predicate cannot use the index).
+Loaded lazily from the database and updated by the repositories after each
+committed write that changes a schedule. Recently changed words are logged,
+so derived results (the review forecast) can be updated for just those words
+(``changes_since``).
+"""
+import threading
+from bisect import bisect_left, bisect_right, insort
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (next_review_time, word id, word) — id breaks ties the same way the SQL
+# due ordering does, so queue pages and keyset cursors agree.
+DueEntry = Tuple[float, int, str]
+
+# 变更日志上限；超出后只能整体重算
+MAX_LOGGED_CHANGES = 4096
+
+
+class DueQueue:
+    """Thread-safe sorted schedule of all words, keyed by next_review_time."""
+
+    def __init__(self, loader: Callable[[], Iterable[DueEntry]]) -> None:
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._entries: List[DueEntry] = []
+        self._by_word: Dict[str, DueEntry] = {}
+        self._loaded = False
+        # Bumped on every change so callers can memoize derived results.
+        self._version = 0
+        # word -> version of its last change, for changes after _log_floor.
+        self._changes: Dict[str, int] = {}
+        self._log_floor = 0
+
+    @staticmethod
+    def _time_key(entry: DueEntry) -> float:
+        return entry[0]
+
+    def _ensure_loaded(self) -> None:
+        # Caller holds self._lock.
+        if self._loaded:
+            return
+        entries = [(float(t or 0), int(word_id), word) for t, word_id, word in self._loader()]
+        entries.sort()
+        self._entries = entries
+        self._by_word = {entry[2]: entry for entry in entries}
+        self._loaded = True
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Drop the index; the next read reloads it from the database."""
+        with self._lock:
+            self._entries = []
+            self._by_word = {}
+            self._loaded = False
+            self._version += 1
+            # Unknown rows may have changed: no caller can update incrementally past this.
+            self._changes.clear()
+            self._log_floor = self._version
+
+    def _log_change(self, word: str) -> None:
+        # Caller holds self._lock and has bumped self._version.
+        self._changes[word] = self._version
+        if len(self._changes) > MAX_LOGGED_CHANGES:
+            self._changes.clear()
+            self._log_floor = self._version
+
+    def changes_since(self, version: int) -> Tuple[int, Optional[List[str]]]:
+        """(current version, words changed after ``version``).
+
+        The word list is None when the log no longer reaches back that far
+        (or the index was invalidated); the caller must then recompute fully.
+        """
+        with self._lock:
+            if version < self._log_floor:
+                return self._version, None
+            return self._version, [word for word, changed in self._changes.items() if changed > version]
+
+    # ------------------------------------------------------------------
+    # Updates (call after the corresponding DB write has committed)
+    # ------------------------------------------------------------------
+
+    def _discard(self, word: str) -> Optional[DueEntry]:
+        entry = self._by_word.pop(word, None)
+        if entry is not None:
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                del self._entries[index]
+        return entry
+
+    def set(self, word: str, next_review_time: float, word_id: Optional[int] = None) -> None:
+        """Record a word's new schedule. ``word_id`` is required for unseen words."""
+        with self._lock:
+            self._version += 1
+            self._log_change(word)
+            if not self._loaded:
+                return  # nothing cached yet; the lazy load will read the committed row
+            previous = self._discard(word)
+            if word_id is None:
+                if previous is None:
+                    # Unknown id: cannot place it consistently, rebuild on next read.
+                    self.invalidate()
+                    return
+                word_id = previous[1]
+            entry = (float(next_review_time or 0), int(word_id), word)
+            insort(self._entries, entry)
+            self._by_word[word] = entry
+
+    def set_many(self, items: Iterable[Tuple[str, float, Optional[int]]]) -> None:
+        with self._lock:
+            for word, next_review_time, word_id in items:
+                self.set(word, next_review_time, word_id)
+
+    def remove(self, word: str) -> None:
+        with self._lock:
+            self._version += 1
+            self._log_change(word)
+            if self._loaded:
+                self._discard(word)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _due_bounds(self, now_ts: float) -> Tuple[int, int]:
+        # Due means next_review_time == 0 or 0 < next_review_time <= now, i.e.
+        # the slice [0, now]; negative times are never due (matches the SQL).
+        start = bisect_left(self._entries, 0.0, key=self._time_key)
+        end = bisect_right(self._entries, now_ts, key=self._time_key)
+        return start, max(start, end)
+
+    def count_due(self, now_ts: float) -> int:
+        with self._lock:
+            self._ensure_loaded()
+            start, end = self._due_bounds(now_ts)
+            return end - start
+
+    def due_page(
+        self,
+        now_ts: float,
+        offset: int,
+        limit: int,
+        after: Optional[Tuple[float, int]] = None,
+    ) -> Tuple[List[DueEntry], int]:
+        """Return (due entries in review order for the page, total due).
+
+        ``after`` is a keyset position ``(next_review_time, id)``; the page then
+        starts right after it and ``offset`` is ignored.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            start, end = self._due_bounds(now_ts)
+            if after is not None:
+                position = (float(after[0] or 0), int(after[1]))
+                first = max(start, bisect_right(self._entries, position, key=lambda e: (e[0], e[1])))
+            else:
+                first = start + max(0, offset)
+            return self._entries[first:min(end, first + max(0, limit))], end - start
+
+    def histogram(self, edges: Sequence[float]) -> List[int]:
+        """Entry counts per bucket ``[edges[i], edges[i + 1])``; ``edges`` must ascend.
+
+        One bisection per edge, so a 90-day histogram costs ~90 * log(words).
+        """
+        with self._lock:
+            self._ensure_loaded()
+            positions = [bisect_left(self._entries, float(edge), key=self._time_key) for edge in edges]
+        return [end - start for start, end in zip(positions, positions[1:])]
+
+    def snapshot(self) -> List[DueEntry]:
+        with self._lock:
+            self._ensure_loaded()
+            return list(self._entries)
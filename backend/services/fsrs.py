@@ -0,0 +1,129 @@
+"""
+FSRS-style memory model (FSRS-4.5 formulas).
+
+Each word carries a stability S (days until recall probability falls to 90%)
+and a difficulty D (1-10). A review updates both from the grade and the
+retrievability R at review time; the next interval is where R reaches the
+desired retention. The 17 weights default to the published FSRS-4.5 values
+and can be replaced by ones fitted to the user's own review_history
+(services.fsrs_fit), cached as JSON next to the database.
+"""
+import json
+import logging
+import math
+import os
+from typing import List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WEIGHTS: Tuple[float, ...] = (
+    0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474,
+    0.1367, 1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755,
+)
+# (low, high) per weight; the fitter clamps into these so the model stays sane.
+WEIGHT_BOUNDS: Tuple[Tuple[float, float], ...] = (
+    (0.1, 100.0), (0.1, 100.0), (0.1, 100.0), (0.1, 100.0),
+    (1.0, 10.0), (0.1, 5.0), (0.1, 5.0), (0.0, 0.75),
+    (0.0, 4.5), (0.0, 0.8), (0.01, 3.5), (0.1, 5.0),
+    (0.01, 0.25), (0.01, 0.9), (0.0, 4.0), (0.0, 1.0), (1.0, 6.0),
+)
+
+DECAY = -0.5
+FACTOR = 0.9 ** (1 / DECAY) - 1
+MAX_INTERVAL_DAYS = 36500
+MIN_STABILITY = 0.01
+
+# App ratings 1-5 -> FSRS grades Again(1) / Hard(2) / Good(3) / Easy(4).
+_GRADE_BY_QUALITY = {1: 1, 2: 1, 3: 2, 4: 3, 5: 4}
+
+
+def grade_for_quality(quality: int) -> int:
+    return _GRADE_BY_QUALITY.get(int(quality), 1 if quality < 3 else 4)
+
+
+def retrievability(elapsed_days: float, stability: float) -> float:
+    return (1 + FACTOR * max(0.0, elapsed_days) / max(stability, MIN_STABILITY)) ** DECAY
+
+
+def interval_days(stability: float, desired_retention: float = 0.9) -> int:
+    days = stability / FACTOR * (desired_retention ** (1 / DECAY) - 1)
+    return int(min(MAX_INTERVAL_DAYS, max(1, round(days))))
+
+
+def _clamp_difficulty(d: float) -> float:
+    return min(10.0, max(1.0, d))
+
+
+def init_stability(w: Sequence[float], grade: int) -> float:
+    return max(w[grade - 1], 0.1)
+
+
+def init_difficulty(w: Sequence[float], grade: int) -> float:
+    return _clamp_difficulty(w[4] - (grade - 3) * w[5])
+
+
+def next_difficulty(w: Sequence[float], d: float, grade: int) -> float:
+    # Mean reversion towards the initial difficulty keeps D from drifting to the bounds.
+    return _clamp_difficulty(w[7] * w[4] + (1 - w[7]) * (d - w[6] * (grade - 3)))
+
+
+def next_stability(w: Sequence[float], d: float, s: float, r: float, grade: int) -> float:
+    if grade == 1:
+        forget = w[11] * d ** -w[12] * ((s + 1) ** w[13] - 1) * math.exp((1 - r) * w[14])
+        return max(MIN_STABILITY, min(forget, s))
+    hard = w[15] if grade == 2 else 1.0
+    easy = w[16] if grade == 4 else 1.0
+    growth = math.exp(w[8]) * (11 - d) * s ** -w[9] * (math.exp((1 - r) * w[10]) - 1) * hard * easy
+    return max(MIN_STABILITY, s * (1 + growth))
+
+
+def review_state(
+    w: Sequence[float],
+    stability: Optional[float],
+    difficulty: Optional[float],
+    elapsed_days: float,
+    grade: int,
+) -> Tuple[float, float]:
+    """New (stability, difficulty) after a review; ``stability=None`` means first review."""
+    if not stability or difficulty is None:
+        return init_stability(w, grade), init_difficulty(w, grade)
+    r = retrievability(elapsed_days, stability)
+    return next_stability(w, difficulty, stability, r, grade), next_difficulty(w, difficulty, grade)
+
+
+# ----------------------------------------------------------------------
+# Fitted-weight cache
+# ----------------------------------------------------------------------
+
+def weights_path_for(db_path: str) -> str:
+    """Where fitted weights for the database at ``db_path`` are cached."""
+    override = os.environ.get("VOCABBOOK_FSRS_WEIGHTS")
+    if override:
+        return override
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), "fsrs_weights.json")
+
+
+def load_weights_file(path: str) -> Optional[dict]:
+    """Read a fitted-weights cache file; None if missing or invalid."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"[FSRS] Ignoring unreadable weights cache {path}: {e}")
+        return None
+    weights = payload.get("weights") if isinstance(payload, dict) else None
+    if not isinstance(weights, list) or len(weights) != len(DEFAULT_WEIGHTS):
+        logger.warning(f"[FSRS] Ignoring malformed weights cache {path}")
+        return None
+    return payload
+
+
+def save_weights_file(path: str, weights: List[float], **metadata) -> None:
+    """Atomically write fitted weights plus metadata (fitted_at, metrics, ...)."""
+    payload = {"weights": [float(x) for x in weights], **metadata}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
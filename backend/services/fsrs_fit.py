@@ -0,0 +1,282 @@
+"""
+Offline FSRS parameter fitting from review_history.
+
+Replays every word's review log through the FSRS model with NumPy (one
+vectorized step per review index across all words), minimizes the log loss of
+the predicted recall probability against what actually happened, and caches
+the fitted weights as JSON for services.review_service.FSRSScheduler.
+
+Runs in a separate process (start_background_fit) so the API never pays for
+it; the per-submit path only ever evaluates the closed-form update.
+
+Also used by benchmarks/scheduler_retention.py to compare FSRS and SM-2
+predicted retention on the same history.
+"""
+import logging
+import multiprocessing
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from services import fsrs
+from services.sm2_batch import calculate_sm2_batch
+
+logger = logging.getLogger(__name__)
+
+_P_MIN, _P_MAX = 1e-4, 1 - 1e-4
+# Quality 1-5 -> FSRS grade, as an index table (index 0 unused).
+_GRADE_TABLE = np.array([1] + [fsrs.grade_for_quality(q) for q in range(1, 6)], dtype=np.int64)
+
+
+class ReviewLogs:
+    """Review history as padded per-word sequences, longest first.
+
+    ``ratings``/``elapsed`` are (words, max_len) arrays; ``elapsed`` holds the
+    days since the word's previous review. ``lengths`` is non-increasing, so
+    the words still active at step k are always the first ``active[k]`` rows.
+    """
+
+    def __init__(self, ratings: np.ndarray, elapsed: np.ndarray, lengths: np.ndarray) -> None:
+        self.ratings = ratings
+        self.elapsed = elapsed
+        self.lengths = lengths
+        self.grades = _GRADE_TABLE[np.clip(ratings, 0, 5)]
+        max_len = ratings.shape[1] if ratings.ndim == 2 else 0
+        self.active = np.array([(lengths > k).sum() for k in range(max_len)], dtype=np.int64)
+        # Outcome of every scored review (all but each word's first).
+        self.recalled = np.concatenate(
+            [self.grades[:self.active[k], k] > 1 for k in range(1, max_len)]
+        ) if max_len > 1 else np.empty(0, dtype=bool)
+
+    @property
+    def review_count(self) -> int:
+        return int(self.lengths.sum())
+
+    @property
+    def scored_count(self) -> int:
+        return int(self.recalled.size)
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[tuple]) -> "ReviewLogs":
+        """Build from (word_id, reviewed_at, rating) rows sorted by word_id, reviewed_at."""
+        sequences: Dict[int, list] = {}
+        for word_id, reviewed_at, rating in rows:
+            if reviewed_at is None or rating is None:
+                continue
+            sequences.setdefault(word_id, []).append((float(reviewed_at), int(rating)))
+        ordered = sorted(sequences.values(), key=len, reverse=True)
+        lengths = np.array([len(seq) for seq in ordered], dtype=np.int64)
+        max_len = int(lengths[0]) if len(lengths) else 0
+        ratings = np.full((len(ordered), max_len), 4, dtype=np.int64)
+        elapsed = np.zeros((len(ordered), max_len), dtype=np.float64)
+        for i, seq in enumerate(ordered):
+            times = np.array([t for t, _ in seq])
+            ratings[i, :len(seq)] = [r for _, r in seq]
+            elapsed[i, 1:len(seq)] = np.maximum(0.0, np.diff(times)) / 86400
+        return cls(ratings, elapsed, lengths)
+
+
+def load_review_rows(db_path: str) -> list:
+    """(word_id, reviewed_at, rating) rows of review_history, via a private read-only connection."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        rows = conn.execute(
+            """
+            SELECT word_id,
+                   COALESCE(reviewed_at, CAST(strftime('%s', review_date || ' 00:00:00') AS REAL)),
+                   rating
+            FROM review_history
+            ORDER BY word_id, 2, id
+            """
+        ).fetchall()
+    finally:
+        conn.close()
+    return rows
+
+
+def load_review_logs(db_path: str) -> ReviewLogs:
+    """Read review_history (safe in a child process: opens its own connection)."""
+    return ReviewLogs.from_rows(load_review_rows(db_path))
+
+
+# ----------------------------------------------------------------------
+# Vectorized replays (same formulas as services.fsrs, across all words)
+# ----------------------------------------------------------------------
+
+def predict_fsrs(w: Sequence[float], logs: ReviewLogs) -> np.ndarray:
+    """Predicted recall probability for every scored review (order of logs.recalled)."""
+    w = np.asarray(w, dtype=np.float64)
+    if logs.ratings.size == 0:
+        return np.empty(0)
+    first = logs.grades[:, 0]
+    s = np.maximum(w[first - 1], 0.1)
+    d = np.clip(w[4] - (first - 3) * w[5], 1.0, 10.0)
+    predictions = []
+    with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+        for k in range(1, logs.ratings.shape[1]):
+            m = logs.active[k]
+            g = logs.grades[:m, k]
+            sk, dk = s[:m], d[:m]
+            r = (1 + fsrs.FACTOR * logs.elapsed[:m, k] / np.maximum(sk, fsrs.MIN_STABILITY)) ** fsrs.DECAY
+            predictions.append(r)
+
+            forget = w[11] * dk ** -w[12] * ((sk + 1) ** w[13] - 1) * np.exp((1 - r) * w[14])
+            forget = np.minimum(forget, sk)
+            bonus = np.where(g == 2, w[15], np.where(g == 4, w[16], 1.0))
+            growth = np.exp(w[8]) * (11 - dk) * sk ** -w[9] * (np.exp((1 - r) * w[10]) - 1) * bonus
+            recall = sk * (1 + growth)
+            s[:m] = np.maximum(fsrs.MIN_STABILITY, np.where(g == 1, forget, recall))
+            d[:m] = np.clip(w[7] * w[4] + (1 - w[7]) * (dk - w[6] * (g - 3)), 1.0, 10.0)
+    return np.concatenate(predictions) if predictions else np.empty(0)
+
+
+def predict_sm2(logs: ReviewLogs, target_retention: float = 0.9) -> np.ndarray:
+    """SM-2 baseline: recall decays exponentially to ``target_retention`` at the scheduled interval."""
+    n = logs.ratings.shape[0]
+    if logs.ratings.size == 0:
+        return np.empty(0)
+    easiness = np.full(n, 2.5)
+    interval = np.zeros(n, dtype=np.int64)
+    repetitions = np.zeros(n, dtype=np.int64)
+    easiness, interval, repetitions = calculate_sm2_batch(logs.ratings[:, 0], easiness, interval, repetitions)
+    predictions = []
+    for k in range(1, logs.ratings.shape[1]):
+        m = logs.active[k]
+        predictions.append(target_retention ** (logs.elapsed[:m, k] / np.maximum(interval[:m], 1)))
+        e, i, r = calculate_sm2_batch(logs.ratings[:m, k], easiness[:m], interval[:m], repetitions[:m])
+        easiness[:m], interval[:m], repetitions[:m] = e, i, r
+    return np.concatenate(predictions) if predictions else np.empty(0)
+
+
+def score(predictions: np.ndarray, recalled: np.ndarray) -> Dict[str, float]:
+    """Log loss, RMSE and mean predicted vs actual retention."""
+    if predictions.size == 0:
+        return {"log_loss": 0.0, "rmse": 0.0, "predicted_retention": 0.0, "actual_retention": 0.0}
+    p = np.clip(np.nan_to_num(predictions, nan=0.5), _P_MIN, _P_MAX)
+    y = recalled.astype(np.float64)
+    return {
+        "log_loss": float(-np.mean(y * np.log(p) + (1 - y) * np.log(1 - p))),
+        "rmse": float(np.sqrt(np.mean((p - y) ** 2))),
+        "predicted_retention": float(p.mean()),
+        "actual_retention": float(y.mean()),
+    }
+
+
+def evaluate(logs: ReviewLogs, weights: Optional[Sequence[float]] = None) -> Dict[str, object]:
+    """Score FSRS (given or default weights) and the SM-2 baseline on the same history."""
+    return {
+        "reviews": logs.review_count,
+        "scored_reviews": logs.scored_count,
+        "fsrs": score(predict_fsrs(weights or fsrs.DEFAULT_WEIGHTS, logs), logs.recalled),
+        "sm2": score(predict_sm2(logs), logs.recalled),
+    }
+
+
+# ----------------------------------------------------------------------
+# Fitting
+# ----------------------------------------------------------------------
+
+_LOW = np.array([b[0] for b in fsrs.WEIGHT_BOUNDS])
+_SPAN = np.array([b[1] - b[0] for b in fsrs.WEIGHT_BOUNDS])
+_DEFAULT_U = (np.array(fsrs.DEFAULT_WEIGHTS) - _LOW) / _SPAN
+
+
+def _objective(u: np.ndarray, logs: ReviewLogs, regularization: float) -> float:
+    p = np.clip(np.nan_to_num(predict_fsrs(_LOW + u * _SPAN, logs), nan=0.5), _P_MIN, _P_MAX)
+    y = logs.recalled
+    loss = -np.mean(np.where(y, np.log(p), np.log(1 - p)))
+    # Pull towards the published defaults so sparse histories do not overfit.
+    return float(loss + regularization * np.sum((u - _DEFAULT_U) ** 2))
+
+
+def fit_weights(
+    logs: ReviewLogs,
+    iterations: int = 200,
+    learning_rate: float = 0.02,
+    regularization: float = 1e-3,
+    tolerance: float = 1e-6,
+) -> list:
+    """Fit the 17 FSRS weights with Adam on central-difference gradients.
+
+    Optimizes in bound-normalized space (every weight in [0, 1]) so a single
+    step size suits weights of very different scale.
+    """
+    if logs.scored_count == 0:
+        return list(fsrs.DEFAULT_WEIGHTS)
+    u = _DEFAULT_U.copy()
+    m = np.zeros_like(u)
+    v = np.zeros_like(u)
+    h = 1e-4
+    best_u, best_loss = u.copy(), _objective(u, logs, regularization)
+    stale = 0
+    for step in range(1, iterations + 1):
+        grad = np.empty_like(u)
+        for i in range(u.size):
+            up, down = u.copy(), u.copy()
+            up[i] = min(1.0, u[i] + h)
+            down[i] = max(0.0, u[i] - h)
+            grad[i] = (_objective(up, logs, regularization) - _objective(down, logs, regularization)) / (up[i] - down[i])
+        m = 0.9 * m + 0.1 * grad
+        v = 0.999 * v + 0.001 * grad ** 2
+        u = np.clip(u - learning_rate * (m / (1 - 0.9 ** step)) / (np.sqrt(v / (1 - 0.999 ** step)) + 1e-8), 0.0, 1.0)
+
+        loss = _objective(u, logs, regularization)
+        if loss < best_loss - tolerance:
+            best_u, best_loss, stale = u.copy(), loss, 0
+        else:
+            stale += 1
+            if stale >= 10:
+                break
+    return (_LOW + best_u * _SPAN).tolist()
+
+
+def fit_and_save(db_path: str, weights_path: str, iterations: int = 200) -> dict:
+    """Fit weights from the database's review_history and write the JSON cache."""
+    started = time.perf_counter()
+    logs = load_review_logs(db_path)
+    weights = fit_weights(logs, iterations=iterations)
+    metrics = evaluate(logs, weights)
+    fsrs.save_weights_file(
+        weights_path,
+        weights,
+        fitted_at=datetime.now().isoformat(timespec="seconds"),
+        review_count=logs.review_count,
+        metrics=metrics,
+        fit_seconds=round(time.perf_counter() - started, 2),
+    )
+    logger.info(f"[FSRS] Fitted weights on {logs.review_count} reviews -> {weights_path}")
+    return metrics
+
+
+# ----------------------------------------------------------------------
+# Background process
+# ----------------------------------------------------------------------
+
+_fit_lock = threading.Lock()
+_fit_process: Optional[multiprocessing.process.BaseProcess] = None
+
+
+def start_background_fit(db_path: str, weights_path: str, iterations: int = 200) -> bool:
+    """Start fitting in a separate process; False if a fit is already running."""
+    global _fit_process
+    with _fit_lock:
+        if _fit_process is not None and _fit_process.is_alive():
+            return False
+        ctx = multiprocessing.get_context("spawn")
+        _fit_process = ctx.Process(
+            target=fit_and_save,
+            args=(db_path, weights_path, iterations),
+            name="fsrs-fit",
+            daemon=True,
+        )
+        _fit_process.start()
+        return True
+
+
+def is_fit_running() -> bool:
+    with _fit_lock:
+        return _fit_process is not None and _fit_process.is_alive()
@@ -0,0 +1,79 @@
+"""
+HTML parsing layer for the dictionary scrapers (Youdao / Cambridge / Bing).
+
+Every cold lookup used to run ``BeautifulSoup(page, 'html.parser')`` over a
+whole page. Most of each page is ``<head>``, inline scripts and site
+navigation that no scraper reads. This module does three things:
+
+- ``parse_page`` first cuts the page at the earliest marker the scraper
+  looks for. Anything before the first occurrence of every marker cannot
+  contain a matching element, so dropping it never changes the result.
+  If no marker occurs, the whole page is parsed as before.
+- The tree builder is pluggable. lxml (C, listed in requirements.txt) is
+  used when it is installed, otherwise the stdlib html.parser.
+  ``VOCABBOOK_HTML_PARSER`` forces one (``lxml``, ``html.parser``,
+  ``html5lib``). The scrapers keep the BeautifulSoup API. Their tests run on
+  the trimmed pages under both lxml and html.parser, and check that the two
+  give the same results. html.parser stays the fallback.
+- ``css`` returns precompiled soupsieve selectors, so each scraper's
+  selectors are compiled once per process, not on every lookup.
+
+``python -m benchmarks.dict_parsing`` times each source's parser on saved
+pages.
+"""
+import logging
+import os
+from functools import lru_cache
+from typing import Iterable, Optional
+
+import soupsieve
+from bs4 import BeautifulSoup, FeatureNotFound
+
+logger = logging.getLogger(__name__)
+
+
+def _default_features() -> str:
+    forced = os.environ.get("VOCABBOOK_HTML_PARSER", "").strip()
+    if forced:
+        return forced
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return "html.parser"
+    return "lxml"
+
+
+HTML_FEATURES = _default_features()
+
+
+@lru_cache(maxsize=None)
+def css(selector: str) -> "soupsieve.SoupSieve":
+    """Compiled CSS selector (compiled once per process)."""
+    return soupsieve.compile(selector)
+
+
+def relevant_slice(html: str, markers: Iterable[str]) -> str:
+    """``html`` from the tag that holds the earliest of ``markers``; the whole page if none occur."""
+    start = -1
+    for marker in markers:
+        idx = html.find(marker)
+        if idx != -1 and (start == -1 or idx < start):
+            start = idx
+    if start <= 0:
+        return html
+    tag_start = html.rfind("<", 0, start)
+    return html[tag_start:] if tag_start > 0 else html
+
+
+def parse_page(html: str, markers: Optional[Iterable[str]] = None, features: Optional[str] = None) -> BeautifulSoup:
+    """Parse the part of ``html`` from the first scraper marker onward."""
+    if markers:
+        html = relevant_slice(html, markers)
+    features = features or HTML_FEATURES
+    try:
+        return BeautifulSoup(html, features)
+    except FeatureNotFound as e:  # a forced builder that is not installed
+        if features == "html.parser":
+            raise
+        logger.warning(f"HTML parser {features!r} unavailable ({e}); falling back to html.parser")
+        return BeautifulSoup(html, "html.parser")
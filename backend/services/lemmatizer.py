@@ -0,0 +1,148 @@
+"""
+Rule-plus-exception lemmatizer for dictionary lookups (no model, no data files).
+
+Maps an inflected form to its lemma:
+
+- ``IRREGULAR`` lists irregular verb forms and plurals ("ran" -> "run",
+  "mice" -> "mouse"). A form is listed only if it is never a headword in its
+  own right. Nouns ("felt", "shot", "won"), participial adjectives
+  ("broken", "lost", "written") and forms of two lemmas ("left", "saw",
+  "ground") are left out. ``irregular_lemma`` is therefore certain, and the
+  dictionary cache aliases and fetches by it (services.dict_cache).
+- ``lemma_candidates`` adds suffix rules (-s/-es/-ies, -ed/-ied, -ing,
+  -ier/-iest, -est). They undo consonant doubling ("running" -> "run") and
+  restore a dropped "e" first after a consonant-vowel-consonant stem
+  ("caring" -> "care" before "car"). Rules alone cannot tell "seed" from
+  "see" + "-ed", so these are guesses. Only the offline word store uses
+  them, and only when a candidate is one of its headwords
+  (services.offline_dict). Words that only look inflected ("news",
+  "morning", "forest") are listed in ``NOT_INFLECTED`` and get no
+  candidates. Agent nouns make "-er" too ambiguous ("number", "corner",
+  "letter"), so that rule is left out. Comparatives in "-ier" are covered.
+"""
+from typing import Dict, Iterator, List, Optional
+
+IRREGULAR: Dict[str, str] = {}
+for _lemma, _forms in {
+    "be": "am is are was were been",
+    "have": "has had having",
+    "do": "does did",
+    "go": "goes went",
+    "arise": "arose arisen", "awake": "awoke awoken", "bear": "borne",
+    "become": "became", "begin": "began begun", "bite": "bitten", "bleed": "bled",
+    "blow": "blew", "breed": "bred", "bring": "brought", "buy": "bought", "catch": "caught",
+    "choose": "chose", "come": "came", "cling": "clung", "creep": "crept", "dig": "dug",
+    "draw": "drew", "dream": "dreamt", "drink": "drank", "eat": "ate eaten",
+    "fight": "fought", "flee": "fled", "fling": "flung", "fly": "flew flown flies",
+    "forbid": "forbade", "forget": "forgot", "forgive": "forgave forgiven", "freeze": "froze",
+    "get": "got gotten", "give": "gave", "grow": "grew", "hear": "heard", "hide": "hid",
+    "hold": "held", "keep": "kept", "kneel": "knelt", "know": "knew", "lay": "laid",
+    "lean": "leant", "leap": "leapt", "learn": "learnt", "lie": "lain", "mean": "meant",
+    "meet": "met", "mistake": "mistook", "overcome": "overcame", "ride": "rode ridden",
+    "ring": "rang", "rise": "risen", "run": "ran", "see": "seen", "seek": "sought",
+    "sell": "sold", "send": "sent", "sew": "sewn", "shake": "shook", "shine": "shone",
+    "show": "shown", "shrink": "shrank shrunk", "sing": "sang sung", "sink": "sank",
+    "sleep": "slept", "slide": "slid", "speed": "sped", "spill": "spilt", "spin": "spun",
+    "spring": "sprang sprung", "stand": "stood", "sting": "stung", "stink": "stank stunk",
+    "stride": "strode", "strike": "struck", "strive": "strove striven", "swear": "swore",
+    "sweep": "swept", "swim": "swam swum", "swing": "swung", "take": "took", "teach": "taught",
+    "tear": "tore", "tell": "told", "throw": "threw thrown", "tread": "trod trodden",
+    "understand": "understood", "wake": "woken", "wear": "wore", "weave": "wove", "weep": "wept",
+    "withdraw": "withdrew", "wring": "wrung", "write": "wrote", "tie": "tying",
+    "man": "men", "woman": "women", "child": "children", "foot": "feet",
+    "tooth": "teeth", "goose": "geese", "mouse": "mice", "louse": "lice", "ox": "oxen",
+    "crisis": "crises", "thesis": "theses", "hypothesis": "hypotheses",
+    "phenomenon": "phenomena", "criterion": "criteria", "bacterium": "bacteria",
+    "curriculum": "curricula", "cactus": "cacti", "fungus": "fungi", "nucleus": "nuclei",
+    "stimulus": "stimuli", "radius": "radii", "appendix": "appendices", "index": "indices",
+    "matrix": "matrices", "knife": "knives", "wife": "wives", "half": "halves",
+    "wolf": "wolves", "shelf": "shelves", "thief": "thieves", "loaf": "loaves",
+    "potato": "potatoes", "tomato": "tomatoes", "hero": "heroes",
+    "far": "farther farthest",
+}.items():
+    for _form in _forms.split():
+        IRREGULAR.setdefault(_form, _lemma)
+del _lemma, _forms, _form
+
+# 形似变形、其实本身就是原形的常见词
+NOT_INFLECTED = frozenset("""
+news series species means always perhaps whereas various famous nervous serious obvious
+bed feed seed need speed shed weed breed greed deed steed heed bleed creed reed indeed
+hundred sacred naked wicked kindred rugged ragged crooked beloved
+thing nothing something anything everything king ring sing bring spring string swing sting
+wing cling fling sling during morning evening ceiling pudding herring offspring awning
+darling sibling earring duckling ping being lying dying
+forest modest interest honest earnest harvest protest contest suggest request invest digest
+arrest manifest
+""".split())
+
+# (后缀, 替换, 还原后最短长度)，按可能性排序
+_SUFFIX_RULES = (
+    ("ies", "y", 2), ("ves", "f", 3), ("es", "", 3), ("s", "", 3),
+    ("ied", "y", 2), ("iest", "y", 2), ("ier", "y", 2),
+)
+# 可能去掉了词尾 "e" 的后缀：cared / caring / finest
+_E_DROPPING = ("ed", "ing", "est")
+# "-es" 只在这些结尾之后才是词尾（boxes, watches, potatoes）；其余是 "-e" + "s"
+_ES_STEMS = ("s", "x", "z", "ch", "sh", "o")
+# "-s" 不能去掉的结尾（glass, bus, analysis, physics, famous）
+_NOT_S_PLURAL = ("ss", "us", "is", "ics")
+_VOWELS = "aeiou"
+
+
+def _e_dropping_candidates(stem: str) -> Iterator[str]:
+    if stem[-1] == stem[-2] and stem[-1] not in _VOWELS + "ls":
+        yield stem[:-1]  # running -> run, stopped -> stop, biggest -> big
+        return
+    with_e = stem + "e" if stem[-1] != "e" else None
+    # consonant-vowel-consonant stem: a final "e" was usually dropped
+    # (caring -> care, not car; hoping -> hope; finest -> fine)
+    cvc = (
+        stem[-1] not in _VOWELS + "wxy"
+        and stem[-2] in _VOWELS
+        and (len(stem) == 2 or stem[-3] not in _VOWELS)
+    )
+    if with_e and cvc:
+        yield with_e
+    if len(stem) >= 3:
+        yield stem
+    if with_e and not cvc:
+        yield with_e
+
+
+def _rule_candidates(key: str) -> Iterator[str]:
+    for suffix, replacement, min_stem in _SUFFIX_RULES:
+        if not key.endswith(suffix):
+            continue
+        stem = key[: -len(suffix)]
+        if len(stem) < min_stem:
+            continue
+        if suffix == "es" and not stem.endswith(_ES_STEMS):
+            continue
+        if suffix == "s" and key.endswith(_NOT_S_PLURAL):
+            continue
+        yield stem + replacement
+    for suffix in _E_DROPPING:
+        stem = key[: -len(suffix)]
+        if key.endswith(suffix) and len(stem) >= 2:
+            yield from _e_dropping_candidates(stem)
+
+
+def irregular_lemma(word: str) -> Optional[str]:
+    """The lemma of an irregular form ("ran" -> "run"), else None."""
+    return IRREGULAR.get((word or "").strip().lower())
+
+
+def lemma_candidates(word: str) -> List[str]:
+    """Possible lemmas of ``word``, most likely first; empty when it does not look inflected.
+
+    An irregular form yields exactly its lemma. Rule candidates are guesses
+    and must be confirmed by the caller.
+    """
+    key = (word or "").strip().lower()
+    lemma = IRREGULAR.get(key)
+    if lemma:
+        return [lemma]
+    if key in NOT_INFLECTED or not key.isalpha():
+        return []
+    return [c for c in dict.fromkeys(_rule_candidates(key)) if c != key]
@@ -1,7 +1,6 @@
 import asyncio
 import os
 import httpx
-from datetime import datetime
 from models.database import DatabaseManager
 from services.blocking_io import run_db_blocking
 from services.http_client import get_http_client
@@ -41,45 +40,10 @@ class LimitService:
 
     def _reset_if_needed(self, feature: str):
         """Reset limits if the date has changed"""
-        today = datetime.now().strftime('%Y-%m-%d')
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT used_count, last_reset_date FROM user_limits WHERE feature = ?', (feature,))
-        row = cursor.fetchone()
-        
-        if row is None:
-            # First time using this feature
-            cursor.execute('''
-                INSERT INTO user_limits (feature, used_count, last_reset_date)
-                VALUES (?, 0, ?)
-            ''', (feature, today))
-            conn.commit()
-            return 0
-        
-        used_count, last_reset_date = row
-        if last_reset_date != today:
-            # New day, reset
-            cursor.execute('''
-                UPDATE user_limits 
-                SET used_count = 0, last_reset_date = ? 
-                WHERE feature = ?
-            ''', (today, feature))
-            conn.commit()
-            return 0
-            
-        return used_count
-        
+        return self.db.limits.reset_if_needed(feature)
+
     def _increment_limit(self, feature: str):
-        today = datetime.now().strftime('%Y-%m-%d')
-        conn = self.db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute('''
-            UPDATE user_limits 
-            SET used_count = used_count + 1 
-            WHERE feature = ?
-        ''', (feature,))
-        conn.commit()
+        self.db.limits.increment(feature)
 
     async def check_and_consume(self, feature: str, token: str = None) -> bool:
         """
@@ -0,0 +1,74 @@
+"""
+Load-balanced review scheduling ("fuzz").
+
+An exact ``now + interval`` sends every word reviewed (or imported) on the
+same day to the same future day, and those spikes repeat as the intervals
+grow. With VOCABBOOK_LOAD_BALANCE=1 a passed review may instead land on the
+least-loaded day of a small window around its interval (wider for longer
+intervals, as in Anki's fuzz). Day loads are read from the in-memory
+schedule (ReviewsRepository.due_queue), which is kept up to date on every
+write, so picking a day is a few bisections rather than a scan of ``words``.
+"""
+import os
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from services.review_service import ReviewService
+
+
+def load_balancing_enabled() -> bool:
+    return os.environ.get("VOCABBOOK_LOAD_BALANCE", "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def fuzz_range(interval: int) -> Tuple[int, int]:
+    """Smallest and largest interval (days) a review of ``interval`` days may be moved to.
+
+    Intervals under 3 days are never moved; the window then grows by 15% of
+    the interval up to 7 days, 10% up to 20 days and 5% beyond.
+    """
+    if interval < 3:
+        return interval, interval
+    delta = 1.0
+    delta += 0.15 * (min(interval, 7) - 2.5)
+    delta += 0.10 * max(0, min(interval, 20) - 7)
+    delta += 0.05 * max(0, interval - 20)
+    return max(2, int(round(interval - delta))), int(round(interval + delta))
+
+
+class LoadBalancer:
+    """Moves passed reviews to the least-loaded day of their fuzz window.
+
+    ``day_loads(edges)`` returns how many words are scheduled in each
+    ``[edges[i], edges[i + 1])`` (DueQueue.histogram). Reviews placed by this
+    balancer but not yet committed (earlier items of the same batch) are
+    counted too, so a batch spreads out instead of piling onto one day.
+    """
+
+    def __init__(self, day_loads: Callable[[Sequence[float]], List[int]]) -> None:
+        self._day_loads = day_loads
+        self._pending: Counter = Counter()
+
+    def balance(self, schedule: dict, quality: int, now: Optional[float] = None) -> dict:
+        """Return ``schedule`` (a scheduler review() result) with interval and next_time balanced."""
+        interval = schedule["interval"]
+        if quality < 3:
+            return schedule  # retry windows stay exact
+        low, high = fuzz_range(interval)
+        if low == high:
+            return schedule
+
+        base = datetime.fromtimestamp(now) if now is not None else datetime.now()
+        today = base.replace(hour=0, minute=0, second=0, microsecond=0)
+        days = [today + timedelta(days=d) for d in range(low, high + 2)]
+        loads = self._day_loads([day.timestamp() for day in days])
+        best = min(
+            range(low, high + 1),
+            key=lambda d: (loads[d - low] + self._pending[days[d - low].date()], abs(d - interval), d),
+        )
+        self._pending[days[best - low].date()] += 1
+        return {
+            **schedule,
+            "interval": best,
+            "next_time": ReviewService.calculate_next_review_time(best, now=now),
+        }
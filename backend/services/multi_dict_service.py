@@ -1,19 +1,30 @@
 """
 多词典聚合查询服务
-支持: 有道词典、剑桥词典 (Cambridge)、Bing词典、Free Dictionary
+支持: 有道词典、剑桥词典 (Cambridge)、Bing词典、Free Dictionary、离线词典 (本地词库)
 """
+import asyncio
 import re
-import time
 import threading
+import weakref
 import httpx
 import json
-from collections import OrderedDict
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor, wait
+from concurrent.futures import ThreadPoolExecutor
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from services.blocking_io import run_cpu_blocking, run_db_blocking
+from services.dict_cache import DictCache, aliased
+from services.html_parsing import css, parse_page
+from services.http_client import get_http_client
+from services.lemmatizer import irregular_lemma
+from services.offline_dict import get_offline_dict
+from services.single_flight import dict_flights
+from utils.text_utils import clean_chinese_text
 import logging
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 # httpx.Client 不是线程安全的，使用 thread-local 为每个线程维护独立实例
 _thread_local = threading.local()
@@ -30,13 +41,95 @@ _DEFAULT_HEADERS = {
 # 数据库管理器引用（延迟初始化）
 _db_manager = None
 
-# 词典聚合查询共享线程池（避免每次请求新建/销毁 executor）
-_dict_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="vocabbook-dict")
+# 每个词典来源的并发请求上限（按事件循环分别创建信号量）
+_SOURCE_CONCURRENCY = {
+    "youdao": 4,
+    "cambridge": 4,
+    "bing": 4,
+    "freedict": 4,
+}
+_source_limits: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+_source_limits_lock = threading.Lock()
+
+
+def source_limit(source: str) -> asyncio.Semaphore:
+    """Per-source concurrency limit for the running event loop.
+
+    asyncio primitives belong to one loop; the sync wrappers run lookups on
+    short-lived loops, so each loop gets its own set of semaphores.
+    """
+    loop = asyncio.get_running_loop()
+    with _source_limits_lock:
+        limits = _source_limits.get(loop)
+        if limits is None:
+            limits = {name: asyncio.Semaphore(n) for name, n in _SOURCE_CONCURRENCY.items()}
+            _source_limits[loop] = limits
+    return limits[source]
+
+
+async def dict_get(url: str, timeout: float, client: Optional[httpx.AsyncClient] = None) -> httpx.Response:
+    """GET a dictionary page with browser headers on the shared AsyncClient (or ``client``)."""
+    client = client or get_http_client()
+    return await client.get(url, headers=_DEFAULT_HEADERS, timeout=timeout, follow_redirects=True)
+
+
+def run_dict_sync(factory: Callable[[httpx.AsyncClient], Awaitable[T]]) -> T:
+    """Run an async lookup ``factory(client)`` from synchronous code.
+
+    The shared AsyncClient is bound to the application's event loop, so the
+    coroutine runs on a short-lived loop with its own client. When called
+    from a thread that already runs a loop, it moves to a helper thread
+    instead of nesting loops.
+    """
+    async def _main():
+        async with httpx.AsyncClient(
+            headers=_DEFAULT_HEADERS,
+            timeout=httpx.Timeout(10.0),
+            follow_redirects=True,
+            transport=httpx.AsyncHTTPTransport(retries=2),
+        ) as client:
+            try:
+                return await factory(client)
+            finally:
+                # 临时事件循环即将关闭：放弃在其上启动的后台刷新，由后续查询重新触发
+                await _cancel_loop_refreshes()
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(_main())
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        return pool.submit(asyncio.run, _main()).result()
+
 
+# 后台刷新任务（stale-while-revalidate）；保持强引用，避免任务在完成前被回收
+_refresh_tasks: set = set()
+_refresh_tasks_lock = threading.Lock()
 
-def shutdown_dict_executor() -> None:
-    """Shut down the shared dict executor at process shutdown."""
-    _dict_executor.shutdown(wait=True, cancel_futures=True)
+
+def spawn_refresh(coro) -> asyncio.Task:
+    """Run ``coro`` in the background on the current loop (stale entries are refreshed this way)."""
+    task = asyncio.get_running_loop().create_task(coro)
+    with _refresh_tasks_lock:
+        _refresh_tasks.add(task)
+
+    def _done(t):
+        with _refresh_tasks_lock:
+            _refresh_tasks.discard(t)
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def _cancel_loop_refreshes() -> None:
+    """Cancel refreshes started on this (short-lived) loop before its client closes."""
+    loop = asyncio.get_running_loop()
+    with _refresh_tasks_lock:
+        pending = [t for t in _refresh_tasks if t.get_loop() is loop]
+    for task in pending:
+        task.cancel()
+    if pending:
+        await asyncio.gather(*pending, return_exceptions=True)
 
 
 def get_session():
@@ -85,34 +178,9 @@ def get_db_manager():
     return _db_manager
 
 
-def clean_chinese_text(text):
-    """
-    Remove spaces between Chinese characters and punctuation.
-    Pattern matches any space that is:
-    - Preceded by a CJK character or punctuation
-    - Followed by a CJK character or punctuation
-    """
-    if not text:
-        return text
-    # \u4e00-\u9fff: Common CJK
-    # \u3000-\u303f: CJK Symbols and Punctuation
-    # \uff00-\uffef: Fullwidth Forms
-    return re.sub(r'(?<=[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef])\s+(?=[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef])', '', text)
-
-
-def _clean_dict_entry(entry):
-    """Clean common fields in dictionary entry"""
-    if not entry:
-        return entry
-    
-    if 'meaning' in entry and entry['meaning']:
-        entry['meaning'] = clean_chinese_text(entry['meaning'])
-        
-    if 'example' in entry and entry['example']:
-        # clean whole block or parts? simplest is whole block
-        entry['example'] = clean_chinese_text(entry['example'])
-        
-    return entry
+# 各页面解析前的裁剪标记：从最早出现的标记所在标签开始解析（见 services.html_parsing）
+_CAMBRIDGE_MARKERS = ("di-title", 'class="us', "def-block")
+_BING_MARKERS = ("qdef", "hd_prUS", "sentenceSeg")
 
 
 def _get_clean_text(el):
@@ -135,6 +203,7 @@ class MultiDictService:
     DICT_CAMBRIDGE = "cambridge"
     DICT_BING = "bing"
     DICT_FREE = "freedict"
+    DICT_OFFLINE = "offline"  # 本地词库（services.offline_dict），不走网络、不进缓存
 
     # 词典显示名称
     DICT_NAMES = {
@@ -142,310 +211,344 @@ class MultiDictService:
         DICT_CAMBRIDGE: "剑桥词典 (Cambridge)",
         DICT_BING: "Bing 词典",
         DICT_FREE: "Free Dictionary",
+        DICT_OFFLINE: "离线词典",
+    }
+
+    DICT_AI = "ai"  # AI 兜底释义（其他来源都没有结果时）
+
+    # 各来源缓存策略（秒）：(新鲜期, 过期后仍可返回的最长陈旧期)。内存与数据库两级共用。
+    # 新鲜期内直接返回；陈旧期内先返回旧结果，同时在后台刷新（stale-while-revalidate）；
+    # 超过两者之和才视为未命中。词典内容很少变化，陈旧期可以放得很长。
+    _cache_policy = {
+        DICT_YOUDAO: (86400, 30 * 86400),
+        DICT_CAMBRIDGE: (86400, 30 * 86400),
+        DICT_BING: (86400, 7 * 86400),
+        DICT_FREE: (86400, 30 * 86400),
+        DICT_AI: (7 * 86400, 23 * 86400),
     }
 
-    # 内存缓存（一级缓存，快速访问）
-    _memory_cache = OrderedDict()
-    _memory_cache_lock = threading.RLock()
-    _memory_cache_max = 2000  # 上限，超出按 LRU 淘汰最旧词条
-    _memory_cache_ttl = 1800  # 内存缓存 30 分钟
+    # 词典缓存：按字节限额的 LRU 内存层 + SQLite dict_cache（见 services.dict_cache）；
+    # 变形词（ran / mice）未命中时回落到原形的缓存条目
+    cache = DictCache(_cache_policy, lambda: get_db_manager(), lemma_of=lambda word: MultiDictService.lemma_of(word))
 
-    # 持久化缓存 TTL（二级缓存，24小时）
-    _db_cache_ttl = 86400
     # 聚合查询整体等待上限，超时后返回已拿到的部分结果
     _aggregate_timeout = 8
+    # 各来源的截止时间（秒，不超过 _aggregate_timeout）；慢来源不拖累整体
+    _source_deadlines = {
+        DICT_YOUDAO: 10,
+        DICT_CAMBRIDGE: 8,
+        DICT_BING: 6,
+        DICT_FREE: 5,
+    }
 
-    @classmethod
-    def get_cached(cls, word, source):
-        """获取缓存的词典结果（先查内存，再查数据库）"""
-        word_lower = word.lower()
-
-        # 一级缓存：内存（带锁 + LRU 刷新）
-        with cls._memory_cache_lock:
-            cache_entry = cls._memory_cache.get(word_lower)
-            if cache_entry is not None:
-                if time.time() - cache_entry.get("timestamp", 0) < cls._memory_cache_ttl:
-                    result = cache_entry.get(source)
-                    if result is not None:
-                        cls._memory_cache.move_to_end(word_lower)
-                        return _clean_dict_entry(result)
-                else:
-                    # 内存缓存过期，清除
-                    del cls._memory_cache[word_lower]
-
-        # 二级缓存：数据库
-        db = get_db_manager()
-        if db:
-            try:
-                result = db.get_dict_cache(word, source, ttl=cls._db_cache_ttl)
-                if result is not None:
-                    # Clean before returning
-                    result = _clean_dict_entry(result)
-                    # 回填到内存缓存
-                    cls._update_memory_cache(word, source, result)
-                    return result
-            except Exception as e:
-                logger.error(f"DB cache read error: {e}")
+    @staticmethod
+    def lemma_of(word):
+        """确定的原形（不规则变形表，其次离线词库的变形表），否则 None；缓存别名和抓取都按它。
 
-        return None
+        后缀规则只是猜测（caring 不是 car 的变形），不在这里使用。
+        """
+        lemma = irregular_lemma(word)
+        if lemma:
+            return lemma
+        store = get_offline_dict()
+        return store.lemma_of(word) if store is not None else None
 
     @classmethod
-    def set_cache(cls, word, source, result):
-        """设置缓存（同时写入内存和数据库）"""
-        # Clean before saving to ensure new data is clean
-        result = _clean_dict_entry(result)
-
-        # 写入内存缓存
-        cls._update_memory_cache(word, source, result)
-
-        # 写入数据库缓存
-        db = get_db_manager()
-        if db:
-            try:
-                db.set_dict_cache(word, source, result)
-            except Exception as e:
-                logger.error(f"DB cache write error: {e}")
+    def lookup_cache(cls, word, source):
+        """查缓存（先内存，再数据库），返回 (result, is_stale)；未命中时为 (None, False)。"""
+        return cls.cache.lookup(word, source)
 
     @classmethod
-    def _update_memory_cache(cls, word, source, result):
-        """更新内存缓存（带锁；超出上限时按 LRU 淘汰最旧词条）"""
-        word_lower = word.lower()
-        with cls._memory_cache_lock:
-            if word_lower not in cls._memory_cache:
-                cls._memory_cache[word_lower] = {"timestamp": time.time()}
-            cls._memory_cache[word_lower][source] = result
-            cls._memory_cache[word_lower]["timestamp"] = time.time()
-            cls._memory_cache.move_to_end(word_lower)
-            while len(cls._memory_cache) > cls._memory_cache_max:
-                cls._memory_cache.popitem(last=False)
+    def get_cached(cls, word, source):
+        """获取缓存的词典结果（先查内存，再查数据库；可能是待刷新的陈旧结果）"""
+        return cls.cache.get(word, source)
 
-    @staticmethod
-    def search_cambridge(word):
-        """
-        剑桥词典查询 (High Quality)
-        """
-        # 1. Check Cache
-        cached = MultiDictService.get_cached(word, MultiDictService.DICT_CAMBRIDGE)
-        if cached: return cached
+    @classmethod
+    def set_cache(cls, word, source, result):
+        """设置缓存（同时写入内存和数据库），返回规范化后的结果"""
+        return cls.cache.set(word, source, result)
 
-        try:
-            # 剑桥词典 URL (English-Chinese Simplified)
-            url = f"https://dictionary.cambridge.org/dictionary/english-chinese-simplified/{word}"
-            session = get_session()
-            resp = session.get(url, timeout=10)
+    # ------------------------------------------------------------------
+    # 解析（纯函数：HTML/JSON 文本 -> 结果字典）
+    # ------------------------------------------------------------------
 
-            if resp.status_code != 200:
-                return None
+    @staticmethod
+    def _parse_cambridge(word, html):
+        """剑桥词典页面解析 (High Quality)"""
+        soup = parse_page(html, _CAMBRIDGE_MARKERS)
 
-            soup = BeautifulSoup(resp.text, 'html.parser')
+        # 检查是否找到单词 (di-title)
+        if not css('div.di-title').select_one(soup):
+            return None
 
-            # 检查是否找到单词 (di-title)
-            if not soup.find('div', class_='di-title'):
-                return None
+        # 音标 (dpron)
+        phonetic = ""
+        us_pron = css('span.us').select_one(soup)
+        if us_pron:
+            pron_span = css('span.pron').select_one(us_pron)
+            if pron_span:
+                phonetic = f"US {pron_span.get_text(strip=True)}"
+
+        # 释义 & 例句
+        # 剑桥词典结构: entry-body -> pr-entry-body__el -> sense-block -> def-block
+        meanings = []
+        examples = []
+
+        # 获取前 3 个释义块
+        def_blocks = css('div.def-block').select(soup, limit=3)
+
+        for block in def_blocks:
+            # 英文释义 (ddef_h -> def)
+            ddef_h = css('div.ddef_h').select_one(block)
+            eng_def = ""
+            if ddef_h:
+                def_text = css('div.def').select_one(ddef_h)
+                eng_def = _get_clean_text(def_text)
+
+            # 中文释义 (def-body -> trans)
+            chn_def = ""
+            trans = css('span.trans').select_one(block)
+            chn_def = _get_clean_text(trans)
+
+            if eng_def or chn_def:
+                m_text = f"{eng_def} {chn_def}".strip()
+                meanings.append(m_text)
+
+            # 例句 (examp)
+            examps = css('div.examp').select(block, limit=2)
+            for ex in examps:
+                eg = css('span.eg').select_one(ex)
+                eg_trans = css('span.trans').select_one(ex)
+                if eg:
+                    eg_text = _get_clean_text(eg)
+                    trans_text = _get_clean_text(eg_trans)
+                    if trans_text:
+                        examples.append(f"{eg_text}\n{trans_text}")
+                    else:
+                        examples.append(eg_text)
+
+        meaning = "\n".join([f"• {m}" for m in meanings])
+        example = "\n".join(examples[:3]) # 限制例句数量
+
+        return {
+            "source": MultiDictService.DICT_CAMBRIDGE,
+            "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_CAMBRIDGE],
+            "word": word,
+            "phonetic": phonetic,
+            "meaning": meaning,
+            "example": example
+        }
 
-            # 音标 (dpron)
-            phonetic = ""
-            us_pron = soup.find('span', class_='us')
-            if us_pron:
-                pron_span = us_pron.find('span', class_='pron')
-                if pron_span:
-                    phonetic = f"US {pron_span.get_text(strip=True)}"
-
-            # 释义 & 例句
-            # 剑桥词典结构: entry-body -> pr-entry-body__el -> sense-block -> def-block
-            meanings = []
-            examples = []
-            
-            # 获取前 3 个释义块
-            def_blocks = soup.find_all('div', class_='def-block', limit=3)
-
-            for block in def_blocks:
-                # 英文释义 (ddef_h -> def)
-                ddef_h = block.find('div', class_='ddef_h')
-                eng_def = ""
-                if ddef_h:
-                    def_text = ddef_h.find('div', class_='def')
-                    eng_def = _get_clean_text(def_text)
-
-                # 中文释义 (def-body -> trans)
-                chn_def = ""
-                trans = block.find('span', class_='trans')
-                chn_def = _get_clean_text(trans)
-
-                if eng_def or chn_def:
-                    m_text = f"{eng_def} {chn_def}".strip()
-                    meanings.append(m_text)
-
-                # 例句 (examp)
-                examps = block.find_all('div', class_='examp', limit=2)
-                for ex in examps:
-                    eg = ex.find('span', class_='eg')
-                    eg_trans = ex.find('span', class_='trans')
-                    if eg:
-                        eg_text = _get_clean_text(eg)
-                        trans_text = _get_clean_text(eg_trans)
-                        if trans_text:
-                            examples.append(f"{eg_text}\n{trans_text}")
-                        else:
-                            examples.append(eg_text)
-
-            meaning = "\n".join([f"• {m}" for m in meanings])
-            example = "\n".join(examples[:3]) # 限制例句数量
-
-            result = {
-                "source": MultiDictService.DICT_CAMBRIDGE,
-                "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_CAMBRIDGE],
-                "word": word,
-                "phonetic": phonetic,
-                "meaning": meaning,
-                "example": example
-            }
-            # Cache result
-            MultiDictService.set_cache(word, MultiDictService.DICT_CAMBRIDGE, result)
-            return result
+    @staticmethod
+    def _parse_bing(word, html):
+        """Bing 词典页面解析"""
+        soup = parse_page(html, _BING_MARKERS)
 
-        except Exception as e:
-            logger.error(f"Cambridge search error: {e}")
+        # Bing 结构变化：div.qdef 里面直接包含 li（无 class）
+        qdef = css('div.qdef').select_one(soup)
+        if not qdef:
             return None
 
+        phonetic = ""
+        pron_us = css('div.hd_prUS').select_one(soup)
+        if pron_us:
+            phonetic = pron_us.get_text(strip=True)
+
+        meanings = []
+        for li in css('li').select(qdef):
+            text = li.get_text(separator=' ', strip=True)
+            if text and len(text) > 1:
+                meanings.append(text)
+        meaning = "\n".join(meanings)
+
+        example = ""
+        se_div = css('div#sentenceSeg').select_one(soup)
+        if se_div:
+            first_sent = css('div.se_li').select_one(se_div)
+            if first_sent:
+                en_sent = css('div.sen_en').select_one(first_sent)
+                cn_sent = css('div.sen_cn').select_one(first_sent)
+                if en_sent and cn_sent:
+                    cn_text = _get_clean_text(cn_sent)
+                    example = f"{en_sent.get_text(separator=' ', strip=True)}\n{cn_text}"
+
+        return {
+            "source": MultiDictService.DICT_BING,
+            "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_BING],
+            "word": word,
+            "phonetic": phonetic,
+            "meaning": meaning,
+            "example": example
+        }
+
     @staticmethod
-    def search_bing(word):
-        """Bing 词典查询"""
-        # 1. Check Cache
-        cached = MultiDictService.get_cached(word, MultiDictService.DICT_BING)
-        if cached: return cached
+    def _parse_free_dict(word, text):
+        """Free Dictionary API 响应解析"""
+        data = json.loads(text)
+        if not data or not isinstance(data, list):
+            return None
 
-        try:
-            # 使用 mkt=zh-cn 强制中文版，setlang 备用
-            url = f"https://cn.bing.com/dict/search?q={word}&mkt=zh-cn&setlang=zh-hans"
-            session = get_session()
-            resp = session.get(url, timeout=8)
+        entry = data[0]
+        phonetic = entry.get('phonetic', '')
+
+        # Extract audio
+        audio_url = ""
+        for p in entry.get('phonetics', []):
+            if p.get('audio'):
+                audio_url = p['audio']
+                break
+
+        meanings = []
+        examples = []
+
+        for m in entry.get('meanings', []):
+            part = m.get('partOfSpeech', '')
+            for d in m.get('definitions', [])[:2]:
+                text = d.get('definition', '')
+                if text:
+                    meanings.append(f"{part}. {text}")
+                if d.get('example'):
+                    examples.append(d['example'])
+
+        meaning = "\n".join(meanings[:5])
+        example = "\n".join(examples[:2])
+
+        return {
+            "source": MultiDictService.DICT_FREE,
+            "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_FREE],
+            "word": word,
+            "phonetic": phonetic,
+            "meaning": meaning,
+            "example": example,
+            "audio": audio_url
+        }
+
+    # ------------------------------------------------------------------
+    # 异步查询（事件循环上运行，共享 AsyncClient 连接池）
+    # ------------------------------------------------------------------
 
-            if resp.status_code != 200:
-                return None
+    @classmethod
+    def _parse_and_cache(cls, source, word, parse, text):
+        result = parse(word, text)
+        if result:
+            cls.set_cache(word, source, result)
+        return result
 
-            soup = BeautifulSoup(resp.text, 'html.parser')
+    @classmethod
+    async def _fetch_source(cls, source, word, url, parse, timeout, client=None):
+        """Cache → HTTP GET (per-source limit) → parse + cache write off the event loop.
+
+        ``url`` is a template with a ``{word}`` field. A form with a certain
+        lemma (``lemma_of``: "ran" -> "run") is answered from the lemma's
+        entry (see DictCache aliases); on a miss the lemma is fetched and
+        cached instead of the form, so all its forms share one entry. Every
+        other word is fetched as typed.
+
+        On a cache miss, concurrent lookups of the same (source, word) share one
+        request. A stale hit is returned immediately and refreshed in the
+        background through the same shared request.
+        """
+        cached, stale, cache_word = await run_db_blocking(cls.cache.resolve, word, source)
+        if not cached:
+            cache_word = cls.cache.alias_of(word) or word
+
+        def fetch():
+            return dict_flights.do(
+                (source, cache_word.lower()),
+                lambda: cls._fetch_uncached(source, cache_word, url.format(word=cache_word), parse, timeout, client),
+            )
+
+        if cached:
+            if stale:
+                spawn_refresh(fetch())
+            return cached
+        result = await fetch()
+        if result and cache_word.lower() != word.lower():
+            return aliased(result, word, cache_word)
+        return result
 
-            if not soup.find('div', class_='qdef'):
+    @classmethod
+    async def _fetch_uncached(cls, source, word, url, parse, timeout, client=None):
+        try:
+            async with source_limit(source):
+                resp = await dict_get(url, timeout, client)
+            if resp.status_code != 200:
                 return None
-
-            phonetic = ""
-            pron_us = soup.find('div', class_='hd_prUS')
-            if pron_us:
-                phonetic = pron_us.get_text(strip=True)
-
-            meaning = ""
-            # Bing 结构变化：div.qdef 里面直接包含 li（无 class）
-            qdef = soup.find('div', class_='qdef')
-            if qdef:
-                meanings = []
-                for li in qdef.find_all('li'):
-                    text = li.get_text(separator=' ', strip=True)
-                    if text and len(text) > 1:
-                        meanings.append(text)
-                meaning = "\n".join(meanings)
-
-            example = ""
-            se_div = soup.find('div', id='sentenceSeg')
-            if se_div:
-                first_sent = se_div.find('div', class_='se_li')
-                if first_sent:
-                    en_sent = first_sent.find('div', class_='sen_en')
-                    cn_sent = first_sent.find('div', class_='sen_cn')
-                    if en_sent and cn_sent:
-                        cn_text = _get_clean_text(cn_sent)
-                        example = f"{en_sent.get_text(separator=' ', strip=True)}\n{cn_text}"
-            
-            result = {
-                "source": MultiDictService.DICT_BING,
-                "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_BING],
-                "word": word,
-                "phonetic": phonetic,
-                "meaning": meaning,
-                "example": example
-            }
-            # Cache result
-            MultiDictService.set_cache(word, MultiDictService.DICT_BING, result)
-            return result
-
+            return await run_cpu_blocking(cls._parse_and_cache, source, word, parse, resp.text)
         except Exception as e:
-            logger.error(f"Bing search error: {e}")
+            logger.error(f"{cls.DICT_NAMES.get(source, source)} search error: {e}")
             return None
 
     @staticmethod
-    def search_free_dict(word):
-        """Free Dictionary API 查询"""
-        # 1. Check Cache
-        cached = MultiDictService.get_cached(word, MultiDictService.DICT_FREE)
-        if cached: return cached
-
-        try:
-            url = f"https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
-            session = get_session()
-            resp = session.get(url, timeout=8)
-
-            if resp.status_code != 200:
-                return None
+    async def search_cambridge_async(word, client=None):
+        """剑桥词典查询 (High Quality)"""
+        url = "https://dictionary.cambridge.org/dictionary/english-chinese-simplified/{word}"
+        return await MultiDictService._fetch_source(
+            MultiDictService.DICT_CAMBRIDGE, word, url, MultiDictService._parse_cambridge, 10, client,
+        )
 
-            data = resp.json()
-            if not data or not isinstance(data, list):
-                return None
+    @staticmethod
+    async def search_bing_async(word, client=None):
+        """Bing 词典查询"""
+        # 使用 mkt=zh-cn 强制中文版，setlang 备用
+        url = "https://cn.bing.com/dict/search?q={word}&mkt=zh-cn&setlang=zh-hans"
+        return await MultiDictService._fetch_source(
+            MultiDictService.DICT_BING, word, url, MultiDictService._parse_bing, 8, client,
+        )
 
-            entry = data[0]
-            phonetic = entry.get('phonetic', '')
-            
-            # Extract audio
-            audio_url = ""
-            for p in entry.get('phonetics', []):
-                if p.get('audio'):
-                    audio_url = p['audio']
-                    break
-            
-            meanings = []
-            examples = []
-
-            for m in entry.get('meanings', []):
-                part = m.get('partOfSpeech', '')
-                for d in m.get('definitions', [])[:2]:
-                    text = d.get('definition', '')
-                    if text:
-                        meanings.append(f"{part}. {text}")
-                    if d.get('example'):
-                        examples.append(d['example'])
-
-            meaning = "\n".join(meanings[:5])
-            example = "\n".join(examples[:2])
-
-            result = {
-                "source": MultiDictService.DICT_FREE,
-                "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_FREE],
-                "word": word,
-                "phonetic": phonetic,
-                "meaning": meaning, 
-                "example": example,
-                "audio": audio_url
-            }
-            # Cache result
-            MultiDictService.set_cache(word, MultiDictService.DICT_FREE, result)
-            return result
+    @staticmethod
+    async def search_free_dict_async(word, client=None):
+        """Free Dictionary API 查询"""
+        url = "https://api.dictionaryapi.dev/api/v2/entries/en/{word}"
+        return await MultiDictService._fetch_source(
+            MultiDictService.DICT_FREE, word, url, MultiDictService._parse_free_dict, 8, client,
+        )
 
+    @staticmethod
+    async def search_offline_async(word):
+        """离线词典查询（本地词库）；未安装词库或没有该词时返回 None"""
+        if get_offline_dict() is None:
+            return None
+        try:
+            return await run_db_blocking(MultiDictService.search_offline, word)
         except Exception as e:
-            logger.error(f"Free Dictionary search error: {e}")
+            logger.error(f"Offline dict search error: {e}")
             return None
 
     @staticmethod
-    def aggregate_search(word, enabled_dicts=None, youdao_result=None):
-        """
-        聚合查询，包含 Youdao, Cambridge, Bing, FreeDict
-        """
+    def network_sources(enabled_dicts=None):
+        """gather_sources_async 会查询的网络来源（剑桥 / Bing / FreeDict 中启用的）。"""
+        order = [MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_BING, MultiDictService.DICT_FREE]
         if enabled_dicts is None:
-            enabled_dicts = [
-                MultiDictService.DICT_YOUDAO,
-                MultiDictService.DICT_CAMBRIDGE, 
-                MultiDictService.DICT_BING,
-                MultiDictService.DICT_FREE
-            ]
+            return order
+        return [source for source in order if source in enabled_dicts]
+
+    @staticmethod
+    async def gather_sources_async(word, enabled_dicts=None, client=None):
+        """并发查询剑桥 / Bing / FreeDict，每个来源有各自的截止时间；超时或失败的来源被跳过。"""
+        fetchers = {
+            MultiDictService.DICT_CAMBRIDGE: MultiDictService.search_cambridge_async,
+            MultiDictService.DICT_BING: MultiDictService.search_bing_async,
+            MultiDictService.DICT_FREE: MultiDictService.search_free_dict_async,
+        }
+        selected = MultiDictService.network_sources(enabled_dicts)
+
+        async def _one(source):
+            deadline = min(MultiDictService._source_deadlines[source], MultiDictService._aggregate_timeout)
+            try:
+                return await asyncio.wait_for(fetchers[source](word, client=client), deadline)
+            except asyncio.TimeoutError:
+                logger.warning(f"Dict {source} timed out after {deadline}s")
+            except Exception as e:
+                logger.error(f"Dict {source} error: {e}")
+            return None
 
+        outcomes = await asyncio.gather(*(_one(source) for source in selected))
+        return {source: result for source, result in zip(selected, outcomes) if result}
+
+    @staticmethod
+    def assemble_results(sources, youdao_result=None):
+        """把有道结果与其他来源合并为 {"primary", "sources"}（有道 > 离线词典 > 剑桥 > Bing）。"""
         results = {"primary": None, "sources": {}}
 
         # 有道 (通常已经查好了，作为 primary)
@@ -456,50 +559,77 @@ class MultiDictService:
                 **youdao_result
             }
             results["primary"] = youdao_result
+        results["sources"].update(sources)
 
-        # 并发查询其他（复用模块级共享线程池，避免每次请求新建/销毁 executor）
-        tasks = {}
-        if MultiDictService.DICT_CAMBRIDGE in enabled_dicts:
-            tasks[_dict_executor.submit(MultiDictService.search_cambridge, word)] = MultiDictService.DICT_CAMBRIDGE
-
-        if MultiDictService.DICT_BING in enabled_dicts:
-            tasks[_dict_executor.submit(MultiDictService.search_bing, word)] = MultiDictService.DICT_BING
-
-        if MultiDictService.DICT_FREE in enabled_dicts:
-            tasks[_dict_executor.submit(MultiDictService.search_free_dict, word)] = MultiDictService.DICT_FREE
-
-        done, not_done = wait(list(tasks.keys()), timeout=MultiDictService._aggregate_timeout)
-
-        for future in done:
-            source = tasks[future]
-            try:
-                result = future.result()
-                if result:
-                    results["sources"][source] = result
-            except Exception as e:
-                logger.error(f"Dict {source} error: {e}")
-
-        for future in not_done:
-            source = tasks[future]
-            future.cancel()
-            logger.warning(f"Dict {source} timed out after {MultiDictService._aggregate_timeout}s")
-
-        # 确定主要结果 (有道 > 剑桥 > Bing)
+        # 确定主要结果 (有道 > 离线词典 > 剑桥 > Bing)
         if not results["primary"]:
-            for source in [MultiDictService.DICT_YOUDAO, MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_BING]:
+            for source in [
+                MultiDictService.DICT_YOUDAO, MultiDictService.DICT_OFFLINE,
+                MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_BING,
+            ]:
                 if source in results["sources"]:
                     results["primary"] = results["sources"][source]
                     break
-        
+
         # 兜底
         if not results["primary"] and results["sources"]:
             results["primary"] = list(results["sources"].values())[0]
 
         return results
 
+    @staticmethod
+    async def aggregate_search_async(word, enabled_dicts=None, youdao_result=None, client=None):
+        """
+        聚合查询，包含 Youdao, Cambridge, Bing, FreeDict
+        """
+        sources = await MultiDictService.gather_sources_async(word, enabled_dicts, client)
+        return MultiDictService.assemble_results(sources, youdao_result)
+
+    # ------------------------------------------------------------------
+    # 同步接口（兼容旧调用方：在临时事件循环里运行异步实现）
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def search_cambridge(word):
+        """剑桥词典查询（同步包装）"""
+        return run_dict_sync(lambda client: MultiDictService.search_cambridge_async(word, client))
+
+    @staticmethod
+    def search_bing(word):
+        """Bing 词典查询（同步包装）"""
+        return run_dict_sync(lambda client: MultiDictService.search_bing_async(word, client))
+
+    @staticmethod
+    def search_free_dict(word):
+        """Free Dictionary API 查询（同步包装）"""
+        return run_dict_sync(lambda client: MultiDictService.search_free_dict_async(word, client))
+
+    @staticmethod
+    def search_offline(word):
+        """离线词典查询（同步，本地 SQLite 读取）"""
+        store = get_offline_dict()
+        entry = store.lookup(word) if store is not None else None
+        if not entry:
+            return None
+        return {
+            "source": MultiDictService.DICT_OFFLINE,
+            "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_OFFLINE],
+            **entry,
+        }
+
+    @staticmethod
+    def aggregate_search(word, enabled_dicts=None, youdao_result=None):
+        """聚合查询（同步包装）"""
+        return run_dict_sync(
+            lambda client: MultiDictService.aggregate_search_async(word, enabled_dicts, youdao_result, client)
+        )
+
     @staticmethod
     def get_best_phonetic(sources):
-        for source in [MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_YOUDAO, MultiDictService.DICT_BING]:
+        for source in [
+            MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_YOUDAO,
+            MultiDictService.DICT_BING, MultiDictService.DICT_OFFLINE,
+        ]:
             if source in sources and sources[source].get('phonetic'):
                 return sources[source]['phonetic']
         return ""
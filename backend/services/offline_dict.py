@@ -0,0 +1,342 @@
+"""
+Offline dictionary: a local ECDICT-style word store.
+
+Every uncached lookup used to go to the network, so lookups were slow and
+failed without a connection. The offline store answers from a local SQLite
+file built once from an ECDICT-format CSV (columns ``word``, ``phonetic``,
+``definition``, ``translation``, ``tag``, ``exchange``, ``frq``; other
+columns are ignored):
+
+    python -m services.offline_dict build ecdict.csv [--out PATH]
+    python -m services.offline_dict lookup perceived [--store PATH]
+
+Layout (read-only at runtime: opened with ``immutable=1`` and memory-mapped):
+
+- ``entries``: one row per lower-cased headword in a WITHOUT ROWID table. An
+  exact lookup is a single B-tree search (O(log n)), and a prefix lookup is
+  a range scan on the same key.
+- ``lemmas``: inflected form -> lemma, built from ECDICT's ``exchange``
+  field (``p:``/``d:``/``i:``/``3:``/``r:``/``t:``/``s:``, and ``0:`` on
+  the inflected entries themselves). Forms not listed there fall back to
+  services.lemmatizer (irregular forms, then suffix rules). A result is used
+  only when it is a headword in the store.
+
+The store is looked up at config.OFFLINE_DICT_PATH, then at the copy bundled
+with the app (config.BUNDLED_OFFLINE_DICT_PATH). Without either, the offline
+source is disabled. MultiDictService exposes it as ``DICT_OFFLINE``.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from models.db_pool import ReadConnectionPool
+from services.lemmatizer import lemma_candidates
+from services.tag_service import TagService
+from services.word_family_service import WordFamilyService
+from utils.text_utils import clean_chinese_text
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = "1"
+_MMAP_SIZE = 256 * 1024 * 1024
+_BATCH = 5000
+# 比任何有效 UTF-8 字符都大：前缀范围查询的上界
+_PREFIX_END = "\U0010ffff"
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT) WITHOUT ROWID;
+CREATE TABLE entries (
+    key TEXT PRIMARY KEY,
+    word TEXT NOT NULL,
+    phonetic TEXT,
+    translation TEXT,
+    definition TEXT,
+    tag TEXT,
+    frq INTEGER
+) WITHOUT ROWID;
+CREATE TABLE lemmas (
+    form TEXT NOT NULL,
+    lemma TEXT NOT NULL,
+    kinds TEXT NOT NULL,
+    PRIMARY KEY (form, lemma)
+) WITHOUT ROWID;
+"""
+
+# ECDICT tag 字段 -> 本项目的标签名（与 TagService 一致）
+_TAG_NAMES = {"cet4": "CET4", "cet6": "CET6", "ky": "考研", "toefl": "TOEFL", "ielts": "IELTS", "gre": "GRE"}
+# exchange 字段里的变形类型
+_INFLECTIONS = {
+    "p": "过去式", "d": "过去分词", "i": "现在分词", "3": "第三人称单数",
+    "r": "比较级", "t": "最高级", "s": "复数",
+}
+
+
+def _key(word: str) -> str:
+    return (word or "").strip().lower()
+
+
+def _text(value: Optional[str]) -> str:
+    # ECDICT 的多行字段在 CSV 里写作字面量 "\n"
+    return (value or "").replace("\\r", "").replace("\\n", "\n").strip()
+
+
+def _exchange_pairs(key: str, exchange: Optional[str]) -> Iterator[Tuple[str, str, str]]:
+    """(form, lemma, kinds) pairs from an ECDICT exchange field."""
+    fields = {}
+    for part in (exchange or "").split("/"):
+        kind, _, value = part.partition(":")
+        if value:
+            fields[kind.strip()] = value.strip()
+    for kind, value in fields.items():
+        if kind in _INFLECTIONS:
+            yield _key(value), key, kind
+    if "0" in fields:  # 本身是变形词：0 = 原形，1 = 变形类型
+        yield key, _key(fields["0"]), "".join(k for k in fields.get("1", "") if k in _INFLECTIONS)
+
+
+class OfflineDict:
+    """Read-only access to a built store; safe to share between threads."""
+
+    def __init__(self, path: str, max_connections: int = 4) -> None:
+        self.path = path
+        uri = Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+
+        def connect() -> sqlite3.Connection:
+            conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute(f"PRAGMA mmap_size={_MMAP_SIZE}")
+            return conn
+
+        self._pool = ReadConnectionPool(connect, max_size=max_connections)
+        try:
+            with self._pool.connection() as conn:
+                meta = dict(conn.execute("SELECT key, value FROM meta").fetchall())
+        except sqlite3.Error:
+            self._pool.close()
+            raise
+        if meta.get("schema_version") != SCHEMA_VERSION:
+            self._pool.close()
+            raise ValueError(f"Unsupported offline dictionary schema: {meta.get('schema_version')!r}")
+        self.entry_count = int(meta.get("entries", 0))
+
+    @staticmethod
+    def _row(conn: sqlite3.Connection, key: str) -> Optional[sqlite3.Row]:
+        return conn.execute(
+            "SELECT word, phonetic, translation, definition, tag FROM entries WHERE key = ?", (key,)
+        ).fetchone()
+
+    @staticmethod
+    def _lemma(conn: sqlite3.Connection, key: str) -> Optional[Tuple[str, str]]:
+        row = conn.execute(
+            "SELECT lemma, kinds FROM lemmas WHERE form = ? ORDER BY lemma LIMIT 1", (key,)
+        ).fetchone()
+        if row:
+            return row["lemma"], row["kinds"]
+        for candidate in lemma_candidates(key):
+            if conn.execute("SELECT 1 FROM entries WHERE key = ?", (candidate,)).fetchone():
+                return candidate, ""
+        return None
+
+    def lemma_of(self, word: str) -> Optional[str]:
+        """The lemma the store lists for an inflected ``word`` (exchange data only), else None."""
+        key = _key(word)
+        if not key:
+            return None
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT lemma FROM lemmas WHERE form = ? ORDER BY lemma LIMIT 1", (key,)
+            ).fetchone()
+        return row["lemma"] if row else None
+
+    def lookup(self, word: str) -> Optional[dict]:
+        """Exact entry for ``word``, else its lemma's entry; None when neither is in the store."""
+        key = _key(word)
+        if not key:
+            return None
+        lemma = kinds = None
+        with self._pool.connection() as conn:
+            row = self._row(conn, key)
+            if row is None:
+                found = self._lemma(conn, key)
+                if found:
+                    lemma, kinds = found
+                    row = self._row(conn, lemma)
+        if row is None:
+            return None
+
+        meaning = row["translation"] or row["definition"] or ""
+        if lemma:
+            kind_names = "/".join(_INFLECTIONS[k] for k in kinds if k in _INFLECTIONS) or "变形"
+            meaning = f"（{row['word']} 的{kind_names}）\n{meaning}".rstrip()
+        tags = [_TAG_NAMES[t] for t in (row["tag"] or "").split() if t in _TAG_NAMES]
+        return {
+            "word": word.strip(),
+            "lemma": row["word"] if lemma else "",
+            "phonetic": f"[{row['phonetic']}]" if row["phonetic"] else "",
+            "meaning": meaning,
+            "definition": row["definition"] or "",
+            "example": "",
+            "roots": "",
+            "synonyms": "",
+            "tags": TagService.format_tags(tags),
+            "word_families": WordFamilyService.extract_root_from_word(word),
+        }
+
+    def ranked_words(self) -> List[Tuple[str, int]]:
+        """(headword, frequency rank) of every entry with a known frequency."""
+        with self._pool.connection() as conn:
+            return [(row["word"], row["frq"]) for row in conn.execute("SELECT word, frq FROM entries WHERE frq > 0")]
+
+    def prefix(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Headwords starting with ``prefix`` (case-insensitive), in key order."""
+        key = _key(prefix)
+        if not key or limit <= 0:
+            return []
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT word, phonetic, translation FROM entries WHERE key >= ? AND key < ? ORDER BY key LIMIT ?",
+                (key, key + _PREFIX_END, limit),
+            ).fetchall()
+        return [
+            {
+                "word": row["word"],
+                "phonetic": f"[{row['phonetic']}]" if row["phonetic"] else "",
+                "meaning": (row["translation"] or "").split("\n", 1)[0],
+            }
+            for row in rows
+        ]
+
+    def stats(self) -> dict:
+        return {"path": self.path, "entries": self.entry_count, "pool": self._pool.stats()}
+
+    def close(self) -> None:
+        self._pool.close()
+
+
+def build_offline_dict(csv_path: str, out_path: str) -> int:
+    """Build a store from an ECDICT-format CSV (replacing ``out_path``); returns the entry count."""
+    tmp_path = out_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        lemmas: Dict[Tuple[str, str], str] = {}
+        batch = []
+
+        def flush():
+            # 大小写不同的同名词条只保留一条，优先全小写的拼写
+            conn.executemany(
+                "INSERT INTO entries (key, word, phonetic, translation, definition, tag, frq) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET word = excluded.word, phonetic = excluded.phonetic, "
+                "translation = excluded.translation, definition = excluded.definition, "
+                "tag = excluded.tag, frq = excluded.frq WHERE excluded.word = excluded.key",
+                batch,
+            )
+            batch.clear()
+
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            for record in csv.DictReader(f):
+                word = (record.get("word") or "").strip()
+                key = _key(word)
+                if not key:
+                    continue
+                try:
+                    frq = int(record.get("frq") or 0)
+                except ValueError:
+                    frq = 0
+                batch.append((
+                    key, word, _text(record.get("phonetic")),
+                    clean_chinese_text(_text(record.get("translation"))),
+                    _text(record.get("definition")), _text(record.get("tag")), frq,
+                ))
+                for form, lemma, kinds in _exchange_pairs(key, record.get("exchange")):
+                    if form and lemma and form != lemma:
+                        merged = lemmas.get((form, lemma), "")
+                        lemmas[(form, lemma)] = merged + "".join(k for k in kinds if k not in merged)
+                if len(batch) >= _BATCH:
+                    flush()
+        flush()
+
+        conn.executemany(
+            "INSERT INTO lemmas (form, lemma, kinds) VALUES (?, ?, ?)",
+            ((form, lemma, kinds) for (form, lemma), kinds in sorted(lemmas.items())),
+        )
+        count = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [("schema_version", SCHEMA_VERSION), ("entries", str(count)), ("source", os.path.basename(csv_path))],
+        )
+        conn.commit()
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    os.replace(tmp_path, out_path)
+    return count
+
+
+_store: Optional[OfflineDict] = None
+_store_failed: Optional[str] = None
+_store_lock = threading.Lock()
+
+
+def _store_path() -> Optional[str]:
+    import config
+
+    for path in (config.OFFLINE_DICT_PATH, config.BUNDLED_OFFLINE_DICT_PATH):
+        if path and os.path.isfile(path):
+            return path
+    return None
+
+
+def get_offline_dict() -> Optional[OfflineDict]:
+    """共享的离线词库实例；没有词库或无法打开时返回 None（离线来源停用）。"""
+    global _store, _store_failed
+    if _store is not None:
+        return _store
+    path = _store_path()
+    if path is None or path == _store_failed:
+        return None
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = OfflineDict(path)
+            except (sqlite3.Error, ValueError) as e:
+                logger.error(f"Offline dictionary at {path} unavailable: {e}")
+                _store_failed = path
+                return None
+    return _store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the offline dictionary store.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a store from an ECDICT-format CSV")
+    build.add_argument("csv")
+    build.add_argument("--out", help="output path (default: config.OFFLINE_DICT_PATH)")
+    lookup = commands.add_parser("lookup", help="look a word up in a store")
+    lookup.add_argument("word")
+    lookup.add_argument("--store", help="store path (default: the one the app uses)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        import config
+
+        out = args.out or config.OFFLINE_DICT_PATH
+        print(f"{build_offline_dict(args.csv, out)} entries -> {out}")
+        return
+    store = OfflineDict(args.store) if args.store else get_offline_dict()
+    if store is None:
+        parser.error("no offline dictionary installed (build one first)")
+    print(json.dumps(store.lookup(args.word), ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,8 @@
 from collections import defaultdict, deque
+from contextlib import contextmanager
 from threading import Lock
-from time import time
-from typing import Deque, Dict, Iterable
+from time import perf_counter, time
+from typing import Deque, Dict, Iterable, Iterator
 import math
 
 
@@ -113,3 +114,27 @@ class RequestMetricsRecorder:
 
 
 request_metrics = RequestMetricsRecorder()
+
+# Per-query timings for hot repository queries, reported next to the request
+# timings so a query-level change can be measured on its own.
+query_metrics = RequestMetricsRecorder()
+
+
+@contextmanager
+def timed_query(name: str) -> Iterator[None]:
+    """Record the wall time of the enclosed DB work under ``name``."""
+    started_at = perf_counter()
+    status_code = 200
+    try:
+        yield
+    except Exception:
+        status_code = 500
+        raise
+    finally:
+        query_metrics.record(
+            bucket="db",
+            route=name,
+            method="SQL",
+            duration_ms=(perf_counter() - started_at) * 1000.0,
+            status_code=status_code,
+        )
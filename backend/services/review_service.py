@@ -1,86 +1,200 @@
-"""
-Review Service
-SM-2 复习算法实现
-"""
-from datetime import datetime, timedelta
-
-
+"""
+Review Service
+SM-2 复习算法实现
+"""
+import os
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+
+from services import fsrs
+
+
 class ReviewService:
-    @staticmethod
-    def calculate_sm2(quality, word_data):
-        """
-        SM-2 Algorithm
-        quality: 0-5
-        word_data: dict
-        Returns: (easiness, interval, repetitions)
-        """
-        easiness = word_data.get('easiness') or 2.5
-        interval = word_data.get('interval') or 0
-        repetitions = word_data.get('repetitions') or 0
-
-        # Compatibility with old stage-based data
-        if repetitions == 0 and word_data.get('stage', 0) > 0:
-            repetitions = word_data['stage']
-            stage = word_data['stage']
-            stage_intervals = [1, 2, 4, 7, 15, 30]
-            interval = stage_intervals[min(5, stage-1)] if stage <= 6 else 30
-
-        # 1. Update Easiness Factor
-        if quality >= 3:
-            easiness = easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
-
-        if easiness < 1.3:
-            easiness = 1.3
-
-        # 2. Update Repetitions and Interval
-        if quality < 3:
-            repetitions = 0
-            interval = 1
-        else:
-            if repetitions == 0:
-                interval = 1
-            elif repetitions == 1:
-                interval = 6
-            else:
-                interval = int(interval * easiness)
-
-            repetitions += 1
-
-        return easiness, interval, repetitions
-
-    @staticmethod
-    def calculate_next_review_time(interval, quality=None):
+    @staticmethod
+    def calculate_sm2(quality, word_data):
+        """
+        SM-2 Algorithm
+        quality: 0-5
+        word_data: dict
+        Returns: (easiness, interval, repetitions)
+        """
+        easiness = word_data.get('easiness') or 2.5
+        interval = word_data.get('interval') or 0
+        repetitions = word_data.get('repetitions') or 0
+
+        # Compatibility with old stage-based data
+        if repetitions == 0 and word_data.get('stage', 0) > 0:
+            repetitions = word_data['stage']
+            stage = word_data['stage']
+            stage_intervals = [1, 2, 4, 7, 15, 30]
+            interval = stage_intervals[min(5, stage-1)] if stage <= 6 else 30
+
+        # 1. Update Easiness Factor
+        if quality >= 3:
+            easiness = easiness + (0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+
+        if easiness < 1.3:
+            easiness = 1.3
+
+        # 2. Update Repetitions and Interval
+        if quality < 3:
+            repetitions = 0
+            interval = 1
+        else:
+            if repetitions == 0:
+                interval = 1
+            elif repetitions == 1:
+                interval = 6
+            else:
+                interval = int(interval * easiness)
+
+            repetitions += 1
+
+        return easiness, interval, repetitions
+
+    @staticmethod
+    def calculate_next_review_time(interval, quality=None, now=None):
         """
         Calculate next review timestamp.
         For low ratings, use short same-day retry windows (less aggressive than minute-level).
+        now: optional review timestamp (e.g. replayed offline reviews); defaults to the current time.
         """
+        base = datetime.fromtimestamp(now) if now is not None else datetime.now()
         if quality == 1:
-            return (datetime.now() + timedelta(hours=8)).timestamp()
+            return (base + timedelta(hours=8)).timestamp()
         if quality == 2:
-            return (datetime.now() + timedelta(hours=20)).timestamp()
-        return (datetime.now() + timedelta(days=interval)).timestamp()
-
-    @staticmethod
-    def calculate_simple_stage(ok, current_stage):
-        """
-        Simple fixed interval algorithm (for spelling mode)
-        Returns: (new_stage, next_ts, mastered)
-        """
-        INTERVALS = [1, 2, 4, 7, 15, 30]
-
-        if ok:
-            if current_stage < len(INTERVALS):
-                days = INTERVALS[current_stage]
-                next_ts = (datetime.now() + timedelta(days=days)).timestamp()
-                new_stage = current_stage + 1
-                mastered = False
-            else:
-                next_ts = 0
-                new_stage = current_stage + 1
-                mastered = True
-        else:
-            new_stage = 0
-            next_ts = 0
-            mastered = False
-
-        return new_stage, next_ts, mastered
+            return (base + timedelta(hours=20)).timestamp()
+        return (base + timedelta(days=interval)).timestamp()
+
+    @staticmethod
+    def calculate_simple_stage(ok, current_stage):
+        """
+        Simple fixed interval algorithm (for spelling mode)
+        Returns: (new_stage, next_ts, mastered)
+        """
+        INTERVALS = [1, 2, 4, 7, 15, 30]
+
+        if ok:
+            if current_stage < len(INTERVALS):
+                days = INTERVALS[current_stage]
+                next_ts = (datetime.now() + timedelta(days=days)).timestamp()
+                new_stage = current_stage + 1
+                mastered = False
+            else:
+                next_ts = 0
+                new_stage = current_stage + 1
+                mastered = True
+        else:
+            new_stage = 0
+            next_ts = 0
+            mastered = False
+
+        return new_stage, next_ts, mastered
+
+
+class ReviewScheduler(ABC):
+    """
+    复习调度器接口：根据评分和单词当前状态计算新的复习计划。
+    review() returns easiness, interval, repetitions, next_time, stability and
+    difficulty (the last two are None for schedulers that do not track them).
+    """
+    name = ""
+
+    @abstractmethod
+    def review(self, quality, word_data, now=None):
+        ...
+
+
+class SM2Scheduler(ReviewScheduler):
+    """SM-2（默认）"""
+    name = "sm2"
+
+    def review(self, quality, word_data, now=None):
+        easiness, interval, repetitions = ReviewService.calculate_sm2(quality, word_data)
+        return {
+            "easiness": easiness,
+            "interval": interval,
+            "repetitions": repetitions,
+            "next_time": ReviewService.calculate_next_review_time(interval, quality, now=now),
+            "stability": None,
+            "difficulty": None,
+        }
+
+
+class FSRSScheduler(ReviewScheduler):
+    """
+    FSRS 记忆模型（services.fsrs），权重可由 review_history 离线拟合。
+    Per review this is a constant-time formula on the word's stored
+    stability/difficulty and the time since its last review.
+    """
+    name = "fsrs"
+
+    def __init__(self, weights=None, desired_retention=0.9):
+        self.weights = tuple(weights) if weights else fsrs.DEFAULT_WEIGHTS
+        self.desired_retention = desired_retention
+
+    def review(self, quality, word_data, now=None):
+        now = time.time() if now is None else now
+        stability = word_data.get('fsrs_stability')
+        difficulty = word_data.get('fsrs_difficulty')
+        last_review = word_data.get('last_review_time')
+        if not stability and last_review and (word_data.get('interval') or 0) > 0:
+            # Word scheduled by SM-2 so far: its interval targets ~90% recall,
+            # which is what stability measures.
+            stability, difficulty = float(word_data['interval']), self.weights[4]
+
+        elapsed_days = max(0.0, (now - (last_review or now)) / 86400)
+        grade = fsrs.grade_for_quality(quality)
+        stability, difficulty = fsrs.review_state(self.weights, stability, difficulty, elapsed_days, grade)
+
+        repetitions = word_data.get('repetitions') or 0
+        if grade == 1:
+            # Failed recall: same short retry windows as SM-2
+            interval, repetitions = 1, 0
+            next_time = ReviewService.calculate_next_review_time(interval, quality, now=now)
+        else:
+            interval, repetitions = fsrs.interval_days(stability, self.desired_retention), repetitions + 1
+            next_time = ReviewService.calculate_next_review_time(interval, now=now)
+
+        return {
+            "easiness": word_data.get('easiness') or 2.5,
+            "interval": interval,
+            "repetitions": repetitions,
+            "next_time": next_time,
+            "stability": stability,
+            "difficulty": difficulty,
+        }
+
+
+_SM2_SCHEDULER = SM2Scheduler()
+_fsrs_scheduler_cache = {}
+
+
+def get_scheduler(weights_path=None):
+    """
+    Scheduler selected for this install: VOCABBOOK_SCHEDULER=sm2 (default) or fsrs.
+    FSRS uses the fitted weights cached at weights_path when present; the
+    instance is reused until that file changes (one stat per call).
+    """
+    name = os.environ.get("VOCABBOOK_SCHEDULER", "sm2").strip().lower()
+    if name != FSRSScheduler.name:
+        return _SM2_SCHEDULER
+
+    try:
+        mtime = os.path.getmtime(weights_path) if weights_path else None
+    except OSError:
+        mtime = None
+    key = (weights_path, mtime)
+    cached = _fsrs_scheduler_cache.get("fsrs")
+    if cached and cached[0] == key:
+        return cached[1]
+
+    payload = fsrs.load_weights_file(weights_path) if mtime is not None else None
+    try:
+        retention = float(os.environ.get("VOCABBOOK_FSRS_RETENTION", "0.9"))
+    except ValueError:
+        retention = 0.9
+    scheduler = FSRSScheduler(payload["weights"] if payload else None, min(0.99, max(0.7, retention)))
+    _fsrs_scheduler_cache["fsrs"] = (key, scheduler)
+    return scheduler
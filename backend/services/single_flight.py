@@ -0,0 +1,109 @@
+"""
+Single-flight coalescing for dictionary lookups.
+
+The dictionary caches are filled only after a fetch completes. When the UI
+and an import (or two browser tabs) ask for the same word at once, each
+caller used to miss the cache and send its own Youdao/Cambridge/Bing/
+FreeDict requests. ``SingleFlight.do(key, factory)`` lets the first caller
+for a key run the fetch. Callers that arrive while it is still running
+wait for the same result instead of starting another.
+
+Lookups run on the app's event loop and also on the short-lived loops of
+the sync wrappers (``run_dict_sync``, one per calling thread). The
+in-flight table is therefore guarded by a ``threading.Lock`` and holds
+``concurrent.futures.Future`` objects. Any loop can await them through
+``asyncio.wrap_future``.
+
+- If a waiter is cancelled (for example by its own per-source deadline),
+  only that waiter stops; the shared fetch keeps running.
+- If the leading caller is cancelled, the fetch is abandoned. A waiter
+  then retries and becomes the new leader.
+- If the fetch raises, every caller gets the exception.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Dict, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """Coalesce concurrent async calls that share a key.
+
+    Keys are tuples whose first element names the kind of lookup (``"word"``,
+    ``"cambridge"``, ...); counters are reported per kind.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[Tuple[Hashable, ...], Future] = {}
+        self._leaders: Dict[str, int] = defaultdict(int)
+        self._coalesced: Dict[str, int] = defaultdict(int)
+
+    async def do(self, key: Tuple[Hashable, ...], factory: Callable[[], Awaitable[T]]) -> T:
+        kind = str(key[0])
+        while True:
+            with self._lock:
+                shared = self._calls.get(key)
+                if shared is None:
+                    shared = self._calls[key] = Future()
+                    self._leaders[kind] += 1
+                    leader = True
+                else:
+                    self._coalesced[kind] += 1
+                    leader = False
+
+            if leader:
+                return await self._lead(key, shared, factory)
+
+            try:
+                # shield: a waiter's own cancellation must not cancel the shared future
+                return await asyncio.shield(asyncio.wrap_future(shared))
+            except asyncio.CancelledError:
+                if shared.cancelled() and not asyncio.current_task().cancelling():
+                    continue  # the leader gave up; retry (possibly as the new leader)
+                raise
+
+    async def _lead(self, key, shared: Future, factory):
+        try:
+            result = await factory()
+        except BaseException as exc:
+            self._finish(key)
+            if isinstance(exc, asyncio.CancelledError):
+                shared.cancel()
+            else:
+                shared.set_exception(exc)
+            raise
+        self._finish(key)
+        shared.set_result(result)
+        return result
+
+    def _finish(self, key) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = sorted(set(self._leaders) | set(self._coalesced))
+            by_kind = {
+                kind: {"fetches": self._leaders[kind], "coalesced": self._coalesced[kind]}
+                for kind in kinds
+            }
+            in_flight = len(self._calls)
+        return {
+            "in_flight": in_flight,
+            "fetches": sum(item["fetches"] for item in by_kind.values()),
+            "coalesced": sum(item["coalesced"] for item in by_kind.values()),
+            "by_kind": by_kind,
+        }
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._leaders.clear()
+            self._coalesced.clear()
+
+
+# Shared by DictService.search_word_async and the MultiDictService fetchers.
+dict_flights = SingleFlight()
@@ -0,0 +1,150 @@
+"""
+Vectorized SM-2 for bulk reschedules.
+
+Array counterpart of ReviewService.calculate_sm2 / calculate_next_review_time:
+same operations in the same order on float64/int64, so every result is
+bit-for-bit identical to running the scalar path word by word.
+"""
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from services.review_service import ReviewService
+
+# Legacy stage -> interval table used by the scalar compatibility branch.
+_STAGE_INTERVALS = np.array([1, 2, 4, 7, 15, 30], dtype=np.int64)
+
+
+def schedule_arrays(rows: Iterable[tuple]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Turn (easiness, interval, repetitions, stage) rows into SM-2 input arrays.
+
+    Applies the scalar path's defaults: missing/zero easiness is 2.5 and
+    missing interval, repetitions or stage are 0.
+    """
+    rows = list(rows)
+    easiness = np.array([r[0] or 2.5 for r in rows], dtype=np.float64)
+    interval = np.array([r[1] or 0 for r in rows], dtype=np.int64)
+    repetitions = np.array([r[2] or 0 for r in rows], dtype=np.int64)
+    stage = np.array([r[3] or 0 for r in rows], dtype=np.int64)
+    return easiness, interval, repetitions, stage
+
+
+def calculate_sm2_batch(
+    qualities,
+    easiness,
+    interval,
+    repetitions,
+    stage=None,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """SM-2 over arrays; returns (easiness, interval, repetitions).
+
+    ``qualities`` may be a scalar applied to every word. Inputs must already
+    carry the scalar defaults (see schedule_arrays).
+    """
+    easiness = np.asarray(easiness, dtype=np.float64)
+    interval = np.asarray(interval, dtype=np.int64)
+    repetitions = np.asarray(repetitions, dtype=np.int64)
+    stage = np.zeros_like(repetitions) if stage is None else np.asarray(stage, dtype=np.int64)
+    quality = np.broadcast_to(np.asarray(qualities, dtype=np.int64), easiness.shape)
+
+    # Compatibility with old stage-based data
+    legacy = (repetitions == 0) & (stage > 0)
+    legacy_interval = np.where(stage <= 6, _STAGE_INTERVALS[np.clip(stage - 1, 0, 5)], 30)
+    repetitions = np.where(legacy, stage, repetitions)
+    interval = np.where(legacy, legacy_interval, interval)
+
+    # 1. Update Easiness Factor
+    missed = 5 - quality
+    easiness = np.where(quality >= 3, easiness + (0.1 - missed * (0.08 + missed * 0.02)), easiness)
+    easiness = np.where(easiness < 1.3, 1.3, easiness)
+
+    # 2. Update Repetitions and Interval
+    grown = np.trunc(interval * easiness).astype(np.int64)
+    passed_interval = np.where(repetitions == 0, 1, np.where(repetitions == 1, 6, grown))
+    new_interval = np.where(quality < 3, 1, passed_interval)
+    new_repetitions = np.where(quality < 3, 0, repetitions + 1)
+    return easiness, new_interval, new_repetitions
+
+
+def calculate_next_review_times(intervals, qualities, now: Optional[float] = None) -> np.ndarray:
+    """Next review timestamps for arrays of SM-2 intervals and qualities.
+
+    Only a few distinct (interval, retry window) schedules exist in any batch,
+    so each is resolved once through the scalar function; that keeps local
+    calendar arithmetic (DST changes) identical to the per-word path.
+    """
+    now = time.time() if now is None else now
+    intervals, quality = np.broadcast_arrays(
+        np.asarray(intervals, dtype=np.int64),
+        np.asarray(qualities, dtype=np.int64),
+    )
+    if intervals.size == 0:
+        return np.empty(0, dtype=np.float64)
+    # Ratings 1 and 2 use fixed retry windows; the interval does not matter.
+    retry = np.where((quality == 1) | (quality == 2), quality, 0)
+    keys = np.stack([retry.ravel(), np.where(retry > 0, 0, intervals).ravel()], axis=1)
+    unique_keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+    times = np.array(
+        [
+            ReviewService.calculate_next_review_time(int(days), int(window) or None, now=now)
+            for window, days in unique_keys
+        ],
+        dtype=np.float64,
+    )
+    return times[inverse.ravel()].reshape(intervals.shape)
+
+
+def regrade_schedules(rows: list, quality: int, now: Optional[float] = None) -> list:
+    """Apply one SM-2 rating to every row of ReviewsRepository.reschedule.
+
+    Returns (easiness, interval, repetitions, next_review_time, mastered)
+    tuples, with mastered following the same interval > 180 rule as a review.
+    """
+    easiness, interval, repetitions, stage = schedule_arrays(r[2:6] for r in rows)
+    easiness, interval, repetitions = calculate_sm2_batch(quality, easiness, interval, repetitions, stage)
+    next_times = calculate_next_review_times(interval, quality, now=now)
+    mastered = (interval > 180).astype(np.int64)
+    return list(zip(
+        easiness.tolist(), interval.tolist(), repetitions.tolist(), next_times.tolist(), mastered.tolist(),
+    ))
+
+
+def shift_schedules(rows: list, shift_days: float) -> list:
+    """Move every scheduled review by ``shift_days`` (e.g. after a vacation).
+
+    Unscheduled words (next_review_time 0) stay new; everything else keeps its
+    SM-2 state.
+    """
+    next_times = np.array([r[6] or 0 for r in rows], dtype=np.float64)
+    next_times = np.where(next_times > 0, next_times + shift_days * 86400, next_times)
+    return [
+        (r[2], r[3], r[4], next_time, r[7])
+        for r, next_time in zip(rows, next_times.tolist())
+    ]
+
+
+def forecast_reviews(rows: list, rating_weights: Dict[int, float], edges, now: Optional[float] = None) -> np.ndarray:
+    """Expected follow-up reviews per day if every due card is reviewed at ``now``.
+
+    ``rows`` are (easiness, interval, repetitions, stage, count) groups of the
+    cards due today; each rating q is applied to all of them and the resulting
+    review times are counted into the ``[edges[i], edges[i + 1])`` buckets
+    with weight ``count * rating_weights[q]`` (the user's recent rating mix).
+    Reviews that land beyond the last edge are dropped.
+    """
+    edges = np.asarray(edges, dtype=np.float64)
+    expected = np.zeros(max(0, edges.size - 1), dtype=np.float64)
+    if not rows or expected.size == 0:
+        return expected
+    easiness, interval, repetitions, stage = schedule_arrays(rows)
+    counts = np.array([r[4] for r in rows], dtype=np.float64)
+    for quality, weight in rating_weights.items():
+        if weight <= 0:
+            continue
+        _, new_interval, _ = calculate_sm2_batch(quality, easiness, interval, repetitions, stage)
+        times = calculate_next_review_times(new_interval, quality, now=now)
+        buckets = np.searchsorted(edges, times, side="right") - 1
+        inside = (buckets >= 0) & (buckets < expected.size)
+        expected += weight * np.bincount(buckets[inside], weights=counts[inside], minlength=expected.size)
+    return expected
@@ -0,0 +1,190 @@
+"""
+In-process prefix index behind the search box's suggestions.
+
+Holds every word that can be suggested: the user's saved words, the words in
+``dict_cache`` (looked up before), and the ranked words of the offline
+dictionary when one is installed. Keys are lower-cased and kept in a sorted
+array, so the candidates for a prefix are one bisection away.
+
+Ranking: saved words first, then by corpus frequency (ECDICT ``frq``, a
+rank where smaller is more common; 0 means unknown), then words looked up
+before, then shorter words. Short prefixes match thousands of keys. The
+top ``TOP_K`` of every prefix with more than ``SCAN_LIMIT`` matches is
+therefore memoized when the index is loaded. Narrower prefixes rank their
+matches directly. Either way a query touches at most ~SCAN_LIMIT keys.
+
+Loaded lazily from the database and updated by the repositories after each
+committed write that adds or deletes a word (like services.due_queue).
+"""
+import heapq
+import threading
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# (word, saved, looked up before, frequency rank) as yielded by the loader.
+SuggestSource = Tuple[str, bool, bool, int]
+
+TOP_K = 20
+SCAN_LIMIT = 256
+_NO_FREQUENCY = 1 << 30
+# 比任何有效字符都大：前缀范围的上界
+_PREFIX_END = "\U0010ffff"
+
+
+def _key(word: str) -> str:
+    return (word or "").strip().lower()
+
+
+class SuggestIndex:
+    """Thread-safe sorted word index with per-prefix top-k memos."""
+
+    def __init__(self, loader: Callable[[], Iterable[SuggestSource]]) -> None:
+        self._loader = loader
+        self._lock = threading.RLock()
+        self._keys: List[str] = []
+        # key -> (display word, saved, looked up, frequency rank). Tuples of
+        # plain values are untracked by the GC, so a large index adds no
+        # collection pauses.
+        self._entries: Dict[str, SuggestSource] = {}
+        self._ranks: Dict[str, tuple] = {}
+        self._top: Dict[str, List[str]] = {}
+        self._loaded = False
+        self._version = 0
+
+    @staticmethod
+    def _rank(key: str, entry: SuggestSource) -> tuple:
+        _, saved, cached, frequency = entry
+        return (not saved, frequency or _NO_FREQUENCY, not cached, len(key), key)
+
+    @staticmethod
+    def _merged(entry: Optional[SuggestSource], word: str, saved: bool, cached: bool, frequency: int) -> SuggestSource:
+        if entry is None:
+            return (word, bool(saved), bool(cached), frequency or 0)
+        display, was_saved, was_cached, known = entry
+        if frequency and (not known or frequency < known):
+            known = frequency
+        # 生词本里的拼写优先
+        return (word if saved and not was_saved else display, was_saved or bool(saved), was_cached or bool(cached), known)
+
+    def _range(self, prefix: str) -> List[str]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _PREFIX_END, lo)
+        return self._keys[lo:hi]
+
+    def _rank_prefix(self, prefix: str, limit: int) -> List[str]:
+        return heapq.nsmallest(limit, self._range(prefix), key=self._ranks.__getitem__)
+
+    def _ensure_loaded(self) -> None:
+        # Caller holds self._lock.
+        if self._loaded:
+            return
+        entries: Dict[str, SuggestSource] = {}
+        for word, saved, cached, frequency in self._loader():
+            word = (word or "").strip()
+            key = word.lower()
+            if key:
+                entries[key] = self._merged(entries.get(key), word, saved, cached, frequency)
+        self._entries = entries
+        self._ranks = {key: self._rank(key, entry) for key, entry in entries.items()}
+        self._keys = sorted(entries)
+        # Memoize level by level: only prefixes of wide prefixes can be wide.
+        self._top = {}
+        wide, depth = {""}, 1
+        while wide:
+            counts = Counter(key[:depth] for key in self._keys if len(key) >= depth and key[:depth - 1] in wide)
+            wide = {prefix for prefix, count in counts.items() if count > SCAN_LIMIT}
+            for prefix in wide:
+                self._top[prefix] = self._rank_prefix(prefix, TOP_K)
+            depth += 1
+        self._loaded = True
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def invalidate(self) -> None:
+        """Drop the index; the next read reloads it."""
+        with self._lock:
+            self._keys, self._entries, self._ranks, self._top = [], {}, {}, {}
+            self._loaded = False
+            self._version += 1
+
+    # ------------------------------------------------------------------
+    # Updates (call after the corresponding DB write has committed)
+    # ------------------------------------------------------------------
+
+    def add(self, word: str, saved: bool = False, cached: bool = False, frequency: int = 0) -> None:
+        """Add ``word`` or raise its rank (saved / looked up / more frequent)."""
+        with self._lock:
+            self._version += 1
+            if not self._loaded:
+                return  # the lazy load will read the committed row
+            word = (word or "").strip()
+            key = word.lower()
+            if not key:
+                return
+            if key not in self._entries:
+                insort(self._keys, key)
+            self._entries[key] = entry = self._merged(self._entries.get(key), word, saved, cached, frequency)
+            self._ranks[key] = rank = self._rank(key, entry)
+            for n in range(1, len(key) + 1):
+                top = self._top.get(key[:n])
+                if top is None:
+                    continue
+                if key in top:
+                    top.remove(key)
+                elif len(top) >= TOP_K and rank >= self._ranks[top[-1]]:
+                    continue
+                top.insert(bisect_left(top, rank, key=self._ranks.__getitem__), key)
+                del top[TOP_K:]
+
+    def remove_saved(self, word: str) -> None:
+        """``word`` was deleted from the word book; it stays suggestible only if it has another source."""
+        with self._lock:
+            self._version += 1
+            key = _key(word)
+            entry = self._entries.get(key) if self._loaded else None
+            if entry is None or not entry[1]:
+                return
+            entry = (entry[0], False, entry[2], entry[3])
+            if entry[2] or entry[3]:
+                self._entries[key] = entry
+                self._ranks[key] = self._rank(key, entry)
+            else:
+                del self._entries[key]
+                del self._ranks[key]
+                del self._keys[bisect_left(self._keys, key)]
+            for n in range(1, len(key) + 1):
+                prefix = key[:n]
+                if key in self._top.get(prefix, ()):
+                    self._top[prefix] = self._rank_prefix(prefix, TOP_K)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[dict]:
+        """Up to ``limit`` (at most TOP_K) ranked words starting with ``prefix``, case-insensitive."""
+        key = _key(prefix)
+        limit = min(limit, TOP_K)
+        if not key or limit <= 0:
+            return []
+        with self._lock:
+            self._ensure_loaded()
+            top = self._top.get(key)
+            keys = top[:limit] if top is not None else self._rank_prefix(key, limit)
+            return [{"word": self._entries[k][0], "saved": self._entries[k][1]} for k in keys]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "words": len(self._keys),
+                "memoized_prefixes": len(self._top),
+                "version": self._version,
+            }
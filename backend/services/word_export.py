@@ -0,0 +1,194 @@
+"""
+Streaming export of the whole word book.
+
+``GET /api/words/all`` builds every row as a dict and returns one JSON body,
+so memory grows with the size of the book. This module streams instead. It
+pulls the book in fixed-size chunks from ``DatabaseManager.iter_all_words``
+(a ``fetchmany`` cursor), with each pull running on the DB executor. Each
+chunk is encoded and yielded before the next one is read, so memory stays
+bounded by the chunk size, not the book size.
+
+Formats:
+
+- ``ndjson``: one word object per line.
+- ``json``: ``{"words": [...], "total": N}``, the same shape as
+  ``/api/words/all``, written incrementally.
+- ``csv``: a ``#word,meaning,phonetic,...`` header. The first three columns
+  match the CSV importer, so an export can be re-imported.
+- ``anki``: tab-separated notes with Anki's ``#separator``/``#tags column``
+  file headers.
+"""
+import csv
+import io
+import json
+import threading
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Iterator, Optional
+
+from services.blocking_io import run_db_blocking
+
+CHUNK_SIZE = 500
+
+CSV_COLUMNS = (
+    "word", "meaning", "phonetic", "example", "tags", "roots", "synonyms",
+    "context_en", "context_cn", "note", "date", "mastered", "review_count",
+)
+
+# Anki note fields, in order; tags go in the last column.
+ANKI_FIELDS = ("word", "phonetic", "meaning", "example", "context_en", "context_cn")
+
+
+def _dumps(value) -> str:
+    # Same separators/escaping as FastAPI's JSONResponse.
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+class _Encoder(ABC):
+    media_type = "application/octet-stream"
+    extension = "txt"
+
+    def header(self) -> str:
+        return ""
+
+    @abstractmethod
+    def chunk(self, words: list[dict], first: bool) -> str:
+        ...
+
+    def footer(self, total: int) -> str:
+        return ""
+
+
+class _NDJSONEncoder(_Encoder):
+    media_type = "application/x-ndjson"
+    extension = "ndjson"
+
+    def chunk(self, words, first):
+        return "".join(_dumps(w) + "\n" for w in words)
+
+
+class _JSONEncoder(_Encoder):
+    media_type = "application/json"
+    extension = "json"
+
+    def header(self):
+        return '{"words":['
+
+    def chunk(self, words, first):
+        body = ",".join(_dumps(w) for w in words)
+        return body if first else "," + body
+
+    def footer(self, total):
+        return f'],"total":{total}}}'
+
+
+class _CSVEncoder(_Encoder):
+    media_type = "text/csv; charset=utf-8"
+    extension = "csv"
+
+    def _rows(self, rows) -> str:
+        buf = io.StringIO()
+        csv.writer(buf, lineterminator="\n").writerows(rows)
+        return buf.getvalue()
+
+    def header(self):
+        # "#" makes the importer skip the header row on re-import.
+        return self._rows([("#" + CSV_COLUMNS[0],) + CSV_COLUMNS[1:]])
+
+    def chunk(self, words, first):
+        return self._rows(
+            [int(w[col]) if col == "mastered" else w.get(col, "") for col in CSV_COLUMNS]
+            for w in words
+        )
+
+
+class _AnkiEncoder(_Encoder):
+    media_type = "text/plain; charset=utf-8"
+    extension = "txt"
+
+    @staticmethod
+    def _field(value) -> str:
+        # Tabs separate fields and newlines separate notes; with #html:true
+        # line breaks inside a field are written as <br>.
+        return str(value or "").replace("\t", " ").replace("\r\n", "<br>").replace("\n", "<br>")
+
+    @staticmethod
+    def _tags(tags: str) -> str:
+        # Anki tags are space-separated and cannot contain spaces.
+        return " ".join(t.strip().replace(" ", "_") for t in (tags or "").split(",") if t.strip())
+
+    def header(self):
+        return f"#separator:tab\n#html:true\n#tags column:{len(ANKI_FIELDS) + 1}\n"
+
+    def chunk(self, words, first):
+        return "".join(
+            "\t".join([self._field(w.get(f)) for f in ANKI_FIELDS] + [self._tags(w.get("tags"))]) + "\n"
+            for w in words
+        )
+
+
+EXPORT_FORMATS = {
+    "ndjson": _NDJSONEncoder,
+    "json": _JSONEncoder,
+    "csv": _CSVEncoder,
+    "anki": _AnkiEncoder,
+}
+
+
+def get_encoder(fmt: str) -> _Encoder:
+    try:
+        return EXPORT_FORMATS[fmt]()
+    except KeyError:
+        raise ValueError(f"Unsupported export format: {fmt}") from None
+
+
+class _ChunkReader:
+    """Serialises access to the chunk generator.
+
+    Each pull runs on whichever DB executor thread is free, and ``close()``
+    may arrive while a pull is still in flight (client disconnected), so the
+    generator is never resumed from two threads at once.
+    """
+
+    def __init__(self, chunks: Iterator[list[dict]], encoder: _Encoder) -> None:
+        self._chunks = chunks
+        self._encoder = encoder
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def read(self) -> Optional[str]:
+        """Fetch and encode the next chunk; None when the book is exhausted."""
+        with self._lock:
+            words = next(self._chunks, None)
+            if words is None:
+                return None
+            first = self.total == 0
+            self.total += len(words)
+            return self._encoder.chunk(words, first)
+
+    def close(self) -> None:
+        with self._lock:
+            self._chunks.close()
+
+
+async def stream_words(
+    db,
+    fmt: str,
+    chunk_size: Optional[int] = None,
+) -> AsyncIterator[str]:
+    """Async iterator of encoded export text, suitable for StreamingResponse."""
+    encoder = get_encoder(fmt)
+    reader = _ChunkReader(db.iter_all_words(chunk_size or CHUNK_SIZE), encoder)
+    try:
+        header = encoder.header()
+        if header:
+            yield header
+        while True:
+            part = await run_db_blocking(reader.read)
+            if part is None:
+                break
+            yield part
+        footer = encoder.footer(reader.total)
+        if footer:
+            yield footer
+    finally:
+        await run_db_blocking(reader.close)
@@ -0,0 +1,87 @@
+"""
+Tests for compressed dict_cache payloads (utils.cache_codec) and their migration.
+"""
+import json
+
+import pytest
+
+from models.database import DatabaseManager
+from utils.cache_codec import PAYLOAD_JSON, PAYLOAD_ZLIB_V1, decode_payload, encode_payload
+
+CAMBRIDGE_ENTRY = {
+    "source": "cambridge",
+    "source_name": "剑桥词典 (Cambridge)",
+    "word": "snag",
+    "phonetic": "US /snæɡ/",
+    "meaning": "• a problem, difficulty, or disadvantage 问题；障碍；不利因素\n"
+               "• a sharp or rough part of something that sticks out 尖利突出物",
+    "example": "The only snag is that I don't have enough money.\n唯一的问题是我没有足够的钱。",
+}
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "codec.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def test_round_trip_and_formats():
+    payload, fmt, raw_size = encode_payload(CAMBRIDGE_ENTRY)
+    assert fmt == PAYLOAD_ZLIB_V1 and isinstance(payload, bytes)
+    assert len(payload) < raw_size * 0.7
+    assert decode_payload(payload, fmt) == CAMBRIDGE_ENTRY
+
+    tiny, fmt, _ = encode_payload({"a": 1})
+    assert fmt == PAYLOAD_JSON and decode_payload(tiny, fmt) == {"a": 1}
+    assert decode_payload('{"legacy": "行"}', None) == {"legacy": "行"}
+
+    with pytest.raises(ValueError):
+        decode_payload(b"not zlib", PAYLOAD_ZLIB_V1)
+    with pytest.raises(ValueError):
+        decode_payload(payload, 99)
+
+
+def test_repository_stores_blobs_and_reports_savings(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.set_dict_cache("snag", "cambridge", dict(CAMBRIDGE_ENTRY))
+        assert db.get_dict_cache("snag", "cambridge") == CAMBRIDGE_ENTRY
+        kind = db.execute("SELECT typeof(data) FROM dict_cache", fetch=True, commit=False)
+        assert kind == [("blob",)]
+
+        db.execute("UPDATE dict_cache SET data = x'00' WHERE word = 'snag'")
+        assert db.get_dict_cache("snag", "cambridge") is None  # corrupt payload reads as a miss
+
+        db.set_dict_cache("snag", "cambridge", dict(CAMBRIDGE_ENTRY))
+        stats = db.get_dict_cache_stats()
+        assert stats["total"] == 1 and stats["compressed"] == 1
+        assert stats["bytes_saved"] == stats["raw_bytes"] - stats["stored_bytes"] > 0
+    finally:
+        db.close_all_connections()
+
+
+def test_startup_migration_recompresses_legacy_rows(tmp_path):
+    db = _make_db(tmp_path)
+    legacy = json.dumps(CAMBRIDGE_ENTRY, ensure_ascii=False)
+    for i in range(7):
+        db.execute(
+            "INSERT INTO dict_cache (word, source, data, created_at, normalized_version) VALUES (?, 'cambridge', ?, 9e9, 1)",
+            (f"w{i}", legacy),
+        )
+    db.execute(
+        "INSERT INTO dict_cache (word, source, data, created_at, normalized_version) VALUES ('bad', 'bing', 'not json', 9e9, 1)"
+    )
+    db.close_all_connections()
+
+    db = _make_db(tmp_path)
+    try:
+        rows = db.execute(
+            "SELECT payload_format, COUNT(*) FROM dict_cache GROUP BY payload_format ORDER BY payload_format",
+            fetch=True, commit=False,
+        )
+        assert rows == [(PAYLOAD_JSON, 1), (PAYLOAD_ZLIB_V1, 7)]  # the unreadable row is left alone
+        assert db.get_dict_cache("w3", "cambridge") == CAMBRIDGE_ENTRY
+        assert db.execute("PRAGMA freelist_count", fetch=True, commit=False) == [(0,)]  # VACUUMed
+        assert db.get_dict_cache_stats()["bytes_saved"] > 0
+
+        assert db.compress_dict_cache(batch_size=3) == 0  # nothing left to convert
+    finally:
+        db.close_all_connections()
@@ -0,0 +1,92 @@
+"""
+Tests for the bounded read-only connection pool (models.db_pool).
+"""
+import sqlite3
+import threading
+
+import pytest
+
+from models.database import DatabaseManager
+from models.db_pool import PoolTimeout, ReadConnectionPool
+
+
+def _pool(tmp_path, **kwargs):
+    path = str(tmp_path / "pool.db")
+    sqlite3.connect(path).close()
+    return ReadConnectionPool(lambda: sqlite3.connect(path, check_same_thread=False), **kwargs)
+
+
+def test_checkout_is_bounded_and_waits_for_return(tmp_path):
+    pool = _pool(tmp_path, max_size=1)
+    try:
+        with pool.connection() as first:
+            with pytest.raises(PoolTimeout):
+                pool.acquire(timeout=0.05)
+
+            got = []
+            waiter = threading.Thread(target=lambda: got.append(pool.acquire(timeout=5)))
+            waiter.start()
+            threading.Event().wait(0.1)
+        waiter.join(5)
+
+        assert got == [first]  # the returned connection is handed to the waiter
+        stats = pool.stats()
+        assert stats["opened"] == 1 and stats["in_use"] == 1
+        assert stats["waits"] >= 1 and stats["timeouts"] == 1 and stats["peak_in_use"] == 1
+    finally:
+        pool.close()
+
+
+def test_dead_thread_leases_are_reclaimed(tmp_path):
+    pool = _pool(tmp_path, max_size=2)
+    try:
+        for _ in range(5):
+            worker = threading.Thread(target=lambda: pool.acquire(owner=threading.current_thread()))
+            worker.start()
+            worker.join()
+
+        # Five short-lived threads leaked their leases, but the pool never grew past two.
+        with pool.connection(timeout=1), pool.connection(timeout=1):
+            assert pool.stats()["open"] == 2
+        assert pool.stats()["reaped_dead_threads"] >= 3
+    finally:
+        pool.close()
+
+
+def test_idle_connections_are_closed(tmp_path):
+    pool = _pool(tmp_path, max_size=3, min_idle=1, idle_timeout=0)
+    try:
+        conns = [pool.acquire() for _ in range(3)]
+        for conn in conns:
+            pool.release(conn)
+        pool.reap()
+
+        stats = pool.stats()
+        assert stats["idle"] == 1 and stats["reaped_idle"] == 2
+    finally:
+        pool.close()
+
+
+def test_database_manager_leases_read_connections_from_pool(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "vocab.db"), json_path=str(tmp_path / "missing.json"), read_pool_size=2)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        conn = db.get_connection()
+        assert db.get_connection() is conn
+        assert conn.execute("PRAGMA query_only").fetchone()[0] == 1
+        assert conn.execute("PRAGMA temp_store").fetchone()[0] == 2  # MEMORY
+
+        for _ in range(4):
+            worker = threading.Thread(target=lambda: db.get_word("alpha"))
+            worker.start()
+            worker.join()
+        with db.read_connection() as other:
+            assert other.execute("SELECT COUNT(*) FROM words").fetchone()[0] == 1
+
+        stats = db.pool_stats()
+        assert stats["open"] <= 2 and stats["writer_transactions"] >= 1
+        db.release_connection()
+        db._read_pool.reap()
+        assert db.pool_stats()["in_use"] == 0
+    finally:
+        db.close_all_connections()
@@ -0,0 +1,139 @@
+"""
+Tests for the single-writer thread (models.db_writer) behind DatabaseManager.write.
+"""
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from models.database import DatabaseManager
+from models.db_writer import DatabaseWriter
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "writer.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def test_concurrent_writes_are_group_committed(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        transactions_before = db._writer.transactions
+        gate = threading.Event()
+
+        def slow_first(conn):
+            gate.wait(5)  # hold the writer so the other writes queue up behind it
+            conn.execute("INSERT INTO translations (source_text, target_text, source_lang, target_lang) VALUES ('a', 'b', 'en', 'zh')")
+
+        first = db.submit_write(slow_first)
+        with ThreadPoolExecutor(max_workers=40) as pool:
+            futures = [pool.submit(db.add_word, {"word": f"w{i}", "meaning": "m"}) for i in range(40)]
+            deadline = time.monotonic() + 5
+            while db._writer._queue.qsize() < 40 and time.monotonic() < deadline:
+                time.sleep(0.005)
+            gate.set()
+            assert all(f.result(timeout=10) for f in futures)
+        first.result(timeout=10)
+
+        assert db.get_words_count() == 40
+        # 41 writes, but everything queued behind the first commit shares a transaction.
+        assert db._writer.transactions - transactions_before <= 3
+        assert db.reviews.check_due_queue() == []
+    finally:
+        db.close_all_connections()
+
+
+def test_failed_write_rolls_back_alone(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        gate = threading.Event()
+        blocker = db.submit_write(lambda conn: gate.wait(5))
+
+        def broken(conn):
+            conn.execute("INSERT INTO words (word, meaning) VALUES ('half', 'done')")
+            raise ValueError("boom")
+
+        ok_before = db.submit_write(lambda conn: conn.execute("INSERT INTO words (word) VALUES ('before')"))
+        failed = db.submit_write(broken)
+        ok_after = db.submit_write(lambda conn: conn.execute("INSERT INTO words (word) VALUES ('after')"))
+        gate.set()
+
+        blocker.result(timeout=5)
+        ok_before.result(timeout=5)
+        ok_after.result(timeout=5)
+        with pytest.raises(ValueError, match="boom"):
+            failed.result(timeout=5)
+        words = {row[0] for row in db.execute("SELECT word FROM words", fetch=True, commit=False)}
+        assert words == {"before", "after"}
+        assert db.add_word({"word": "before", "meaning": "dup"}) is False  # IntegrityError still maps to False
+    finally:
+        db.close_all_connections()
+
+
+def test_nested_writes_and_on_commit_order(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        events = []
+
+        def outer(conn):
+            conn.execute("INSERT INTO words (word) VALUES ('outer')")
+            db.on_commit(lambda: events.append("outer committed"))
+            # A repository write called from inside a closure joins the open transaction.
+            db.add_word({"word": "inner", "meaning": "m"})
+            # Reads inside the closure see its own uncommitted rows.
+            events.append(db.get_word("inner")["word"])
+            return "done"
+
+        assert db.write(outer) == "done"
+        assert events == ["inner", "outer committed"]
+        assert db.get_word("outer") is not None
+        with pytest.raises(RuntimeError):
+            db.on_commit(lambda: None)
+    finally:
+        db.close_all_connections()
+
+
+def test_read_connections_are_read_only(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        with pytest.raises(sqlite3.OperationalError, match="readonly"):
+            db.get_connection().execute("INSERT INTO words (word) VALUES ('sneaky')")
+    finally:
+        db.close_all_connections()
+
+
+def test_writer_restarts_after_close(tmp_path):
+    writer = DatabaseWriter(lambda: sqlite3.connect(str(tmp_path / "plain.db"), check_same_thread=False))
+    writer.run(lambda conn: conn.execute("CREATE TABLE t (x INTEGER)"))
+    writer.close()
+    writer.run(lambda conn: conn.execute("INSERT INTO t VALUES (1)"))
+    assert writer.run(lambda conn: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]) == 1
+    writer.close()
+
+
+def test_standalone_work_runs_between_group_commits(tmp_path):
+    writer = DatabaseWriter(lambda: sqlite3.connect(str(tmp_path / "plain.db"), check_same_thread=False))
+    try:
+        writer.run(lambda conn: conn.execute("CREATE TABLE t (x INTEGER)"))
+        gate = threading.Event()
+        first = writer.submit(lambda conn: (gate.wait(5), conn.execute("INSERT INTO t VALUES (1)")))
+        queued = [writer.submit(lambda conn: conn.execute("INSERT INTO t VALUES (2)")) for _ in range(3)]
+
+        def vacuum(conn):
+            assert not conn.in_transaction  # VACUUM fails inside a transaction
+            conn.execute("VACUUM")
+            return conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]
+
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            standalone = pool.submit(writer.run_standalone, vacuum)
+            time.sleep(0.05)
+            assert not standalone.done()  # waits for the writes queued ahead of it
+            gate.set()
+            assert standalone.result(timeout=10) == 4
+        first.result(timeout=10)
+        assert all(f.result(timeout=10) for f in queued)
+        writer.run(lambda conn: conn.execute("INSERT INTO t VALUES (3)"))  # group commits resume
+        assert writer.run(lambda conn: conn.execute("SELECT COUNT(*) FROM t").fetchone()[0]) == 5
+    finally:
+        writer.close()
@@ -0,0 +1,37 @@
+"""
+Smoke test for the offline dictionary lookup benchmark (benchmarks.dict_lookup).
+"""
+import httpx
+import pytest
+
+from benchmarks import dict_lookup
+from services import multi_dict_service
+
+
+def test_replay_benchmark_runs_offline():
+    corpus = dict_lookup.ResponseCorpus.synthetic(12)
+    saved_db = multi_dict_service._db_manager
+
+    report = dict_lookup.run(corpus, allocations=True)
+
+    assert multi_dict_service._db_manager is saved_db
+    assert set(report) == {
+        "youdao", "cambridge", "bing", "freedict", "get_all_examples",
+        "aggregate (warm)", "search_word (warm)", "aggregate (cold)",
+    }
+    for row in report.values():
+        assert row["count"] == 12
+        assert row["p50_ms"] <= row["p99_ms"] <= row["max_ms"]
+        assert row["alloc_kb_per_call"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_replay_transport_serves_the_corpus_only():
+    corpus = dict_lookup.ResponseCorpus.synthetic(3)
+    word = corpus.words[0]
+    async with httpx.AsyncClient(transport=dict_lookup.replay_transport(corpus)) as client:
+        resp = await client.get(dict_lookup.SOURCE_URLS["bing"].format(word=word))
+        assert resp.text == corpus.get("bing", word)[1]
+        assert (await client.get(dict_lookup.SOURCE_URLS["freedict"].format(word="zzz"))).status_code == 404
+        with pytest.raises(RuntimeError):
+            await client.get("https://example.com/")
@@ -0,0 +1,101 @@
+"""
+Tests for the unified dictionary cache (services.dict_cache).
+"""
+import asyncio
+import time
+
+import httpx
+
+from models.database import DatabaseManager
+from services import multi_dict_service
+from services.dict_cache import DictCache, estimate_size
+from services.dict_service import DictService
+from services.multi_dict_service import MultiDictService
+
+
+def test_memory_tier_is_bounded_by_bytes_and_lru():
+    small = {"meaning": "x"}
+    size = estimate_size(small)
+    cache = DictCache({}, lambda: None, max_bytes=size * 5)
+
+    for i in range(10):
+        cache.put_memory(f"word_{i}", "youdao", small)
+    assert len(cache) == 5 and cache.stats()["memory"]["bytes"] <= size * 5
+    assert ("word_0", "youdao") not in cache and ("word_9", "youdao") in cache
+
+    # Touching an entry refreshes its LRU position.
+    assert cache.get("word_5", "youdao") == small
+    cache.put_memory("word_new", "youdao", small)
+    assert ("word_5", "youdao") in cache and ("word_6", "youdao") not in cache
+
+    # One large entry pushes out several small ones.
+    cache.put_memory("big", "cambridge", {"meaning": "y" * (size * 6)})
+    assert ("big", "cambridge") not in cache  # larger than the whole budget
+    cache.put_memory("big", "cambridge", {"meaning": "y" * (size * 2)})
+    assert ("big", "cambridge") in cache and len(cache) <= 3
+    assert cache.stats()["memory"]["evictions"] >= 8
+
+
+def test_read_through_and_counters(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "cache.db"), json_path=str(tmp_path / "missing.json"))
+    cache = DictCache({"bing": (100, 1000)}, lambda: db)
+    try:
+        assert cache.lookup("snag", "bing") == (None, False)
+        cache.set("Snag", "bing", {"meaning": "小 问题"})
+        cache.clear_memory()
+
+        assert cache.lookup("snag", "bing") == ({"meaning": "小问题"}, False)  # from SQLite
+        assert cache.lookup("SNAG", "bing") == ({"meaning": "小问题"}, False)  # now from memory
+
+        db.write(lambda conn: conn.execute("UPDATE dict_cache SET created_at = created_at - 500"))
+        cache.clear_memory()
+        assert cache.lookup("snag", "bing") == ({"meaning": "小问题"}, True)
+        assert cache.lookup("snag", "bing")[1] is True  # memory copy keeps the row's age
+
+        stats = cache.stats()
+        assert stats["writes"] == 1
+        assert stats["memory"]["hits"] == 1 and stats["memory"]["stale_hits"] == 1
+        assert stats["memory"]["misses"] == 3
+        assert stats["db"] == {"hits": 1, "stale_hits": 1, "misses": 1, "errors": 0}
+    finally:
+        db.close_all_connections()
+
+
+def test_word_lookup_is_assembled_from_source_entries(monkeypatch):
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: None)
+    MultiDictService.cache.clear_memory()
+    requests = []
+
+    def handler(request):
+        requests.append(str(request.url))
+        return httpx.Response(404)
+
+    now = time.time()
+    MultiDictService.cache.put_memory("snag", "youdao", {
+        "word": "snag", "phonetic": "/snæɡ/", "meaning": "n. 障碍", "example": "", "roots": "",
+        "synonyms": "", "tags": "", "word_families": [], "date": "2020-01-01",
+    }, stored_at=now)
+    MultiDictService.cache.put_memory("snag", "cambridge", {
+        "source": "cambridge", "source_name": "Cambridge", "word": "snag",
+        "phonetic": "US /snæɡ/", "meaning": "a problem", "example": "We hit a snag.",
+    }, stored_at=now)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            first = await DictService.search_word_async("snag", ["cambridge"], client)
+            second = await DictService.search_word_async("snag", ["cambridge"], client)
+            return first, second
+
+    try:
+        first, second = asyncio.run(run())
+        youdao_entry = MultiDictService.get_cached("snag", "youdao")
+    finally:
+        MultiDictService.cache.clear_memory()
+
+    assert requests == []
+    assert first == second and first is not second
+    assert first["meaning"] == "n. 障碍" and first["phonetic"] == "US /snæɡ/"
+    assert first["example"] == "• We hit a snag."
+    assert set(first["sources_data"]) == {"youdao", "cambridge"}
+    # The cached per-source entries were not modified by the enrichment.
+    assert youdao_entry["phonetic"] == "/snæɡ/" and "sources_data" not in youdao_entry
@@ -0,0 +1,90 @@
+"""
+Tests for the in-memory due queue owned by ReviewsRepository.
+"""
+import time
+
+from models.database import DatabaseManager
+from services.due_queue import DueQueue
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "due.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def _sql_due(db, now_ts):
+    rows = db.execute(
+        "SELECT word FROM words WHERE next_review_time = 0 OR (next_review_time > 0 AND next_review_time <= ?) "
+        "ORDER BY next_review_time, id",
+        (now_ts,),
+        fetch=True,
+        commit=False,
+    )
+    return [row[0] for row in rows]
+
+
+def test_due_queue_bounds_and_keyset():
+    entries = [(-5.0, 1, "neg"), (0.0, 2, "new"), (10.0, 3, "a"), (10.0, 4, "b"), (50.0, 5, "later")]
+    queue = DueQueue(lambda: entries)
+
+    assert queue.count_due(20.0) == 3
+    page, total = queue.due_page(20.0, offset=0, limit=2)
+    assert [e[2] for e in page] == ["new", "a"] and total == 3
+    page, _ = queue.due_page(20.0, offset=0, limit=10, after=(10.0, 3))
+    assert [e[2] for e in page] == ["b"]
+
+    queue.set("later", 5.0)
+    queue.remove("new")
+    assert [e[2] for e in queue.due_page(20.0, 0, 10)[0]] == ["later", "a", "b"]
+
+
+def test_queue_follows_repository_writes(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        db.add_word({"word": "beta", "meaning": "m"})
+        assert db.get_due_review_count() == 2  # loads the queue
+
+        db.add_word({"word": "gamma", "meaning": "m"})
+        db.add_words_batch([{"word": "delta", "meaning": "m"}, {"word": "alpha", "meaning": "dup"}])
+        later = time.time() + 3600
+        assert db.update_sm2_status("alpha", easiness=2.5, interval=1, repetitions=1, next_time=later, rating=4) == 3
+        db.update_review_status("beta", stage=1, next_time=later, mastered=False)
+        db.delete_word("gamma")
+
+        assert db.get_due_review_count() == 1
+        assert db.reviews.check_due_queue() == []
+    finally:
+        db.close_connection()
+
+
+def test_raw_sql_writes_invalidate_queue(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        assert db.get_due_review_count() == 1
+        db.execute("UPDATE words SET next_review_time = ? WHERE word = 'alpha'", (time.time() + 3600,))
+        assert db.get_due_review_count() == 0
+        assert db.reviews.check_due_queue() == []
+    finally:
+        db.close_connection()
+
+
+def test_due_search_served_from_queue_matches_sql(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        now_ts = time.time()
+        for i in range(8):
+            db.add_word({"word": f"w{i}", "meaning": "m", "tags": "t" if i % 2 else ""})
+        db.execute("UPDATE words SET next_review_time = ? WHERE id % 2 = 0", (now_ts - 30,))
+        db.execute("UPDATE words SET next_review_time = ? WHERE id = 3", (now_ts + 3600,))
+
+        expected = _sql_due(db, time.time())
+        words, total = db.search_words(status_filter="due", limit=100)
+        assert [w["word"] for w in words] == expected
+        assert total == len(expected)
+        assert isinstance(words[0]["mastered"], bool) and words[0]["note"] == ""
+
+        page, _ = db.search_words(status_filter="due", limit=3, offset=3, count_total=False)
+        assert [w["word"] for w in page] == expected[3:6]
+    finally:
+        db.close_connection()
@@ -0,0 +1,144 @@
+"""
+Tests for the pluggable review scheduler (SM-2 / FSRS) and FSRS weight fitting.
+"""
+import asyncio
+import json
+
+import numpy as np
+import pytest
+
+from models.database import DatabaseManager
+from routers.review import ReviewSubmit, submit_review
+from services import fsrs
+from services.fsrs_fit import ReviewLogs, _objective, _DEFAULT_U, fit_and_save, fit_weights, predict_fsrs
+from services.review_service import FSRSScheduler, ReviewScheduler, SM2Scheduler, get_scheduler
+
+
+def _synthetic_rows(n_words=120, seed=3):
+    """Review logs simulated from a model whose weights differ from the defaults."""
+    rng = np.random.default_rng(seed)
+    true_w = list(fsrs.DEFAULT_WEIGHTS)
+    true_w[8], true_w[10] = 1.2, 1.5
+    rows = []
+    for word_id in range(n_words):
+        t = 1.7e9
+        quality = int(rng.integers(3, 6))
+        s, d = fsrs.review_state(true_w, None, None, 0, fsrs.grade_for_quality(quality))
+        rows.append((word_id, t, quality))
+        for _ in range(int(rng.integers(1, 10))):
+            gap = max(0.3, fsrs.interval_days(s) * rng.uniform(0.5, 2.0))
+            t += gap * 86400
+            recalled = rng.random() < fsrs.retrievability(gap, s)
+            quality = int(rng.integers(3, 6)) if recalled else int(rng.integers(1, 3))
+            s, d = fsrs.review_state(true_w, s, d, gap, fsrs.grade_for_quality(quality))
+            rows.append((word_id, t, quality))
+    return rows
+
+
+def test_vectorized_replay_matches_scalar_model():
+    rows = _synthetic_rows(n_words=30)
+    logs = ReviewLogs.from_rows(rows)
+    w = fsrs.DEFAULT_WEIGHTS
+
+    by_word = {}
+    for word_id, t, quality in rows:
+        by_word.setdefault(word_id, []).append((t, quality))
+    ordered = sorted(by_word.values(), key=len, reverse=True)
+    states = [None] * len(ordered)
+    expected = []
+    for k in range(len(ordered[0])):
+        for i, seq in enumerate(ordered):
+            if len(seq) <= k:
+                continue
+            t, quality = seq[k]
+            grade = fsrs.grade_for_quality(quality)
+            if k == 0:
+                states[i] = fsrs.review_state(w, None, None, 0, grade)
+                continue
+            s, d = states[i]
+            elapsed = (t - seq[k - 1][0]) / 86400
+            expected.append(fsrs.retrievability(elapsed, s))
+            states[i] = fsrs.review_state(w, s, d, elapsed, grade)
+
+    np.testing.assert_allclose(predict_fsrs(w, logs), expected, rtol=1e-12)
+
+
+def test_fit_improves_loss_within_bounds():
+    logs = ReviewLogs.from_rows(_synthetic_rows())
+    fitted = fit_weights(logs, iterations=40)
+
+    assert len(fitted) == len(fsrs.DEFAULT_WEIGHTS)
+    assert all(lo <= w <= hi for w, (lo, hi) in zip(fitted, fsrs.WEIGHT_BOUNDS))
+    low = np.array([b[0] for b in fsrs.WEIGHT_BOUNDS])
+    span = np.array([b[1] - b[0] for b in fsrs.WEIGHT_BOUNDS])
+    assert _objective((np.array(fitted) - low) / span, logs, 1e-3) < _objective(_DEFAULT_U, logs, 1e-3)
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "fsrs.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def test_scheduler_selection_and_fitted_weight_cache(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        db.execute(
+            "INSERT INTO review_history (word_id, review_date, reviewed_at, rating) VALUES (1, '2024-01-01', ?, ?)",
+            (1.7e9, 4),
+        )
+        db.execute(
+            "INSERT INTO review_history (word_id, review_date, reviewed_at, rating) VALUES (1, '2024-01-05', ?, ?)",
+            (1.7e9 + 4 * 86400, 2),
+        )
+        weights_path = str(tmp_path / "fsrs_weights.json")
+
+        monkeypatch.delenv("VOCABBOOK_SCHEDULER", raising=False)
+        assert isinstance(get_scheduler(weights_path), SM2Scheduler)
+
+        monkeypatch.setenv("VOCABBOOK_SCHEDULER", "fsrs")
+        assert get_scheduler(weights_path).weights == fsrs.DEFAULT_WEIGHTS
+
+        metrics = fit_and_save(db.db_path, weights_path, iterations=5)
+        with open(weights_path, encoding="utf-8") as f:
+            cached = json.load(f)
+        assert cached["review_count"] == 2 and cached["metrics"] == metrics
+        assert set(metrics) >= {"fsrs", "sm2"}
+        scheduler = get_scheduler(weights_path)
+        assert isinstance(scheduler, FSRSScheduler)
+        assert list(scheduler.weights) == cached["weights"]
+    finally:
+        db.close_connection()
+
+
+def test_submit_with_fsrs_stores_memory_state(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        monkeypatch.setenv("VOCABBOOK_SCHEDULER", "fsrs")
+        monkeypatch.setenv("VOCABBOOK_FSRS_WEIGHTS", str(tmp_path / "none.json"))
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+
+        result = asyncio.run(submit_review(
+            ReviewSubmit(word="alpha", quality=4),
+            authorization=None,
+            x_client_id=None,
+            x_evermem_enabled="false",
+            x_evermem_url=None,
+            x_evermem_key=None,
+        ))
+
+        word = db.get_word("alpha")
+        assert word["fsrs_stability"] == fsrs.DEFAULT_WEIGHTS[2]  # Good on a first review
+        assert word["fsrs_difficulty"] is not None and word["last_review_time"]
+        assert result["interval_days"] == fsrs.interval_days(word["fsrs_stability"])
+        assert word["repetitions"] == 1
+    finally:
+        db.close_all_connections()
+
+
+def test_scheduler_without_review_cannot_be_created():
+    class Incomplete(ReviewScheduler):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
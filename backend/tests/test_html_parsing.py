@@ -0,0 +1,125 @@
+"""
+Tests for the dictionary scrapers' parsing layer (services.html_parsing).
+"""
+import pytest
+
+from services import html_parsing
+from services.dict_service import DictService
+from services.html_parsing import css, parse_page, relevant_slice
+from services.multi_dict_service import MultiDictService
+
+# Site chrome the scrapers never read; the marker strings also appear in it
+# only after the entry starts, as on the real pages.
+_HEAD = (
+    "<html><head><title>snag</title>"
+    + "<script>var cfg = {a: 1 < 2};</script>" * 50
+    + "<style>.nav{color:red}</style></head><body>"
+    + "<div class='nav'><a href='/'>home</a></div>" * 50
+)
+_TAIL = "<div class='footer'>(c)</div></body></html>"
+
+YOUDAO_BODY = """
+<div id="results-contents">
+  <div class="baav">
+    <span class="pronounce">英<span class="phonetic">[snæɡ]</span></span>
+    <span class="pronounce">美<span class="phonetic">[snæg]</span></span>
+  </div>
+  <div class="trans-container"><ul>
+    <li>n. 障碍 ； 意外 困难</li><li>vt. 钩住</li><li class="additional">[ 复数 snags ]</li>
+  </ul></div>
+  <div id="bilingual"><ul><li><p>We hit a snag.</p><p>我们 遇到 了 麻烦 。</p></li></ul></div>
+  <div id="relWordTab"><p>词根： snag</p></div>
+  <div id="synonyms"><ul><li>n.</li><li>obstacle , hitch</li></ul></div>
+</div>
+"""
+
+CAMBRIDGE_BODY = """
+<div class="di-title">snag</div>
+<span class="uk"><span class="pron">/uk/</span></span>
+<span class="us dpron-i"><span class="pron">/snæɡ/</span></span>
+<div class="def-block">
+  <div class="ddef_h"><div class="def">a small problem</div></div>
+  <span class="trans">小 问题</span>
+  <div class="examp"><span class="eg">We hit a snag.</span><span class="trans">我们 遇到 了 麻烦。</span></div>
+</div>
+"""
+
+BING_BODY = """
+<div class="qdef">
+  <div class="hd_prUS">美 [snæɡ]</div>
+  <ul><li>n. 障碍</li><li>v. 钩住</li><li>x</li></ul>
+</div>
+<div id="sentenceSeg"><div class="se_li">
+  <div class="sen_en">We hit a snag.</div><div class="sen_cn">我们 遇到 了 麻烦。</div>
+</div></div>
+"""
+
+
+@pytest.fixture(params=["lxml", "html.parser"])
+def features(request, monkeypatch):
+    """Run the scraper tests under each tree builder; they must agree."""
+    if request.param == "lxml":
+        pytest.importorskip("lxml")
+    monkeypatch.setattr(html_parsing, "HTML_FEATURES", request.param)
+    return request.param
+
+
+def test_relevant_slice_starts_at_the_earliest_marker_tag():
+    page = "<head>junk</head><div id='x'><span class=\"b\">B</span><i class=\"a\">A</i></div>"
+    assert relevant_slice(page, ("class=\"a\"", "class=\"b\"")) == "<span class=\"b\">B</span><i class=\"a\">A</i></div>"
+    assert relevant_slice(page, ("missing",)) == page
+    assert relevant_slice(page, ()) == page
+
+
+def test_parsers_ignore_page_chrome(features):
+    for parse, body in (
+        (MultiDictService._parse_cambridge, CAMBRIDGE_BODY),
+        (MultiDictService._parse_bing, BING_BODY),
+        (DictService._parse_youdao, YOUDAO_BODY),
+    ):
+        assert parse("snag", _HEAD + body + _TAIL) == parse("snag", body)
+
+
+def test_youdao_fields(features):
+    result = DictService._parse_youdao("snag", _HEAD + YOUDAO_BODY + _TAIL)
+    assert result["phonetic"] == "[snæg]"
+    assert result["meaning"] == "n. 障碍；意外困难\nvt. 钩住"
+    assert result["example"] == "We hit a snag.\n我们遇到了麻烦。"
+    assert result["roots"].startswith("[词根]") and "snag" in result["roots"]
+    assert result["synonyms"] == "n. obstacle , hitch"
+
+    assert DictService._parse_youdao("snag", _HEAD + "<div class='error-wrapper'>无结果</div>") is None
+
+
+def test_cambridge_and_bing_fields(features):
+    cambridge = MultiDictService._parse_cambridge("snag", CAMBRIDGE_BODY)
+    assert cambridge["phonetic"] == "US /snæɡ/"
+    assert cambridge["meaning"] == "• a small problem 小问题"
+    assert cambridge["example"] == "We hit a snag.\n我们遇到了麻烦。"
+    assert MultiDictService._parse_cambridge("snag", _HEAD + _TAIL) is None
+
+    bing = MultiDictService._parse_bing("snag", BING_BODY)
+    assert bing["phonetic"] == "美 [snæɡ]"
+    assert bing["meaning"] == "n. 障碍\nv. 钩住"
+    assert bing["example"] == "We hit a snag.\n我们遇到了麻烦。"
+    assert MultiDictService._parse_bing("snag", _HEAD + _TAIL) is None
+
+
+def test_builders_give_the_same_results(monkeypatch):
+    pytest.importorskip("lxml")
+    for parse, body in (
+        (MultiDictService._parse_cambridge, CAMBRIDGE_BODY),
+        (MultiDictService._parse_bing, BING_BODY),
+        (DictService._parse_youdao, YOUDAO_BODY),
+    ):
+        results = []
+        for features in ("lxml", "html.parser"):
+            monkeypatch.setattr(html_parsing, "HTML_FEATURES", features)
+            results.append(parse("snag", _HEAD + body + _TAIL))
+        assert results[0] is not None and results[0] == results[1]
+
+
+def test_unavailable_parser_falls_back_to_html_parser():
+    soup = parse_page(BING_BODY, features="no-such-parser")
+    assert css("div.hd_prUS").select_one(soup).get_text(strip=True) == "美 [snæɡ]"
+    assert css("div.qdef") is css("div.qdef")  # compiled once
@@ -0,0 +1,128 @@
+"""
+Tests for keyset (cursor) pagination of /api/words and the review queues.
+"""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+from models.database import DatabaseManager
+from routers.review import get_review_queue
+from routers.words import get_words
+from utils.pagination import decode_cursor, encode_cursor, split_page
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "pages.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def _list_words(**kwargs):
+    params = {
+        "keyword": "",
+        "tag": "",
+        "mastered": None,
+        "status": None,
+        "sort_by": None,
+        "sort_order": "ASC",
+        "page": 1,
+        "page_size": 50,
+        "cursor": None,
+        "include_total": None,
+    }
+    params.update(kwargs)
+    return asyncio.run(get_words(**params))
+
+
+def test_cursor_round_trip_and_sort_mismatch():
+    token = encode_cursor("next_review_time", "asc", {"id": 7, "next_review_time": 123.5})
+    assert decode_cursor(token, "next_review_time", "ASC") == (123.5, 7)
+    with pytest.raises(ValueError):
+        decode_cursor(token, "word", "ASC")
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor", "word", "ASC")
+
+
+def test_cursor_pages_walk_every_word_once(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        base = time.time()
+        for i in range(25):
+            db.add_word({"word": f"w{i:02d}", "meaning": "m"})
+        # Ties on next_review_time must still page deterministically (id tiebreak).
+        db.execute("UPDATE words SET next_review_time = ? WHERE id % 3 = 0", (base + 10,))
+        monkeypatch.setattr("utils.db.get_db", lambda: db)
+
+        first = _list_words(page_size=10)
+        assert first.total == 25 and first.next_cursor
+
+        seen = [w.word for w in first.words]
+        cursor = first.next_cursor
+        while cursor:
+            page = _list_words(page_size=10, cursor=cursor)
+            assert page.total is None  # follow-up pages skip COUNT(*) by default
+            seen.extend(w.word for w in page.words)
+            cursor = page.next_cursor
+
+        assert sorted(seen) == sorted(f"w{i:02d}" for i in range(25))
+        assert len(seen) == 25
+
+        offset_order = [w["word"] for w in db.search_words(limit=100)[0]]
+        assert seen == offset_order
+    finally:
+        db.close_all_connections()
+
+
+@pytest.mark.parametrize("sort_order", ["ASC", "DESC"])
+def test_cursor_pages_cross_null_sort_values(tmp_path, sort_order):
+    db = _make_db(tmp_path)
+    try:
+        for word in "abcde":
+            db.add_word({"word": word, "meaning": "m"})
+        db.execute("UPDATE words SET date_added = NULL WHERE word IN ('a', 'c')")
+
+        seen, cursor = [], None
+        while True:  # the same steps as get_words
+            after = decode_cursor(cursor, "date_added", sort_order) if cursor else None
+            rows = db.search_words(sort_by="date_added", sort_order=sort_order, limit=3, count_total=False, after=after)[0]
+            page, cursor = split_page(rows, 2, "date_added", sort_order)
+            seen.extend(w["word"] for w in page)
+            if not cursor:
+                break
+
+        offset_order = [w["word"] for w in db.search_words(sort_by="date_added", sort_order=sort_order, limit=100)[0]]
+        assert seen == offset_order and sorted(seen) == list("abcde")
+    finally:
+        db.close_all_connections()
+
+
+def test_cursor_rejected_for_relevance_sort(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        monkeypatch.setattr("utils.db.get_db", lambda: db)
+        token = encode_cursor("next_review_time", "ASC", {"id": 1, "next_review_time": 0})
+        with pytest.raises(HTTPException) as exc:
+            _list_words(keyword="abc", cursor=token)
+        assert exc.value.status_code == 400
+    finally:
+        db.close_all_connections()
+
+
+def test_review_due_queue_pages_by_cursor(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        now_ts = time.time()
+        for i in range(5):
+            db.add_word({"word": f"due{i}", "meaning": "m"})
+            db.execute("UPDATE words SET next_review_time = ? WHERE word = ?", (now_ts - 100 + i, f"due{i}"))
+        db.add_word({"word": "later", "meaning": "m"})
+        db.execute("UPDATE words SET next_review_time = ? WHERE word = 'later'", (now_ts + 3600,))
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+
+        first = asyncio.run(get_review_queue(queue="due", limit=3, cursor=None))
+        assert [w["word"] for w in first["words"]] == ["due0", "due1", "due2"]
+        second = asyncio.run(get_review_queue(queue="due", limit=3, cursor=first["next_cursor"]))
+        assert [w["word"] for w in second["words"]] == ["due3", "due4"]
+        assert second["next_cursor"] is None
+    finally:
+        db.close_all_connections()
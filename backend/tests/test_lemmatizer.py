@@ -0,0 +1,94 @@
+"""
+Tests for the rule-plus-exception lemmatizer (services.lemmatizer) and the
+lemma aliases of the dictionary cache.
+"""
+import asyncio
+
+import httpx
+
+from models.database import DatabaseManager
+from services import multi_dict_service
+from services.dict_cache import DictCache
+from services.lemmatizer import irregular_lemma, lemma_candidates
+from services.multi_dict_service import MultiDictService
+
+
+def test_irregular_forms_are_certain():
+    assert irregular_lemma("Ran") == "run" and irregular_lemma("mice") == "mouse"
+    assert irregular_lemma("was") == "be" and irregular_lemma("knives") == "knife"
+    # Headwords in their own right: nouns, participial adjectives, forms of two lemmas.
+    for word in ("bore", "felt", "fell", "spoke", "stole", "broke", "fed", "lost", "drunk",
+                 "won", "shot", "lit", "broken", "left", "saw", "better", "data", "lying"):
+        assert irregular_lemma(word) is None, word
+
+
+def test_rule_candidates():
+    assert lemma_candidates("Ran") == ["run"]
+    assert lemma_candidates("stopped") == ["stop"] and lemma_candidates("running") == ["run"]
+    assert lemma_candidates("biggest") == ["big"] and lemma_candidates("tied") == ["tie"]
+    # A dropped "e" comes first after a consonant-vowel-consonant stem.
+    for form, lemma in (("caring", "care"), ("staring", "stare"), ("hoping", "hope"), ("riding", "ride"),
+                        ("biting", "bite"), ("scaring", "scare"), ("finest", "fine"), ("ripest", "ripe")):
+        assert lemma_candidates(form)[0] == lemma, form
+    assert lemma_candidates("eating")[0] == "eat" and lemma_candidates("telling")[0] == "tell"
+    assert lemma_candidates("studies")[0] == "study" and lemma_candidates("happier") == ["happy"]
+    assert lemma_candidates("boxes")[0] == "box" and lemma_candidates("wolves") == ["wolf"]
+    for word in ("news", "morning", "seed", "glass", "analysis", "forest", "lying", "run", "well-being", ""):
+        assert lemma_candidates(word) == [], word
+
+
+def test_alias_hits_serve_the_lemma_entry(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "cache.db"), json_path=str(tmp_path / "missing.json"))
+    cache = DictCache({"bing": (100, 1000)}, lambda: db, lemma_of=irregular_lemma)
+    try:
+        cache.set("run", "bing", {"word": "run", "meaning": "跑"})
+        cache.set("car", "bing", {"word": "car", "meaning": "汽车"})
+        cache.clear_memory()
+        cache.reset_stats()
+
+        assert cache.resolve("Ran", "bing") == ({"word": "Ran", "meaning": "跑", "lemma": "run"}, False, "run")
+        assert cache.lookup("ran", "bing")[0]["meaning"] == "跑"  # now from memory
+        assert cache.lookup("run", "bing")[0] == {"word": "run", "meaning": "跑"}
+        assert cache.resolve("caring", "bing") == (None, False, "caring")  # a guess never aliases
+        assert cache.lookup("mice", "bing") == (None, False)  # lemma not cached
+        assert len(cache) == 1  # aliases hold no entries of their own
+
+        stats = cache.stats()
+        assert stats["lookups"] == 5
+        assert stats["aliases"] == {"hits": 2, "stale_hits": 0, "memoized": 3}
+        assert stats["hit_rate"] == 0.6 and stats["hit_rate_without_aliases"] == 0.2
+    finally:
+        db.close_all_connections()
+
+
+def test_only_certain_lemmas_are_fetched_in_place_of_the_form(monkeypatch):
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: None)
+    monkeypatch.setattr(multi_dict_service, "get_offline_dict", lambda: None)
+    MultiDictService.cache.clear_memory()
+    requests = []
+
+    def handler(request):
+        requests.append(request.url.path)
+        word = request.url.path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json=[{"word": word, "phonetic": f"/{word}/", "meanings": []}])
+
+    async def lookup(word):
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await MultiDictService.search_free_dict_async(word, client)
+
+    try:
+        result = asyncio.run(lookup("ran"))
+        assert result["phonetic"] == "/run/" and result["lemma"] == "run"
+        assert requests == ["/api/v2/entries/en/run"]
+        assert ("run", MultiDictService.DICT_FREE) in MultiDictService.cache
+        assert asyncio.run(lookup("run"))["phonetic"] == "/run/"
+        assert requests == ["/api/v2/entries/en/run"]
+
+        # Headwords and rule-only forms are fetched as typed, even when a guessed lemma is cached.
+        asyncio.run(lookup("car"))
+        for word in ("bore", "caring", "running"):
+            result = asyncio.run(lookup(word))
+            assert result["phonetic"] == f"/{word}/" and "lemma" not in result
+        assert requests[-3:] == ["/api/v2/entries/en/bore", "/api/v2/entries/en/caring", "/api/v2/entries/en/running"]
+    finally:
+        MultiDictService.cache.clear_memory()
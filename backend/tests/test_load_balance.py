@@ -0,0 +1,66 @@
+"""
+Tests for load-balanced review scheduling (VOCABBOOK_LOAD_BALANCE).
+"""
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+
+from models.database import DatabaseManager
+from routers.review import ReviewBatchItem, ReviewBatchSubmit, submit_review_batch
+from services.due_queue import DueQueue
+from services.load_balance import LoadBalancer, fuzz_range
+
+
+def test_fuzz_range_grows_with_interval():
+    assert fuzz_range(1) == (1, 1) and fuzz_range(2) == (2, 2)
+    assert fuzz_range(3) == (2, 4)
+    assert fuzz_range(30) == (27, 33)
+    low, high = fuzz_range(200)
+    assert low < 200 < high and high - low < 30
+
+
+def test_balancer_picks_least_loaded_day_and_counts_pending():
+    now = datetime(2024, 3, 1, 9, 0).timestamp()
+    day = lambda d: (datetime(2024, 3, 1, 12, 0) + timedelta(days=d)).timestamp()
+    # Days 9 and 10 are busy, day 11 has one review, days 8 and 12 are empty.
+    entries = [(day(9), i, f"a{i}") for i in range(5)] + [(day(10), 10 + i, f"b{i}") for i in range(5)]
+    entries.append((day(11), 20, "c"))
+    balancer = LoadBalancer(DueQueue(lambda: entries).histogram)
+    schedule = {"interval": 10, "next_time": 0.0, "easiness": 2.5, "repetitions": 3}
+
+    assert fuzz_range(10) == (8, 12)
+    picked = [balancer.balance(schedule, 4, now=now)["interval"] for _ in range(4)]
+    # Lightest day first; ties go to the day closest to 10, then the earlier one.
+    assert picked == [8, 12, 11, 8]
+    moved = balancer.balance(schedule, 4, now=now)
+    assert datetime.fromtimestamp(moved["next_time"]).hour == 9
+
+    assert balancer.balance(schedule, 2, now=now) is schedule  # failed reviews keep the retry window
+
+
+def test_batch_submit_spreads_identical_words(tmp_path, monkeypatch):
+    db = DatabaseManager(db_path=str(tmp_path / "balance.db"), json_path=str(tmp_path / "missing.json"))
+    try:
+        words = [f"w{i}" for i in range(40)]
+        for word in words:
+            db.add_word({"word": word, "meaning": "m"})
+        db.execute("UPDATE words SET interval = 6, repetitions = 2, easiness = 2.5")
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+        monkeypatch.setenv("VOCABBOOK_LOAD_BALANCE", "1")
+
+        asyncio.run(submit_review_batch(
+            ReviewBatchSubmit(reviews=[ReviewBatchItem(word=w, quality=5) for w in words]),
+            authorization=None,
+            x_client_id=None,
+            x_evermem_enabled="false",
+            x_evermem_url=None,
+            x_evermem_key=None,
+        ))
+
+        intervals = Counter(db.get_word(w)["interval"] for w in words)
+        low, high = fuzz_range(int(6 * 2.6))
+        assert set(intervals) == set(range(low, high + 1))
+        assert max(intervals.values()) - min(intervals.values()) <= 1
+        assert db.reviews.check_due_queue() == []
+    finally:
+        db.close_all_connections()
@@ -1,33 +1,15 @@
+import asyncio
+import json
 import time
 
+import httpx
+
 import config
+from models.database import DatabaseManager
 from services import multi_dict_service
 from services.multi_dict_service import MultiDictService
 
 
-def test_memory_cache_is_bounded_and_lru(monkeypatch):
-    """The in-memory dict cache must stay within _memory_cache_max and evict oldest first."""
-    original_max = MultiDictService._memory_cache_max
-    monkeypatch.setattr(MultiDictService, "_memory_cache_max", 5)
-    try:
-        for i in range(10):
-            MultiDictService._update_memory_cache(f"word_{i}", "youdao", {"word": f"word_{i}"})
-        assert len(MultiDictService._memory_cache) == 5
-        # Oldest entries were evicted; the newest survive
-        assert "word_0" not in MultiDictService._memory_cache
-        assert "word_5" in MultiDictService._memory_cache
-        assert "word_9" in MultiDictService._memory_cache
-
-        # Touching an entry refreshes its LRU position
-        MultiDictService._update_memory_cache("word_5", "bing", {"word": "word_5"})
-        MultiDictService._update_memory_cache("word_new", "youdao", {"word": "word_new"})
-        assert "word_5" in MultiDictService._memory_cache
-        assert "word_6" not in MultiDictService._memory_cache
-    finally:
-        MultiDictService._memory_cache.clear()
-        MultiDictService._memory_cache_max = original_max
-
-
 def test_get_db_manager_supports_current_import_mode(monkeypatch, tmp_path):
     original_db = multi_dict_service._db_manager
     test_db_path = tmp_path / "dict-cache.db"
@@ -48,7 +30,7 @@ def test_get_db_manager_supports_current_import_mode(monkeypatch, tmp_path):
 def test_aggregate_search_returns_partial_results_on_timeout(monkeypatch):
     original_timeout = MultiDictService._aggregate_timeout
 
-    def fast_cambridge(_word):
+    async def fast_cambridge(_word, client=None):
         return {
             "source": MultiDictService.DICT_CAMBRIDGE,
             "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_CAMBRIDGE],
@@ -58,8 +40,8 @@ def test_aggregate_search_returns_partial_results_on_timeout(monkeypatch):
             "example": "",
         }
 
-    def slow_bing(_word):
-        time.sleep(0.2)
+    async def slow_bing(_word, client=None):
+        await asyncio.sleep(0.2)
         return {
             "source": MultiDictService.DICT_BING,
             "source_name": MultiDictService.DICT_NAMES[MultiDictService.DICT_BING],
@@ -69,20 +51,165 @@ def test_aggregate_search_returns_partial_results_on_timeout(monkeypatch):
             "example": "",
         }
 
+    async def no_result(_word, client=None):
+        return None
+
     monkeypatch.setattr(MultiDictService, "_aggregate_timeout", 0.05)
-    monkeypatch.setattr(MultiDictService, "search_cambridge", staticmethod(fast_cambridge))
-    monkeypatch.setattr(MultiDictService, "search_bing", staticmethod(slow_bing))
-    monkeypatch.setattr(MultiDictService, "search_free_dict", staticmethod(lambda _word: None))
+    monkeypatch.setattr(MultiDictService, "search_cambridge_async", staticmethod(fast_cambridge))
+    monkeypatch.setattr(MultiDictService, "search_bing_async", staticmethod(slow_bing))
+    monkeypatch.setattr(MultiDictService, "search_free_dict_async", staticmethod(no_result))
 
     try:
+        started = time.perf_counter()
         result = MultiDictService.aggregate_search(
             "snag",
             enabled_dicts=[MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_BING, MultiDictService.DICT_FREE],
             youdao_result=None,
         )
+        elapsed = time.perf_counter() - started
     finally:
         MultiDictService._aggregate_timeout = original_timeout
 
     assert result["primary"]["source"] == MultiDictService.DICT_CAMBRIDGE
     assert MultiDictService.DICT_CAMBRIDGE in result["sources"]
     assert MultiDictService.DICT_BING not in result["sources"]
+    assert elapsed < 0.2  # the slow source was abandoned at its deadline
+
+
+_CAMBRIDGE_HTML = """
+<div class="di-title">snag</div>
+<span class="us"><span class="pron">/snæɡ/</span></span>
+<div class="def-block">
+  <div class="ddef_h"><div class="def">a small problem</div></div>
+  <span class="trans">小 问题</span>
+  <div class="examp"><span class="eg">We hit a snag.</span><span class="trans">我们 遇到 了 麻烦。</span></div>
+</div>
+"""
+
+_FREE_DICT_JSON = json.dumps([{
+    "phonetic": "/snæɡ/",
+    "phonetics": [{"audio": "https://example.test/snag.mp3"}],
+    "meanings": [{"partOfSpeech": "noun", "definitions": [{"definition": "A problem.", "example": "A snag."}]}],
+}])
+
+
+def _mock_client(calls, in_flight):
+    async def handler(request):
+        calls.append(request.url.host)
+        host = request.url.host
+        in_flight[host] = in_flight.get(host, 0) + 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight[host])
+        await asyncio.sleep(0.01)
+        in_flight[host] -= 1
+        if request.url.host == "dictionary.cambridge.org":
+            return httpx.Response(200, text=_CAMBRIDGE_HTML)
+        if request.url.host == "api.dictionaryapi.dev":
+            return httpx.Response(200, text=_FREE_DICT_JSON)
+        return httpx.Response(404)
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_async_fetchers_share_client_and_respect_source_limits(monkeypatch):
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: None)
+    monkeypatch.setitem(multi_dict_service._SOURCE_CONCURRENCY, "cambridge", 2)
+    MultiDictService.cache.clear_memory()
+    calls, in_flight = [], {"peak": 0}
+
+    async def run():
+        async with _mock_client(calls, in_flight) as client:
+            words = [f"snag{i}" for i in range(6)]
+            cambridge = await asyncio.gather(*(MultiDictService.search_cambridge_async(w, client) for w in words))
+            aggregated = await MultiDictService.aggregate_search_async("snag", client=client)
+            return cambridge, aggregated
+
+    try:
+        cambridge, aggregated = asyncio.run(run())
+    finally:
+        MultiDictService.cache.clear_memory()
+
+    assert in_flight["peak"] == 2  # per-source limit held while 6 lookups were in flight
+    assert cambridge[0]["phonetic"] == "US /snæɡ/"
+    assert cambridge[0]["meaning"] == "• a small problem 小问题"
+    assert cambridge[0]["example"] == "We hit a snag.\n我们遇到了麻烦。"
+    assert set(aggregated["sources"]) == {MultiDictService.DICT_CAMBRIDGE, MultiDictService.DICT_FREE}
+    assert aggregated["sources"][MultiDictService.DICT_FREE]["audio"] == "https://example.test/snag.mp3"
+    assert aggregated["primary"]["source"] == MultiDictService.DICT_CAMBRIDGE
+    # "snag" itself was not among the cached words, so Bing (404) was tried once.
+    assert calls.count("cn.bing.com") == 1
+
+
+def _age_cache_row(db, word, source, seconds):
+    db.write(lambda conn: conn.execute(
+        "UPDATE dict_cache SET created_at = created_at - ? WHERE word = ? AND source = ?",
+        (seconds, word, source),
+    ))
+
+
+def test_stale_entries_are_served_then_refreshed_in_background(tmp_path, monkeypatch):
+    db = DatabaseManager(db_path=str(tmp_path / "swr.db"), json_path=str(tmp_path / "missing.json"))
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: db)
+    monkeypatch.setitem(MultiDictService._cache_policy, MultiDictService.DICT_FREE, (100, 1000))
+    MultiDictService.cache.clear_memory()
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text=json.dumps([{"phonetic": "/new/", "meanings": []}]))
+
+    async def lookup_then_wait():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            started = time.perf_counter()
+            result = await MultiDictService.search_free_dict_async("snag", client)
+            elapsed = time.perf_counter() - started
+            while multi_dict_service._refresh_tasks:
+                await asyncio.sleep(0.01)
+            return result, elapsed
+
+    try:
+        db.set_dict_cache("snag", MultiDictService.DICT_FREE, {"phonetic": "/old/"})
+
+        # Fresh: no request at all.
+        assert asyncio.run(lookup_then_wait())[0]["phonetic"] == "/old/"
+        assert requests == []
+
+        # Past the freshness window but within max-stale: old data now, refresh behind it.
+        MultiDictService.cache.clear_memory()
+        _age_cache_row(db, "snag", MultiDictService.DICT_FREE, 500)
+        result, elapsed = asyncio.run(lookup_then_wait())
+        assert result["phonetic"] == "/old/" and elapsed < 0.05
+        assert len(requests) == 1
+        data, created_at = db.get_dict_cache_entry("snag", MultiDictService.DICT_FREE)
+        assert data["phonetic"] == "/new/" and time.time() - created_at < 100
+        assert MultiDictService.lookup_cache("snag", MultiDictService.DICT_FREE) == (data, False)
+
+        # Past max-stale: treated as a miss and fetched on the caller's path.
+        MultiDictService.cache.clear_memory()
+        _age_cache_row(db, "snag", MultiDictService.DICT_FREE, 5000)
+        result, _ = asyncio.run(lookup_then_wait())
+        assert result["phonetic"] == "/new/" and len(requests) == 2
+    finally:
+        MultiDictService.cache.clear_memory()
+        db.close_all_connections()
+
+
+def test_sync_wrapper_drops_refresh_with_its_loop(monkeypatch):
+    monkeypatch.setitem(MultiDictService._cache_policy, MultiDictService.DICT_BING, (0, 1000))
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: None)
+    MultiDictService.cache.clear_memory()
+    MultiDictService.cache.put_memory("snag", MultiDictService.DICT_BING, {"meaning": "旧"})
+    refreshed = []
+
+    async def slow_refresh(*_args):
+        await asyncio.sleep(5)
+        refreshed.append(1)
+
+    monkeypatch.setattr(MultiDictService, "_fetch_uncached", staticmethod(slow_refresh))
+    try:
+        started = time.perf_counter()
+        assert MultiDictService.search_bing("snag") == {"meaning": "旧"}
+        assert time.perf_counter() - started < 1
+        assert refreshed == [] and not multi_dict_service._refresh_tasks
+    finally:
+        MultiDictService.cache.clear_memory()
@@ -0,0 +1,120 @@
+"""
+Tests for the offline dictionary store (services.offline_dict) and the
+offline-first lookup in DictService.
+"""
+import asyncio
+import csv
+import time
+
+import httpx
+
+import config
+from models.database import DatabaseManager
+from services import multi_dict_service, offline_dict
+from services.dict_service import DictService
+from services.multi_dict_service import MultiDictService
+from services.offline_dict import OfflineDict, build_offline_dict
+
+_COLUMNS = ["word", "phonetic", "definition", "translation", "pos", "collins", "oxford",
+            "tag", "bnc", "frq", "exchange", "detail", "audio"]
+_ROWS = [
+    {"word": "perceive", "phonetic": "pə'si:v", "definition": "v. become aware of",
+     "translation": "v. 察觉, 感觉\\nv. 理解", "tag": "cet4 cet6 ky", "frq": "3150",
+     "exchange": "p:perceived/d:perceived/3:perceives/i:perceiving"},
+    {"word": "Polish", "translation": "a. 波兰的"},
+    {"word": "polish", "phonetic": "'pɔliʃ", "translation": "v. 擦亮"},
+    {"word": "stop", "translation": "v. 停止"},
+    {"word": "perch", "translation": "n. 栖木"},
+]
+
+
+def _build(tmp_path):
+    csv_path = tmp_path / "ecdict.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=_COLUMNS)
+        writer.writeheader()
+        writer.writerows(_ROWS)
+    store_path = tmp_path / "offline_dict.db"
+    assert build_offline_dict(str(csv_path), str(store_path)) == 4
+    return str(store_path)
+
+
+def test_exact_prefix_and_lemma_lookups(tmp_path):
+    store = OfflineDict(_build(tmp_path))
+    try:
+        entry = store.lookup(" Perceive ")
+        assert entry["word"] == "Perceive" and entry["lemma"] == ""
+        assert entry["phonetic"] == "[pə'si:v]"
+        assert entry["meaning"] == "v. 察觉, 感觉\nv. 理解"
+        assert entry["tags"] == "CET4,CET6,考研"
+        assert store.lookup("polish")["meaning"] == "v. 擦亮"  # lower-case spelling wins
+
+        inflected = store.lookup("perceiving")  # from the exchange field
+        assert inflected["lemma"] == "perceive"
+        assert inflected["meaning"].startswith("（perceive 的现在分词）\nv. 察觉")
+        assert store.lookup("stopped")["lemma"] == "stop"  # suffix rule
+        assert store.lookup("zzzz") is None and store.lookup("") is None
+
+        assert [e["word"] for e in store.prefix("PER")] == ["perceive", "perch"]
+        assert store.prefix("perc", limit=1)[0] == {"word": "perceive", "phonetic": "[pə'si:v]", "meaning": "v. 察觉, 感觉"}
+        assert store.prefix("x") == []
+    finally:
+        store.close()
+
+
+def test_shared_store_is_disabled_without_a_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(offline_dict, "_store", None)
+    monkeypatch.setattr(config, "OFFLINE_DICT_PATH", str(tmp_path / "missing.db"))
+    monkeypatch.setattr(config, "BUNDLED_OFFLINE_DICT_PATH", str(tmp_path / "also-missing.db"))
+    assert offline_dict.get_offline_dict() is None
+    assert MultiDictService.search_offline("perceive") is None
+
+    monkeypatch.setattr(config, "BUNDLED_OFFLINE_DICT_PATH", _build(tmp_path))
+    store = offline_dict.get_offline_dict()
+    try:
+        assert store is not None and offline_dict.get_offline_dict() is store
+        assert MultiDictService.search_offline("perceive")["source"] == MultiDictService.DICT_OFFLINE
+    finally:
+        store.close()
+
+
+def test_offline_answers_first_and_network_enriches_in_background(tmp_path, monkeypatch):
+    store = OfflineDict(_build(tmp_path))
+    db = DatabaseManager(db_path=str(tmp_path / "cache.db"), json_path=str(tmp_path / "missing.json"))
+    monkeypatch.setattr(offline_dict, "_store", store)
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: db)
+    MultiDictService.cache.clear_memory()
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.host)
+        await asyncio.sleep(0.05)
+        return httpx.Response(
+            200, text='<div class="trans-container"><ul><li>vt. 察觉（有道）</li></ul></div>',
+        )
+
+    async def lookup_then_wait():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            started = time.perf_counter()
+            result = await DictService.search_word_async("perceive", sources=[], client=client)
+            elapsed = time.perf_counter() - started
+            while multi_dict_service._refresh_tasks:
+                await asyncio.sleep(0.01)
+            return result, elapsed
+
+    try:
+        result, elapsed = asyncio.run(lookup_then_wait())
+        assert elapsed < 0.05
+        assert result["source"] == MultiDictService.DICT_OFFLINE
+        assert result["meaning"].startswith("v. 察觉")
+        assert list(result["sources_data"]) == [MultiDictService.DICT_OFFLINE]
+        assert requests == ["dict.youdao.com"]  # fetched behind the answer
+
+        result, _ = asyncio.run(lookup_then_wait())
+        assert result["meaning"] == "vt. 察觉（有道）"
+        assert set(result["sources_data"]) == {MultiDictService.DICT_YOUDAO, MultiDictService.DICT_OFFLINE}
+        assert requests == ["dict.youdao.com"]  # cache now complete: no further fetch
+    finally:
+        MultiDictService.cache.clear_memory()
+        db.close_all_connections()
+        store.close()
@@ -1,6 +1,6 @@
 """
 Tests for word query speed optimizations.
-Validates: cache TTL/capacity, N+1 fix in FamiliesRepo, DB indexes, aggregate timeout.
+Validates: N+1 fix in FamiliesRepo, DB indexes, aggregate timeout.
 """
 import sqlite3
 import time
@@ -15,51 +15,9 @@ backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
 if backend_dir not in sys.path:
     sys.path.insert(0, backend_dir)
 
-from services.dict_service import _dict_cache, _cache_ttl, _get_cached, _set_cached
 from services.multi_dict_service import MultiDictService
 
 
-class TestDictServiceCache:
-    """Test DictService LRU cache optimizations."""
-
-    def setup_method(self):
-        _dict_cache.clear()
-
-    def teardown_method(self):
-        _dict_cache.clear()
-
-    def test_cache_ttl_is_30_minutes(self):
-        """Cache TTL should be 1800 seconds (30 minutes)."""
-        assert _cache_ttl == 1800
-
-    def test_cache_capacity_is_2000(self):
-        """Cache should hold up to 2000 entries before eviction."""
-        # Fill cache with 2000 entries
-        for i in range(2000):
-            _set_cached(f"word_{i}:default", {"word": f"word_{i}", "meaning": f"meaning_{i}"})
-        assert len(_dict_cache) == 2000
-
-        # Adding one more should evict the oldest
-        _set_cached("word_overflow:default", {"word": "overflow", "meaning": "overflow"})
-        assert len(_dict_cache) == 2000
-        # First entry should be evicted
-        assert _get_cached("word_0:default") is None
-        # Last entry should exist
-        assert _get_cached("word_overflow:default") is not None
-
-    def test_cache_hit_returns_result(self):
-        """Cache hit should return the stored result."""
-        _set_cached("hello:default", {"word": "hello", "meaning": "greeting"})
-        result = _get_cached("hello:default")
-        assert result is not None
-        assert result["word"] == "hello"
-
-    def test_cache_miss_returns_none(self):
-        """Cache miss should return None."""
-        result = _get_cached("nonexistent:default")
-        assert result is None
-
-
 class TestMultiDictServiceTimeout:
     """Test aggregate timeout optimization."""
 
@@ -78,23 +36,24 @@ class TestFamiliesRepoSingleQuery:
         db_path = str(tmp_path / "test_families.db")
         db = DatabaseManager(db_path=db_path)
 
-        conn = db.get_connection()
-        cursor = conn.cursor()
+        def _seed(conn):
+            cursor = conn.cursor()
+
+            # Insert test word
+            cursor.execute('''
+                INSERT INTO words (word, phonetic, meaning, example, date_added, next_review_time)
+                VALUES ('prediction', '', 'n. 预测', '', '2024-01-01', 0)
+            ''')
+
+            # Insert word families: 2 roots sharing the word "predict"
+            cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('pre-', '前', 'predict')")
+            cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('pre-', '前', 'prediction')")
+            cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('pre-', '前', 'preview')")
+            cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('dict-', '说', 'predict')")
+            cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('dict-', '说', 'dictionary')")
+            cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('dict-', '说', 'prediction')")
 
-        # Insert test word
-        cursor.execute('''
-            INSERT INTO words (word, phonetic, meaning, example, date_added, next_review_time)
-            VALUES ('prediction', '', 'n. 预测', '', '2024-01-01', 0)
-        ''')
-
-        # Insert word families: 2 roots sharing the word "predict"
-        cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('pre-', '前', 'predict')")
-        cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('pre-', '前', 'prediction')")
-        cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('pre-', '前', 'preview')")
-        cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('dict-', '说', 'predict')")
-        cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('dict-', '说', 'dictionary')")
-        cursor.execute("INSERT OR IGNORE INTO word_families (root, root_meaning, word) VALUES ('dict-', '说', 'prediction')")
-        conn.commit()
+        db.write(_seed)
 
         result = db.families.get_family("prediction")
 
@@ -0,0 +1,93 @@
+"""
+Tests for POST /api/review/submit-batch (one transaction per session).
+"""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from models.database import DatabaseManager
+from routers.review import (
+    ReviewBatchItem,
+    ReviewBatchSubmit,
+    ReviewSubmit,
+    submit_review,
+    submit_review_batch,
+)
+
+_NO_EVERMEM = dict(
+    authorization=None,
+    x_client_id=None,
+    x_evermem_enabled="false",
+    x_evermem_url=None,
+    x_evermem_key=None,
+)
+
+
+def _make_db(tmp_path, name="batch.db"):
+    db = DatabaseManager(db_path=str(tmp_path / name), json_path=str(tmp_path / "missing.json"))
+    for word in ["alpha", "beta", "gamma"]:
+        db.add_word({"word": word, "meaning": "m"})
+    db.execute("UPDATE words SET next_review_time = ?, review_count = 1", (time.time() - 60,))
+    return db
+
+
+def _state(db):
+    rows = db.execute(
+        "SELECT word, easiness, interval, repetitions, review_count, error_count, mastered FROM words ORDER BY word",
+        fetch=True,
+        commit=False,
+    )
+    return rows
+
+
+def test_batch_matches_sequential_submits(tmp_path, monkeypatch):
+    ratings = [("alpha", 4), ("beta", 2), ("alpha", 5), ("gamma", 3)]
+
+    single_db = _make_db(tmp_path, "single.db")
+    batch_db = _make_db(tmp_path, "batch.db")
+    try:
+        monkeypatch.setattr("routers.review.get_db", lambda: single_db)
+        for word, quality in ratings:
+            asyncio.run(submit_review(ReviewSubmit(word=word, quality=quality), **_NO_EVERMEM))
+
+        monkeypatch.setattr("routers.review.get_db", lambda: batch_db)
+        result = asyncio.run(submit_review_batch(
+            ReviewBatchSubmit(reviews=[ReviewBatchItem(word=w, quality=q) for w, q in ratings]),
+            **_NO_EVERMEM,
+        ))
+
+        assert result["submitted"] == 4
+        assert [r["status"] for r in result["results"]] == ["ok"] * 4
+        assert result["remaining_due_count"] == 0
+        assert _state(batch_db) == _state(single_db)
+        assert (
+            batch_db.execute("SELECT COUNT(*) FROM review_history", fetch=True, commit=False)
+            == single_db.execute("SELECT COUNT(*) FROM review_history", fetch=True, commit=False)
+        )
+        assert batch_db.get_review_heatmap_data() == single_db.get_review_heatmap_data()
+        assert batch_db.get_statistics()["reviewed_today"] == 3
+        assert batch_db.reviews.check_due_queue() == []
+    finally:
+        single_db.close_all_connections()
+        batch_db.close_all_connections()
+
+
+def test_batch_replays_offline_reviews_and_skips_unknown_words(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+        yesterday = datetime.now() - timedelta(days=1)
+        result = asyncio.run(submit_review_batch(
+            ReviewBatchSubmit(reviews=[
+                ReviewBatchItem(word="alpha", quality=1, reviewed_at=yesterday.timestamp()),
+                ReviewBatchItem(word="ghost", quality=4),
+            ]),
+            **_NO_EVERMEM,
+        ))
+
+        assert [r["status"] for r in result["results"]] == ["ok", "not_found"]
+        # An 8h retry window from yesterday's review is already due again.
+        assert result["remaining_due_count"] == 3
+        assert db.get_review_heatmap_data() == {yesterday.strftime('%Y-%m-%d'): 1}
+    finally:
+        db.close_all_connections()
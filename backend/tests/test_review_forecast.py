@@ -0,0 +1,136 @@
+"""
+Tests for the review-load forecast (GET /api/review/forecast).
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from models.database import DatabaseManager
+from routers.review import get_review_forecast
+from services.due_queue import DueQueue
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "forecast.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def test_histogram_buckets_are_half_open():
+    queue = DueQueue(lambda: [(-1.0, 1, "neg"), (0.0, 2, "new"), (5.0, 3, "a"), (10.0, 4, "b"), (25.0, 5, "c")])
+    assert queue.histogram([0.0, 10.0, 20.0, 30.0]) == [2, 1, 1]
+    assert queue.histogram([0.0]) == []
+
+
+def test_forecast_matches_sql_and_simulates_todays_cards(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        noon = today + timedelta(hours=12)
+        # new, overdue, later today, +3 days, +10 days, beyond the horizon
+        offsets = [None, -2, 0, 3, 10, 40]
+        for i, offset in enumerate(offsets):
+            db.add_word({"word": f"w{i}", "meaning": "m"})
+            if offset is not None:
+                db.execute(
+                    "UPDATE words SET next_review_time = ?, interval = 6, repetitions = 2, easiness = 2.5 WHERE word = ?",
+                    ((noon + timedelta(days=offset)).timestamp(), f"w{i}"),
+                )
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+
+        result = asyncio.run(get_review_forecast(days=14))
+        days = result["days"]
+
+        assert len(days) == 14 and days[0]["date"] == today.strftime('%Y-%m-%d')
+        for i, day in enumerate(days):
+            start = 0.0 if i == 0 else (today + timedelta(days=i)).timestamp()
+            end = (today + timedelta(days=i + 1)).timestamp()
+            expected = db.execute(
+                "SELECT COUNT(*) FROM words WHERE next_review_time >= ? AND next_review_time < ?",
+                (start, end), fetch=True, commit=False,
+            )[0][0]
+            assert day["scheduled"] == expected
+        assert [d["scheduled"] for d in days if d["scheduled"]] == [3, 1, 1]
+
+        # No history yet: every due card is assumed "good" (quality 4).
+        # The new card returns tomorrow, the two reviewed ones in int(6 * 2.5) = 15 days.
+        assert result["rating_mix"] == {"4": 1.0}
+        assert days[1]["simulated"] == 1.0
+        assert sum(d["simulated"] for d in days) == 1.0  # day 15 is past the horizon
+        assert days[3]["total"] == 1.0
+    finally:
+        db.close_all_connections()
+
+
+def test_forecast_after_writes_matches_a_full_rebuild(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        now = datetime.now().timestamp()
+        for i in range(8):
+            db.add_word({"word": f"w{i}", "meaning": "m"})
+        db.reviews.get_review_forecast(days=30)
+        version = db.reviews.due_queue.version
+
+        db.update_review_status("w0", 2, now + 3 * 86400, False)  # reviewed: no longer due
+        db.update_review_status("w1", 1, now - 60, False)  # still due, new SM-2 stage
+        db.delete_word("w2")
+        db.add_word({"word": "w9", "meaning": "m"})
+        assert db.reviews.due_queue.changes_since(version) == (db.reviews.due_queue.version, ["w0", "w1", "w2", "w9"])
+
+        incremental = db.reviews.get_review_forecast(days=30, now=now)
+        db.reviews._forecast_cache = None
+        assert incremental == db.reviews.get_review_forecast(days=30, now=now)
+
+        db.reviews.due_queue.invalidate()
+        assert db.reviews.due_queue.changes_since(version)[1] is None
+    finally:
+        db.close_all_connections()
+
+
+def test_concurrent_forecasts_keep_the_cached_counts_right(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        now = datetime.now().timestamp()
+        for i in range(40):
+            db.add_word({"word": f"w{i}", "meaning": "m"})
+        db.reviews.get_review_forecast(days=30, now=now)
+        start = threading.Barrier(4)
+
+        def forecast():
+            start.wait()
+            return db.reviews.get_review_forecast(days=30, now=now)
+
+        # Hold each forecast after it reads the cache so the others read it too.
+        changes_since = db.reviews.due_queue.changes_since
+
+        def slow_changes_since(version):
+            time.sleep(0.01)
+            return changes_since(version)
+        monkeypatch.setattr(db.reviews.due_queue, "changes_since", slow_changes_since)
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            for round_ in range(10):
+                for i in range(round_ % 2, 40, 2):  # changed SM-2 stage, still due
+                    db.update_review_status(f"w{i}", round_ + 1, now - 60, False)
+                results = list(pool.map(lambda _: forecast(), range(4)))
+                cached = db.reviews.get_review_forecast(days=30, now=now)
+                db.reviews._forecast_cache = None
+                rebuilt = db.reviews.get_review_forecast(days=30, now=now)
+                assert all(result == rebuilt for result in results) and cached == rebuilt
+    finally:
+        db.close_all_connections()
+
+
+def test_word_edits_to_scheduler_state_reach_the_cached_forecast(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        now = datetime.now().timestamp()
+        db.add_word({"word": "pear", "meaning": "m"})
+        db.reviews.get_review_forecast(days=30, now=now)
+        assert db.reviews._forecast_cache[2]["pear"][3] == 0
+
+        db.update_word("pear", {"stage": 3})
+        db.reviews.get_review_forecast(days=30, now=now)
+        assert db.reviews._forecast_cache[2]["pear"][3] == 3
+    finally:
+        db.close_all_connections()
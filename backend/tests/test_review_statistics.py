@@ -0,0 +1,149 @@
+"""
+Tests for ReviewsRepository.get_statistics (single aggregate pass + SQL streak)
+and the review_daily_rollup table behind the heatmap and streak.
+"""
+import time
+from datetime import datetime, timedelta
+
+from models.database import DatabaseManager
+from services.request_metrics import query_metrics
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "stats.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def _add_history(db, word_id, day):
+    db.execute(
+        "INSERT INTO review_history (word_id, review_date, reviewed_at, rating) VALUES (?, ?, ?, 4)",
+        (word_id, day.strftime('%Y-%m-%d'), time.time()),
+    )
+
+
+def test_statistics_counters(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        now_ts = time.time()
+        for word in ["new1", "new2", "due", "later", "done"]:
+            db.add_word({"word": word, "meaning": "m"})
+        db.execute("UPDATE words SET next_review_time = ?, review_count = 2 WHERE word = 'due'", (now_ts - 60,))
+        db.execute("UPDATE words SET next_review_time = ?, review_count = 1 WHERE word = 'later'", (now_ts + 3600,))
+        db.execute("UPDATE words SET next_review_time = ?, mastered = 1 WHERE word = 'done'", (now_ts + 86400,))
+        db.execute("UPDATE words SET next_review_time = ? WHERE word LIKE 'new%'", (now_ts + 60,))
+        db.execute("UPDATE words SET next_review_time = 0 WHERE word = 'new2'")
+
+        stats = db.get_statistics()
+
+        assert stats["total"] == 5
+        assert stats["mastered"] == 1
+        assert stats["new"] == 2
+        assert stats["learning"] == 2
+        assert stats["due_today"] == 2  # 'due' plus the nrt=0 word
+        assert stats["reviewed_today"] == 0
+        assert stats["streak_days"] == 0
+    finally:
+        db.close_connection()
+
+
+def test_streak_counts_latest_consecutive_run(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        db.add_word({"word": "beta", "meaning": "m"})
+        today = datetime.now()
+        for offset in (0, 1, 2):
+            _add_history(db, 1, today - timedelta(days=offset))
+        _add_history(db, 2, today)
+        # An older run separated by a gap must not be counted.
+        for offset in (5, 6, 7, 8):
+            _add_history(db, 1, today - timedelta(days=offset))
+        db.reviews.rebuild_daily_rollup()
+
+        stats = db.get_statistics()
+        assert stats["streak_days"] == 3
+        assert stats["reviewed_today"] == 2
+    finally:
+        db.close_connection()
+
+
+def test_streak_survives_until_end_of_next_day_only(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        today = datetime.now()
+        for offset in (1, 2):
+            _add_history(db, 1, today - timedelta(days=offset))
+        db.reviews.rebuild_daily_rollup()
+        assert db.get_statistics()["streak_days"] == 2
+
+        db.execute("DELETE FROM review_history")
+        for offset in (2, 3):
+            _add_history(db, 1, today - timedelta(days=offset))
+        db.reviews.rebuild_daily_rollup()
+        assert db.get_statistics()["streak_days"] == 0
+    finally:
+        db.close_connection()
+
+
+def test_statistics_queries_are_timed(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.get_statistics()
+        routes = query_metrics.snapshot()["routes"]
+        assert routes["SQL reviews.statistics.words"]["count"] >= 1
+        assert "SQL reviews.statistics.streak" in routes
+    finally:
+        db.close_connection()
+
+
+def _rollup(db):
+    return db.execute(
+        "SELECT review_date, review_count, distinct_words, rating_1, rating_2, rating_3, rating_4, rating_5 "
+        "FROM review_daily_rollup ORDER BY review_date",
+        fetch=True,
+        commit=False,
+    )
+
+
+def test_rollup_is_maintained_by_review_writes(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "alpha", "meaning": "m"})
+        db.add_word({"word": "beta", "meaning": "m"})
+        later = time.time() + 86400
+        db.update_sm2_status("alpha", easiness=2.5, interval=1, repetitions=1, next_time=later, rating=4)
+        db.update_sm2_status("alpha", easiness=2.5, interval=1, repetitions=0, next_time=later, rating=2)
+        db.update_sm2_status("beta", easiness=2.5, interval=1, repetitions=1, next_time=later, rating=5)
+        db.update_review_status("beta", stage=1, next_time=later, mastered=False)
+        # Unknown words record nothing.
+        db.update_sm2_status("ghost", easiness=2.5, interval=1, repetitions=1, next_time=later, rating=5)
+
+        today = datetime.now().strftime('%Y-%m-%d')
+        assert _rollup(db) == [(today, 4, 2, 1, 1, 0, 1, 1)]
+        assert db.get_review_heatmap_data() == {today: 4}
+        assert db.get_statistics()["reviewed_today"] == 2
+        assert db.get_statistics()["streak_days"] == 1
+
+        # The incremental rollup matches a full recomputation from history.
+        incremental = _rollup(db)
+        db.reviews.rebuild_daily_rollup()
+        assert _rollup(db) == incremental
+    finally:
+        db.close_connection()
+
+
+def test_rollup_backfilled_from_existing_history(tmp_path):
+    db_path = str(tmp_path / "stats.db")
+    json_path = str(tmp_path / "missing.json")
+    db = DatabaseManager(db_path=db_path, json_path=json_path)
+    db.add_word({"word": "alpha", "meaning": "m"})
+    day = datetime.now() - timedelta(days=3)
+    _add_history(db, 1, day)
+    _add_history(db, 1, day)
+    db.close_connection()
+
+    reopened = DatabaseManager(db_path=db_path, json_path=json_path)
+    try:
+        assert reopened.get_review_heatmap_data() == {day.strftime('%Y-%m-%d'): 2}
+    finally:
+        reopened.close_connection()
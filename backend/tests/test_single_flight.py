@@ -0,0 +1,138 @@
+"""
+Tests for single-flight coalescing of dictionary lookups (services.single_flight).
+"""
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from services import multi_dict_service
+from services.multi_dict_service import MultiDictService
+from services.single_flight import SingleFlight, dict_flights
+
+
+def test_concurrent_callers_share_one_call():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"word": "snag"}
+
+    async def run():
+        return await asyncio.gather(*(flight.do(("word", "snag"), fetch) for _ in range(5)))
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats() == {
+        "in_flight": 0, "fetches": 1, "coalesced": 4,
+        "by_kind": {"word": {"fetches": 1, "coalesced": 4}},
+    }
+
+
+def test_callers_on_different_threads_and_loops_are_coalesced():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls, results = [], []
+
+    async def fetch():
+        calls.append(1)
+        started.set()
+        await asyncio.get_running_loop().run_in_executor(None, release.wait, 5)
+        return "done"
+
+    def caller():
+        results.append(asyncio.run(flight.do(("bing", "snag"), fetch)))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    assert started.wait(5)
+    followers = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    while flight.stats()["coalesced"] < 3:
+        threading.Event().wait(0.005)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join(5)
+
+    assert calls == [1] and results == ["done"] * 4
+
+
+def test_errors_reach_every_waiter_and_later_calls_run_again():
+    flight = SingleFlight()
+    calls = []
+
+    async def failing():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flight.do(("youdao", "x"), failing) for _ in range(3)), return_exceptions=True)
+
+    outcomes = asyncio.run(run())
+    assert len(calls) == 1
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(flight.do(("youdao", "x"), failing))
+    assert len(calls) == 2 and flight.stats()["in_flight"] == 0
+
+
+def test_waiter_timeout_does_not_cancel_shared_call_and_cancelled_leader_hands_over():
+    flight = SingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def run():
+        leader = asyncio.create_task(flight.do(("cambridge", "w"), fetch))
+        await asyncio.sleep(0)
+        # A waiter with a short deadline gives up alone.
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(flight.do(("cambridge", "w"), fetch), 0.01)
+        assert not leader.done()
+
+        # The leader being cancelled makes the remaining waiter run the fetch itself.
+        waiter = asyncio.create_task(flight.do(("cambridge", "w"), fetch))
+        await asyncio.sleep(0)
+        leader.cancel()
+        return await waiter
+
+    assert asyncio.run(run()) == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_concurrent_source_lookups_send_one_request(monkeypatch):
+    monkeypatch.setattr(multi_dict_service, "get_db_manager", lambda: None)
+    MultiDictService.cache.clear_memory()
+    dict_flights.reset_stats()
+    requests = []
+
+    async def handler(request):
+        requests.append(request.url.path)
+        await asyncio.sleep(0.02)
+        return httpx.Response(200, text='[{"phonetic": "/snæɡ/", "meanings": []}]')
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await asyncio.gather(
+                *(MultiDictService.search_free_dict_async("Snag", client) for _ in range(4))
+            )
+
+    try:
+        results = asyncio.run(run())
+    finally:
+        MultiDictService.cache.clear_memory()
+
+    assert len(requests) == 1
+    assert all(result["phonetic"] == "/snæɡ/" for result in results)
+    assert dict_flights.stats()["by_kind"]["freedict"] == {"fetches": 1, "coalesced": 3}
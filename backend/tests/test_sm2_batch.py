@@ -0,0 +1,85 @@
+"""
+Tests for the vectorized SM-2 scheduler and POST /api/review/reschedule.
+"""
+import asyncio
+import time
+
+import numpy as np
+import pytest
+from fastapi import HTTPException
+
+from models.database import DatabaseManager
+from routers.review import RescheduleRequest, reschedule_words
+from services.review_service import ReviewService
+from services.sm2_batch import calculate_next_review_times, calculate_sm2_batch, schedule_arrays
+
+
+def test_batch_is_bit_identical_to_scalar_path():
+    rng = np.random.default_rng(7)
+    n = 5000
+    rows = list(zip(
+        rng.choice([None, 0, 1.3, 1.31, 2.5, 2.7, 3.123456789], n).tolist(),
+        rng.choice([None, 0, 1, 6, 17, 250], n).tolist(),
+        rng.integers(0, 8, n).tolist(),
+        rng.integers(0, 9, n).tolist(),
+    ))
+    qualities = rng.integers(1, 6, n)
+    now_ts = time.time()
+
+    easiness, interval, repetitions = calculate_sm2_batch(qualities, *schedule_arrays(rows))
+    next_times = calculate_next_review_times(interval, qualities, now=now_ts)
+
+    for i, (row, quality) in enumerate(zip(rows, qualities.tolist())):
+        word_data = dict(zip(["easiness", "interval", "repetitions", "stage"], row))
+        e, iv, rep = ReviewService.calculate_sm2(quality, word_data)
+        assert (e, iv, rep) == (easiness[i], interval[i], repetitions[i])
+        assert ReviewService.calculate_next_review_time(iv, quality, now=now_ts) == next_times[i]
+
+
+def _make_db(tmp_path):
+    db = DatabaseManager(db_path=str(tmp_path / "resched.db"), json_path=str(tmp_path / "missing.json"))
+    db.add_word({"word": "alpha", "meaning": "m", "tags": "trip"})
+    db.add_word({"word": "beta", "meaning": "m", "tags": "trip"})
+    db.add_word({"word": "gamma", "meaning": "m"})
+    db.execute("UPDATE words SET interval = 6, repetitions = 2, easiness = 2.5, next_review_time = ?", (time.time() - 60,))
+    return db
+
+
+def test_reschedule_regrades_filtered_words(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+        result = asyncio.run(reschedule_words(RescheduleRequest(tag="trip", quality=5)))
+
+        assert result["rescheduled"] == 2
+        assert result["remaining_due_count"] == 1  # only gamma is still due
+        rows = db.execute(
+            "SELECT word, interval, repetitions, review_count FROM words ORDER BY word", fetch=True, commit=False
+        )
+        assert rows == [("alpha", 15, 3, 0), ("beta", 15, 3, 0), ("gamma", 6, 2, 0)]
+        assert db.execute("SELECT COUNT(*) FROM review_history", fetch=True, commit=False) == [(0,)]
+        assert db.reviews.check_due_queue() == []
+    finally:
+        db.close_all_connections()
+
+
+def test_reschedule_shifts_schedules(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        db.execute("UPDATE words SET next_review_time = 0 WHERE word = 'gamma'")
+        before = dict(db.execute("SELECT word, next_review_time FROM words", fetch=True, commit=False))
+        monkeypatch.setattr("routers.review.get_db", lambda: db)
+
+        result = asyncio.run(reschedule_words(RescheduleRequest(shift_days=7)))
+
+        after = dict(db.execute("SELECT word, next_review_time FROM words", fetch=True, commit=False))
+        assert result["rescheduled"] == 3
+        assert after["alpha"] == before["alpha"] + 7 * 86400
+        assert after["gamma"] == 0
+        assert result["remaining_due_count"] == 1
+
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(reschedule_words(RescheduleRequest(quality=4, shift_days=1)))
+        assert exc.value.status_code == 400
+    finally:
+        db.close_all_connections()
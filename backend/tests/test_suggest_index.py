@@ -0,0 +1,101 @@
+"""
+Tests for the search box prefix index (services.suggest_index) and the
+repository hooks that keep it current.
+"""
+import csv
+import random
+
+from models.database import DatabaseManager
+from services import offline_dict, suggest_index
+from services.offline_dict import OfflineDict, build_offline_dict
+from services.suggest_index import SuggestIndex
+
+
+def _brute_force(sources, prefix, limit):
+    merged = {}
+    for word, saved, cached, frequency in sources:
+        key = word.lower()
+        entry = merged.setdefault(key, [word, False, False, 0])
+        entry[1] |= saved
+        entry[2] |= cached
+        if frequency and (not entry[3] or frequency < entry[3]):
+            entry[3] = frequency
+    ranked = sorted(
+        (key for key in merged if key.startswith(prefix)),
+        key=lambda k: SuggestIndex._rank(k, merged[k]),
+    )
+    return [merged[k][0] for k in ranked[:limit]]
+
+
+def test_ranking_saved_then_frequency():
+    index = SuggestIndex(lambda: [
+        ("apple", False, False, 900), ("apply", False, False, 300), ("Appetite", True, False, 0),
+        ("app", False, True, 0), ("apex", False, False, 0), ("banana", True, False, 50),
+    ])
+    assert [s["word"] for s in index.suggest("AP")] == ["Appetite", "apply", "apple", "app", "apex"]
+    assert index.suggest("ap", limit=1) == [{"word": "Appetite", "saved": True}]
+    assert index.suggest("") == [] and index.suggest("zz") == []
+
+
+def test_memoized_prefixes_match_a_full_scan_under_updates(monkeypatch):
+    monkeypatch.setattr(suggest_index, "SCAN_LIMIT", 8)
+    rng = random.Random(3)
+    words = sorted({"".join(rng.choice("abc") for _ in range(rng.randint(1, 5))) for _ in range(300)})
+    sources = []
+    for w in words:  # like the real loader, every word has at least one source
+        saved, frequency = rng.random() < 0.1, rng.choice([0, 0, rng.randint(1, 999)])
+        sources.append((w, saved, not saved and not frequency or rng.random() < 0.2, frequency))
+    index = SuggestIndex(lambda: list(sources))
+    index.suggest("a")
+    assert index.stats()["memoized_prefixes"] > 3
+
+    for _ in range(200):
+        word = rng.choice(words + ["abcabc", "cab"])
+        if rng.random() < 0.5:
+            index.add(word, saved=True)
+            sources.append((word, True, False, 0))
+        else:
+            index.remove_saved(word)
+            sources = [(w, False, c, f) if w == word else (w, s, c, f) for w, s, c, f in sources]
+            sources = [s for s in sources if s[1] or s[2] or s[3] or s[0] != word]
+        for prefix in ("a", "b", "ab", "ca", "abc"):
+            assert [s["word"] for s in index.suggest(prefix, 20)] == _brute_force(sources, prefix, 20)
+
+
+def test_index_follows_repository_writes(tmp_path, monkeypatch):
+    csv_path = tmp_path / "ecdict.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["word", "translation", "frq"])
+        writer.writeheader()
+        writer.writerows([
+            {"word": "snack", "translation": "n. 小吃", "frq": "4000"},
+            {"word": "snake", "translation": "n. 蛇", "frq": "2000"},
+            {"word": "snap", "translation": "v. 折断", "frq": "0"},
+        ])
+    build_offline_dict(str(csv_path), str(tmp_path / "offline.db"))
+    store = OfflineDict(str(tmp_path / "offline.db"))
+    monkeypatch.setattr(offline_dict, "_store", store)
+    db = DatabaseManager(db_path=str(tmp_path / "suggest.db"), json_path=str(tmp_path / "missing.json"))
+    try:
+        db.add_word({"word": "snag", "meaning": "m"})
+        db.set_dict_cache("sniff", "bing", {"meaning": "m"})
+        assert [s["word"] for s in db.suggest_words("sn")] == ["snag", "snake", "snack", "sniff", "snap"]
+
+        db.add_words_batch([{"word": "snail", "meaning": "m"}])
+        db.set_dict_cache("Snore", "youdao", {"meaning": "m"})
+        db.delete_word("snag")
+        assert db.suggest_words("sn") == [
+            {"word": "snail", "saved": True},
+            {"word": "snake", "saved": False},
+            {"word": "snack", "saved": False},
+            {"word": "sniff", "saved": False},
+            {"word": "Snore", "saved": False},
+            {"word": "snap", "saved": False},  # offline headword without a frequency
+        ]
+
+        db.clear_all_dict_cache()
+        assert [s["word"] for s in db.suggest_words("sn", limit=3)] == ["snail", "snake", "snack"]
+        assert [s["word"] for s in db.suggest_words("sni")] == []
+    finally:
+        db.close_all_connections()
+        store.close()
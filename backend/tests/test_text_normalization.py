@@ -0,0 +1,60 @@
+"""
+Tests for write-time text normalization (utils.text_utils) and its migration.
+"""
+import json
+
+from models.database import DatabaseManager
+from utils.text_utils import NORMALIZED_VERSION, clean_chinese_text
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "norm.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def test_clean_chinese_text():
+    assert clean_chinese_text("苹果 水果 ， 香蕉") == "苹果水果，香蕉"
+    assert clean_chinese_text("an apple 苹果") == "an apple 苹果"
+    assert clean_chinese_text(None) is None
+
+
+def test_writes_store_normalized_text(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.add_word({"word": "apple", "meaning": "苹果 水果", "example": "我 喜欢 苹果"})
+        db.add_words_batch([{"word": "pear", "meaning": "梨 子"}])
+        db.update_word("pear", {"context_cn": "一个 梨"})
+        db.set_dict_cache("apple", "youdao", {"meaning": "苹 果", "phonetic": "/ˈæp/"})
+
+        assert db.get_word("apple")["meaning"] == "苹果水果"
+        assert db.get_word("apple")["example"] == "我喜欢苹果"
+        assert db.get_word("pear")["meaning"] == "梨子"
+        assert db.get_word("pear")["context_cn"] == "一个梨"
+        assert db.get_dict_cache("apple", "youdao")["meaning"] == "苹果"
+        versions = db.execute("SELECT DISTINCT normalized_version FROM words", fetch=True, commit=False)
+        assert versions == [(NORMALIZED_VERSION,)]
+    finally:
+        db.close_all_connections()
+
+
+def test_startup_migration_normalizes_old_rows(tmp_path):
+    db = _make_db(tmp_path)
+    db.execute("INSERT INTO words (word, meaning, example) VALUES ('old', '旧 的 东西', 'plain text')")
+    db.execute(
+        "INSERT INTO dict_cache (word, source, data, created_at) VALUES ('old', 'bing', ?, 9e9)",
+        (json.dumps({"meaning": "旧 的"}, ensure_ascii=False),),
+    )
+    db.close_all_connections()
+
+    db = _make_db(tmp_path)
+    try:
+        word = db.get_word("old")
+        assert word["meaning"] == "旧的东西" and word["example"] == "plain text"
+        assert db.get_dict_cache("old", "bing") == {"meaning": "旧的"}
+        pending = db.execute(
+            "SELECT COUNT(*) FROM dict_cache WHERE normalized_version < ?", (NORMALIZED_VERSION,), fetch=True, commit=False
+        )
+        assert pending == [(0,)]
+        if db.fts_enabled:
+            assert db.search_words(keyword="的东西")[0][0]["word"] == "old"  # FTS re-indexed the rewrite
+    finally:
+        db.close_all_connections()
@@ -0,0 +1,86 @@
+"""
+Tests for the streamed word-book export (/api/words/all/stream, /api/words/export).
+"""
+import asyncio
+import csv
+import io
+import json
+
+import pytest
+
+from models.database import DatabaseManager
+from routers.words import export_words, get_all_words, stream_all_words
+from services.word_export import _Encoder
+from utils.import_utils import parse_csv_content
+
+
+def _make_db(tmp_path, count=7):
+    db = DatabaseManager(db_path=str(tmp_path / "export.db"), json_path=str(tmp_path / "missing.json"))
+    for i in range(count):
+        db.add_word({"word": f"w{i}", "meaning": "苹果 水果", "phonetic": f"/w{i}/", "tags": "fruit, a b"})
+    return db
+
+
+def _body(route, **kwargs):
+    async def _run():
+        response = await route(**kwargs)
+        parts = [part async for part in response.body_iterator]
+        return response, "".join(parts), len(parts)
+
+    return asyncio.run(_run())
+
+
+def test_streamed_json_matches_all_words_in_chunks(tmp_path, monkeypatch):
+    db = _make_db(tmp_path)
+    try:
+        monkeypatch.setattr("routers.words.get_db", lambda: db)
+        monkeypatch.setattr("services.word_export.CHUNK_SIZE", 3)
+        expected = asyncio.run(get_all_words())
+        in_use = db.pool_stats()["in_use"]
+
+        response, body, parts = _body(stream_all_words, fmt="json")
+        assert response.media_type == "application/json"
+        assert json.loads(body) == expected
+        assert expected["words"][0]["meaning"] == "苹果水果"  # cleaned like /all
+        assert parts == 1 + 3 + 1  # header, 7 words in chunks of 3, footer
+
+        _, body, _ = _body(stream_all_words, fmt="ndjson")
+        assert [json.loads(line) for line in body.splitlines()] == expected["words"]
+        assert db.pool_stats()["in_use"] == in_use  # the stream returned its connection
+    finally:
+        db.close_all_connections()
+
+
+def test_csv_and_anki_export(tmp_path, monkeypatch):
+    db = _make_db(tmp_path, count=2)
+    try:
+        db.update_word("w1", {"example": "line one\nline\ttwo"})
+        monkeypatch.setattr("routers.words.get_db", lambda: db)
+
+        response, body, _ = _body(export_words, fmt="csv")
+        assert response.headers["content-disposition"].endswith('.csv"')
+        rows = list(csv.reader(io.StringIO(body)))
+        assert rows[0][:3] == ["#word", "meaning", "phonetic"]
+        assert [r[0] for r in rows[1:]] == ["w0", "w1"]
+        # The importer round-trips the export (header skipped).
+        assert parse_csv_content(body) == [
+            {"word": "w0", "meaning": "苹果水果", "phonetic": "/w0/"},
+            {"word": "w1", "meaning": "苹果水果", "phonetic": "/w1/"},
+        ]
+
+        _, body, _ = _body(export_words, fmt="anki")
+        lines = body.splitlines()
+        assert lines[:3] == ["#separator:tab", "#html:true", "#tags column:7"]
+        fields = lines[4].split("\t")
+        assert fields[0] == "w1" and fields[3] == "line one<br>line two"
+        assert fields[-1] == "fruit a_b"
+    finally:
+        db.close_all_connections()
+
+
+def test_encoder_without_chunk_cannot_be_created():
+    class Incomplete(_Encoder):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()
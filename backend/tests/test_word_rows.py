@@ -0,0 +1,39 @@
+"""
+Tests for the shared word row mapper (repositories.word_rows).
+"""
+from models.database import DatabaseManager
+from repositories.word_rows import WORD_COLUMNS
+
+
+def _make_db(tmp_path):
+    return DatabaseManager(db_path=str(tmp_path / "rows.db"), json_path=str(tmp_path / "missing.json"))
+
+
+def test_word_columns_match_schema(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        schema = tuple(row[1] for row in db.get_connection().execute("PRAGMA table_info(words)"))
+        assert schema == WORD_COLUMNS + ("normalized_version",)
+    finally:
+        db.close_all_connections()
+
+
+def test_null_text_columns_map_to_empty_strings(tmp_path):
+    db = _make_db(tmp_path)
+    try:
+        db.write(lambda conn: conn.execute(
+            "INSERT INTO words (word, date_added, mastered, error_count) VALUES ('bare', '2024-02-03', 1, 2)"
+        ))
+        word = db.get_word("bare")
+        assert set(word) == set(WORD_COLUMNS) | {"date"}
+        assert word["meaning"] == "" and word["note"] == "" and word["audio"] == ""
+        assert word["mastered"] is True and word["date"] == "2024-02-03"
+        assert word["fsrs_stability"] is None  # only text columns are blanked
+
+        assert db.get_all_words() == [word]
+        assert db.get_difficult_words(5) == [word]
+        assert db.search_words(keyword="bare")[0] == [word]
+        listed = db.get_words_for_list()["words"][0]
+        assert listed["phonetic"] == "" and listed["date"] == "2024-02-03" and listed["mastered"] is True
+    finally:
+        db.close_all_connections()
@@ -0,0 +1,114 @@
+"""
+Tests for the words_fts full-text index behind WordsRepository keyword search.
+"""
+import sqlite3
+
+from models.database import DatabaseManager
+
+
+def _make_db(tmp_path, name="fts.db"):
+    return DatabaseManager(db_path=str(tmp_path / name), json_path=str(tmp_path / "missing.json"))
+
+
+def _words(result):
+    words, _total = result
+    return [w["word"] for w in words]
+
+
+class TestWordsFtsSearch:
+    def test_keyword_matches_word_and_chinese_meaning(self, tmp_path):
+        db = _make_db(tmp_path)
+        try:
+            assert db.fts_enabled
+            db.add_word({"word": "apple", "meaning": "n. 苹果；苹果树"})
+            db.add_word({"word": "pineapple", "meaning": "n. 菠萝"})
+            db.add_word({"word": "banana", "meaning": "n. 香蕉"})
+
+            assert sorted(_words(db.search_words(keyword="APPLE"))) == ["apple", "pineapple"]
+            assert _words(db.search_words(keyword="苹果树")) == ["apple"]
+            # Too short for trigrams: served by the LIKE fallback.
+            assert _words(db.search_words(keyword="香蕉")) == ["banana"]
+        finally:
+            db.close_connection()
+
+    def test_index_follows_updates_and_deletes(self, tmp_path):
+        db = _make_db(tmp_path)
+        try:
+            db.add_word({"word": "orange", "meaning": "n. 橙子"})
+            assert _words(db.search_words(keyword="橙子颜色")) == []
+
+            db.update_word("orange", {"meaning": "n. 橙子颜色"})
+            assert _words(db.search_words(keyword="橙子颜色")) == ["orange"]
+
+            db.delete_word("orange")
+            words, total = db.search_words(keyword="orange")
+            assert words == [] and total == 0
+        finally:
+            db.close_connection()
+
+    def test_relevance_puts_exact_and_prefix_matches_first(self, tmp_path):
+        db = _make_db(tmp_path)
+        try:
+            for word in ["disport", "portable", "port", "support"]:
+                db.add_word({"word": word, "meaning": "m"})
+
+            words = _words(db.search_words(keyword="port", sort_by="relevance"))
+            assert words[:2] == ["port", "portable"]
+            assert sorted(words[2:]) == ["disport", "support"]
+        finally:
+            db.close_connection()
+
+    def test_like_fallback_when_fts_unavailable(self, tmp_path):
+        db = _make_db(tmp_path)
+        try:
+            db.add_word({"word": "grape", "meaning": "n. 葡萄"})
+            db.fts_enabled = False
+            words, total = db.search_words(keyword="rap", sort_by="relevance")
+            assert [w["word"] for w in words] == ["grape"]
+            assert total == 1
+        finally:
+            db.close_connection()
+
+
+def test_existing_words_are_backfilled_into_index(tmp_path):
+    db_path = str(tmp_path / "legacy.db")
+    conn = sqlite3.connect(db_path)
+    try:
+        # Pre-FTS schema: the words table exists but words_fts does not.
+        conn.execute(
+            """
+            CREATE TABLE words (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                word TEXT UNIQUE NOT NULL,
+                phonetic TEXT,
+                meaning TEXT,
+                example TEXT,
+                context_en TEXT,
+                context_cn TEXT,
+                date_added TEXT,
+                next_review_time REAL DEFAULT 0,
+                review_count INTEGER DEFAULT 0,
+                mastered INTEGER DEFAULT 0,
+                stage INTEGER DEFAULT 0,
+                easiness REAL DEFAULT 2.5,
+                interval INTEGER DEFAULT 0,
+                repetitions INTEGER DEFAULT 0
+            )
+            """
+        )
+        conn.execute("INSERT INTO words (word, meaning) VALUES ('legacy', 'adj. 遗留的代码')")
+        conn.commit()
+    finally:
+        conn.close()
+
+    db = DatabaseManager(db_path=db_path, json_path=str(tmp_path / "missing.json"))
+    try:
+        rows = db.execute(
+            "SELECT rowid FROM words_fts WHERE words_fts MATCH '\"遗留的\"'",
+            fetch=True,
+            commit=False,
+        )
+        assert rows == [(1,)]
+        assert _words(db.search_words(keyword="egac")) == ["legacy"]
+    finally:
+        db.close_connection()
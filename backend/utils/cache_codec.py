@@ -0,0 +1,72 @@
+"""
+Payload encoding for ``dict_cache`` rows.
+
+Dictionary entries used to be stored as plain JSON text. The Cambridge/Bing
+meanings and examples made ``dict_cache`` the largest table in the
+database. Entries are now stored as compact JSON compressed with zlib. The
+compressor is primed with a preset dictionary (``zdict``) of the keys,
+source names and phrases that recur in every entry, so even short entries
+compress well.
+
+``payload_format`` is stored alongside each row:
+
+- ``PAYLOAD_JSON`` (0): plain JSON text (legacy rows, and entries too small
+  to gain anything from compression);
+- ``PAYLOAD_ZLIB_V1`` (1): zlib with ``_ZDICT_V1``.
+
+A format's zdict must never change once rows have been written with it.
+Changing the dictionary means adding a new format number. The startup
+migration (DatabaseManager.compress_dict_cache) then re-encodes older rows.
+"""
+import json
+import zlib
+from typing import Tuple, Union
+
+PAYLOAD_JSON = 0
+PAYLOAD_ZLIB_V1 = 1
+CURRENT_FORMAT = PAYLOAD_ZLIB_V1
+
+# Substrings common to cached entries. zlib prefers matches near the end of
+# the window, so the most frequent strings go last.
+_ZDICT_V1 = "".join([
+    "剑桥词典 (Cambridge)", "Bing 词典", "Free Dictionary", "有道词典",
+    "https://api.dictionaryapi.dev/media/pronunciations/en/",
+    '"word_families":[{"root":"', '"meaning":"', '"words":[',
+    "something ", "someone ", "used to ", "that ", "which ", "with ",
+    "的", "，", "。", "；", "人", "物", "使", "被",
+    "n. ", "v. ", "vt. ", "vi. ", "adj. ", "adv. ", "prep. ", "conj. ",
+    "<br>", "\\n", "• ", "US /", "UK /",
+    '"source_name":"', '"audio":"', '"roots":"', '"synonyms":"', '"tags":"',
+    '"word_families":[]', '"date":"', '"example":"', '"phonetic":"', '"meaning":"',
+    '{"source":"cambridge",', '{"source":"bing",', '{"source":"freedict",',
+    '{"word":"', '","',
+]).encode("utf-8")
+
+_ZLIB_LEVEL = 6
+
+
+def encode_payload(data: dict) -> Tuple[Union[bytes, str], int, int]:
+    """Encode a cache entry; returns (payload, payload_format, raw_size)."""
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    raw = text.encode("utf-8")
+    compressor = zlib.compressobj(_ZLIB_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, zdict=_ZDICT_V1)
+    packed = compressor.compress(raw) + compressor.flush()
+    if len(packed) >= len(raw):
+        return text, PAYLOAD_JSON, len(raw)
+    return packed, PAYLOAD_ZLIB_V1, len(raw)
+
+
+def decode_payload(payload: Union[bytes, str], payload_format: int):
+    """Decode a stored payload; raises ValueError if it is corrupt or of an unknown format."""
+    if payload_format in (None, PAYLOAD_JSON):
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8")
+        return json.loads(payload)
+    if payload_format == PAYLOAD_ZLIB_V1:
+        try:
+            decompressor = zlib.decompressobj(zlib.MAX_WBITS, zdict=_ZDICT_V1)
+            raw = decompressor.decompress(payload) + decompressor.flush()
+        except (zlib.error, TypeError) as e:
+            raise ValueError(f"Corrupt dict_cache payload: {e}") from e
+        return json.loads(raw)
+    raise ValueError(f"Unknown dict_cache payload format: {payload_format}")
@@ -0,0 +1,59 @@
+"""
+Opaque keyset-pagination cursors shared by list endpoints.
+
+A cursor records the sort the page was produced with plus the (sort value, id)
+of its last row, so the next page is a constant-cost index range scan instead
+of an ``OFFSET`` walk over every preceding row.
+"""
+import base64
+import binascii
+import json
+from typing import Any, List, Optional, Tuple
+
+
+def encode_cursor(sort_by: str, sort_order: str, last_row: dict) -> str:
+    """Build the cursor pointing just past ``last_row``."""
+    value = last_row.get(sort_by)
+    if isinstance(value, bool):
+        value = int(value)
+    payload = {"s": sort_by, "o": sort_order.upper(), "k": [value, last_row["id"]]}
+    raw = json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """Return the (sort value, id) keyset position stored in ``token``.
+
+    Raises ValueError for malformed cursors or ones issued for a different sort.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw.decode("utf-8"))
+        value, last_id = payload["k"]
+        cursor_sort, cursor_order = payload["s"], payload["o"]
+    except (binascii.Error, UnicodeDecodeError, ValueError, KeyError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if cursor_sort != sort_by or cursor_order != sort_order.upper():
+        raise ValueError("Cursor was issued for a different sort order")
+    if not isinstance(last_id, int):
+        raise ValueError("Malformed cursor")
+    return value, last_id
+
+
+def split_page(
+    rows: List[dict],
+    page_size: int,
+    sort_by: Optional[str],
+    sort_order: str,
+) -> Tuple[List[dict], Optional[str]]:
+    """Trim a ``page_size + 1`` fetch to one page and derive its next cursor.
+
+    ``sort_by=None`` (e.g. relevance ranking, which has no keyset) yields the
+    page without a cursor.
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    page = rows[:page_size]
+    if not sort_by:
+        return page, None
+    return page, encode_cursor(sort_by, sort_order, page[-1])
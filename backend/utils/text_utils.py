@@ -0,0 +1,62 @@
+"""
+Write-time normalization of display text.
+
+Dictionary sources often put spaces between CJK characters ("苹果 水果").
+Those spaces used to be stripped with a regex on every read: the words and
+review routers and every dictionary-cache hit. Now the text is normalized
+once, when it is stored. Word rows are normalized by WordsRepository on
+add/update/import, and dictionary entries by CacheRepository.set and the
+in-memory caches. Each stored row records which normalization it has had in
+a ``normalized_version`` column. At startup, DatabaseManager rewrites rows
+stored under an older version, so readers can return stored text as is.
+
+Bump NORMALIZED_VERSION whenever the rules change; the next start re-runs
+them over existing rows.
+"""
+import re
+from typing import Optional
+
+NORMALIZED_VERSION = 1
+
+# Word columns shown with Chinese text.
+WORD_TEXT_FIELDS = ("meaning", "example", "context_cn")
+# Dictionary-entry keys holding Chinese text.
+DICT_TEXT_FIELDS = ("meaning", "example")
+
+# \u4e00-\u9fff: Common CJK
+# \u3000-\u303f: CJK Symbols and Punctuation
+# \uff00-\uffef: Fullwidth Forms
+_CJK = r"[\u4e00-\u9fff\u3000-\u303f\uff00-\uffef]"
+_CJK_GAP = re.compile(rf"(?<={_CJK})\s+(?={_CJK})")
+
+
+def clean_chinese_text(text):
+    """
+    Remove spaces between Chinese characters and punctuation.
+    Pattern matches any space that is:
+    - Preceded by a CJK character or punctuation
+    - Followed by a CJK character or punctuation
+    """
+    if not text:
+        return text
+    return _CJK_GAP.sub('', text)
+
+
+def normalize_word_fields(data: dict) -> dict:
+    """Normalize the text fields present in a word row/update dict (in place)."""
+    for key in WORD_TEXT_FIELDS:
+        value = data.get(key)
+        if value and isinstance(value, str):
+            data[key] = clean_chinese_text(value)
+    return data
+
+
+def normalize_dict_entry(entry: Optional[dict]) -> Optional[dict]:
+    """Normalize a dictionary lookup result before it is cached (in place)."""
+    if not entry:
+        return entry
+    for key in DICT_TEXT_FIELDS:
+        value = entry.get(key)
+        if value and isinstance(value, str):
+            entry[key] = clean_chinese_text(value)
+    return entry